@@ -3,7 +3,6 @@ Analisadores específicos por linguagem de programação.
 """
 
 from .python_analyzer import PythonAnalyzer
-from .javascript_analyzer import JavaScriptAnalyzer
-from .ruby_analyzer import RubyAnalyzer
+from .java_analyzer import JavaAnalyzer
 
-__all__ = ["PythonAnalyzer", "JavaScriptAnalyzer", "RubyAnalyzer"]
+__all__ = ["PythonAnalyzer", "JavaAnalyzer"]
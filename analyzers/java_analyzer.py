@@ -9,10 +9,31 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from code_analyzer import LanguageAnalyzer, CodeElement
+from analyzers.java_parser import parse_java_source, JavaMember, ACCESS_MODIFIERS
+from analyzers.response_parser import parse_response_blocks
+
+# Métodos gerados/boilerplate descritos localmente, sem o LLM
+_BOILERPLATE_METHODS = {'equals', 'hashCode', 'toString'}
+_ACCESSOR_PATTERN = re.compile(r'^(get|set|is)[A-Z]')
+_ACCESSOR_MAX_BODY_TOKENS = 16
+_TYPE_KINDS = ('class', 'interface', 'enum', 'record', 'annotation')
+
+# Cabeçalhos do formato de resposta de análise Java
+_RESPONSE_HEADERS = {
+    'CLASSE': 'class',
+    'INTERFACE': 'interface',
+    'ENUM': 'enum',
+    'MÉTODO': 'method',
+    'CAMPO': 'field',
+    'IMPORT': 'import',
+}
+_METHOD_NAME_PATTERN = re.compile(r'(\w+)\s*\(')
 
 class JavaAnalyzer(LanguageAnalyzer):
     """Analisador específico para projetos Java."""
     
+    language_name = "java"
+    
     def __init__(self, project_dir: Path):
         super().__init__(project_dir)
         self.java_packages = {}  # package -> [arquivos]
@@ -139,23 +160,99 @@ class JavaAnalyzer(LanguageAnalyzer):
         except Exception:
             return ""
     
-    def build_analysis_prompt(self, file_path: str, content: str, context: str, external_deps: str) -> str:
-        """Constrói prompt específico para análise de arquivos Java."""
-        return f"""
-Analise o arquivo Java abaixo e descreva CADA elemento (classe, interface, enum, método, campo, etc.) de forma concisa mas completa.
-
-**CONTEXTO DAS DEPENDÊNCIAS:**
-{context}
-
-**DEPENDÊNCIAS MAVEN/GRADLE:**
-{external_deps}
-
-**ARQUIVO: {file_path}**
-```java
-{content}
-```
-
-**INSTRUÇÕES ESPECÍFICAS PARA JAVA:**
+    def extract_static_elements(self, file_path: str, content: str) -> Dict[str, CodeElement]:
+        """Extrai o esqueleto do arquivo Java com o parser leve de `java_parser`."""
+        if not file_path.endswith('.java'):
+            return {}  # Kotlin/Scala continuam com análise completa pelo LLM
+        
+        skeleton = parse_java_source(content)
+        if not skeleton.members:
+            return {}
+        
+        elements = {}
+        for import_name in skeleton.imports:
+            elements[f"{file_path}:{import_name}"] = CodeElement(
+                file_path=file_path,
+                element_type='import',
+                name=import_name,
+                signature=import_name,
+                description=f"Importa `{import_name}`.",
+                dependencies=[],
+                package=skeleton.package
+            )
+        
+        for member in skeleton.members:
+            element_type = self._element_type_for(member)
+            key = f"{file_path}:{member.owner}.{member.name}" if member.owner else f"{file_path}:{member.name}"
+            suffix = 2
+            while key in elements:
+                key = f"{file_path}:{member.owner}.{member.name}#{suffix}"
+                suffix += 1
+            
+            elements[key] = CodeElement(
+                file_path=file_path,
+                element_type=element_type,
+                name=member.name,
+                signature=member.signature,
+                description=member.doc or self._trivial_description(member),
+                dependencies=list(member.supertypes),
+                package=skeleton.package,
+                access_modifier=next((m for m in member.modifiers if m in ACCESS_MODIFIERS), ""),
+                annotations=list(member.annotations)
+            )
+        
+        self._describe_data_holders(skeleton.members, elements, file_path)
+        return elements
+    
+    def _describe_data_holders(self, members: List[JavaMember], elements: Dict[str, CodeElement], file_path: str):
+        """Tipos sem Javadoc cujos membros são todos triviais (DTOs) são descritos localmente."""
+        for member in members:
+            if member.kind not in ('class', 'record', 'enum') or member.doc:
+                continue
+            qualified = f"{member.owner}.{member.name}" if member.owner else member.name
+            children = [m for m in members if m.owner == qualified]
+            if any(child.kind in _TYPE_KINDS or not self._trivial_description(child) for child in children):
+                continue
+            fields = [child.name for child in children if child.kind in ('field', 'enum_constant')]
+            key = f"{file_path}:{qualified}"
+            if key in elements and not elements[key].description:
+                listed = f" com {', '.join(fields)}" if fields else ""
+                elements[key].description = f"Estrutura de dados `{member.name}`{listed}."
+    
+    @staticmethod
+    def _element_type_for(member: JavaMember) -> str:
+        if member.kind in ('class', 'record'):
+            return 'class'
+        if member.kind == 'annotation':
+            return 'interface'
+        if member.kind == 'constructor':
+            return 'method'
+        return member.kind
+    
+    @staticmethod
+    def _trivial_description(member: JavaMember) -> str:
+        """Descrição local para elementos triviais; vazio quando o LLM deve descrever."""
+        owner = member.owner.split('.')[-1]
+        if member.kind == 'field':
+            return f"Campo `{member.signature}` de `{owner}`."
+        if member.kind == 'enum_constant':
+            return f"Valor `{member.name}` do enum `{owner}`."
+        if member.kind == 'constructor' and member.body_size <= _ACCESSOR_MAX_BODY_TOKENS * 2:
+            return f"Construtor de `{owner}`."
+        if member.kind == 'method':
+            if member.name in _BOILERPLATE_METHODS:
+                return f"Implementação padrão de `{member.name}` para `{owner}`."
+            if _ACCESSOR_PATTERN.match(member.name) and member.body_size <= _ACCESSOR_MAX_BODY_TOKENS:
+                return f"Acessor `{member.name}` de `{owner}`."
+        return ""
+    
+    def get_batch_group_key(self, file_path: Path) -> str:
+        """Agrupa lotes pelo pacote Java (ou pelo diretório, se não houver package)."""
+        return self._extract_java_package(file_path) or str(file_path.parent)
+    
+    def get_analysis_instructions(self) -> str:
+        """Instruções e formato de resposta para análise de arquivos Java."""
+        return """**INSTRUÇÕES ESPECÍFICAS PARA JAVA:**
 Para cada elemento encontrado, forneça:
 
 1. **CLASSES:** Nome, propósito, herança/implementações, principais métodos
@@ -195,75 +292,65 @@ Uso: Como é usado no código...
 ```
 
 Seja preciso e inclua informações sobre modificadores de acesso, herança, annotations e padrões de design utilizados.
+"""
+    
+    def build_analysis_prompt(self, file_path: str, content: str, context: str, external_deps: str) -> str:
+        """Constrói prompt específico para análise de arquivos Java."""
+        return f"""
+Analise o arquivo Java abaixo e descreva CADA elemento (classe, interface, enum, método, campo, etc.) de forma concisa mas completa.
+
+**CONTEXTO DAS DEPENDÊNCIAS:**
+{context}
+
+**DEPENDÊNCIAS MAVEN/GRADLE:**
+{external_deps}
+
+**ARQUIVO: {file_path}**
+```java
+{content}
+```
+
+{self.get_analysis_instructions()}
 """
     
     def parse_analysis_response(self, file_path: str, response: str) -> Dict[str, CodeElement]:
-        """Parser robusto usando regex para respostas de análise Java."""
-        import re
-        
+        """Converte a resposta de análise Java em elementos (parser linear de `response_parser`)."""
         elements = {}
+        package = self._extract_java_package(Path(file_path))
         
-        # Padrões regex para diferentes tipos de elementos Java
-        patterns = {
-            'class': r'CLASSE:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)[^\n]*)*)?)',
-            'interface': r'INTERFACE:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)[^\n]*)*)?)',
-            'enum': r'ENUM:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)[^\n]*)*)?)',
-            'method': r'MÉTODO:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)[^\n]*)*)?)',
-            'field': r'CAMPO:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)[^\n]*)*)?)',
-            'import': r'IMPORT:\s*([^\n]+)\n(?:.*?\n)*?(?:Uso:\s*([^\n]+(?:\n(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)[^\n]*)*)?)'
-        }
-        
-        for element_type, pattern in patterns.items():
-            matches = re.finditer(pattern, response, re.MULTILINE | re.DOTALL)
+        for block in parse_response_blocks(response, _RESPONSE_HEADERS):
+            signature_part = block.header
             
-            for match in matches:
-                signature_part = match.group(1).strip()
-                description_part = match.group(2).strip() if match.group(2) else ""
-                
-                # Extrai o nome limpo dependendo do tipo
-                name = "unknown"
-                if element_type in ['class', 'interface', 'enum']:
-                    name = signature_part.split()[0]
-                elif element_type == 'method':
-                    # Para métodos, procura o nome antes dos parênteses
-                    method_match = re.search(r'(\w+)\s*\(', signature_part)
-                    if method_match:
-                        name = method_match.group(1)
-                elif element_type == 'field':
-                    # Para campos, o nome geralmente é a última palavra
-                    field_parts = signature_part.split()
-                    if field_parts:
-                        name = field_parts[-1]
-                elif element_type == 'import':
-                    name = signature_part
-                
-                if name and name != "unknown":
-                    # Extrai informações adicionais do bloco
-                    access_modifier = ""
-                    annotations = []
-                    
-                    # Procura por modificadores no texto
-                    modifier_match = re.search(r'Modificadores:\s*([^\n]+)', match.group(0))
-                    if modifier_match:
-                        access_modifier = modifier_match.group(1).strip()
-                    
-                    # Procura por annotations
-                    annotation_match = re.search(r'Annotations:\s*([^\n]+)', match.group(0))
-                    if annotation_match:
-                        annotations = [a.strip() for a in annotation_match.group(1).split(',')]
-                    
-                    element = CodeElement(
-                        file_path=file_path,
-                        element_type=element_type,
-                        name=name,
-                        signature=signature_part,
-                        description=description_part,
-                        dependencies=[],
-                        package=self._extract_java_package(Path(file_path)),
-                        access_modifier=access_modifier,
-                        annotations=annotations
-                    )
-                    elements[f"{file_path}:{name}"] = element
+            # Extrai o nome limpo dependendo do tipo
+            name = ""
+            if block.element_type in ['class', 'interface', 'enum']:
+                name = signature_part.split()[0]
+            elif block.element_type == 'method':
+                # Para métodos, procura o nome antes dos parênteses
+                method_match = _METHOD_NAME_PATTERN.search(signature_part)
+                if method_match:
+                    name = method_match.group(1)
+            elif block.element_type == 'field':
+                # Para campos, o nome geralmente é a última palavra
+                name = signature_part.split()[-1]
+            elif block.element_type == 'import':
+                name = signature_part
+            
+            if not name:
+                continue
+            
+            annotations = block.fields.get('Annotations', '')
+            elements[f"{file_path}:{name}"] = CodeElement(
+                file_path=file_path,
+                element_type=block.element_type,
+                name=name,
+                signature=signature_part,
+                description=block.description,
+                dependencies=[],
+                package=package,
+                access_modifier=block.fields.get('Modificadores', ''),
+                annotations=[a.strip() for a in annotations.split(',')] if annotations else []
+            )
         
         return elements
     
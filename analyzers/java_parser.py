@@ -0,0 +1,381 @@
+"""
+Parser leve de código Java.
+Extrai o esqueleto de um arquivo (package, imports, tipos, métodos, campos)
+localmente, sem depender do LLM nem de regex sobre o arquivo inteiro.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<doc>/\*\*.*?\*/)
+  | (?P<skip>//[^\n]*|/\*.*?\*/|\s+)
+  | (?P<text>"""(?:.|\n)*?"""|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<symbol>\.\.\.|::|->|[{}()\[\];,<>=.?:&|+\-*/%!~^@])
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+MODIFIERS = {
+    'public', 'protected', 'private', 'static', 'final', 'abstract', 'synchronized',
+    'native', 'transient', 'volatile', 'strictfp', 'default', 'sealed'
+}
+ACCESS_MODIFIERS = ('public', 'protected', 'private')
+TYPE_KEYWORDS = {'class', 'interface', 'enum', 'record'}
+
+_NO_SPACE_BEFORE = {'.', ',', ')', ']', '>', '(', '[', '...', ';', '<'}
+_NO_SPACE_AFTER = {'.', '(', '[', '<'}
+
+
+@dataclass
+class JavaMember:
+    """Elemento declarado em um arquivo Java"""
+    kind: str  # class, interface, enum, annotation, record, method, constructor, field, enum_constant
+    name: str
+    signature: str
+    owner: str = ""  # tipo que declara o elemento (vazio para tipos de nível superior)
+    modifiers: List[str] = field(default_factory=list)
+    annotations: List[str] = field(default_factory=list)
+    supertypes: List[str] = field(default_factory=list)
+    body_size: int = 0  # número de tokens do corpo (métodos/construtores)
+    doc: str = ""  # primeira frase do Javadoc, se houver
+
+
+@dataclass
+class JavaSkeleton:
+    """Esqueleto estático de um arquivo Java"""
+    package: str = ""
+    imports: List[str] = field(default_factory=list)
+    members: List[JavaMember] = field(default_factory=list)
+
+
+def tokenize_java(source: str) -> Tuple[List[str], Dict[int, str]]:
+    """Divide o código em tokens, descartando comentários e literais.
+
+    Retorna os tokens e um mapa posição do token -> Javadoc que o precede.
+    """
+    tokens: List[str] = []
+    docs: Dict[int, str] = {}
+    for match in _TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind == 'skip' or kind == 'other':
+            continue
+        if kind == 'doc':
+            docs[len(tokens)] = _first_doc_sentence(match.group())
+        elif kind == 'text':
+            tokens.append('""')
+        else:
+            tokens.append(match.group())
+    return tokens, docs
+
+
+def _first_doc_sentence(doc: str) -> str:
+    """Extrai a primeira frase de um comentário Javadoc."""
+    lines = []
+    for line in doc[3:-2].split('\n'):
+        line = line.strip().lstrip('*').strip()
+        if line.startswith('@'):
+            break
+        if line:
+            lines.append(line)
+    text = ' '.join(lines)
+    text = re.sub(r'<[^>]+>|\{@\w+\s+([^}]*)\}', r'\1', text)
+    sentence_end = text.find('. ')
+    return text[:sentence_end + 1] if sentence_end >= 0 else text
+
+
+def join_tokens(tokens: List[str]) -> str:
+    """Reconstrói um trecho de código a partir de tokens com espaçamento legível."""
+    parts: List[str] = []
+    prev = None
+    for tok in tokens:
+        if prev is not None and tok not in _NO_SPACE_BEFORE and prev not in _NO_SPACE_AFTER:
+            parts.append(' ')
+        elif prev in MODIFIERS and tok == '<':
+            parts.append(' ')
+        parts.append(tok)
+        prev = tok
+    return ''.join(parts)
+
+
+class _JavaParser:
+    def __init__(self, tokens: List[str], docs: Dict[int, str]):
+        self.tokens = tokens
+        self.docs = docs
+        self.pos = 0
+        self.skeleton = JavaSkeleton()
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def skip_balanced(self, open_tok: str, close_tok: str) -> int:
+        """Avança sobre um bloco balanceado começando no token atual; retorna seu tamanho."""
+        depth = 0
+        start = self.pos
+        while self.pos < len(self.tokens):
+            tok = self.tokens[self.pos]
+            self.pos += 1
+            if tok == open_tok:
+                depth += 1
+            elif tok == close_tok:
+                depth -= 1
+                if depth == 0:
+                    break
+        return self.pos - start
+
+    def read_until(self, stops: set) -> List[str]:
+        """Lê tokens até um dos tokens de parada (fora de parênteses/colchetes)."""
+        collected = []
+        depth = 0
+        while self.pos < len(self.tokens):
+            tok = self.tokens[self.pos]
+            if depth == 0 and tok in stops:
+                break
+            if tok in ('(', '['):
+                depth += 1
+            elif tok in (')', ']'):
+                depth -= 1
+            collected.append(tok)
+            self.pos += 1
+        return collected
+
+    def read_modifiers(self) -> Tuple[List[str], List[str], str]:
+        doc = self.docs.get(self.pos, "")
+        modifiers: List[str] = []
+        annotations: List[str] = []
+        while self.pos < len(self.tokens):
+            tok = self.tokens[self.pos]
+            if tok == '@' and self.peek(1) != 'interface':
+                self.pos += 1
+                name = self.peek() or ""
+                self.pos += 1
+                while self.peek() == '.' and self.peek(1) is not None:
+                    name += '.' + self.peek(1)
+                    self.pos += 2
+                annotations.append('@' + name)
+                if self.peek() == '(':
+                    self.skip_balanced('(', ')')
+            elif tok in MODIFIERS:
+                modifiers.append(tok)
+                self.pos += 1
+            else:
+                break
+            doc = doc or self.docs.get(self.pos, "")
+        return modifiers, annotations, doc
+
+    def parse(self) -> JavaSkeleton:
+        while self.pos < len(self.tokens):
+            tok = self.peek()
+            if tok == 'package':
+                self.pos += 1
+                self.skeleton.package = ''.join(self.read_until({';'}))
+                self.pos += 1
+            elif tok == 'import':
+                self.pos += 1
+                parts = [t for t in self.read_until({';'}) if t != 'static']
+                self.skeleton.imports.append(''.join(parts))
+                self.pos += 1
+            elif tok == ';':
+                self.pos += 1
+            else:
+                modifiers, annotations, doc = self.read_modifiers()
+                if self.is_type_declaration():
+                    self.parse_type(modifiers, annotations, doc, owner="")
+                else:
+                    self.pos += 1
+        return self.skeleton
+
+    def is_type_declaration(self) -> bool:
+        return self.peek() in TYPE_KEYWORDS or (self.peek() == '@' and self.peek(1) == 'interface')
+
+    def parse_type(self, modifiers: List[str], annotations: List[str], doc: str, owner: str):
+        if self.peek() == '@':
+            self.pos += 2
+            kind = 'annotation'
+        else:
+            kind = self.peek()
+            self.pos += 1
+        name = self.peek() or ""
+        self.pos += 1
+
+        header = self.read_until({'{', ';'})
+        supertypes = self._extract_supertypes(header)
+        qualified_name = f"{owner}.{name}" if owner else name
+        keyword = '@interface' if kind == 'annotation' else kind
+        self.skeleton.members.append(JavaMember(
+            kind=kind,
+            name=name,
+            signature=join_tokens(modifiers + [keyword, name] + header),
+            owner=owner,
+            modifiers=modifiers,
+            annotations=annotations,
+            supertypes=supertypes,
+            doc=doc
+        ))
+
+        if self.peek() == '{':
+            self.pos += 1
+            self.parse_body(qualified_name, name, kind)
+        else:
+            self.pos += 1
+
+    @staticmethod
+    def _extract_supertypes(header: List[str]) -> List[str]:
+        supertypes: List[str] = []
+        collecting = False
+        depth = 0
+        for index, tok in enumerate(header):
+            if tok in ('extends', 'implements', 'permits'):
+                collecting = tok != 'permits'
+            elif tok == '<':
+                depth += 1
+            elif tok == '>':
+                depth -= 1
+            elif collecting and depth == 0 and re.match(r'[A-Za-z_$]', tok):
+                if supertypes and index > 0 and header[index - 1] == '.':
+                    supertypes[-1] += '.' + tok
+                else:
+                    supertypes.append(tok)
+        return supertypes
+
+    def parse_enum_constants(self, owner: str):
+        while self.pos < len(self.tokens):
+            tok = self.peek()
+            if tok == ';':
+                self.pos += 1
+                return
+            if tok == '}':
+                return
+            if tok == ',':
+                self.pos += 1
+                continue
+            doc = self.docs.get(self.pos, "")
+            _, annotations, doc = self.read_modifiers()
+            name = self.peek() or ""
+            self.pos += 1
+            if self.peek() == '(':
+                self.skip_balanced('(', ')')
+            if self.peek() == '{':
+                self.skip_balanced('{', '}')
+            if re.match(r'[A-Za-z_$]', name):
+                self.skeleton.members.append(JavaMember(
+                    kind='enum_constant', name=name, signature=name, owner=owner,
+                    annotations=annotations, doc=doc
+                ))
+
+    def parse_body(self, owner: str, simple_name: str, kind: str):
+        if kind == 'enum':
+            self.parse_enum_constants(owner)
+
+        while self.pos < len(self.tokens):
+            tok = self.peek()
+            if tok == '}':
+                self.pos += 1
+                return
+            if tok == ';':
+                self.pos += 1
+                continue
+            if tok == '{':
+                self.skip_balanced('{', '}')  # bloco inicializador
+                continue
+            if tok == 'static' and self.peek(1) == '{':
+                self.pos += 1
+                self.skip_balanced('{', '}')
+                continue
+
+            modifiers, annotations, doc = self.read_modifiers()
+            if self.is_type_declaration():
+                self.parse_type(modifiers, annotations, doc, owner)
+                continue
+
+            declaration = self.read_until({'(', '=', ';', '{', '}'})
+            next_tok = self.peek()
+            if not declaration:
+                if next_tok == '{':
+                    self.skip_balanced('{', '}')
+                elif next_tok in ('(', '=', ';'):
+                    self.pos += 1
+                continue
+
+            if next_tok == '(':
+                self.parse_method(declaration, modifiers, annotations, doc, owner, simple_name)
+            elif next_tok in ('=', ';'):
+                self.parse_fields(declaration, modifiers, annotations, doc, owner)
+            elif next_tok == '{':
+                self.skip_balanced('{', '}')
+
+    def parse_method(self, declaration: List[str], modifiers: List[str], annotations: List[str],
+                     doc: str, owner: str, simple_name: str):
+        name = declaration[-1]
+        params_start = self.pos
+        self.skip_balanced('(', ')')
+        params = self.tokens[params_start:self.pos]
+        trailer = self.read_until({'{', ';', '}'})
+
+        body_size = 0
+        if self.peek() == '{':
+            body_size = self.skip_balanced('{', '}') - 2
+        elif self.peek() == ';':
+            self.pos += 1
+
+        kind = 'constructor' if name == simple_name and len(declaration) == 1 else 'method'
+        self.skeleton.members.append(JavaMember(
+            kind=kind,
+            name=name,
+            signature=join_tokens(modifiers + declaration + params + trailer),
+            owner=owner,
+            modifiers=modifiers,
+            annotations=annotations,
+            body_size=max(body_size, 0),
+            doc=doc
+        ))
+
+    def parse_fields(self, declaration: List[str], modifiers: List[str], annotations: List[str],
+                     doc: str, owner: str):
+        field_type = declaration[:-1]
+        names = [declaration[-1]]
+        while self.peek() is not None and self.peek() != ';':
+            if self.peek() == '=':
+                self.pos += 1
+                initializer_depth = 0
+                while self.peek() is not None:
+                    tok = self.peek()
+                    if tok in ('(', '[', '{'):
+                        initializer_depth += 1
+                    elif tok in (')', ']', '}'):
+                        if initializer_depth == 0:
+                            break
+                        initializer_depth -= 1
+                    elif initializer_depth == 0 and tok in (',', ';'):
+                        break
+                    self.pos += 1
+            if self.peek() == ',':
+                self.pos += 1
+                if self.peek() is not None and re.match(r'[A-Za-z_$]', self.peek()):
+                    names.append(self.peek())
+                    self.pos += 1
+            elif self.peek() == '}':
+                return
+            elif self.peek() != ';' and self.peek() != '=':
+                self.pos += 1
+        self.pos += 1
+
+        for name in names:
+            self.skeleton.members.append(JavaMember(
+                kind='field',
+                name=name,
+                signature=join_tokens(modifiers + field_type + [name]),
+                owner=owner,
+                modifiers=modifiers,
+                annotations=annotations,
+                doc=doc
+            ))
+
+
+def parse_java_source(source: str) -> JavaSkeleton:
+    """Extrai o esqueleto estático de um arquivo Java."""
+    tokens, docs = tokenize_java(source)
+    return _JavaParser(tokens, docs).parse()
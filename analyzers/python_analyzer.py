@@ -8,10 +8,21 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from code_analyzer import LanguageAnalyzer, CodeElement
+from analyzers.response_parser import parse_response_blocks
+
+# Cabeçalhos do formato de resposta de análise Python
+_RESPONSE_HEADERS = {
+    'FUNÇÃO': 'function',
+    'CLASSE': 'class',
+    'VARIÁVEL': 'variable',
+    'IMPORT': 'import',
+}
 
 class PythonAnalyzer(LanguageAnalyzer):
     """Analisador específico para projetos Python."""
     
+    language_name = "python"
+    
     def get_file_extensions(self) -> List[str]:
         return ['.py']
     
@@ -41,6 +52,109 @@ class PythonAnalyzer(LanguageAnalyzer):
             'python_packages': self._discover_python_packages()
         }
     
+    def extract_static_elements(self, file_path: str, content: str) -> Dict[str, CodeElement]:
+        """Extrai funções, classes, métodos, variáveis globais e imports com `ast`.
+
+        Docstrings viram a descrição do elemento; imports e variáveis recebem
+        descrição local. Só o restante precisa ser descrito pelo LLM.
+        """
+        try:
+            tree = ast.parse(content)
+        except SyntaxError:
+            return {}
+        
+        module = self._module_name(file_path)
+        elements = {}
+        
+        def add(key_name: str, element: CodeElement):
+            elements[f"{file_path}:{key_name}"] = element
+        
+        def describe_function(node, owner: str = ""):
+            prefix = f"{owner}." if owner else ""
+            decorators = [f"@{ast.unparse(d)}" for d in node.decorator_list]
+            returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+            is_async = "async " if isinstance(node, ast.AsyncFunctionDef) else ""
+            add(prefix + node.name, CodeElement(
+                file_path=file_path,
+                element_type='method' if owner else 'function',
+                name=node.name,
+                signature=f"{is_async}{node.name}({ast.unparse(node.args)}){returns}",
+                description=self._docstring_summary(node),
+                dependencies=[],
+                package=module,
+                access_modifier='private' if node.name.startswith('_') and not node.name.endswith('__') else 'public',
+                annotations=decorators
+            ))
+        
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    base = f"{node.module}." if isinstance(node, ast.ImportFrom) and node.module else ""
+                    imported = f"{base}{alias.name}"
+                    add(imported, CodeElement(
+                        file_path=file_path,
+                        element_type='import',
+                        name=imported,
+                        signature=imported,
+                        description=f"Importa `{imported}`" + (f" como `{alias.asname}`." if alias.asname else "."),
+                        dependencies=[],
+                        package=module
+                    ))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                describe_function(node)
+            elif isinstance(node, ast.ClassDef):
+                bases = [ast.unparse(base) for base in node.bases]
+                add(node.name, CodeElement(
+                    file_path=file_path,
+                    element_type='class',
+                    name=node.name,
+                    signature=f"{node.name}({', '.join(bases)})" if bases else node.name,
+                    description=self._docstring_summary(node),
+                    dependencies=bases,
+                    package=module,
+                    access_modifier='private' if node.name.startswith('_') else 'public',
+                    annotations=[f"@{ast.unparse(d)}" for d in node.decorator_list]
+                ))
+                for child in node.body:
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        describe_function(child, owner=node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        annotation = f": {ast.unparse(node.annotation)}" if isinstance(node, ast.AnnAssign) else ""
+                        add(target.id, CodeElement(
+                            file_path=file_path,
+                            element_type='variable',
+                            name=target.id,
+                            signature=f"{target.id}{annotation}",
+                            description=f"Variável global `{target.id}` do módulo `{module}`.",
+                            dependencies=[],
+                            package=module
+                        ))
+        
+        return elements
+    
+    @staticmethod
+    def _docstring_summary(node) -> str:
+        """Primeira linha da docstring, usada como descrição sem passar pelo LLM."""
+        docstring = ast.get_docstring(node)
+        if not docstring:
+            return ""
+        return docstring.strip().split('\n')[0].strip()
+    
+    def _module_name(self, file_path: str) -> str:
+        """Converte o caminho do arquivo no nome do módulo Python."""
+        path = Path(file_path)
+        try:
+            path = path.relative_to(self.project_dir)
+        except ValueError:
+            pass
+        parts = list(path.with_suffix('').parts)
+        if parts and parts[-1] == '__init__':
+            parts = parts[:-1]
+        return '.'.join(parts)
+    
     def _discover_python_packages(self) -> List[str]:
         """Descobre pacotes Python no projeto."""
         packages = []
@@ -50,23 +164,9 @@ class PythonAnalyzer(LanguageAnalyzer):
             packages.append(package_name)
         return packages
     
-    def build_analysis_prompt(self, file_path: str, content: str, context: str, external_deps: str) -> str:
-        """Constrói prompt específico para análise de arquivos Python."""
-        return f"""
-Analise o arquivo Python abaixo e descreva CADA elemento (função, classe, variável global, etc.) de forma concisa mas completa.
-
-**CONTEXTO DAS DEPENDÊNCIAS:**
-{context}
-
-**ESTRUTURA DO PROJETO:**
-{external_deps}
-
-**ARQUIVO: {file_path}**
-```python
-{content}
-```
-
-**INSTRUÇÕES:**
+    def get_analysis_instructions(self) -> str:
+        """Instruções e formato de resposta para análise de arquivos Python."""
+        return """**INSTRUÇÕES:**
 Para cada elemento encontrado, forneça:
 
 1. **FUNÇÕES:** Nome, parâmetros, retorno, e o que faz em 1-2 frases
@@ -91,50 +191,51 @@ Uso: Como é usado no código...
 ```
 
 Seja preciso e foque no que cada elemento FAZ, não como está implementado.
+"""
+    
+    def build_analysis_prompt(self, file_path: str, content: str, context: str, external_deps: str) -> str:
+        """Constrói prompt específico para análise de arquivos Python."""
+        return f"""
+Analise o arquivo Python abaixo e descreva CADA elemento (função, classe, variável global, etc.) de forma concisa mas completa.
+
+**CONTEXTO DAS DEPENDÊNCIAS:**
+{context}
+
+**ESTRUTURA DO PROJETO:**
+{external_deps}
+
+**ARQUIVO: {file_path}**
+```python
+{content}
+```
+
+{self.get_analysis_instructions()}
 """
     
     def parse_analysis_response(self, file_path: str, response: str) -> Dict[str, CodeElement]:
-        """Parser robusto usando regex para respostas Python."""
-        import re
-        
+        """Converte a resposta de análise Python em elementos (parser linear de `response_parser`)."""
         elements = {}
         
-        # Padrões regex para diferentes tipos de elementos
-        patterns = {
-            'function': r'FUNÇÃO:\s*([^(\n]+)(?:\([^)]*\))?\s*(?:->\s*[^\n]+)?\n(?:Descrição:\s*([^\n]+(?:\n(?!FUNÇÃO:|CLASSE:|VARIÁVEL:|IMPORT:)[^\n]*)*)?)',
-            'class': r'CLASSE:\s*([^\n]+)\n(?:Descrição:\s*([^\n]+(?:\n(?!FUNÇÃO:|CLASSE:|VARIÁVEL:|IMPORT:)[^\n]*)*)?)',
-            'variable': r'VARIÁVEL:\s*([^(\n]+)(?:\([^)]*\))?\n(?:Descrição:\s*([^\n]+(?:\n(?!FUNÇÃO:|CLASSE:|VARIÁVEL:|IMPORT:)[^\n]*)*)?)',
-            'import': r'IMPORT:\s*([^\n]+)\n(?:Uso:\s*([^\n]+(?:\n(?!FUNÇÃO:|CLASSE:|VARIÁVEL:|IMPORT:)[^\n]*)*)?)'
-        }
-        
-        for element_type, pattern in patterns.items():
-            matches = re.finditer(pattern, response, re.MULTILINE | re.DOTALL)
+        for block in parse_response_blocks(response, _RESPONSE_HEADERS):
+            name_part = block.header
             
-            for match in matches:
-                name_part = match.group(1).strip()
-                description_part = match.group(2).strip() if match.group(2) else ""
-                
-                # Extrai o nome limpo
-                if element_type == 'function':
-                    name = name_part.split('(')[0].strip()
-                    signature = name_part
-                elif element_type == 'variable':
-                    name = name_part.split('(')[0].strip()
-                    signature = ""
-                else:
-                    name = name_part.split()[0] if name_part else "unknown"
-                    signature = name_part if element_type == 'class' else ""
-                
-                if name and name != "unknown":
-                    element = CodeElement(
-                        file_path=file_path,
-                        element_type=element_type,
-                        name=name,
-                        signature=signature,
-                        description=description_part,
-                        dependencies=[]
-                    )
-                    elements[f"{file_path}:{name}"] = element
+            # Extrai o nome limpo
+            if block.element_type in ('function', 'variable'):
+                name = name_part.split('(')[0].strip()
+                signature = name_part if block.element_type == 'function' else ""
+            else:
+                name = name_part.split()[0]
+                signature = name_part if block.element_type == 'class' else ""
+            
+            if name:
+                elements[f"{file_path}:{name}"] = CodeElement(
+                    file_path=file_path,
+                    element_type=block.element_type,
+                    name=name,
+                    signature=signature,
+                    description=block.description,
+                    dependencies=[]
+                )
         
         return elements
     
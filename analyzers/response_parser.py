@@ -0,0 +1,81 @@
+"""
+Parser de respostas de análise no formato `ROTULO: valor` (CLASSE:, MÉTODO:, FUNÇÃO:...).
+
+Percorre a resposta uma única vez como uma máquina de estados: uma única regex
+ancorada no início da linha localiza as linhas rotuladas; cada cabeçalho de elemento
+abre um bloco, linhas `Campo: valor` preenchem o bloco e a descrição é o trecho entre
+o rótulo `Descrição:` e o próximo cabeçalho. Custo linear no tamanho da resposta, sem
+os quantificadores preguiçosos aninhados que causavam backtracking.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# Rótulos cujo valor inicia a descrição do elemento
+DESCRIPTION_LABELS = ('Descrição', 'Uso')
+
+# Linha `Rótulo: valor` (rótulo curto, opcionalmente em lista ou negrito markdown)
+_LABELED_LINE_PATTERN = re.compile(
+    r'^[ \t]*(?:[-*#]+[ \t]*)?\**([A-Za-zÀ-ÿ][A-Za-zÀ-ÿ /]{0,40})\**:\**[ \t]*([^\n]*)$',
+    re.MULTILINE
+)
+
+
+@dataclass
+class ResponseBlock:
+    """Bloco de um elemento na resposta do LLM."""
+    element_type: str
+    header: str
+    fields: Dict[str, str] = field(default_factory=dict)
+    description: str = ""
+
+
+def _clean_description(text: str) -> str:
+    """Remove cercas de código markdown que o LLM deixa no fim da resposta."""
+    if '```' in text:
+        text = "\n".join(line for line in text.split('\n') if not line.lstrip().startswith('```'))
+    return text.strip()
+
+
+def parse_response_blocks(response: str, headers: Dict[str, str],
+                          description_labels: Tuple[str, ...] = DESCRIPTION_LABELS) -> List[ResponseBlock]:
+    """Divide a resposta em blocos de elementos.
+
+    Args:
+        response: texto devolvido pelo LLM.
+        headers: rótulo do cabeçalho → tipo do elemento (ex.: {'CLASSE': 'class'}).
+        description_labels: rótulos que iniciam a descrição.
+
+    Returns:
+        Blocos na ordem em que aparecem; cabeçalhos sem valor são ignorados.
+    """
+    blocks: List[ResponseBlock] = []
+    current = None
+    description_start = -1
+
+    def close_description(end: int):
+        if current is not None and description_start >= 0:
+            current.description = _clean_description(response[description_start:end])
+
+    for match in _LABELED_LINE_PATTERN.finditer(response):
+        label = match.group(1).strip()
+
+        if label in headers:
+            close_description(match.start())
+            description_start = -1
+            value = match.group(2).strip()
+            current = ResponseBlock(headers[label], value) if value else None
+            if current:
+                blocks.append(current)
+            continue
+
+        if current is None:
+            continue
+
+        current.fields.setdefault(label, match.group(2).strip())
+        if description_start < 0 and label in description_labels:
+            description_start = match.start(2)
+
+    close_description(len(response))
+    return blocks
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Benchmark de ponta a ponta do pipeline, sem Chrome nem vscode.dev
+
+Gera um sistema legado sintético (`synthetic_codebase.py`), sobe o chat falso
+(`fake_chat_server.py`) em um processo separado e executa, com o `LLMClient` real
+via CDP, as etapas do pipeline em um diretório temporário:
+
+- `fase1`, `fase2`, `fase3` e `fase4` (a Fase 4 em lote, com `--workers` sessões);
+- `context`: `build_comprehensive_context` e `build_smart_context_for_task` repetidos;
+- `analyze_project_code` sobre o sistema sintético.
+
+As esperas fixas do cliente (1s por comando CDP, polls de 5s) são multiplicadas
+por `--time-scale`; a latência e o streaming do chat falso são os configurados.
+Para cada etapa são medidos tempo de parede, tempo de CPU deste processo (o
+servidor roda à parte), prompts enviados e seus tamanhos.
+
+Os resultados podem ser gravados como baseline (`--save-baseline`) e comparados
+com ela nas execuções seguintes: o script termina com código 1 se alguma etapa
+ficar mais lenta (ou enviar prompts maiores) do que a tolerância `--threshold`.
+
+Uso: python benchmarks/bench_pipeline.py [--language java] [--files 60] [--tasks 4] [--save-baseline]
+"""
+
+import argparse
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Callable, Dict, List
+from urllib.request import urlopen
+
+# Adiciona o diretório raiz do projeto ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic_codebase import GRAPHS, generate_codebase
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baselines", "bench_pipeline.json")
+# Módulos do cliente cujas esperas fixas são escaladas
+SLEEP_MODULES = ('llm_client', 'devtools.client', 'devtools.dom', 'devtools.input')
+# Métricas comparadas com a baseline (as de tempo ignoram diferenças abaixo de MIN_DELTA_S)
+COMPARED_METRICS = ('wall_s', 'cpu_s', 'prompt_chars')
+MIN_DELTA_S = 0.1
+# Descrições usadas no cenário de construção de contexto
+CONTEXT_TASKS = (
+    ("Migrar o serviço de pedidos para a nova API REST", "implementation"),
+    ("Validar o repositório de clientes migrado", "validation"),
+    ("Integrar o módulo de faturamento ao novo backend", "integration"),
+)
+
+
+class _ScaledTime:
+    """Módulo `time` com `sleep` multiplicado por `scale` (o resto é o original)."""
+
+    def __init__(self, scale: float):
+        self._scale = scale
+
+    def sleep(self, seconds):
+        time.sleep(seconds * self._scale)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def scale_client_sleeps(scale: float):
+    for module_name in SLEEP_MODULES:
+        importlib.import_module(module_name).time = _ScaledTime(scale)
+
+
+def start_server(args) -> (subprocess.Popen, int):
+    command = [
+        sys.executable, os.path.join(BENCHMARKS_DIR, "fake_chat_server.py"), '--port', '0',
+        '--tabs', str(args.workers), '--latency', str(args.latency), '--stream-time', str(args.stream_time),
+        '--response-size', str(args.response_size), '--tasks', str(args.tasks),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    first_line = process.stdout.readline().split()
+    if len(first_line) != 2 or first_line[0] != 'PORT':
+        process.kill()
+        raise RuntimeError("Servidor de chat falso não iniciou")
+    return process, int(first_line[1])
+
+
+def server_stats(port: int) -> Dict[str, int]:
+    with urlopen(f"http://127.0.0.1:{port}/stats") as response:
+        return json.load(response)
+
+
+def measure(port: int, function: Callable, verbose: bool = False) -> Dict:
+    before = server_stats(port)
+    output = sys.stdout if verbose else io.StringIO()
+    with redirect_stdout(output):
+        started_wall, started_cpu = time.perf_counter(), time.process_time()
+        function()
+        wall, cpu = time.perf_counter() - started_wall, time.process_time() - started_cpu
+    after = server_stats(port)
+    prompts = after['prompts'] - before['prompts']
+    return {
+        'wall_s': round(wall, 3),
+        'cpu_s': round(cpu, 3),
+        'prompts': prompts,
+        'prompt_chars': after['prompt_chars'] - before['prompt_chars'],
+        'response_chars': after['response_chars'] - before['response_chars'],
+        'prompts_per_s': round(prompts / wall, 2) if wall else 0.0,
+    }
+
+
+def run_pipeline(args) -> Dict[str, Dict]:
+    """Executa as etapas medidas em um diretório temporário e retorna as métricas por etapa."""
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    legacy_dir = os.path.join(work_dir, "legacy")
+    generate_codebase(legacy_dir, args.language, args.files, args.fan_out, args.graph)
+    run_dir = os.path.join(work_dir, "run")
+    os.makedirs(run_dir)
+
+    server, port = start_server(args)
+    original_cwd = os.getcwd()
+    results: Dict[str, Dict] = {}
+    try:
+        # main grava em migration_docs/ relativo ao diretório atual
+        os.chdir(run_dir)
+        main = importlib.import_module('main')
+        from llm_client import LLMClient
+        scale_client_sleeps(args.time_scale)
+
+        client = LLMClient(debug_endpoint=f"http://127.0.0.1:{port}/json")
+        client.connect()
+        context_files: List[str] = []
+
+        def phases(function):
+            def run():
+                context_files[:] = function(client, list(context_files))
+            return run
+
+        def build_contexts():
+            for _ in range(args.context_iterations):
+                main.build_comprehensive_context(list(context_files), legacy_dir)
+                for description, task_type in CONTEXT_TASKS:
+                    main.build_smart_context_for_task(description, task_type)
+
+        steps = [
+            ('fase1', lambda: context_files.extend(main.fase1(client, legacy_dir))),
+            ('fase2', phases(main.fase2)),
+            ('fase3', phases(main.fase3)),
+            ('context', build_contexts),
+            ('fase4', lambda: main.fase4_batch(client, list(context_files), args.workers)),
+            ('analyze_project_code', lambda: main.analyze_project_code(client, legacy_dir, use_batches=True)),
+        ]
+        for name, function in steps:
+            print(f"⏱️  {name}...", flush=True)
+            results[name] = measure(port, function, args.verbose)
+        client.close()
+        main.llm_log.close()
+    finally:
+        os.chdir(original_cwd)
+        server.terminate()
+        server.wait()
+        if args.keep:
+            print(f"📁 Arquivos gerados mantidos em {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def benchmark_config(args) -> Dict:
+    """Parâmetros que precisam coincidir para a comparação com a baseline fazer sentido."""
+    return {name: getattr(args, name) for name in (
+        'language', 'files', 'fan_out', 'graph', 'tasks', 'workers', 'latency', 'stream_time',
+        'response_size', 'time_scale', 'context_iterations'
+    )}
+
+
+def print_results(results: Dict[str, Dict]):
+    print(f"\n{'etapa':<22} {'tempo (s)':>10} {'CPU (s)':>9} {'prompts':>8} {'prompts/s':>10} {'chars prompt':>13}")
+    for name, metrics in results.items():
+        print(f"{name:<22} {metrics['wall_s']:>10.3f} {metrics['cpu_s']:>9.3f} {metrics['prompts']:>8} "
+              f"{metrics['prompts_per_s']:>10.2f} {metrics['prompt_chars']:>13,}")
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Lista as regressões (métrica acima de baseline * (1 + threshold))."""
+    regressions = []
+    print(f"\n📊 Comparação com a baseline (tolerância {threshold:.0%})")
+    print(f"{'etapa':<22} {'métrica':<13} {'baseline':>12} {'atual':>12} {'variação':>9}")
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            regressed = change > threshold and (metric == 'prompt_chars' or new - old > MIN_DELTA_S)
+            if regressed:
+                regressions.append(f"{name}.{metric}: {old} → {new} ({change:+.0%})")
+            print(f"{name:<22} {metric:<13} {old:>12,} {new:>12,} {change:>+8.0%}{' ❌' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta do pipeline com chat falso")
+    parser.add_argument('--language', choices=('java', 'python'), default='java', help='linguagem do sistema legado')
+    parser.add_argument('--files', type=int, default=60, help='arquivos do sistema legado sintético')
+    parser.add_argument('--fan-out', type=int, default=3, help='imports de outros arquivos do projeto por arquivo')
+    parser.add_argument('--graph', choices=GRAPHS, default='random', help='forma do grafo de imports')
+    parser.add_argument('--tasks', type=int, default=4, help='tasks no backlog da Fase 3')
+    parser.add_argument('--workers', type=int, default=2, help='sessões de chat usadas pela Fase 4 em lote')
+    parser.add_argument('--latency', type=float, default=0.05, help='segundos até a resposta aparecer no chat')
+    parser.add_argument('--stream-time', type=float, default=0.05, help='segundos de streaming de cada resposta')
+    parser.add_argument('--response-size', type=int, default=4000, help='tamanho (chars) das respostas em texto')
+    parser.add_argument('--time-scale', type=float, default=0.01,
+                        help='fator aplicado às esperas fixas do cliente (1 = tempos reais)')
+    parser.add_argument('--context-iterations', type=int, default=20, help='repetições do cenário de contexto')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='arquivo JSON da baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='grava os resultados como nova baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='regressão tolerada (fração da baseline)')
+    parser.add_argument('--keep', action='store_true', help='mantém o diretório temporário com os artefatos')
+    parser.add_argument('--verbose', action='store_true', help='mostra a saída do pipeline')
+    args = parser.parse_args()
+
+    config = benchmark_config(args)
+    print(f"🏁 Benchmark do pipeline: {json.dumps(config)}")
+    results = run_pipeline(args)
+    print_results(results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'config': config,
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\n💾 Baseline salva em {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️ Sem baseline em {args.baseline}; use --save-baseline para criar")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print("\n⚠️ Parâmetros diferentes dos da baseline; comparação ignorada")
+        return
+    regressions = compare_with_baseline(results, baseline['results'], args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressão(ões):")
+        for regression in regressions:
+            print(f"   • {regression}")
+        sys.exit(1)
+    print("\n✅ Nenhuma regressão em relação à baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark do parser de respostas de análise
+
+Compara o parser linear de `analyzers/response_parser.py` com o parser antigo
+baseado em regex com quantificadores preguiçosos aninhados, usando respostas
+sintéticas de tamanho crescente.
+
+O segundo cenário reproduz o pior caso do parser antigo: um elemento sem
+`Descrição:` seguido de texto livre, que faz os padrões preguiçosos testarem
+um número exponencial de divisões das linhas.
+
+Uso: python benchmarks/bench_response_parser.py [--sizes 100,1000,5000] [--trailing 8,12,16] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzers.java_analyzer import JavaAnalyzer
+from code_analyzer import CodeElement
+
+# Padrões do parser antigo, mantidos aqui apenas como referência de comparação
+_STOP = r'(?!CLASSE:|INTERFACE:|ENUM:|MÉTODO:|CAMPO:|IMPORT:)'
+LEGACY_PATTERNS = {
+    'class': rf'CLASSE:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n{_STOP}[^\n]*)*)?)',
+    'interface': rf'INTERFACE:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n{_STOP}[^\n]*)*)?)',
+    'enum': rf'ENUM:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n{_STOP}[^\n]*)*)?)',
+    'method': rf'MÉTODO:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n{_STOP}[^\n]*)*)?)',
+    'field': rf'CAMPO:\s*([^\n]+)\n(?:.*?\n)*?(?:Descrição:\s*([^\n]+(?:\n{_STOP}[^\n]*)*)?)',
+    'import': rf'IMPORT:\s*([^\n]+)\n(?:.*?\n)*?(?:Uso:\s*([^\n]+(?:\n{_STOP}[^\n]*)*)?)',
+}
+
+
+def legacy_parse(analyzer: JavaAnalyzer, file_path: str, response: str) -> Dict[str, CodeElement]:
+    """Reprodução do `JavaAnalyzer.parse_analysis_response` antigo."""
+    elements = {}
+    for element_type, pattern in LEGACY_PATTERNS.items():
+        for match in re.finditer(pattern, response, re.MULTILINE | re.DOTALL):
+            signature_part = match.group(1).strip()
+            description_part = match.group(2).strip() if match.group(2) else ""
+
+            name = "unknown"
+            if element_type in ['class', 'interface', 'enum']:
+                name = signature_part.split()[0]
+            elif element_type == 'method':
+                method_match = re.search(r'(\w+)\s*\(', signature_part)
+                if method_match:
+                    name = method_match.group(1)
+            elif element_type == 'field':
+                field_parts = signature_part.split()
+                if field_parts:
+                    name = field_parts[-1]
+            elif element_type == 'import':
+                name = signature_part
+
+            if name and name != "unknown":
+                access_modifier = ""
+                annotations = []
+                modifier_match = re.search(r'Modificadores:\s*([^\n]+)', match.group(0))
+                if modifier_match:
+                    access_modifier = modifier_match.group(1).strip()
+                annotation_match = re.search(r'Annotations:\s*([^\n]+)', match.group(0))
+                if annotation_match:
+                    annotations = [a.strip() for a in annotation_match.group(1).split(',')]
+
+                elements[f"{file_path}:{name}"] = CodeElement(
+                    file_path=file_path,
+                    element_type=element_type,
+                    name=name,
+                    signature=signature_part,
+                    description=description_part,
+                    dependencies=[],
+                    package=analyzer._extract_java_package(Path(file_path)),
+                    access_modifier=access_modifier,
+                    annotations=annotations
+                )
+    return elements
+
+
+def build_response(elements: int) -> str:
+    """Gera uma resposta sintética no formato de análise Java."""
+    parts = []
+    for i in range(elements):
+        kind = i % 4
+        if kind == 0:
+            parts.append(f"CLASSE: Servico{i} extends Base implements Runnable\n"
+                         f"Modificadores: public\n"
+                         f"Descrição: Coordena o fluxo {i} do sistema.\n"
+                         f"Métodos principais: executar, validar\n")
+        elif kind == 1:
+            parts.append(f"MÉTODO: public void executar{i}(String entrada, int tentativas)\n"
+                         f"Descrição: Executa o passo {i} e registra o resultado.\n"
+                         f"Annotations: @Override, @Transactional\n")
+        elif kind == 2:
+            parts.append(f"CAMPO: private final Repositorio repositorio{i}\n"
+                         f"Descrição: Acesso ao repositório {i}.\n")
+        else:
+            parts.append(f"IMPORT: com.acme.modulo{i}.Classe\n"
+                         f"Uso: Tipo usado no passo {i}.\n")
+    return "\n".join(parts)
+
+
+def build_degenerate_response(trailing_lines: int) -> str:
+    """Resposta com um elemento sem descrição seguido de texto livre."""
+    notes = "".join(f"Observação {i} sobre a classe.\n" for i in range(trailing_lines))
+    return build_response(100) + "\nCLASSE: Final\n" + notes
+
+
+def measure(function, repeat: int) -> float:
+    """Melhor tempo (em segundos) entre `repeat` execuções."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parser de respostas de análise")
+    parser.add_argument('--sizes', default='100,1000,5000', help='quantidades de elementos, separadas por vírgula')
+    parser.add_argument('--trailing', default='8,12,16',
+                        help='linhas de texto livre após um elemento sem descrição (pior caso do parser antigo)')
+    parser.add_argument('--repeat', type=int, default=3, help='repetições por medida (usa o melhor tempo)')
+    parser.add_argument('--skip-legacy', action='store_true', help='não executa o parser antigo (lento em respostas grandes)')
+    args = parser.parse_args()
+
+    analyzer = JavaAnalyzer(Path('.'))
+    print("📊 Respostas bem formadas")
+    print(f"{'elementos':>10} {'bytes':>10} {'linear (ms)':>12} {'regex antigo (ms)':>18} {'ganho':>8}")
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        response = build_response(size)
+        parsed = analyzer.parse_analysis_response("Bench.java", response)
+        assert len(parsed) == size, f"Parser linear encontrou {len(parsed)} de {size} elementos"
+
+        linear = measure(lambda: analyzer.parse_analysis_response("Bench.java", response), args.repeat)
+        if args.skip_legacy:
+            print(f"{size:>10} {len(response):>10} {linear * 1000:>12.2f} {'-':>18} {'-':>8}")
+            continue
+
+        legacy = measure(lambda: legacy_parse(analyzer, "Bench.java", response), args.repeat)
+        print(f"{size:>10} {len(response):>10} {linear * 1000:>12.2f} {legacy * 1000:>18.2f} {legacy / linear:>7.1f}x")
+
+    print("\n📊 Elemento sem descrição seguido de texto livre")
+    print(f"{'linhas':>10} {'bytes':>10} {'linear (ms)':>12} {'regex antigo (ms)':>18} {'ganho':>8}")
+    for trailing in (int(value) for value in args.trailing.split(',')):
+        response = build_degenerate_response(trailing)
+        linear = measure(lambda: analyzer.parse_analysis_response("Bench.java", response), args.repeat)
+        if args.skip_legacy:
+            print(f"{trailing:>10} {len(response):>10} {linear * 1000:>12.2f} {'-':>18} {'-':>8}")
+            continue
+
+        legacy = measure(lambda: legacy_parse(analyzer, "Bench.java", response), args.repeat)
+        print(f"{trailing:>10} {len(response):>10} {linear * 1000:>12.2f} {legacy * 1000:>18.2f} {legacy / linear:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark do SmartContextManager com bases de conhecimento sintéticas
+
+Para cada tamanho de base (ex.: 1.000, 10.000, 100.000 documentos) mede:
+- `index_document`: latência por documento (p50/p95/p99) e tempo total;
+- `save_knowledge_base` / `load_knowledge_base`: tempo, tamanho do arquivo e
+  memória alocada pela base carregada (tracemalloc);
+- `search_relevant_docs` e `build_smart_context_for_task`: latência por consulta;
+- qualidade da recuperação: recall@k em consultas rotuladas.
+
+Os documentos são agrupados em tópicos (`--docs-per-topic`); cada tópico tem duas
+palavras exclusivas e cada consulta rotulada cita as palavras de um tópico e
+`--query-noise` termos comuns do domínio. Os documentos relevantes são os do tópico, então uma
+otimização que piore a busca aparece como queda no recall.
+
+Os resultados são gravados em JSON (`benchmarks/results/` por padrão) para
+acompanhar a evolução entre versões.
+
+Uso: python benchmarks/bench_smart_context.py [--sizes 1000,10000] [--queries 200] [--output arquivo.json]
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smart_context_manager import SmartContextManager
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RECALL_KS = (1, 3, 5)
+# Prefixos dos ids (os mesmos nomes dos documentos das fases, que recebem bônus na busca)
+DOC_KINDS = ('architecture-analysis', 'business-flows', 'dependencies-analysis', 'component-roadmap', 'notes')
+DOMAIN_WORDS = (
+    'cliente', 'pedido', 'fatura', 'pagamento', 'estoque', 'produto', 'usuario', 'relatorio',
+    'servico', 'repositorio', 'controlador', 'entidade', 'banco', 'tabela', 'consulta', 'cadastro',
+    'integracao', 'mensageria', 'fila', 'cache', 'autenticacao', 'permissao', 'auditoria', 'agenda',
+    'contrato', 'endereco', 'transporte', 'nota', 'imposto', 'desconto', 'frete', 'catalogo',
+)
+_SYLLABLES = ('ka', 'lo', 'mi', 'ru', 'te', 'va', 'no', 'si', 'pe', 'do', 'xu', 'ba', 'ze', 'fi', 'go', 'ju')
+
+
+def topic_word(index: int, salt: int) -> str:
+    """Palavra artificial exclusiva do tópico (só letras, como um termo de domínio)."""
+    value = index * 2 + salt
+    syllables = []
+    for _ in range(5):
+        value, digit = divmod(value, len(_SYLLABLES))
+        syllables.append(_SYLLABLES[digit])
+    return ''.join(syllables)
+
+
+def build_document(topic: int, kind: str, rng: random.Random, doc_chars: int) -> str:
+    first, second = topic_word(topic, 0), topic_word(topic, 1)
+    noise = lambda count: ' '.join(rng.sample(DOMAIN_WORDS, count))
+    parts = [
+        f"# {kind} {first}\n",
+        f"O componente {first} {second} trata {noise(4)}.\n",
+        "## Arquitetura\n",
+        f"Camadas do {first}: {noise(6)}.\n",
+        "## Tecnologias e Frameworks\n",
+        f"Dependências do {second}: {noise(5)}.\n",
+        "## Testes e Validação\n",
+    ]
+    while sum(len(part) for part in parts) < doc_chars:
+        parts.append(f"- Cenário de {noise(3)} cobrindo {noise(3)}.\n")
+    return ''.join(parts)
+
+
+def build_corpus(documents: int, docs_per_topic: int, doc_chars: int, seed: int) -> Tuple[Dict[str, str], Dict[int, List[str]]]:
+    """Documentos (id -> conteúdo) e os ids de cada tópico."""
+    rng = random.Random(seed)
+    corpus, topics = {}, {}
+    for index in range(documents):
+        topic = index // docs_per_topic
+        doc_id = f"{DOC_KINDS[index % len(DOC_KINDS)]}-{index}.md"
+        corpus[doc_id] = build_document(topic, DOC_KINDS[index % len(DOC_KINDS)], rng, doc_chars)
+        topics.setdefault(topic, []).append(doc_id)
+    return corpus, topics
+
+
+def labeled_queries(topics: Dict[int, List[str]], count: int, noise: int, seed: int) -> List[Tuple[str, List[str]]]:
+    rng = random.Random(seed + 1)
+    queries = []
+    for topic in rng.sample(sorted(topics), min(count, len(topics))):
+        common = ' '.join(rng.sample(DOMAIN_WORDS, noise))
+        queries.append((f"Implementar {topic_word(topic, 0)} {topic_word(topic, 1)} com {common}", topics[topic]))
+    return queries
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/máximo em milissegundos."""
+    if len(samples) < 2:
+        value = round(samples[0] * 1000, 3) if samples else 0.0
+        return {'p50_ms': value, 'p95_ms': value, 'p99_ms': value, 'max_ms': value}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def timed(function, *args) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def load_manager(output_dir: str) -> SmartContextManager:
+    manager = SmartContextManager(output_dir)
+    len(manager.knowledge_base)
+    return manager
+
+
+def run_size(documents: int, args) -> Dict:
+    corpus, topics = build_corpus(documents, args.docs_per_topic, args.doc_chars, args.seed)
+    queries = labeled_queries(topics, args.queries, args.query_noise, args.seed)
+    output_dir = tempfile.mkdtemp(prefix="bench_smart_context_")
+    result = {'documents': documents, 'corpus_chars': sum(map(len, corpus.values()))}
+    try:
+        with redirect_stdout(io.StringIO()):
+            manager = SmartContextManager(output_dir)
+
+            index_times = [timed(manager.index_document, doc_id, content, 'general')[0]
+                           for doc_id, content in corpus.items()]
+            result['index'] = dict(percentiles(index_times), total_s=round(sum(index_times), 3))
+
+            save_time, _ = timed(manager.save_knowledge_base)
+            kb_files = [os.path.join(output_dir, name) for name in os.listdir(output_dir)
+                        if name.startswith("knowledge_base")]
+            result['save'] = {'seconds': round(save_time, 3), 'file_bytes': sum(map(os.path.getsize, kb_files))}
+
+            del manager
+            tracemalloc.start()
+            # Carregamento completo: construção + primeira consulta ao índice
+            load_time, manager = timed(load_manager, output_dir)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['load'] = {'seconds': round(load_time, 3), 'memory_bytes': current, 'peak_bytes': peak}
+
+            search_times, context_times = [], []
+            hits = {k: 0.0 for k in RECALL_KS}
+            for query, relevant in queries:
+                search_time, found = timed(manager.search_relevant_docs, query, max(RECALL_KS))
+                search_times.append(search_time)
+                found_ids = [doc_id for doc_id, _, _ in found]
+                for k in RECALL_KS:
+                    hits[k] += len(set(found_ids[:k]) & set(relevant)) / min(len(relevant), k)
+            for query, _ in queries[:args.context_queries]:
+                context_times.append(timed(manager.build_smart_context_for_task, query, 'implementation')[0])
+        result['search'] = percentiles(search_times)
+        result['build_context'] = percentiles(context_times)
+        result['recall'] = {f"@{k}": round(hits[k] / max(len(queries), 1), 4) for k in RECALL_KS}
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return result
+
+
+def print_result(result: Dict):
+    mb = 1024 * 1024
+    print(f"\n📚 {result['documents']:,} documentos ({result['corpus_chars'] / mb:.1f} MB de texto)")
+    print(f"   index_document      p50 {result['index']['p50_ms']:.3f} ms | p99 {result['index']['p99_ms']:.3f} ms"
+          f" | total {result['index']['total_s']:.2f}s")
+    print(f"   save_knowledge_base {result['save']['seconds']:.2f}s | arquivo {result['save']['file_bytes'] / mb:.1f} MB")
+    print(f"   load_knowledge_base {result['load']['seconds']:.2f}s | memória {result['load']['memory_bytes'] / mb:.1f} MB"
+          f" (pico {result['load']['peak_bytes'] / mb:.1f} MB)")
+    print(f"   search_relevant_docs p50 {result['search']['p50_ms']:.2f} ms | p95 {result['search']['p95_ms']:.2f} ms"
+          f" | p99 {result['search']['p99_ms']:.2f} ms")
+    print(f"   build_smart_context p50 {result['build_context']['p50_ms']:.2f} ms | p95 {result['build_context']['p95_ms']:.2f} ms")
+    print("   recall " + " | ".join(f"{k} {value:.3f}" for k, value in result['recall'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do SmartContextManager com bases sintéticas")
+    parser.add_argument('--sizes', default='1000,10000', help='quantidades de documentos, separadas por vírgula')
+    parser.add_argument('--doc-chars', type=int, default=1500, help='tamanho aproximado de cada documento')
+    parser.add_argument('--docs-per-topic', type=int, default=3, help='documentos relevantes por consulta rotulada')
+    parser.add_argument('--queries', type=int, default=200, help='consultas rotuladas (busca e recall)')
+    parser.add_argument('--query-noise', type=int, default=1, help='termos comuns do domínio em cada consulta rotulada')
+    parser.add_argument('--context-queries', type=int, default=50, help='consultas usadas em build_smart_context_for_task')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: benchmarks/results/smart_context_<ts>.json)')
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(value) for value in args.sizes.split(',') if value.strip()):
+        print(f"⏱️  {size:,} documentos...", flush=True)
+        results.append(run_size(size, args))
+        print_result(results[-1])
+
+    output = args.output or os.path.join(RESULTS_DIR, f"smart_context_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'benchmark': 'smart_context',
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'config': {name: getattr(args, name) for name in
+                       ('doc_chars', 'docs_per_topic', 'queries', 'query_noise', 'context_queries', 'seed')},
+            'results': results,
+        }, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\n💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
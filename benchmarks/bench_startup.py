@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo de inicialização do CLI
+
+Cada medida roda em um processo novo, dentro de um diretório temporário vazio:
+- `python -c pass`: custo do próprio interpretador (referência);
+- `import main`: importação do módulo (testes e benchmarks pagam esse custo);
+- `python main.py --help`: CLI até o parse dos argumentos.
+
+Também verifica os efeitos colaterais da importação: nenhum arquivo pode ser criado
+no diretório corrente e os módulos pesados (cliente websocket, YAML, SQLite, análise
+de código) só devem ser carregados quando uma opção do menu os usar. As maiores
+importações são listadas a partir de `python -X importtime`.
+
+Uso: python benchmarks/bench_startup.py [--runs 10] [--max-import-ms 250]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Módulos que não devem ser carregados só por importar o main
+DEFERRED_MODULES = ('websocket', 'yaml', 'sqlite3', 'llm_client', 'code_analyzer',
+                    'helper.code_validator', 'helper.llm_log', 'smart_context_manager')
+IMPORT_MAIN = f"import sys; sys.path.insert(0, {ROOT_DIR!r}); import main"
+
+
+def run_python(args: List[str], cwd: str) -> Tuple[float, subprocess.CompletedProcess]:
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable] + args, cwd=cwd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} falhou:\n{result.stderr}")
+    return elapsed, result
+
+
+def median_ms(args: List[str], runs: int, cwd: str) -> float:
+    return round(statistics.median(run_python(args, cwd)[0] for _ in range(runs)) * 1000, 1)
+
+
+def slowest_imports(cwd: str, top: int) -> List[Tuple[str, int]]:
+    """Módulos importados pelo main com maior tempo acumulado (µs), sem os submódulos."""
+    _, result = run_python(['-X', 'importtime', '-c', IMPORT_MAIN], cwd)
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit() and name.startswith('   ') and not name.startswith('    '):
+            # Só os imports diretos do main (um nível abaixo dele)
+            timings.append((name.strip(), int(cumulative)))
+    return sorted(timings, key=lambda item: item[1], reverse=True)[:top]
+
+
+def side_effects(cwd: str) -> Dict[str, List[str]]:
+    """Arquivos criados e módulos pesados carregados pela importação do main."""
+    check = IMPORT_MAIN + f"; print('\\n'.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    _, result = run_python(['-c', check], cwd)
+    return {
+        'created_files': sorted(os.listdir(cwd)),
+        'loaded_modules': [line for line in result.stdout.splitlines() if line],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de inicialização do CLI")
+    parser.add_argument('--runs', type=int, default=10, help='execuções por medida (mediana)')
+    parser.add_argument('--top', type=int, default=10, help='importações mais lentas listadas')
+    parser.add_argument('--max-import-ms', type=float,
+                        help='falha (código 1) se `import main` passar desse tempo acima do interpretador')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        interpreter = median_ms(['-c', 'pass'], args.runs, workdir)
+        import_main = median_ms(['-c', IMPORT_MAIN], args.runs, workdir)
+        cli_help = median_ms([os.path.join(ROOT_DIR, 'main.py'), '--help'], args.runs, workdir)
+        # Diretório limpo para a checagem de efeitos colaterais
+        shutil.rmtree(workdir)
+        os.makedirs(workdir)
+        effects = side_effects(workdir)
+        imports = slowest_imports(workdir, args.top)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"⏱️  Inicialização (mediana de {args.runs} execuções)")
+    print(f"   python -c pass          {interpreter:>8.1f} ms")
+    print(f"   import main             {import_main:>8.1f} ms (+{import_main - interpreter:.1f} ms)")
+    print(f"   python main.py --help   {cli_help:>8.1f} ms (+{cli_help - interpreter:.1f} ms)")
+    print("\n📦 Importações mais lentas do main (acumulado)")
+    for name, cumulative in imports:
+        print(f"   {name:<32} {cumulative / 1000:>8.1f} ms")
+
+    failures = []
+    if effects['created_files']:
+        failures.append(f"importar o main criou arquivos: {', '.join(effects['created_files'])}")
+    if effects['loaded_modules']:
+        failures.append(f"módulos carregados na importação: {', '.join(effects['loaded_modules'])}")
+    if args.max_import_ms is not None and import_main - interpreter > args.max_import_ms:
+        failures.append(f"import main levou {import_main - interpreter:.1f} ms (limite {args.max_import_ms:.0f} ms)")
+    if failures:
+        print(f"\n❌ {len(failures)} problema(s):")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    print("\n✅ Importação sem efeitos colaterais")
+
+
+if __name__ == "__main__":
+    main()
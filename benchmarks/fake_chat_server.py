@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Backend falso do Copilot Chat para benchmarks offline
+
+Servidor local que responde como o Chrome com `--remote-debugging-port`:
+- `GET /json` lista as abas (uma por sessão de chat, todas em https://vscode.dev);
+- cada aba aceita um WebSocket CDP e emula o DOM do chat usado pelo `LLMClient`:
+  um `<textarea>`, o botão de enviar e os elementos `div[data-last-element]`,
+  cuja resposta aparece após `latency` segundos e cresce em trechos ao longo de
+  `stream_time` segundos (como o streaming do Copilot);
+- `GET /stats` devolve os totais de prompts e respostas, usados pelo benchmark.
+
+As respostas vêm do `SyntheticResponder`, que reconhece o tipo de prompt
+(fases 1-4, análise de código) e devolve o formato que o pipeline espera.
+
+Implementado só com a biblioteca padrão (handshake e frames WebSocket da RFC 6455).
+
+Uso: python benchmarks/fake_chat_server.py [--port 9222] [--tabs 3] [--latency 0.5] [--response-size 4000]
+"""
+
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import re
+import socketserver
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+TARGET_URL = "https://vscode.dev/"
+
+# Nós do DOM emulado e suas caixas (quads de DOM.getBoxModel)
+TEXTAREA_NODE_ID = 4
+SEND_BUTTON_NODE_ID = 5
+_BOXES = {
+    TEXTAREA_NODE_ID: [10, 500, 410, 500, 410, 540, 10, 540],
+    SEND_BUTTON_NODE_ID: [420, 500, 440, 500, 440, 520, 420, 520],
+}
+_DOCUMENT = {
+    'nodeId': 1, 'nodeName': '#document', 'children': [
+        {'nodeId': 2, 'nodeName': 'HTML', 'children': [
+            {'nodeId': 3, 'nodeName': 'BODY', 'children': [
+                {'nodeId': TEXTAREA_NODE_ID, 'nodeName': 'TEXTAREA', 'children': []},
+            ]},
+        ]},
+    ],
+}
+
+_PROMPT_HEADER = re.compile(r'^Prompt (\d)\.(\d):', re.MULTILINE)
+_DESCRIPTION_REF = re.compile(r'^\[(\d+)\]', re.MULTILINE)
+_BATCH_FILE = re.compile(r'^=== ARQUIVO: (.+?) ===$', re.MULTILINE)
+_SINGLE_FILE = re.compile(r'^\*\*ARQUIVO: (.+?)\*\*$', re.MULTILINE)
+
+
+class SyntheticResponder:
+    """Gera respostas no formato esperado por cada etapa do pipeline.
+
+    `response_size` é o tamanho aproximado (chars) das respostas em texto livre;
+    `tasks` é o número de tasks do backlog devolvido pelo P3_2.
+    """
+
+    def __init__(self, response_size: int = 4000, tasks: int = 4):
+        self.response_size = response_size
+        self.tasks = tasks
+        self._files = itertools.count(1)
+
+    def __call__(self, prompt: str) -> str:
+        if "**ELEMENTOS A DESCREVER:**" in prompt:
+            listing = prompt.split("**ELEMENTOS A DESCREVER:**", 1)[1]
+            return "\n".join(f"[{ref}] Coordena a etapa {ref} do fluxo legado."
+                             for ref in _DESCRIPTION_REF.findall(listing))
+        batch_files = _BATCH_FILE.findall(prompt)
+        if batch_files:
+            return "\n\n".join(f"=== ARQUIVO: {path} ===\n{self._analysis(path)}" for path in batch_files)
+        headers = _PROMPT_HEADER.findall(prompt)
+        if not headers:
+            single_file = _SINGLE_FILE.search(prompt)
+            return self._analysis(single_file.group(1) if single_file else "Arquivo")
+        key = "P{}_{}".format(*headers[-1])
+        if key == "P3_2":
+            return self._backlog()
+        if key == "P4_1":
+            return self._implementation()
+        if key == "P4_2":
+            return "✅ APROVADO\n\n" + self._prose("Validação", self.response_size // 4)
+        return self._prose(f"Documento {key}", self.response_size)
+
+    def _prose(self, title: str, size: int) -> str:
+        sections = [f"# {title}\n"]
+        for index in itertools.count(1):
+            if sum(len(section) for section in sections) >= size:
+                break
+            sections.append(
+                f"## Seção {index}\n"
+                f"- O módulo {index} concentra regras de negócio e acesso a dados do sistema legado.\n"
+                f"- A migração do módulo {index} depende dos contratos definidos nas seções anteriores.\n"
+            )
+        return "\n".join(sections)
+
+    def _analysis(self, path: str) -> str:
+        name = re.sub(r'\W', '', path.rsplit('/', 1)[-1].split('.')[0]) or "Arquivo"
+        return (f"CLASSE: {name}\nModificadores: public\nDescrição: Serviço sintético de {name}.\n\n"
+                f"MÉTODO: public void executar()\nDescrição: Executa o fluxo principal de {name}.\n")
+
+    def _backlog(self) -> str:
+        lines = ["# Backlog de Migração", ""]
+        for index in range(1, self.tasks + 1):
+            if index == 1 or (index - 1) % 3 == 0:
+                lines += [f"## Sprint {(index - 1) // 3 + 1}", ""]
+            lines += [f"### Task {index}: Migrar módulo {index}",
+                      f"Prioridade: {'Alta' if index % 2 else 'Média'}",
+                      f"Migrar o serviço {index} do sistema legado para a nova arquitetura."]
+            if index > 1:
+                lines.append(f"Dependências: Task {index - 1}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def _implementation(self) -> str:
+        number = next(self._files)
+        blocks = []
+        for kind in ("service", "repository"):
+            blocks.append(
+                f"ARQUIVO: {kind}_{number}.py\n"
+                f"LOCALIZAÇÃO: backend/{kind}\n"
+                "COMPONENTE: Backend\n"
+                f"DESCRIÇÃO: {kind.capitalize()} sintético {number}\n"
+                "```python\n"
+                f"class {kind.capitalize()}{number}:\n"
+                "    def __init__(self):\n"
+                "        self.items = {}\n\n"
+                "    def save(self, key, value):\n"
+                "        self.items[key] = value\n"
+                "        return value\n"
+                "```\n"
+                "DEPENDÊNCIAS: nenhuma\n"
+            )
+        return "Implementação proposta:\n\n" + "\n".join(blocks)
+
+
+class ChatTab:
+    """Estado de uma aba: texto digitado e respostas (com início e texto completo)."""
+
+    def __init__(self, server: 'FakeChatServer'):
+        self.server = server
+        self.draft = ""
+        self.responses: List[Dict] = []
+        self.lock = threading.Lock()
+
+    def _visible(self, response: Dict) -> Optional[str]:
+        """Texto já "transmitido" da resposta (None se ela ainda não apareceu)."""
+        elapsed = time.monotonic() - response['started']
+        if elapsed < self.server.latency:
+            return None
+        text = response['text']
+        if self.server.stream_time <= 0:
+            return text
+        # Cresce em trechos de tamanho igual ao longo de stream_time
+        progress = min((elapsed - self.server.latency) / self.server.stream_time, 1.0)
+        chunks = self.server.stream_chunks
+        return text[:len(text) * int(progress * chunks) // chunks]
+
+    def submit(self):
+        with self.lock:
+            prompt, self.draft = self.draft, ""
+        if not prompt:
+            return
+        text = self.server.responder(prompt)
+        self.server.record(prompt, text)
+        with self.lock:
+            self.responses.append({'started': time.monotonic(), 'text': text})
+
+    def evaluate(self, expression: str):
+        with self.lock:
+            visible = [text for text in map(self._visible, self.responses) if text is not None]
+        if 'elems.length - 2' in expression or '.interactive-session' in expression:
+            return visible[-1] if visible else ''
+        if '.length' in expression:
+            # Um elemento por resposta mais o da área de entrada
+            return len(visible) + 1
+        return None
+
+    def handle(self, method: str, params: Dict) -> Dict:
+        if method == 'Page.getFrameTree':
+            return {'frameTree': {'frame': {'id': 'main', 'url': TARGET_URL}}}
+        if method == 'DOM.getDocument':
+            return {'root': _DOCUMENT}
+        if method == 'DOM.querySelector':
+            return {'nodeId': SEND_BUTTON_NODE_ID}
+        if method == 'DOM.getBoxModel':
+            quad = _BOXES.get(params.get('nodeId'))
+            return {'model': {'content': quad}} if quad else {}
+        if method == 'Input.insertText':
+            with self.lock:
+                self.draft += params.get('text', '')
+            return {}
+        if method == 'Input.dispatchMouseEvent':
+            x0, y0, x1, _, _, y2 = _BOXES[SEND_BUTTON_NODE_ID][:6]
+            if params.get('type') == 'mouseReleased' and x0 <= params.get('x', -1) <= x1 \
+                    and y0 <= params.get('y', -1) <= y2:
+                self.submit()
+            return {}
+        if method == 'Runtime.evaluate':
+            value = self.evaluate(params.get('expression', ''))
+            if value is None:
+                return {'result': {'type': 'undefined'}}
+            return {'result': {'type': 'number' if isinstance(value, int) else 'string', 'value': value}}
+        # *.enable e demais comandos: aceitos sem efeito
+        return {}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: 'FakeChatServer'
+
+    def handle(self):
+        request_line = self.rfile.readline().decode('latin-1').strip()
+        if not request_line:
+            return
+        path = request_line.split(' ')[1] if ' ' in request_line else '/'
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('upgrade', '').lower() == 'websocket':
+            self._websocket(path, headers)
+        elif path.startswith('/json'):
+            self._json(self.server.tabs_json())
+        elif path.startswith('/stats'):
+            self._json(self.server.stats())
+        else:
+            self.wfile.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+
+    def _json(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+
+    def _websocket(self, path: str, headers: Dict[str, str]):
+        match = re.match(r'^/devtools/page/(\d+)$', path)
+        if not match or int(match.group(1)) >= len(self.server.chat_tabs):
+            self.wfile.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+        tab = self.server.chat_tabs[int(match.group(1))]
+        accept = base64.b64encode(
+            hashlib.sha1((headers.get('sec-websocket-key', '') + _WEBSOCKET_GUID).encode('ascii')).digest()
+        ).decode('ascii')
+        self.wfile.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode('latin-1'))
+
+        while True:
+            frame = self._read_message()
+            if frame is None:
+                return
+            opcode, payload = frame
+            if opcode == 0x8:  # close
+                self._send_frame(0x8, payload[:2])
+                return
+            if opcode == 0x9:  # ping
+                self._send_frame(0xA, payload)
+                continue
+            if opcode != 0x1:
+                continue
+            message = json.loads(payload.decode('utf-8'))
+            result = tab.handle(message.get('method', ''), message.get('params') or {})
+            self._send_frame(0x1, json.dumps({'id': message.get('id'), 'result': result}).encode('utf-8'))
+
+    def _read_exact(self, size: int) -> Optional[bytes]:
+        data = self.rfile.read(size)
+        return data if len(data) == size else None
+
+    def _read_message(self):
+        """Lê uma mensagem completa (junta frames de continuação); None se a conexão caiu."""
+        opcode, parts = None, []
+        while True:
+            header = self._read_exact(2)
+            if header is None:
+                return None
+            fin, frame_opcode = header[0] & 0x80, header[0] & 0x0F
+            length = header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack('>H', self._read_exact(2) or b'\0\0')[0]
+            elif length == 127:
+                length = struct.unpack('>Q', self._read_exact(8) or b'\0' * 8)[0]
+            mask = self._read_exact(4) if header[1] & 0x80 else None
+            payload = self._read_exact(length) if length else b''
+            if payload is None:
+                return None
+            if mask:
+                payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+            if frame_opcode >= 0x8:  # controle pode vir no meio de uma mensagem fragmentada
+                return frame_opcode, payload
+            if frame_opcode:
+                opcode = frame_opcode
+            parts.append(payload)
+            if fin:
+                return opcode, b''.join(parts)
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        self.wfile.write(header + payload)
+        self.wfile.flush()
+
+
+class FakeChatServer(socketserver.ThreadingTCPServer):
+    """Servidor HTTP + WebSocket CDP com `tabs` sessões de chat independentes."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0, tabs: int = 1, latency: float = 0.5, stream_time: float = 0.5,
+                 stream_chunks: int = 5, responder: Optional[Callable[[str], str]] = None):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency = latency
+        self.stream_time = stream_time
+        self.stream_chunks = max(stream_chunks, 1)
+        self.responder = responder or SyntheticResponder()
+        self.chat_tabs = [ChatTab(self) for _ in range(tabs)]
+        self._stats = {'prompts': 0, 'prompt_chars': 0, 'response_chars': 0}
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def json_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/json"
+
+    def tabs_json(self) -> List[Dict]:
+        return [{'id': str(index), 'type': 'page', 'title': 'Visual Studio Code', 'url': TARGET_URL,
+                 'webSocketDebuggerUrl': f"ws://127.0.0.1:{self.port}/devtools/page/{index}"}
+                for index in range(len(self.chat_tabs))]
+
+    def record(self, prompt: str, response: str):
+        with self._stats_lock:
+            self._stats['prompts'] += 1
+            self._stats['prompt_chars'] += len(prompt)
+            self._stats['response_chars'] += len(response)
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def start(self) -> 'FakeChatServer':
+        """Atende em uma thread de fundo (uso dentro do mesmo processo, ex.: testes)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-chat-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend falso do Copilot Chat (CDP) para benchmarks offline")
+    parser.add_argument('--port', type=int, default=9222, help='porta HTTP/WebSocket (0 escolhe uma livre)')
+    parser.add_argument('--tabs', type=int, default=3, help='sessões de chat (abas) disponíveis')
+    parser.add_argument('--latency', type=float, default=0.5, help='segundos até a resposta aparecer')
+    parser.add_argument('--stream-time', type=float, default=0.5, help='segundos de streaming de cada resposta')
+    parser.add_argument('--stream-chunks', type=int, default=5, help='trechos em que a resposta é transmitida')
+    parser.add_argument('--response-size', type=int, default=4000, help='tamanho (chars) das respostas em texto')
+    parser.add_argument('--tasks', type=int, default=4, help='tasks no backlog devolvido pelo P3_2')
+    args = parser.parse_args()
+
+    server = FakeChatServer(args.port, args.tabs, args.latency, args.stream_time, args.stream_chunks,
+                            SyntheticResponder(args.response_size, args.tasks))
+    # A primeira linha informa a porta a quem iniciou o processo (ex.: bench_pipeline.py)
+    print(f"PORT {server.port}", flush=True)
+    print(f"🤖 Chat falso em {server.json_url} ({args.tabs} aba(s), latência {args.latency}s)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Gerador de sistemas legados sintéticos (Java ou Python) para benchmarks
+
+Cria `files` arquivos distribuídos em `packages` pacotes. Cada arquivo importa
+`fan_out` arquivos anteriores segundo o grafo escolhido:
+- `random`: anteriores sorteados (semente fixa, resultado reprodutível);
+- `chain`: só o imediatamente anterior (cadeia longa de dependências);
+- `hub`: os primeiros `fan_out` arquivos (poucos módulos centrais muito importados).
+
+Um em cada quatro arquivos é um DTO pequeno (agrupado em lotes pela análise de
+código); os demais são serviços com campos, métodos e corpo.
+
+Uso: python benchmarks/synthetic_codebase.py <diretório> [--language java] [--files 60] [--fan-out 3] [--graph random]
+"""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+GRAPHS = ('random', 'chain', 'hub')
+
+
+@dataclass
+class SyntheticFile:
+    """Arquivo gerado: nome do tipo, pacote e índices dos arquivos que importa"""
+    index: int
+    name: str
+    package: int
+    imports: List[int]
+    small: bool
+
+
+def plan_codebase(files: int, fan_out: int = 3, graph: str = 'random', packages: int = 4,
+                  seed: int = 42) -> List[SyntheticFile]:
+    """Define nomes, pacotes e o grafo de imports (sempre acíclico: só importa anteriores)."""
+    if graph not in GRAPHS:
+        raise ValueError(f"Grafo inválido: {graph} (use {', '.join(GRAPHS)})")
+    rng = random.Random(seed)
+    planned = []
+    for index in range(files):
+        if graph == 'chain':
+            imports = [index - 1] if index else []
+        elif graph == 'hub':
+            imports = list(range(min(fan_out, index)))
+        else:
+            imports = sorted(rng.sample(range(index), min(fan_out, index)))
+        small = index % 4 == 3
+        name = f"{'Pedido' if small else 'Servico'}{index}{'Dto' if small else ''}"
+        planned.append(SyntheticFile(index, name, index % packages, imports, small))
+    return planned
+
+
+def _java_source(item: SyntheticFile, planned: List[SyntheticFile]) -> str:
+    package = f"com.acme.legacy.mod{item.package}"
+    imports = "".join(f"import com.acme.legacy.mod{planned[i].package}.{planned[i].name};\n" for i in item.imports)
+    if item.small:
+        return (f"package {package};\n\n{imports}\n"
+                f"public class {item.name} {{\n"
+                "    private Long id;\n"
+                "    private String descricao;\n\n"
+                "    public Long getId() { return id; }\n"
+                "    public String getDescricao() { return descricao; }\n"
+                "}\n")
+    fields = "".join(f"    private {planned[i].name} dependencia{i};\n" for i in item.imports)
+    methods = "".join(
+        f"    public int processar{step}(int valor) {{\n"
+        f"        int total = valor * {step + 1};\n"
+        "        for (int i = 0; i < valor; i++) {\n"
+        "            total += i % 7;\n"
+        "        }\n"
+        "        return total;\n"
+        "    }\n\n"
+        for step in range(4)
+    )
+    return (f"package {package};\n\nimport java.util.List;\n{imports}\n"
+            f"public class {item.name} {{\n{fields}\n"
+            f"    public {item.name}() {{\n    }}\n\n{methods}"
+            "    public List<String> listar(List<String> entrada) {\n"
+            "        return entrada;\n"
+            "    }\n"
+            "}\n")
+
+
+def _python_source(item: SyntheticFile, planned: List[SyntheticFile]) -> str:
+    imports = "".join(
+        f"from ..mod{planned[i].package}.{planned[i].name.lower()} import {planned[i].name}\n" for i in item.imports
+    )
+    if item.small:
+        return (f"{imports}\n\nclass {item.name}:\n"
+                "    def __init__(self, id=None, descricao=\"\"):\n"
+                "        self.id = id\n"
+                "        self.descricao = descricao\n")
+    fields = "".join(f"        self.dependencia{i} = {planned[i].name}()\n" for i in item.imports) or "        pass\n"
+    methods = "".join(
+        f"\n    def processar{step}(self, valor):\n"
+        f"        total = valor * {step + 1}\n"
+        "        for i in range(valor):\n"
+        "            total += i % 7\n"
+        "        return total\n"
+        for step in range(4)
+    )
+    return f"{imports}\n\nclass {item.name}:\n    def __init__(self):\n{fields}{methods}"
+
+
+def generate_codebase(root: str, language: str = 'java', files: int = 60, fan_out: int = 3,
+                      graph: str = 'random', packages: int = 4, seed: int = 42) -> List[Path]:
+    """Grava o sistema sintético em `root` e retorna os caminhos criados."""
+    planned = plan_codebase(files, fan_out, graph, packages, seed)
+    root_path = Path(root)
+    created = []
+    if language == 'java':
+        base = root_path / "src" / "main" / "java" / "com" / "acme" / "legacy"
+        for item in planned:
+            path = base / f"mod{item.package}" / f"{item.name}.java"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(_java_source(item, planned), encoding='utf-8')
+            created.append(path)
+    elif language == 'python':
+        base = root_path / "legacy"
+        base.mkdir(parents=True, exist_ok=True)
+        (base / "__init__.py").write_text("", encoding='utf-8')
+        for item in planned:
+            package_dir = base / f"mod{item.package}"
+            if not package_dir.exists():
+                package_dir.mkdir()
+                (package_dir / "__init__.py").write_text("", encoding='utf-8')
+            path = package_dir / f"{item.name.lower()}.py"
+            path.write_text(_python_source(item, planned), encoding='utf-8')
+            created.append(path)
+    else:
+        raise ValueError(f"Linguagem não suportada: {language} (use java ou python)")
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um sistema legado sintético para benchmarks")
+    parser.add_argument('directory', help='diretório de destino')
+    parser.add_argument('--language', choices=('java', 'python'), default='java')
+    parser.add_argument('--files', type=int, default=60, help='quantidade de arquivos')
+    parser.add_argument('--fan-out', type=int, default=3, help='imports de outros arquivos do projeto por arquivo')
+    parser.add_argument('--graph', choices=GRAPHS, default='random', help='forma do grafo de imports')
+    parser.add_argument('--packages', type=int, default=4, help='quantidade de pacotes')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    created = generate_codebase(args.directory, args.language, args.files, args.fan_out, args.graph,
+                                args.packages, args.seed)
+    print(f"✅ {len(created)} arquivos {args.language} gerados em {os.path.abspath(args.directory)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,23 @@
 import os
+import re
 import json
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 
+# Lotes de análise: arquivos pequenos são agrupados em um único prompt
+# (estimativa de ~4 caracteres por token, como no restante do sistema)
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+DEFAULT_SMALL_FILE_CHARS = 4000
+
+# Marcador que separa a resposta de cada arquivo em uma análise em lote
+BATCH_FILE_MARKER = "=== ARQUIVO:"
+# Elementos usados como contexto dos arquivos que importam o arquivo onde estão
+TYPE_ELEMENT_KINDS = ('class', 'interface', 'enum', 'record')
+_DESCRIPTION_LINE_PATTERN = re.compile(r'^\s*[-*]?\s*\[(\d+)\]\s*[:.)-]?\s*(.*)$')
+_BATCH_MARKER_PATTERN = re.compile(r'^[\s*#>`]*===\s*ARQUIVO:\s*(.+?)\s*===[\s*`]*$')
+
 @dataclass
 class CodeElement:
     file_path: str
@@ -24,6 +37,8 @@ class CodeElement:
 class LanguageAnalyzer(ABC):
     """Interface base para analisadores de linguagem específica."""
     
+    language_name = ""  # usado nos blocos de código dos prompts
+    
     def __init__(self, project_dir: Path):
         self.project_dir = project_dir
     
@@ -56,16 +71,149 @@ class LanguageAnalyzer(ABC):
         """Verifica se um import é uma dependência local do projeto."""
         return False  # Implementação padrão - override conforme necessário
 
+    def extract_static_elements(self, file_path: str, content: str) -> Dict[str, CodeElement]:
+        """Extrai localmente o esqueleto dos elementos (nomes, assinaturas, modificadores).
+
+        Elementos triviais (imports, campos, acessores) já saem com descrição;
+        os demais ficam com descrição vazia para serem descritos pelo LLM.
+        Retorna um dicionário vazio quando a extração estática não é suportada.
+        """
+        return {}
+
+    def build_description_prompt(self, files: List[Tuple[str, str]], elements: List[Tuple[int, CodeElement]],
+                                 context: str, external_deps: str) -> str:
+        """Constrói prompt que pede apenas descrições para elementos já identificados."""
+        contents = "\n\n".join(
+            f"**ARQUIVO: {file_path}**\n```{self.language_name}\n{content}\n```" for file_path, content in files
+        )
+        listing = "\n".join(
+            f"[{ref}] {element.element_type} {element.signature or element.name}"
+            + (f" ({Path(element.file_path).name})" if len(files) > 1 else "")
+            for ref, element in elements
+        )
+        return f"""
+Os elementos abaixo já foram identificados por análise estática do código.
+NÃO liste outros elementos nem repita assinaturas: escreva apenas o que cada elemento FAZ, em 1-2 frases.
+
+**CONTEXTO DAS DEPENDÊNCIAS:**
+{context}
+
+**DEPENDÊNCIAS EXTERNAS / ESTRUTURA DO PROJETO:**
+{external_deps}
+
+{contents}
+
+**ELEMENTOS A DESCREVER:**
+{listing}
+
+**FORMATO DE RESPOSTA (uma linha por elemento, na mesma numeração):**
+```
+[1] Descrição do elemento 1
+[2] Descrição do elemento 2
+```
+"""
+
+    def parse_description_response(self, response: str) -> Dict[int, str]:
+        """Lê as descrições numeradas (`[n] texto`) devolvidas pelo LLM."""
+        descriptions: Dict[int, List[str]] = {}
+        current = None
+        for line in response.split('\n'):
+            match = _DESCRIPTION_LINE_PATTERN.match(line)
+            if match:
+                current = int(match.group(1))
+                descriptions[current] = [match.group(2).strip()]
+            elif current is not None and line.strip() and not line.strip().startswith('```'):
+                descriptions[current].append(line.strip())
+            elif not line.strip():
+                current = None
+        return {ref: ' '.join(part for part in parts if part) for ref, parts in descriptions.items()}
+
+    def get_batch_group_key(self, file_path: Path) -> str:
+        """Chave usada para agrupar arquivos em lotes (pacote/diretório)."""
+        return str(file_path.parent)
+
+    def get_analysis_instructions(self) -> str:
+        """Instruções e formato de resposta usados nos prompts de análise."""
+        return ""
+
+    def build_batch_analysis_prompt(self, files: List[Tuple[str, str]], context: str, external_deps: str) -> str:
+        """Constrói um único prompt para analisar vários arquivos pequenos.
+
+        Usa as mesmas instruções do prompt de arquivo único e pede que a
+        resposta seja separada por arquivo com `BATCH_FILE_MARKER`.
+        """
+        file_list = "\n".join(f"- {file_path}" for file_path, _ in files)
+        contents = "\n\n".join(
+            f"{BATCH_FILE_MARKER} {file_path} ===\n```\n{content}\n```" for file_path, content in files
+        )
+        return f"""
+Analise os {len(files)} arquivos abaixo e descreva CADA elemento de cada arquivo de forma concisa mas completa.
+
+**CONTEXTO DAS DEPENDÊNCIAS:**
+{context}
+
+**DEPENDÊNCIAS EXTERNAS / ESTRUTURA DO PROJETO:**
+{external_deps}
+
+**ARQUIVOS DO LOTE:**
+{file_list}
+
+{contents}
+
+{self.get_analysis_instructions()}
+
+**FORMATO OBRIGATÓRIO PARA LOTES:**
+Comece a análise de cada arquivo com uma linha exatamente no formato
+`{BATCH_FILE_MARKER} <caminho do arquivo> ===` e, abaixo dela, use o formato de resposta acima.
+Não omita nenhum arquivo da lista.
+"""
+
+    def split_batch_response(self, response: str, file_paths: List[str]) -> Dict[str, str]:
+        """Separa a resposta de um lote em trechos por arquivo.
+
+        Os marcadores são casados pelo caminho completo ou, em último caso, pelo
+        nome do arquivo. Arquivos sem seção na resposta ficam fora do resultado.
+        """
+        by_name: Dict[str, List[str]] = {}
+        for file_path in file_paths:
+            by_name.setdefault(Path(file_path).name, []).append(file_path)
+
+        sections: Dict[str, List[str]] = {}
+        current = None
+        for line in response.split('\n'):
+            marker = _BATCH_MARKER_PATTERN.match(line.strip())
+            if marker:
+                declared = marker.group(1).strip().strip('`')
+                if declared in file_paths:
+                    current = declared
+                else:
+                    candidates = by_name.get(Path(declared).name, [])
+                    current = candidates[0] if len(candidates) == 1 else None
+                if current is not None:
+                    sections.setdefault(current, [])
+                continue
+            if current is not None:
+                sections[current].append(line)
+
+        return {path: '\n'.join(lines).strip() for path, lines in sections.items()}
+
 class CodeAnalyzer:
     """Orquestra a análise de código usando o analisador de linguagem apropriado."""
 
-    def __init__(self, project_dir: str, output_dir: str):
+    def __init__(self, project_dir: str, output_dir: str, use_static_extraction: bool = True):
         self.project_dir = Path(project_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.analyzer = self._create_analyzer()
         self.knowledge_base: Dict[str, CodeElement] = {}
         self.analysis_order: List[Path] = []
+        # Dependências (dentro do projeto) de cada arquivo, usadas no planejamento dos lotes
+        self.dependency_graph: Dict[str, List[str]] = {}
+        # Tipos já analisados de cada arquivo (contexto dos arquivos que dependem dele)
+        self._types_by_file: Dict[str, List[CodeElement]] = {}
+        self._external_deps_str: Optional[str] = None
+        # Pré-extração estática: o LLM só descreve elementos já identificados
+        self.use_static_extraction = use_static_extraction
 
     def _create_analyzer(self) -> LanguageAnalyzer:
         """Detecta a linguagem e retorna a instância do analisador apropriada."""
@@ -102,7 +250,8 @@ class CodeAnalyzer:
         
         # Simplificação de nomes para o grafo (de Path para str)
         # E normalização de dependências para caminhos absolutos
-        str_graph = {str(k): [str(dep) for dep in v] for k, v in dependency_graph.items()}
+        str_graph = self._resolve_project_dependencies(dependency_graph)
+        self.dependency_graph = str_graph
 
         # Ordenação topológica para resolver a ordem de análise
         sorted_nodes = []
@@ -112,7 +261,36 @@ class CodeAnalyzer:
             if node not in visited:
                 self._topological_sort_util(node, visited, str_graph, sorted_nodes)
         
-        self.analysis_order = [Path(p) for p in sorted_nodes]
+        # Por nível topológico (cada arquivo depois de todas as suas dependências): arquivos
+        # do mesmo nível não dependem uns dos outros e podem dividir lotes
+        levels: Dict[str, int] = {}
+        for node in sorted_nodes:
+            levels[node] = 1 + max((levels[dep] for dep in str_graph[node] if dep in levels), default=-1)
+        self.analysis_order = [Path(p) for p in sorted(sorted_nodes, key=levels.get)]
+
+    def _resolve_project_dependencies(self, dependency_graph: Dict[Path, List[str]]) -> Dict[str, List[str]]:
+        """Converte os imports de cada arquivo nos arquivos do projeto que eles referenciam.
+
+        O import `a.b.C` corresponde ao arquivo cujo caminho (em notação de pontos, sem
+        extensão) termina em `a.b.C`; um import de pacote (`a.b`, vindo de `a.b.*`)
+        corresponde aos arquivos do diretório. Imports externos são descartados.
+        """
+        modules: Dict[str, Set[str]] = {}
+        for file in dependency_graph:
+            parts = Path(file).with_suffix('').parts
+            for start in range(len(parts)):
+                modules.setdefault('.'.join(parts[start:]), set()).add(str(file))
+                if start < len(parts) - 1:
+                    modules.setdefault('.'.join(parts[start:-1]), set()).add(str(file))
+
+        resolved = {}
+        for file, imports in dependency_graph.items():
+            targets = set()
+            for name in imports:
+                targets.update(modules.get(name, ()))
+            targets.discard(str(file))
+            resolved[str(file)] = sorted(targets)
+        return resolved
 
     def _topological_sort_util(self, node: str, visited: Set[str], graph: Dict[str, List[str]], sorted_nodes: List[str]):
         visited.add(node)
@@ -123,19 +301,199 @@ class CodeAnalyzer:
                 self._topological_sort_util(dep, visited, graph, sorted_nodes)
         sorted_nodes.append(node)
 
+    def _build_dependency_context(self, file_path: Path) -> str:
+        """Constrói contexto com base nas dependências já analisadas (tipos dos arquivos importados)."""
+        dependencies = self.dependency_graph.get(str(file_path), [])
+        context_elements = [element for dep in dependencies for element in self._types_by_file.get(dep, [])]
+        
+        return "\n".join([f"- `{elem.name}` ({elem.element_type}): {elem.description}" for elem in context_elements])
+
+    def _get_external_deps_str(self) -> str:
+        """Obtém dependências externas da análise de estrutura (calculado uma vez)."""
+        if self._external_deps_str is None:
+            project_structure = self.analyzer.analyze_project_structure()
+            self._external_deps_str = json.dumps(project_structure.get('dependencies', {}), indent=2)
+        return self._external_deps_str
+
+    def plan_analysis_batches(self, files: Optional[List[Path]] = None,
+                              token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+                              small_file_chars: int = DEFAULT_SMALL_FILE_CHARS) -> List[List[Path]]:
+        """Agrupa arquivos pequenos do mesmo pacote em lotes limitados por tokens.
+
+        Arquivos grandes viram lotes unitários. A ordem de análise é preservada
+        dentro de cada grupo; um lote é emitido quando o próximo arquivo
+        estouraria o orçamento, quando a lista termina ou antes de qualquer arquivo
+        de outro lote que dependa de um dos seus membros (a ordem topológica vale
+        entre lotes: as dependências de um arquivo já foram analisadas ou estão no
+        mesmo lote).
+        """
+        files = files if files is not None else self.analysis_order
+        batches: List[List[Path]] = []
+        pending: Dict[str, List[Path]] = {}
+        pending_tokens: Dict[str, int] = {}
+        # Lote pendente em que cada arquivo está
+        pending_group_of: Dict[str, str] = {}
+
+        def flush(group):
+            for member in pending[group]:
+                pending_group_of.pop(str(member), None)
+            batches.append(pending.pop(group))
+            pending_tokens.pop(group)
+
+        for file_path in files:
+            try:
+                size = file_path.stat().st_size
+            except OSError:
+                size = 0
+
+            group = None if size > small_file_chars else self.analyzer.get_batch_group_key(file_path)
+            for dependency in self.dependency_graph.get(str(file_path), []):
+                dependency_group = pending_group_of.get(dependency)
+                if dependency_group is not None and dependency_group != group:
+                    flush(dependency_group)
+
+            if group is None:
+                batches.append([file_path])
+                continue
+
+            tokens = size // 4
+            if pending.get(group) and pending_tokens[group] + tokens > token_budget:
+                flush(group)
+
+            pending.setdefault(group, []).append(file_path)
+            pending_group_of[str(file_path)] = group
+            pending_tokens[group] = pending_tokens.get(group, 0) + tokens
+
+        batches.extend(pending.values())
+        return batches
+
+    def _extract_static_elements(self, file_path: Path, content: str) -> Dict[str, CodeElement]:
+        if not self.use_static_extraction:
+            return {}
+        try:
+            return self.analyzer.extract_static_elements(str(file_path), content)
+        except Exception as e:
+            print(f"⚠️ Extração estática falhou para {file_path.name}: {e}")
+            return {}
+
+    def analyze_batch_with_llm(self, llm_client, batch: List[Path]):
+        """Analisa um lote de arquivos pequenos com um único prompt.
+
+        Arquivos com extração estática recebem apenas um pedido de descrições;
+        os demais usam o prompt completo em lote, cuja resposta é dividida por
+        arquivo e passa pelo `parse_analysis_response` do analisador. Arquivos
+        que o LLM deixar de fora são reanalisados individualmente.
+        """
+        if len(batch) == 1:
+            self.analyze_file_with_llm(llm_client, batch[0])
+            return
+
+        contents = {file_path: file_path.read_text(encoding='utf-8') for file_path in batch}
+        static_elements = {file_path: self._extract_static_elements(file_path, content)
+                           for file_path, content in contents.items()}
+
+        static_files = [file_path for file_path in batch if static_elements[file_path]]
+        if static_files:
+            self._describe_static_elements(llm_client, static_files, contents, static_elements)
+
+        full_files = [file_path for file_path in batch if not static_elements[file_path]]
+        if len(full_files) == 1:
+            self._analyze_file_full_prompt(llm_client, full_files[0], contents[full_files[0]])
+        elif full_files:
+            self._analyze_batch_full_prompt(llm_client, full_files, contents)
+
+    def _analyze_batch_full_prompt(self, llm_client, batch: List[Path], contents: Dict[Path, str]):
+        files = [(str(file_path), contents[file_path]) for file_path in batch]
+        context_str = self._build_batch_context(batch)
+
+        prompt = self.analyzer.build_batch_analysis_prompt(files, context_str, self._get_external_deps_str())
+
+        response = llm_client.send_prompt(prompt)
+
+        sections = self.analyzer.split_batch_response(response, [path for path, _ in files])
+        missing = []
+        for file_path in batch:
+            section = sections.get(str(file_path))
+            if not section:
+                missing.append(file_path)
+                continue
+
+            # Mantém um arquivo de análise por arquivo de código, como na análise individual
+            (self.output_dir / f"analysis_{file_path.stem}.md").write_text(section, encoding='utf-8')
+
+            parsed_elements = self.analyzer.parse_analysis_response(str(file_path), section)
+            self._store_elements(parsed_elements)
+
+        for file_path in missing:
+            print(f"⚠️ {file_path.name} ausente na resposta do lote, analisando individualmente...")
+            self._analyze_file_full_prompt(llm_client, file_path, contents[file_path])
+
+    def _build_batch_context(self, batch: List[Path]) -> str:
+        context_lines = []
+        for file_path in batch:
+            dependency_context = self._build_dependency_context(file_path)
+            if dependency_context:
+                context_lines.append(dependency_context)
+        return "\n".join(dict.fromkeys(context_lines))
+
+    def _describe_static_elements(self, llm_client, batch: List[Path], contents: Dict[Path, str],
+                                  static_elements: Dict[Path, Dict[str, CodeElement]]):
+        """Pede ao LLM somente as descrições dos elementos não triviais já extraídos."""
+        pending: List[Tuple[int, CodeElement]] = []
+        for file_path in batch:
+            for element in static_elements[file_path].values():
+                if not element.description:
+                    pending.append((len(pending) + 1, element))
+
+        if pending:
+            files = [(str(file_path), contents[file_path]) for file_path in batch]
+            prompt = self.analyzer.build_description_prompt(
+                files, pending, self._build_batch_context(batch), self._get_external_deps_str()
+            )
+            response = llm_client.send_prompt(prompt)
+            descriptions = self.analyzer.parse_description_response(response)
+            for ref, element in pending:
+                element.description = descriptions.get(ref, "")
+        else:
+            print(f"⚡ Elementos descritos localmente, sem chamada ao LLM: {', '.join(p.name for p in batch)}")
+
+        for file_path in batch:
+            elements = static_elements[file_path]
+            self._write_static_analysis(file_path, elements)
+            self._store_elements(elements)
+
+    def _store_elements(self, elements: Dict[str, CodeElement]):
+        self.knowledge_base.update(elements)
+        for element in elements.values():
+            if element.element_type in TYPE_ELEMENT_KINDS:
+                types = self._types_by_file.setdefault(element.file_path, [])
+                types[:] = [known for known in types if known.name != element.name] + [element]
+
+    def _write_static_analysis(self, file_path: Path, elements: Dict[str, CodeElement]):
+        """Salva a análise de um arquivo no mesmo formato de resposta usado pelo LLM."""
+        lines = [f"# Análise de `{file_path.name}`\n"]
+        for element in elements.values():
+            lines.append(f"- **{element.element_type}** `{element.signature or element.name}`: {element.description}")
+        (self.output_dir / f"analysis_{file_path.stem}.md").write_text("\n".join(lines) + "\n", encoding='utf-8')
+
     def analyze_file_with_llm(self, llm_client, file_path: Path):
         """Analisa um único arquivo usando o LLM."""
         content = file_path.read_text(encoding='utf-8')
         
+        static_elements = self._extract_static_elements(file_path, content)
+        if static_elements:
+            self._describe_static_elements(llm_client, [file_path], {file_path: content}, {file_path: static_elements})
+            return
+
+        self._analyze_file_full_prompt(llm_client, file_path, content)
+
+    def _analyze_file_full_prompt(self, llm_client, file_path: Path, content: str):
+        """Analisa um arquivo pedindo ao LLM a lista completa de elementos."""
         # Constrói contexto com base nas dependências já analisadas
-        dependencies = self.analyzer.extract_dependencies(file_path)
-        context_elements = [self.knowledge_base[str(dep)] for dep in dependencies if str(dep) in self.knowledge_base]
-        
-        context_str = "\n".join([f"- `{elem.name}` ({elem.element_type}): {elem.description}" for elem in context_elements])
+        context_str = self._build_dependency_context(file_path)
         
         # Obtém dependências externas da análise de estrutura
-        project_structure = self.analyzer.analyze_project_structure()
-        external_deps_str = json.dumps(project_structure.get('dependencies', {}), indent=2)
+        external_deps_str = self._get_external_deps_str()
 
         prompt = self.analyzer.build_analysis_prompt(str(file_path), content, context_str, external_deps_str)
         
@@ -146,7 +504,7 @@ class CodeAnalyzer:
         (self.output_dir / analysis_file_name).write_text(response, encoding='utf-8')
 
         parsed_elements = self.analyzer.parse_analysis_response(str(file_path), response)
-        self.knowledge_base.update(parsed_elements)
+        self._store_elements(parsed_elements)
 
     def save_knowledge_base(self):
         """Salva a base de conhecimento em um arquivo JSON."""
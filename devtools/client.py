@@ -2,6 +2,8 @@ import json
 import time
 import websocket
 
+from helper.spans import span
+
 class DevToolsClient:
     """
     Cliente para interação com o Chrome DevTools Protocol via WebSocket.
@@ -15,25 +17,26 @@ class DevToolsClient:
         """
         Envia comando ao DevTools e aguarda a resposta correspondente ao ID.
         """
-        request_id = self._next_id
-        self._next_id += 1
-        message = json.dumps({
-            "id": request_id,
-            "method": method,
-            "params": params or {}
-        })
-        self.ws.send(message)
+        with span(f"cdp.{method}"):
+            request_id = self._next_id
+            self._next_id += 1
+            message = json.dumps({
+                "id": request_id,
+                "method": method,
+                "params": params or {}
+            })
+            self.ws.send(message)
 
-        time.sleep(1)
-        while True:
-            raw = self.ws.recv()
-            try:
-                response = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
+            time.sleep(1)
+            while True:
+                raw = self.ws.recv()
+                try:
+                    response = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
 
-            if response.get("id") == request_id:
-                return response
+                if response.get("id") == request_id:
+                    return response
 
     def close(self):
         """Fecha a conexão WebSocket."""
@@ -0,0 +1,150 @@
+"""
+Modelo estruturado do backlog da migração (`migration-backlog.md`)
+
+Cada título `##`/`###` vira uma task com ID estável (hash da seção e do título),
+sprint, prioridade e dependências explícitas (linhas `Dependências: Task 3, Modelo`).
+Como o status é guardado pelo ID, editar o backlog (inserir, remover ou reordenar
+tasks) não muda quais tasks contam como concluídas.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_SPRINT_PATTERN = re.compile(r'^\s*(?:sprint|itera[çc][ãa]o|iteration|fase|etapa|milestone)\s*(\d+)', re.IGNORECASE)
+_DEPENDENCY_LINE_PATTERN = re.compile(
+    r'^\s*[-*]?\s*\**\s*(?:depend[eê]ncias|depende de|dependencies|depends on|pré-requisitos)\s*\**\s*:\s*\**\s*(.+)$',
+    re.IGNORECASE | re.MULTILINE
+)
+_PRIORITY_LINE_PATTERN = re.compile(
+    r'^\s*[-*]?\s*\**\s*(?:prioridade|priority)\s*\**\s*:\s*\**\s*([\wéêíç]+)',
+    re.IGNORECASE | re.MULTILINE
+)
+_PRIORITY_TAG_PATTERN = re.compile(r'[\[(]\s*(P[0-3])\s*[\])]', re.IGNORECASE)
+_TASK_NUMBER_PATTERN = re.compile(r'(?:\btask|\btarefa|\bt|#)\s*-?\s*(\d+)', re.IGNORECASE)
+_TITLE_NUMBER_PATTERN = re.compile(r'^\s*(?:(?:task|tarefa|t)\s*-?\s*)?(\d+)\s*[.):\-]', re.IGNORECASE)
+_NO_DEPENDENCY_VALUES = {'nenhuma', 'nenhum', 'none', 'n/a', '-'}
+
+# Prioridade normalizada: 1 = alta, 2 = média, 3 = baixa
+PRIORITY_LEVELS = {
+    'crítica': 1, 'critica': 1, 'alta': 1, 'high': 1, 'p0': 1, 'p1': 1,
+    'média': 2, 'media': 2, 'medium': 2, 'p2': 2,
+    'baixa': 3, 'low': 3, 'p3': 3
+}
+
+
+@dataclass
+class BacklogTask:
+    """Task do backlog"""
+    id: str
+    index: int
+    title: str
+    description: str = ""
+    section: str = ""
+    sprint: int = 0
+    priority: Optional[int] = None
+    dependencies: List[str] = field(default_factory=list)
+
+    def as_dict(self, status: str = 'pending') -> Dict:
+        """Formato de dicionário usado pelas fases (`task['title']`, `task['description']`)."""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'status': status,
+            'section': self.section,
+            'sprint': self.sprint,
+            'priority': self.priority,
+            'dependencies': list(self.dependencies)
+        }
+
+
+def is_heading_only(task: Dict) -> bool:
+    """Se a entrada é só um agrupador (ex.: `## Sprint 2`) e não uma task a implementar."""
+    if not (task.get('description') or "").strip():
+        return True
+    return task.get('title') == task.get('section') and bool(_SPRINT_PATTERN.match(task.get('title') or ""))
+
+
+def task_id(section: str, title: str) -> str:
+    return hashlib.sha1(f"{section}\n{title}".encode('utf-8')).hexdigest()[:12]
+
+
+def _task_number(title: str) -> Optional[int]:
+    match = _TITLE_NUMBER_PATTERN.match(title) or _TASK_NUMBER_PATTERN.search(title)
+    return int(match.group(1)) if match else None
+
+
+def _parse_priority(title: str, description: str) -> Optional[int]:
+    match = _PRIORITY_LINE_PATTERN.search(description) or _PRIORITY_TAG_PATTERN.search(title)
+    return PRIORITY_LEVELS.get(match.group(1).lower()) if match else None
+
+
+def _resolve_reference(reference: str, task: BacklogTask, numbers: Dict[int, BacklogTask],
+                       tasks: List[BacklogTask]) -> List[str]:
+    """Converte uma referência de dependência em IDs de tasks anteriores."""
+    resolved = []
+    for number in _TASK_NUMBER_PATTERN.findall(reference):
+        target = numbers.get(int(number))
+        if target is not None and target.index < task.index:
+            resolved.append(target.id)
+    if resolved:
+        return resolved
+
+    text = reference.strip(' .*`').lower()
+    if len(text) < 4 or text in _NO_DEPENDENCY_VALUES:
+        return resolved
+    return [previous.id for previous in tasks[:task.index] if text in previous.title.lower()]
+
+
+def parse_backlog(content: str) -> List[BacklogTask]:
+    """Lê o markdown do backlog e retorna as tasks na ordem do arquivo.
+
+    Dependências só apontam para tasks anteriores, então nunca formam ciclos.
+    """
+    tasks: List[BacklogTask] = []
+    section = ""
+    sprint = 0
+    current = None
+    description_lines: List[str] = []
+
+    def close_current():
+        if current is not None:
+            current.description = ''.join(description_lines)
+            tasks.append(current)
+
+    for line in content.split('\n'):
+        if line.startswith('## ') or line.startswith('### '):
+            close_current()
+            title = line.strip('# ')
+            if line.startswith('## '):
+                section = title
+            sprint_match = _SPRINT_PATTERN.match(title)
+            if sprint_match:
+                sprint = int(sprint_match.group(1))
+            current = BacklogTask(id="", index=len(tasks), title=title, section=section, sprint=sprint)
+            description_lines = []
+        elif current is not None and line.strip():
+            description_lines.append(line + '\n')
+    close_current()
+
+    seen: Dict[str, int] = {}
+    numbers: Dict[int, BacklogTask] = {}
+    for task in tasks:
+        base_id = task_id(task.section, task.title)
+        seen[base_id] = seen.get(base_id, 0) + 1
+        # Títulos repetidos na mesma seção recebem sufixo pela ordem de aparição
+        task.id = base_id if seen[base_id] == 1 else f"{base_id}-{seen[base_id]}"
+        task.priority = _parse_priority(task.title, task.description)
+        number = _task_number(task.title)
+        if number is not None:
+            numbers.setdefault(number, task)
+
+    for task in tasks:
+        for dependency_line in _DEPENDENCY_LINE_PATTERN.findall(task.description):
+            for reference in re.split(r'[,;]', dependency_line):
+                for dependency in _resolve_reference(reference, task, numbers, tasks):
+                    if dependency not in task.dependencies:
+                        task.dependencies.append(dependency)
+    return tasks
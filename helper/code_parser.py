@@ -1,5 +1,4 @@
-import re
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -13,107 +12,175 @@ class StructuredCodeBlock:
     code: str
     dependencies: List[str]
 
+_FENCE = '```'
+
+
+class StructuredCodeBlockParser:
+    """Parser incremental de respostas com blocos `ARQUIVO:` e blocos de código markdown.
+
+    Recebe a resposta em trechos (`feed`) e emite cada `StructuredCodeBlock` assim que a
+    cerca de fechamento chega, sem esperar o restante da resposta. Cercas aninhadas
+    (ex.: um README com ```bash dentro de ```markdown) são respeitadas. A linha
+    `DEPENDÊNCIAS:` vem depois da cerca, então preenche a lista do bloco já emitido.
+
+    Os blocos de código simples (`code_blocks`) são coletados na mesma passada.
+    """
+
+    def __init__(self, on_block: Optional[Callable[[StructuredCodeBlock], None]] = None):
+        self.on_block = on_block
+        self.blocks: List[StructuredCodeBlock] = []
+        self.code_blocks: List[Dict[str, str]] = []
+        self.text = ""
+        self._pending = ""
+        self._header: Optional[Dict[str, str]] = None
+        self._last_block: Optional[StructuredCodeBlock] = None
+        # Estado da cerca aberta: linguagem, tamanho da cerca, profundidade aninhada e linhas
+        self._fence_language: Optional[str] = None
+        self._fence_size = 0
+        self._fence_depth = 0
+        self._code_lines: List[str] = []
+
+    def feed(self, chunk: str) -> List[StructuredCodeBlock]:
+        """Processa mais um trecho da resposta e retorna os blocos concluídos nele."""
+        if not chunk:
+            return []
+        self.text += chunk
+        lines = (self._pending + chunk).split('\n')
+        self._pending = lines.pop()
+        emitted = []
+        for line in lines:
+            block = self._process_line(line)
+            if block:
+                emitted.append(block)
+        return emitted
+
+    def close(self) -> List[StructuredCodeBlock]:
+        """Finaliza a resposta; um bloco estruturado sem cerca de fechamento vai até o fim."""
+        emitted = []
+        if self._pending:
+            block = self._process_line(self._pending)
+            self._pending = ""
+            if block:
+                emitted.append(block)
+        if self._fence_language is not None and self._header is not None:
+            block = self._finish_structured_block()
+            if block:
+                emitted.append(block)
+        self._fence_language = None
+        return emitted
+
+    def sync(self, full_text: str) -> List[StructuredCodeBlock]:
+        """Garante que o texto final completo foi processado e encerra o parser.
+
+        Se a resposta final não continua o que foi recebido em trechos (ex.: captura
+        alternativa), processa o texto inteiro e emite apenas os arquivos ainda não vistos.
+        """
+        if full_text.startswith(self.text):
+            return self.feed(full_text[len(self.text):]) + self.close()
+
+        seen = {block.filename for block in self.blocks}
+        fresh = StructuredCodeBlockParser()
+        fresh.feed(full_text)
+        fresh.close()
+        emitted = []
+        for block in fresh.blocks:
+            if block.filename not in seen:
+                self._emit(block)
+                emitted.append(block)
+        self.code_blocks = fresh.code_blocks
+        self.text = full_text
+        return emitted
+
+    def _process_line(self, line: str) -> Optional[StructuredCodeBlock]:
+        stripped = line.strip()
+
+        if self._fence_language is not None:
+            return self._process_code_line(line, stripped)
+
+        if stripped.startswith(_FENCE):
+            size = len(stripped) - len(stripped.lstrip('`'))
+            self._fence_language = stripped[size:].strip()
+            self._fence_size = size
+            self._fence_depth = 0
+            self._code_lines = []
+            return None
+
+        if stripped.startswith('ARQUIVO:'):
+            self._header = {'filename': stripped[len('ARQUIVO:'):].strip(), 'location': "",
+                            'component': "", 'description': ""}
+            self._last_block = None
+        elif self._header is not None:
+            if stripped.startswith('LOCALIZAÇÃO:'):
+                self._header['location'] = stripped[len('LOCALIZAÇÃO:'):].strip()
+            elif stripped.startswith('COMPONENTE:'):
+                self._header['component'] = stripped[len('COMPONENTE:'):].strip()
+            elif stripped.startswith('DESCRIÇÃO:'):
+                self._header['description'] = stripped[len('DESCRIÇÃO:'):].strip()
+        elif self._last_block is not None and stripped.startswith('DEPENDÊNCIAS:'):
+            dependencies = stripped[len('DEPENDÊNCIAS:'):].strip()
+            self._last_block.dependencies.extend(dep.strip() for dep in dependencies.split(',') if dep.strip())
+            self._last_block = None
+        return None
+
+    def _process_code_line(self, line: str, stripped: str) -> Optional[StructuredCodeBlock]:
+        if stripped.startswith(_FENCE):
+            size = len(stripped) - len(stripped.lstrip('`'))
+            info = stripped[size:].strip()
+            if info and size <= self._fence_size:
+                # Abertura de uma cerca interna (ex.: ```bash dentro de um README)
+                self._fence_depth += 1
+            elif not info and self._fence_depth > 0 and size <= self._fence_size:
+                self._fence_depth -= 1
+            elif not info and size >= self._fence_size:
+                return self._close_fence()
+        self._code_lines.append(line)
+        return None
+
+    def _close_fence(self) -> Optional[StructuredCodeBlock]:
+        code = '\n'.join(self._code_lines).strip()
+        self.code_blocks.append({'language': self._fence_language or 'text', 'code': code})
+        block = self._finish_structured_block() if self._header is not None else None
+        self._fence_language = None
+        self._code_lines = []
+        return block
+
+    def _finish_structured_block(self) -> Optional[StructuredCodeBlock]:
+        header, self._header = self._header, None
+        code = '\n'.join(self._code_lines).strip()
+        if not header['filename'] or not code:
+            return None
+        block = StructuredCodeBlock(
+            filename=header['filename'],
+            location=header['location'] or "unknown",
+            component=header['component'] or "unknown",
+            description=header['description'] or "No description",
+            language=self._fence_language or "text",
+            code=code,
+            dependencies=[]
+        )
+        self._last_block = block
+        self._emit(block)
+        return block
+
+    def _emit(self, block: StructuredCodeBlock):
+        self.blocks.append(block)
+        if self.on_block:
+            self.on_block(block)
+
+
 def extract_code_blocks(text):
     """Extrai todos os blocos de código markdown de um texto."""
-    # Pattern para blocos de código com ```
-    pattern = r'```(\w+)?\n(.*?)\n```'
-    matches = re.findall(pattern, text, re.DOTALL)
-    
-    code_blocks = []
-    for language, code in matches:
-        code_blocks.append({
-            'language': language if language else 'text',
-            'code': code.strip()
-        })
-    
-    return code_blocks
+    parser = StructuredCodeBlockParser()
+    parser.feed(text)
+    parser.close()
+    return parser.code_blocks
 
 def extract_structured_code_blocks(text: str) -> List[StructuredCodeBlock]:
     """Extrai blocos de código estruturados com metadados do novo formato"""
-    structured_blocks = []
-    
-    # Pattern mais flexível para capturar blocos estruturados
-    # Procura por cada bloco individualmente
-    lines = text.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Procura por início de bloco estruturado
-        if line.startswith('ARQUIVO:'):
-            filename = line.replace('ARQUIVO:', '').strip()
-            location = ""
-            component = ""
-            description = ""
-            language = ""
-            code = ""
-            dependencies_str = ""
-            
-            i += 1
-            
-            # Extrai metadados
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                line = lines[i].strip()
-                if line.startswith('LOCALIZAÇÃO:'):
-                    location = line.replace('LOCALIZAÇÃO:', '').strip()
-                elif line.startswith('COMPONENTE:'):
-                    component = line.replace('COMPONENTE:', '').strip()
-                elif line.startswith('DESCRIÇÃO:'):
-                    description = line.replace('DESCRIÇÃO:', '').strip()
-                i += 1
-            
-            # Procura pelo início do bloco de código
-            if i < len(lines) and lines[i].strip().startswith('```'):
-                code_start_line = lines[i].strip()
-                language = code_start_line.replace('```', '').strip()
-                i += 1
-                
-                # Coleta o código
-                code_lines = []
-                while i < len(lines) and not lines[i].strip() == '```':
-                    code_lines.append(lines[i])
-                    i += 1
-                
-                code = '\n'.join(code_lines).strip()
-                
-                # Pula a linha de fechamento ```
-                if i < len(lines) and lines[i].strip() == '```':
-                    i += 1
-                
-                # Procura por dependências
-                while i < len(lines):
-                    line = lines[i].strip()
-                    if line.startswith('DEPENDÊNCIAS:'):
-                        dependencies_str = line.replace('DEPENDÊNCIAS:', '').strip()
-                        break
-                    elif line.startswith('ARQUIVO:'):
-                        # Próximo bloco encontrado, volta uma linha
-                        i -= 1
-                        break
-                    i += 1
-            
-            # Cria o bloco estruturado se temos dados suficientes
-            if filename and code:
-                dependencies = []
-                if dependencies_str:
-                    dependencies = [dep.strip() for dep in dependencies_str.split(',') if dep.strip()]
-                
-                structured_block = StructuredCodeBlock(
-                    filename=filename,
-                    location=location or "unknown",
-                    component=component or "unknown",
-                    description=description or "No description",
-                    language=language or "text",
-                    code=code,
-                    dependencies=dependencies
-                )
-                
-                structured_blocks.append(structured_block)
-        
-        i += 1
-    
-    return structured_blocks
+    parser = StructuredCodeBlockParser()
+    parser.feed(text)
+    parser.close()
+    return parser.blocks
 
 def extract_first_code_block(text, language=None):
     """Extrai o primeiro bloco de código, opcionalmente filtrado por linguagem."""
@@ -0,0 +1,332 @@
+"""
+Validação estática local do código gerado
+
+Antes de pedir a validação ao LLM (P4_2), os arquivos gerados passam por verificações
+locais baratas que pegam rejeições mecânicas: erros de sintaxe, imports faltando e
+classe pública com nome diferente do arquivo. Se algo for encontrado, o código vai
+direto para o refinamento com as mensagens exatas, economizando a ida ao LLM.
+
+As verificações são conservadoras: na dúvida, o arquivo é considerado válido e a
+decisão fica com a validação do LLM.
+"""
+
+import ast
+import builtins
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set, Tuple
+
+import yaml
+
+from analyzers.java_parser import parse_java_source, tokenize_java
+
+# Linguagem a partir da extensão (tem prioridade sobre a linguagem do bloco)
+EXTENSION_LANGUAGES = {
+    '.py': 'python', '.java': 'java', '.json': 'json', '.yml': 'yaml', '.yaml': 'yaml',
+    '.sql': 'sql', '.xml': 'xml'
+}
+LANGUAGE_ALIASES = {'py': 'python', 'yml': 'yaml'}
+
+# Tipos comuns que exigem import explícito em Java -> pacotes que os fornecem
+KNOWN_JAVA_IMPORTS = {
+    'List': ('java.util',), 'ArrayList': ('java.util',), 'Map': ('java.util',),
+    'HashMap': ('java.util',), 'Set': ('java.util',), 'HashSet': ('java.util',),
+    'Optional': ('java.util',), 'UUID': ('java.util',), 'Collectors': ('java.util.stream',),
+    'BigDecimal': ('java.math',), 'LocalDate': ('java.time',), 'LocalDateTime': ('java.time',),
+    'Entity': ('jakarta.persistence', 'javax.persistence'),
+    'Table': ('jakarta.persistence', 'javax.persistence'),
+    'Id': ('jakarta.persistence', 'javax.persistence'),
+    'Column': ('jakarta.persistence', 'javax.persistence'),
+    'GeneratedValue': ('jakarta.persistence', 'javax.persistence'),
+    'Autowired': ('org.springframework.beans.factory.annotation',),
+    'Service': ('org.springframework.stereotype',),
+    'Component': ('org.springframework.stereotype',),
+    'Repository': ('org.springframework.stereotype',),
+    'RestController': ('org.springframework.web.bind.annotation',),
+    'RequestMapping': ('org.springframework.web.bind.annotation',),
+    'GetMapping': ('org.springframework.web.bind.annotation',),
+    'PostMapping': ('org.springframework.web.bind.annotation',),
+    'PathVariable': ('org.springframework.web.bind.annotation',),
+    'RequestBody': ('org.springframework.web.bind.annotation',),
+    'ResponseEntity': ('org.springframework.http',),
+    'JpaRepository': ('org.springframework.data.jpa.repository',),
+}
+
+JAVA_TYPE_KINDS = ('class', 'interface', 'enum', 'record', 'annotation')
+
+_MODULE_DUNDERS = {'__file__', '__name__', '__doc__', '__spec__', '__loader__', '__package__',
+                   '__builtins__', '__path__', '__annotations__', '__dict__', '__class__'}
+_PAIRS = {')': '(', ']': '[', '}': '{'}
+# Arquivos salvos sem nome de tipo reconhecido recebem nomes como Task3_Main.java
+_GENERATED_NAME = re.compile(r'^Task\d+_')
+
+
+@dataclass
+class StaticIssue:
+    """Problema encontrado pela validação estática"""
+    filename: str
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self):
+        location = f" (linha {self.line})" if self.line else ""
+        return f"Erro em {self.filename}{location}: {self.message}"
+
+
+def detect_language(filename: str, language: str = "") -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in EXTENSION_LANGUAGES:
+        return EXTENSION_LANGUAGES[extension]
+    language = (language or "").lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def _delimiter_issues(filename: str, code: str, line_comment: str, quotes: str,
+                      multiline_quotes: str = "", backslash_escapes: bool = True) -> List[StaticIssue]:
+    """Verifica parênteses/colchetes/chaves, strings e comentários não fechados."""
+    stack = []
+    line = 1
+    i = 0
+    n = len(code)
+    while i < n:
+        char = code[i]
+        if char == '\n':
+            line += 1
+            i += 1
+        elif line_comment and code.startswith(line_comment, i):
+            end = code.find('\n', i)
+            i = n if end < 0 else end
+        elif code.startswith('/*', i):
+            end = code.find('*/', i + 2)
+            if end < 0:
+                return [StaticIssue(filename, "comentário /* não foi fechado", line)]
+            line += code.count('\n', i, end)
+            i = end + 2
+        elif char in quotes:
+            delimiter = char * 3 if code.startswith(char * 3, i) else char
+            j = i + len(delimiter)
+            while j < n and not code.startswith(delimiter, j):
+                if backslash_escapes and code[j] == '\\':
+                    j += 2
+                    continue
+                if code[j] == '\n' and len(delimiter) == 1 and char not in multiline_quotes:
+                    break
+                j += 1
+            if j >= n or code[j] == '\n':
+                return [StaticIssue(filename, f"string iniciada com {delimiter} não foi fechada", line)]
+            line += code.count('\n', i, j)
+            i = j + len(delimiter)
+        elif char in '([{':
+            stack.append((char, line))
+            i += 1
+        elif char in _PAIRS:
+            if not stack or stack[-1][0] != _PAIRS[char]:
+                return [StaticIssue(filename, f"'{char}' sem abertura correspondente", line)]
+            stack.pop()
+            i += 1
+        else:
+            i += 1
+    if stack:
+        opener, opener_line = stack[-1]
+        return [StaticIssue(filename, f"'{opener}' aberto e nunca fechado", opener_line)]
+    return []
+
+
+def _python_issues(filename: str, code: str) -> List[StaticIssue]:
+    try:
+        tree = ast.parse(code, filename=filename)
+    except SyntaxError as e:
+        return [StaticIssue(filename, f"erro de sintaxe: {e.msg}", e.lineno)]
+
+    # Nomes lidos que não são definidos em lugar nenhum do módulo (nem builtins)
+    bound = set(dir(builtins)) | _MODULE_DUNDERS
+    loaded = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and any(alias.name == '*' for alias in node.names):
+            return []  # import * torna a verificação imprecisa
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            bound.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Load):
+                loaded.setdefault(node.id, node.lineno)
+            else:
+                bound.add(node.id)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            bound.add(node.rest)
+    return [
+        StaticIssue(filename, f"nome '{name}' usado sem import ou definição", line)
+        for name, line in sorted(loaded.items(), key=lambda item: item[1]) if name not in bound
+    ]
+
+
+def java_declared_types(code: str) -> Set[str]:
+    """Tipos declarados ou importados (nome simples) em um arquivo Java."""
+    skeleton = parse_java_source(code)
+    declared = {member.name for member in skeleton.members if member.kind in JAVA_TYPE_KINDS}
+    return declared | {name.rsplit('.', 1)[-1] for name in skeleton.imports}
+
+
+def _java_issues(filename: str, code: str, task_types: Set[str] = frozenset()) -> List[StaticIssue]:
+    issues = _delimiter_issues(filename, code, '//', '"\'')
+    if issues:
+        return issues
+
+    skeleton = parse_java_source(code)
+    declared = {member.name for member in skeleton.members if member.kind in JAVA_TYPE_KINDS}
+    stem = os.path.splitext(os.path.basename(filename))[0] if filename.endswith('.java') else ""
+    if _GENERATED_NAME.match(stem):
+        stem = ""  # nome dado pelo projeto (TaskN_...), não pelo LLM: não há o que comparar
+    for member in skeleton.members:
+        if (stem and not member.owner and 'public' in member.modifiers
+                and member.kind in JAVA_TYPE_KINDS and member.name != stem):
+            issues.append(StaticIssue(filename, f"tipo público '{member.name}' deve estar no arquivo {member.name}.java"))
+
+    imported = {name.rsplit('.', 1)[-1] for name in skeleton.imports}
+    wildcard_packages = {name[:-2] for name in skeleton.imports if name.endswith('.*')}
+    tokens, _ = tokenize_java(code)
+    # Nomes qualificados (java.util.List, @javax.persistence.Id) não precisam de import
+    used = {token for index, token in enumerate(tokens) if index == 0 or tokens[index - 1] != '.'}
+    for name, packages in KNOWN_JAVA_IMPORTS.items():
+        # Tipos declarados ou importados em qualquer arquivo da task podem ser do próprio
+        # projeto (mesmo pacote): na dúvida, a decisão fica com o LLM
+        if name not in used or name in imported or name in declared or name in task_types:
+            continue
+        if skeleton.package in packages or wildcard_packages.intersection(packages):
+            continue
+        issues.append(StaticIssue(filename, f"'{name}' usado sem import (ex.: import {packages[0]}.{name};)"))
+    return issues
+
+
+class _TolerantYamlLoader(yaml.SafeLoader):
+    """SafeLoader que aceita tags customizadas (!Ref, !Sub...) sem interpretá-las"""
+
+
+_TolerantYamlLoader.add_multi_constructor('!', lambda loader, suffix, node: None)
+
+
+def _yaml_issues(filename: str, code: str) -> List[StaticIssue]:
+    if '{{' in code or '{%' in code:
+        return []  # templates (Helm, Jinja) só são YAML depois de renderizados
+    try:
+        list(yaml.load_all(code, Loader=_TolerantYamlLoader))
+    except yaml.YAMLError as e:
+        mark = getattr(e, 'problem_mark', None)
+        problem = getattr(e, 'problem', None) or str(e).split('\n')[0]
+        return [StaticIssue(filename, f"YAML inválido: {problem}", mark.line + 1 if mark else None)]
+    return []
+
+
+def _json_issues(filename: str, code: str) -> List[StaticIssue]:
+    base_name = os.path.basename(filename or "").lower()
+    if base_name.startswith(('tsconfig', 'jsconfig')) or base_name.endswith('.jsonc'):
+        return []  # aceitam comentários
+    try:
+        json.loads(code)
+    except json.JSONDecodeError as e:
+        return [StaticIssue(filename, f"JSON inválido: {e.msg}", e.lineno)]
+    return []
+
+
+def _xml_issues(filename: str, code: str) -> List[StaticIssue]:
+    try:
+        ET.fromstring(code.strip())
+    except ET.ParseError as e:
+        return [StaticIssue(filename, f"XML inválido: {e}", e.position[0])]
+    return []
+
+
+def _sql_issues(filename: str, code: str) -> List[StaticIssue]:
+    # Em SQL aspas são escapadas duplicando ('it''s'), não com barra invertida
+    return _delimiter_issues(filename, code, '--', '\'"', multiline_quotes='\'"', backslash_escapes=False)
+
+
+_CHECKERS = {
+    'python': _python_issues,
+    'java': _java_issues,
+    'yaml': _yaml_issues,
+    'json': _json_issues,
+    'xml': _xml_issues,
+    'sql': _sql_issues,
+}
+
+
+def validate_source(filename: str, language: str, code: str, task_types: Iterable[str] = ()) -> List[StaticIssue]:
+    """Valida um arquivo; linguagens sem verificador local são consideradas válidas.
+
+    `task_types`: tipos Java declarados ou importados nos demais arquivos da task.
+    """
+    checker = _CHECKERS.get(detect_language(filename, language))
+    if not checker or not code.strip():
+        return []
+    try:
+        if checker is _java_issues:
+            return checker(filename or language, code, set(task_types))
+        return checker(filename or language, code)
+    except Exception as e:  # o verificador nunca deve impedir a validação pelo LLM
+        print(f"⚠️ Validação estática ignorada para {filename}: {e}")
+        return []
+
+
+def validate_blocks(blocks: Iterable) -> List[StaticIssue]:
+    """Valida `StructuredCodeBlock`s (usa `filename`, `language` e `code`)."""
+    blocks = list(blocks)
+    task_types = _task_java_types((block.filename, block.language, block.code) for block in blocks)
+    issues = []
+    for block in blocks:
+        issues.extend(validate_source(block.filename, block.language, block.code, task_types))
+    return issues
+
+
+def validate_files(paths: Iterable[str]) -> List[StaticIssue]:
+    """Valida arquivos já salvos em disco."""
+    sources = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                sources.append((path, "", f.read()))
+        except (OSError, UnicodeDecodeError):
+            continue
+    task_types = _task_java_types(sources)
+    issues = []
+    for path, language, code in sources:
+        issues.extend(validate_source(path, language, code, task_types))
+    return issues
+
+
+def _task_java_types(sources: Iterable[Tuple[str, str, str]]) -> Set[str]:
+    types = set()
+    for filename, language, code in sources:
+        if detect_language(filename, language) == 'java':
+            try:
+                types |= java_declared_types(code)
+            except Exception:
+                continue
+    return types
+
+
+def format_static_report(issues: List[StaticIssue]) -> str:
+    """Texto de validação rejeitada no mesmo formato esperado do P4_2."""
+    lines = [
+        "❌ REJEITADO",
+        "",
+        "## Validação estática local",
+        f"Foram encontrados {len(issues)} problema(s) mecânico(s) antes da validação pelo LLM:",
+        ""
+    ]
+    lines.extend(f"- {issue}" for issue in issues)
+    lines.append("")
+    lines.append("Corrija exatamente estes erros mantendo o restante do código.")
+    return "\n".join(lines)
@@ -1,12 +1,17 @@
 import os
+import threading
+
+# Vários workers da Fase 4 podem anexar ao mesmo arquivo de contexto/log
+_append_lock = threading.Lock()
 
 def save_md(filepath, content):
     with open(filepath, "w", encoding="utf-8") as f:
         f.write(content.strip() + "\n")
 
 def append_to_context(context_path, content):
-    with open(context_path, "a", encoding="utf-8") as f:
-        f.write(content.strip() + "\n")
+    with _append_lock:
+        with open(context_path, "a", encoding="utf-8") as f:
+            f.write(content.strip() + "\n")
 
 def load_context(filepaths):
     context = ""
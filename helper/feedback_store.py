@@ -0,0 +1,233 @@
+"""
+Armazenamento limitado do feedback de validação e integração (Fase 4)
+
+O `global_context.md` deixou de crescer indefinidamente: as últimas entradas ficam na
+íntegra e as mais antigas são comprimidas em lições por componente (motivos de falha
+recorrentes com contagem). O estado fica em `feedback_store.json`, com um índice por
+task e por componente, e o markdown é reescrito a cada atualização com tamanho máximo
+fixo. Cada task carrega só a fatia relevante (lições do seu componente, histórico da
+própria task e entradas recentes do mesmo componente).
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List
+
+# Limites do armazenamento (independentes do número de tasks executadas)
+RECENT_ENTRIES = 20
+MAX_ENTRY_CHARS = 4000
+MAX_LESSONS_PER_COMPONENT = 10
+MAX_LESSON_CHARS = 200
+MAX_COMPONENTS = 50
+DEFAULT_SLICE_CHARS = 3000
+
+DEFAULT_COMPONENT = "geral"
+# Títulos que marcam o fim do cabeçalho do global_context.md
+ENTRY_MARKERS = ("## 🧠", "## 🔍", "## 🔗")
+LESSONS_HEADER = "## 🧠 Lições Consolidadas por Componente"
+
+_LESSON_PREFIX = re.compile(r'^[\s\-*#>\d.)]+')
+# Linhas que só repetem o status ("❌ REJEITADO") não são lições
+_STATUS_ONLY = re.compile(r'^[❌✅\s*#:-]*(rejeitad[oa]|rejeitar|aprovad[oa])?[\s*:-]*$', re.IGNORECASE)
+
+
+@dataclass
+class FeedbackEntry:
+    """Feedback de uma validação ou integração"""
+    kind: str  # 'validation' | 'integration'
+    task_index: str
+    task_title: str
+    component: str
+    approved: bool
+    text: str
+    reasons: List[str] = field(default_factory=list)
+    timestamp: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _normalize_lesson(reason: str) -> str:
+    if _STATUS_ONLY.match(reason):
+        return ""
+    return _LESSON_PREFIX.sub('', reason).strip()[:MAX_LESSON_CHARS]
+
+
+class FeedbackStore:
+    """Feedback recente na íntegra + lições comprimidas por componente"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.state_file = os.path.join(output_dir, "feedback_store.json")
+        self.context_file = os.path.join(output_dir, "global_context.md")
+        self._lock = threading.RLock()
+        self._state = self._load()
+
+    def _empty_state(self) -> Dict:
+        return {'recent': [], 'components': {}, 'tasks': {}}
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state.get('recent'), list):
+                return state
+        except (OSError, json.JSONDecodeError):
+            pass
+        self._preserve_legacy_context()
+        return self._empty_state()
+
+    def _preserve_legacy_context(self):
+        """Guarda uma cópia do global_context.md do formato antigo (só anexava)
+        antes que ele seja reescrito de forma limitada."""
+        if not os.path.exists(self.context_file) or not self._read_preamble(self.context_file, detect_entries=True):
+            return
+        legacy_file = os.path.join(self.output_dir, "global_context.legacy.md")
+        shutil.copyfile(self.context_file, legacy_file)
+        print(f"📦 Histórico anterior do contexto global preservado em: {os.path.basename(legacy_file)}")
+
+    @staticmethod
+    def _read_preamble(path: str, detect_entries: bool = False):
+        """Lê só o cabeçalho do markdown (até a primeira entrada de feedback).
+
+        Com `detect_entries`, apenas informa se o arquivo já tem entradas.
+        """
+        lines = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith(ENTRY_MARKERS):
+                        return True if detect_entries else "".join(lines)
+                    lines.append(line)
+        except OSError:
+            pass
+        return False if detect_entries else "".join(lines)
+
+    def _write_atomic(self, path: str, content: str):
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_file, path)
+
+    def reset(self):
+        """Descarta o feedback acumulado (nova migração)."""
+        with self._lock:
+            self._state = self._empty_state()
+            self._write_atomic(self.state_file, json.dumps(self._state, ensure_ascii=False))
+
+    def record(self, entry: FeedbackEntry):
+        """Registra uma entrada, comprime as que saem da janela recente e reescreve os arquivos."""
+        entry.component = entry.component or DEFAULT_COMPONENT
+        entry.task_index = str(entry.task_index)
+        if len(entry.text) > MAX_ENTRY_CHARS:
+            entry.text = entry.text[:MAX_ENTRY_CHARS] + "\n... (feedback truncado)"
+        entry.reasons = [lesson for lesson in (_normalize_lesson(r) for r in entry.reasons) if lesson][:5]
+
+        with self._lock:
+            recent = self._state['recent']
+            recent.append(asdict(entry))
+            while len(recent) > RECENT_ENTRIES:
+                self._compress(recent.pop(0))
+            self._index_task(entry)
+            self._write_atomic(self.state_file, json.dumps(self._state, ensure_ascii=False, indent=1))
+            self._render()
+
+    def _index_task(self, entry: FeedbackEntry):
+        info = self._state['tasks'].setdefault(entry.task_index, {'validations': 0, 'rejections': 0})
+        info.update(title=entry.task_title, component=entry.component, updated_at=entry.timestamp)
+        if entry.kind == 'validation':
+            info['validations'] += 1
+            info['rejections'] += 0 if entry.approved else 1
+            info['status'] = "✅ APROVADO" if entry.approved else "❌ REJEITADO"
+            if entry.reasons:
+                info['last_reasons'] = entry.reasons[:3]
+        else:
+            info['status'] = "✅ INTEGRAÇÃO PLANEJADA" if entry.approved else "❌ PROBLEMAS DE INTEGRAÇÃO"
+
+    def _compress(self, entry: Dict):
+        """Transforma uma entrada antiga em contagens e lições do componente."""
+        components = self._state['components']
+        summary = components.setdefault(entry['component'], {'approved': 0, 'rejected': 0, 'integrated': 0, 'lessons': []})
+        if entry['kind'] == 'integration':
+            summary['integrated'] += 1
+        else:
+            summary['approved' if entry['approved'] else 'rejected'] += 1
+        summary['updated_at'] = entry['timestamp']
+
+        lessons = summary['lessons']
+        for reason in entry['reasons']:
+            key = reason.lower()
+            existing = next((lesson for lesson in lessons if lesson['text'].lower() == key), None)
+            if existing:
+                existing['count'] += 1
+                existing.update(last_task=entry['task_index'], last_seen=entry['timestamp'])
+            else:
+                lessons.append({'text': reason, 'count': 1, 'last_task': entry['task_index'],
+                                'last_seen': entry['timestamp']})
+        # Mantém as lições mais recorrentes (em empate, as mais novas)
+        lessons.sort(key=lambda lesson: (lesson['count'], lesson['last_seen']), reverse=True)
+        del lessons[MAX_LESSONS_PER_COMPONENT:]
+
+        if len(components) > MAX_COMPONENTS:
+            oldest = min(components, key=lambda name: components[name].get('updated_at', ''))
+            del components[oldest]
+
+    def _format_component(self, name: str, summary: Dict) -> str:
+        lines = [f"### {name} ({summary['approved']} aprovada(s), {summary['rejected']} rejeitada(s), "
+                 f"{summary['integrated']} integração(ões))"]
+        lines.extend(f"- ({lesson['count']}x) {lesson['text']}" for lesson in summary['lessons'])
+        return "\n".join(lines)
+
+    def _render(self):
+        """Reescreve o global_context.md: cabeçalho + lições + entradas recentes."""
+        parts = [self._read_preamble(self.context_file).rstrip() or "# Contexto Global da Migração"]
+        components = self._state['components']
+        if components:
+            parts.append(LESSONS_HEADER)
+            parts.extend(self._format_component(name, summary) for name, summary in sorted(components.items()))
+        parts.extend(entry['text'].strip() for entry in self._state['recent'])
+        self._write_atomic(self.context_file, "\n\n".join(parts) + "\n")
+
+    def context_for(self, task_index=None, component: str = "",
+                    max_chars: int = DEFAULT_SLICE_CHARS) -> str:
+        """Fatia do feedback relevante para uma task, limitada a `max_chars`.
+
+        Sem `task_index`, retorna as lições e as entradas mais recentes de qualquer componente.
+        """
+        component = component or DEFAULT_COMPONENT
+        with self._lock:
+            recent = list(self._state['recent'])
+            components = self._state['components']
+            if task_index is None:
+                selected_components = {name: components[name] for name in sorted(components)}
+                info = None
+            else:
+                task_key = str(task_index)
+                selected_components = {component: components[component]} if component in components else {}
+                info = dict(self._state['tasks'].get(task_key, {})) or None
+                recent = [entry for entry in recent if entry['component'] == component or entry['task_index'] == task_key]
+            lessons = "\n".join(self._format_component(name, summary) for name, summary in selected_components.items())
+
+        parts = []
+        if info:
+            line = (f"**Histórico desta task:** {info['validations']} validação(ões), "
+                    f"{info['rejections']} rejeição(ões), último status {info.get('status', '-')}")
+            parts.append("\n".join([line] + [f"- {reason}" for reason in info.get('last_reasons', [])]))
+        if lessons:
+            parts.append(f"{LESSONS_HEADER}\n{lessons}")
+
+        # Entradas mais novas primeiro, até o limite
+        used = sum(len(part) for part in parts)
+        selected = []
+        for entry in reversed(recent):
+            text = entry['text'].strip()
+            if used + len(text) > max_chars:
+                if not selected:
+                    selected.append(text[:max(0, max_chars - used)])
+                break
+            selected.append(text)
+            used += len(text)
+        parts.extend(reversed(selected))
+        return "\n\n".join(part for part in parts if part)[:max_chars]
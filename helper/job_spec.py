@@ -0,0 +1,111 @@
+"""
+Especificação de jobs para execuções sem interação (`python main.py job spec.yaml`)
+
+Um job é um arquivo YAML no mesmo formato do `migration_config_example.yaml`, com uma
+seção `job:` a mais que substitui as respostas dadas pelo menu:
+
+    job:
+      legacy_directory: /repos/sistema-legado   # Fase 1 e análise de código
+      output_dir: runs/sistema-legado           # padrão: migration_docs
+      debug_endpoint: http://localhost:9223/json
+      config: migration_config.yaml             # ou a seção migration_config: neste arquivo
+      steps: [fase0, fase1, fase2, fase3, implement]
+      workers: 3
+      resume: false
+    migration_config:
+      project_name: "Sistema Legado"
+      ...
+
+Caminhos relativos são resolvidos a partir do diretório do arquivo do job. Vários
+jobs podem rodar ao mesmo tempo na mesma máquina desde que cada um tenha o seu
+`output_dir` e a sua instância do Chrome (`debug_endpoint`).
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import yaml
+
+# Etapas na ordem em que são executadas
+JOB_STEPS = ('fase0', 'fase1', 'fase2', 'fase3', 'implement', 'analyze')
+DEFAULT_STEPS = ('fase0', 'fase1', 'fase2', 'fase3', 'implement')
+DEFAULT_OUTPUT_DIR = "migration_docs"
+DEFAULT_WORKERS = 3
+
+
+@dataclass
+class JobSpec:
+    """Parâmetros de uma execução sem interação"""
+    path: str
+    name: str
+    output_dir: str
+    steps: List[str] = field(default_factory=lambda: list(DEFAULT_STEPS))
+    legacy_directory: Optional[str] = None
+    config_file: Optional[str] = None
+    debug_endpoint: Optional[str] = None
+    workers: int = DEFAULT_WORKERS
+    resume: bool = False
+
+
+def load_job_spec(path: str) -> JobSpec:
+    """Lê e valida um arquivo de job; erros de conteúdo viram ValueError com a causa."""
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: YAML inválido ({e})")
+    if not isinstance(data, dict) or not isinstance(data.get('job'), dict):
+        raise ValueError(f"{path}: seção 'job:' não encontrada")
+    job = data['job']
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value):
+        return os.path.normpath(os.path.join(base_dir, os.path.expanduser(str(value)))) if value else None
+
+    steps = job.get('steps') or list(DEFAULT_STEPS)
+    unknown = [step for step in steps if step not in JOB_STEPS]
+    if unknown:
+        raise ValueError(f"{path}: etapas desconhecidas {unknown} (válidas: {', '.join(JOB_STEPS)})")
+
+    # A configuração da migração pode estar no próprio arquivo do job
+    config_file = resolve(job.get('config')) or (os.path.abspath(path) if 'migration_config' in data else None)
+    spec = JobSpec(
+        path=os.path.abspath(path),
+        name=str(job.get('name') or os.path.splitext(os.path.basename(path))[0]),
+        output_dir=resolve(job.get('output_dir')) or DEFAULT_OUTPUT_DIR,
+        steps=sorted(set(steps), key=JOB_STEPS.index),
+        legacy_directory=resolve(job.get('legacy_directory')),
+        config_file=config_file,
+        debug_endpoint=job.get('debug_endpoint'),
+        workers=int(job.get('workers', DEFAULT_WORKERS)),
+        resume=bool(job.get('resume', False)),
+    )
+
+    if 'fase0' in spec.steps and not spec.config_file:
+        raise ValueError(f"{path}: a etapa fase0 precisa de job.config ou da seção migration_config")
+    if spec.config_file and not os.path.exists(spec.config_file):
+        raise ValueError(f"{path}: arquivo de configuração não encontrado: {spec.config_file}")
+    needs_legacy = {'fase1', 'analyze'} & set(spec.steps)
+    if needs_legacy and not (spec.legacy_directory and os.path.isdir(spec.legacy_directory)):
+        raise ValueError(f"{path}: as etapas {sorted(needs_legacy)} precisam de job.legacy_directory existente")
+    if spec.workers < 1:
+        raise ValueError(f"{path}: job.workers deve ser pelo menos 1")
+    return spec
+
+
+def find_conflicts(specs: List[JobSpec], parallel: int) -> List[str]:
+    """Jobs que não podem rodar juntos: mesmo diretório de saída ou, em paralelo, o mesmo Chrome."""
+    conflicts = []
+    seen_dirs, seen_endpoints = {}, {}
+    for spec in specs:
+        output_dir = os.path.abspath(spec.output_dir)
+        if output_dir in seen_dirs:
+            conflicts.append(f"{spec.name} e {seen_dirs[output_dir]} usam o mesmo output_dir ({spec.output_dir})")
+        seen_dirs.setdefault(output_dir, spec.name)
+        if parallel > 1:
+            endpoint = spec.debug_endpoint or 'padrão'
+            if endpoint in seen_endpoints:
+                conflicts.append(f"{spec.name} e {seen_endpoints[endpoint]} usam o mesmo debug_endpoint ({endpoint})")
+            seen_endpoints.setdefault(endpoint, spec.name)
+    return conflicts
@@ -0,0 +1,161 @@
+"""
+Armazenamento da base de conhecimento do contexto inteligente
+
+A base fica em dois arquivos:
+- `knowledge_base.index.json`: metadados de cada documento (resumo, palavras-chave,
+  tipo, tamanho) e a posição do corpo no arquivo de corpos, o suficiente para a busca;
+- `knowledge_base.docs.jsonl`: corpos (`content` e `sections`), um JSON por linha,
+  lidos sob demanda com seek pela posição indexada.
+
+Documentos reindexados recebem um corpo novo no fim do arquivo; quando os corpos
+obsoletos passam a ocupar mais da metade do arquivo, os vigentes são copiados para um
+arquivo de nova geração (`knowledge_base.docs.<n>.jsonl`), registrado no índice. O
+índice só passa a apontar para o arquivo novo quando é substituído (de forma atômica)
+e o arquivo antigo é removido depois: uma queda no meio nunca deixa posições inválidas.
+
+Uma base no formato antigo (`knowledge_base.json` com tudo junto) é convertida na
+primeira leitura do índice.
+"""
+
+import glob
+import json
+import os
+import threading
+from typing import Dict
+
+INDEX_FILENAME = "knowledge_base.index.json"
+BODIES_FILENAME = "knowledge_base.docs.jsonl"
+LEGACY_FILENAME = "knowledge_base.json"
+BODY_FIELDS = ('content', 'sections')
+# Arquivos de corpos menores que isso nunca são compactados
+COMPACT_MIN_BYTES = 1024 * 1024
+
+
+class KnowledgeBaseStore:
+    """Índice de metadados em JSON + corpos em JSONL com acesso por posição"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.index_file = os.path.join(output_dir, INDEX_FILENAME)
+        self.generation = 0
+        self.bodies_file = self._bodies_path(0)
+        self.legacy_file = os.path.join(output_dir, LEGACY_FILENAME)
+        self._lock = threading.Lock()
+        self._reader = None
+
+    def load_index(self) -> Dict[str, Dict]:
+        """Metadados por documento (sem os corpos)."""
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.generation = index.get('generation', 0)
+            self.bodies_file = self._bodies_path(self.generation)
+            return index.get('documents', {})
+        if os.path.exists(self.legacy_file):
+            return self._migrate_legacy()
+        return {}
+
+    def _bodies_path(self, generation: int) -> str:
+        if generation == 0:
+            return os.path.join(self.output_dir, BODIES_FILENAME)
+        stem, extension = os.path.splitext(BODIES_FILENAME)
+        return os.path.join(self.output_dir, f"{stem}.{generation}{extension}")
+
+    def _migrate_legacy(self) -> Dict[str, Dict]:
+        with open(self.legacy_file, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        # O mesmo nome de arquivo também é usado pela análise de código (CodeElement); só
+        # entradas com corpo e palavras-chave são documentos do contexto inteligente
+        documents, bodies = {}, {}
+        for doc_id, entry in legacy.items():
+            if isinstance(entry, dict) and 'content' in entry and 'keywords' in entry:
+                documents[doc_id] = {key: value for key, value in entry.items() if key not in BODY_FIELDS}
+                bodies[doc_id] = {field: entry.get(field) for field in BODY_FIELDS}
+        if documents:
+            self.save(documents, bodies)
+            print(f"📚 Base de conhecimento convertida para o formato indexado: {len(documents)} documentos")
+        return documents
+
+    def read_body(self, entry: Dict) -> Dict:
+        """Corpo (`content`, `sections`) de um documento a partir da posição no índice."""
+        if 'offset' not in entry:
+            return {}
+        with self._lock:
+            if self._reader is None:
+                self._reader = open(self.bodies_file, 'rb')
+            self._reader.seek(entry['offset'])
+            raw = self._reader.read(entry['length'])
+        return json.loads(raw.decode('utf-8'))
+
+    def save(self, documents: Dict[str, Dict], bodies: Dict[str, Dict]):
+        """Acrescenta os corpos novos (`bodies`) e grava o índice de forma atômica.
+
+        As entradas de `documents` recebem a posição dos seus corpos novos.
+        """
+        with self._lock:
+            if bodies:
+                with open(self.bodies_file, 'ab') as f:
+                    offset = f.tell()
+                    for doc_id, body in bodies.items():
+                        if doc_id not in documents:
+                            continue
+                        raw = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                        f.write(raw + b'\n')
+                        documents[doc_id]['offset'] = offset
+                        documents[doc_id]['length'] = len(raw)
+                        offset += len(raw) + 1
+            previous_file = self.bodies_file
+            compacted = self._compact_if_needed(documents)
+            self._write_index(documents)
+            self._close_reader()
+            if compacted:
+                # O índice já aponta para a nova geração: o arquivo antigo pode sair
+                self._remove_stale_bodies(previous_file)
+
+    def _write_index(self, documents: Dict[str, Dict]):
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'generation': self.generation, 'documents': documents}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+
+    def _compact_if_needed(self, documents: Dict[str, Dict]) -> bool:
+        """Copia os corpos vigentes para a próxima geração; as posições em `documents`
+        passam a valer para o arquivo novo, que só é usado após a gravação do índice."""
+        try:
+            file_size = os.path.getsize(self.bodies_file)
+        except OSError:
+            return False
+        live = sum(entry.get('length', 0) + 1 for entry in documents.values())
+        if file_size < COMPACT_MIN_BYTES or file_size <= 2 * live:
+            return False
+        generation = self.generation + 1
+        target_file = self._bodies_path(generation)
+        with open(self.bodies_file, 'rb') as source, open(target_file, 'wb') as target:
+            for entry in documents.values():
+                if 'offset' not in entry:
+                    continue
+                source.seek(entry['offset'])
+                raw = source.read(entry['length'])
+                entry['offset'] = target.tell()
+                target.write(raw + b'\n')
+            target.flush()
+            os.fsync(target.fileno())
+        self.generation = generation
+        self.bodies_file = target_file
+        return True
+
+    def _remove_stale_bodies(self, previous_file: str):
+        """Remove o arquivo da geração anterior e sobras de compactações interrompidas."""
+        stem, extension = os.path.splitext(BODIES_FILENAME)
+        candidates = set(glob.glob(os.path.join(glob.escape(self.output_dir), f"{stem}*{extension}")))
+        candidates.add(previous_file)
+        for path in candidates - {self.bodies_file}:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _close_reader(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
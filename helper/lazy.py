@@ -0,0 +1,41 @@
+"""
+Objetos criados no primeiro uso
+
+`LazyObject(factory)` ocupa o lugar de um gerenciador global: só chama `factory()`
+(que pode importar módulos pesados, ler e gravar arquivos) quando algum atributo é
+acessado. Assim importar o `main` não tem efeitos colaterais nem custo proporcional
+ao tamanho dos dados em disco.
+"""
+
+import threading
+from typing import Any, Callable
+
+
+class LazyObject:
+    """Proxy que cria a instância real no primeiro acesso a um atributo"""
+
+    __slots__ = ('_factory', '_instance', '_lock')
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _resolve(self):
+        if self._instance is None:
+            # Workers paralelos podem fazer o primeiro acesso ao mesmo tempo
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, '_instance', self._factory())
+        return self._instance
+
+    @property
+    def lazy_loaded(self) -> bool:
+        """Se a instância real já foi criada."""
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
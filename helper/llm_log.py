@@ -0,0 +1,365 @@
+"""
+Log das interações com o LLM em segmentos JSONL
+
+Cada interação vira um registro JSONL anexado ao segmento atual
+(`interactions_<início>_<pid>_<n>.jsonl[.gz|.zst]`), em vez de um JSON, um Markdown e uma
+entrada no log consolidado por chamada. A gravação acontece numa thread de fundo:
+os registros são agrupados, comprimidos por lote (cada lote é um membro gzip/frame
+zstd independente) e sincronizados com fsync de uma vez. O segmento é rotacionado ao
+atingir o tamanho máximo. As métricas de cada lote vão para o índice SQLite
+(`log_index.py`) na mesma passagem. As visões em Markdown são geradas sob demanda.
+
+Os prompts repetem muito material (configuração da migração, resumo do legado,
+estrutura do projeto). Com o índice ativo, cada prompt é dividido em componentes
+(parágrafos) guardados uma única vez pelo hash do conteúdo; o registro só leva a
+lista de hashes e o SHA-1 do prompt completo, que é reconstruído exatamente.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from helper.log_index import LogIndex
+
+try:
+    import zstandard
+except ImportError:  # compressão zstd é opcional
+    zstandard = None
+
+SEGMENT_PREFIX = "interactions_"
+SEGMENT_EXTENSIONS = {None: ".jsonl", 'gzip': ".jsonl.gz", 'zstd': ".jsonl.zst"}
+DEFAULT_MAX_SEGMENT_BYTES = 16 * 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_BATCH_SIZE = 64
+# Logs do formato antigo (um JSON por interação)
+LEGACY_PREFIX = "llm_log_"
+
+_COMPONENT_BOUNDARY = re.compile(r'\n{2,}')
+
+
+def split_prompt_components(text: str) -> List[str]:
+    """Divide o prompt em parágrafos (com os separadores), de modo que `"".join()` o reconstrói."""
+    parts = []
+    start = 0
+    for match in _COMPONENT_BOUNDARY.finditer(text):
+        parts.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        parts.append(text[start:])
+    return parts
+
+
+def component_hash(content: str) -> str:
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:20]
+
+
+class LLMLogWriter:
+    """Escritor em lote dos registros de interação"""
+
+    def __init__(self, logs_dir: str, compression: Optional[str] = 'gzip',
+                 max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, batch_size: int = DEFAULT_BATCH_SIZE,
+                 index: bool = True):
+        if compression == 'zstd' and zstandard is None:
+            print("⚠️ Pacote 'zstandard' não instalado; usando gzip nos logs")
+            compression = 'gzip'
+        if compression not in SEGMENT_EXTENSIONS:
+            raise ValueError(f"Compressão de log desconhecida: {compression}")
+        self.logs_dir = logs_dir
+        self.compression = compression
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.index = LogIndex(logs_dir) if index else None
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._id_lock = threading.Lock()
+        self._sequence = 0
+        self._segment_index = 0
+        self._segment_start = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._segment_path = None
+        self._segment_bytes = 0
+
+    @property
+    def current_segment(self) -> Optional[str]:
+        """Segmento em gravação (None antes do primeiro lote)."""
+        return self._segment_path
+
+    def _next_id(self, timestamp: str) -> str:
+        with self._id_lock:
+            self._sequence += 1
+            return f"{timestamp}_{os.getpid()}_{self._sequence:05d}"
+
+    def write(self, record: Dict) -> str:
+        """Enfileira um registro (sem I/O no chamador) e retorna seu ID único."""
+        record = dict(record)
+        record.setdefault('timestamp', datetime.now().strftime("%Y%m%d_%H%M%S"))
+        record.setdefault('id', self._next_id(record['timestamp']))
+        self._ensure_thread()
+        self._queue.put(record)
+        return record['id']
+
+    def flush(self):
+        """Bloqueia até que tudo o que foi enfileirado esteja gravado em disco."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Grava o que falta e encerra a thread de fundo."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None:
+                os.makedirs(self.logs_dir, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="llm-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch = []
+        waiters = []
+        deadline = None  # o lote é gravado quando o registro mais antigo completa flush_interval
+        running = True
+        while running:
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # tempo esgotado: grava o lote parcial
+            if item is None:
+                running = False
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not False:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size and time.monotonic() < deadline:
+                    continue
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    # Nenhum erro pode derrubar a thread: flush() e close() ficariam bloqueados
+                    print(f"⚠️ Erro ao gravar logs do LLM: {e}")
+                batch = []
+                deadline = None
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+    def _deduplicate_prompts(self, records: List[Dict]) -> List[Dict]:
+        """Troca o texto do prompt por referências aos componentes (gravados antes do segmento)."""
+        components = {}
+        deduplicated = []
+        for record in records:
+            prompt_text = record.get('prompt_text')
+            if not prompt_text:
+                deduplicated.append(record)
+                continue
+            hashes = []
+            for part in split_prompt_components(prompt_text):
+                digest = component_hash(part)
+                components[digest] = part
+                hashes.append(digest)
+            record = {key: value for key, value in record.items() if key != 'prompt_text'}
+            record.setdefault('prompt_size_chars', len(prompt_text))
+            record['prompt_sha1'] = hashlib.sha1(prompt_text.encode('utf-8')).hexdigest()
+            record['prompt_components'] = hashes
+            deduplicated.append(record)
+        self.index.store_components(components, deduplicated)
+        return deduplicated
+
+    def _write_batch(self, records: List[Dict]):
+        if self.index:
+            records = self._deduplicate_prompts(records)
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+        if self._segment_path is None or self._segment_bytes >= self.max_segment_bytes:
+            self._segment_index += 1
+            self._segment_path = os.path.join(
+                self.logs_dir,
+                f"{SEGMENT_PREFIX}{self._segment_start}_{os.getpid()}_{self._segment_index:03d}"
+                f"{SEGMENT_EXTENSIONS[self.compression]}"
+            )
+            self._segment_bytes = 0
+        if self.compression == 'gzip':
+            data = gzip.compress(payload)
+        elif self.compression == 'zstd':
+            data = zstandard.ZstdCompressor().compress(payload)
+        else:
+            data = payload
+        with open(self._segment_path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._segment_bytes += len(payload)
+        if self.index:
+            self.index.add(records, os.path.basename(self._segment_path))
+
+    def sync_index(self):
+        """Indexa arquivos gravados antes do índice existir (execuções antigas, JSON legado)."""
+        if not self.index:
+            return
+        indexed = self.index.indexed_sources()
+        for path in _log_files(self.logs_dir):
+            name = os.path.basename(path)
+            if name not in indexed:
+                self.index.add(_records_from(path), name)
+
+
+def list_segments(logs_dir: str) -> List[str]:
+    """Segmentos em ordem cronológica."""
+    if not os.path.isdir(logs_dir):
+        return []
+    return sorted(
+        os.path.join(logs_dir, name) for name in os.listdir(logs_dir)
+        if name.startswith(SEGMENT_PREFIX) and '.jsonl' in name
+    )
+
+
+def _log_files(logs_dir: str) -> List[str]:
+    """JSON legados seguidos dos segmentos, em ordem cronológica."""
+    if not os.path.isdir(logs_dir):
+        return []
+    legacy = sorted(
+        os.path.join(logs_dir, name) for name in os.listdir(logs_dir)
+        if name.startswith(LEGACY_PREFIX) and name.endswith('.json')
+    )
+    return legacy + list_segments(logs_dir)
+
+
+def _decompress_gzip_members(data: bytes) -> bytes:
+    """Descomprime membro a membro; um último lote incompleto (queda durante a
+    gravação) é descartado sem perder os anteriores."""
+    chunks = []
+    while data:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            chunk = decompressor.decompress(data)
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        chunks.append(chunk)
+        data = decompressor.unused_data
+    return b"".join(chunks)
+
+
+def _read_segment(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith('.gz'):
+        return _decompress_gzip_members(data)
+    if path.endswith('.zst'):
+        if zstandard is None:
+            print(f"⚠️ {os.path.basename(path)} exige o pacote 'zstandard'")
+            return b""
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True).read()
+    return data
+
+
+def _records_from(path: str) -> Iterator[Dict]:
+    if path.endswith('.json'):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        record.setdefault('id', os.path.basename(path)[:-len('.json')])
+        yield record
+        return
+    for line in _read_segment(path).decode('utf-8', errors='replace').splitlines():
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def iter_records(logs_dir: str) -> Iterator[Dict]:
+    """Registros de todos os segmentos (e dos logs JSON do formato antigo)."""
+    for path in _log_files(logs_dir):
+        yield from _records_from(path)
+
+
+def resolve_prompt(record: Dict, index: LogIndex) -> Dict:
+    """Reconstrói `prompt_text` a partir dos componentes referenciados pelo registro."""
+    hashes = record.get('prompt_components')
+    if hashes is None or 'prompt_text' in record:
+        return record
+    components = index.load_components(hashes)
+    missing = [digest for digest in hashes if digest not in components]
+    if missing:
+        raise ValueError(f"Componentes de prompt ausentes no índice: {', '.join(missing[:3])}")
+    prompt_text = "".join(components[digest] for digest in hashes)
+    if hashlib.sha1(prompt_text.encode('utf-8')).hexdigest() != record.get('prompt_sha1'):
+        raise ValueError(f"Prompt reconstruído não confere com o original ({record.get('id')})")
+    return dict(record, prompt_text=prompt_text)
+
+
+def find_record(logs_dir: str, record_id: str, index: Optional[LogIndex] = None) -> Optional[Dict]:
+    """Registro completo de uma interação; com o índice, lê só o arquivo que a contém
+    e reconstrói o prompt."""
+    source = index.source_of(record_id) if index else None
+    records = _records_from(os.path.join(logs_dir, source)) if source else iter_records(logs_dir)
+    record = next((record for record in records if record.get('id') == record_id), None)
+    if record is not None and index is not None:
+        record = resolve_prompt(record, index)
+    return record
+
+
+def render_markdown(record: Dict) -> str:
+    """Visão legível de uma interação."""
+    timestamp = record.get('timestamp', 'N/A')
+    response_text = record.get('response_text', '')
+    return f"""# Log LLM Interaction - {timestamp}
+
+## 📋 Metadados
+- **ID:** {record.get('id', 'N/A')}
+- **Prompt Key:** {record.get('prompt_key', 'N/A')}
+- **Timestamp:** {timestamp}
+- **Context Size:** {record.get('context_size_chars', 0):,} caracteres
+- **Token Estimate:** {record.get('token_estimate', 0):,} tokens
+- **Response Size:** {record.get('response_size_chars', len(response_text)):,} caracteres
+
+## 📤 PROMPT ENVIADO
+```
+{record.get('prompt_text', '')}
+```
+
+## 📥 RESPOSTA RECEBIDA
+{response_text}
+
+---
+*Log gerado automaticamente pelo sistema de migração*
+"""
+
+
+def render_summary(records: List[Dict]) -> str:
+    """Log consolidado (uma entrada curta por interação)."""
+    entries = []
+    for record in records:
+        entries.append(
+            f"## {record.get('timestamp', 'N/A')} - {record.get('prompt_key', 'N/A')}\n"
+            f"- **ID:** `{record.get('id', 'N/A')}`\n"
+            f"- **Context:** {record.get('context_size_chars', 0):,} chars\n"
+            f"- **Response:** {record.get('response_size_chars', 0):,} chars\n"
+        )
+    return "\n".join(entries)
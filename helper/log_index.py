@@ -0,0 +1,270 @@
+"""
+Índice SQLite das interações com o LLM
+
+Uma linha por interação com as métricas usadas pelos relatórios (prompt, fase, task,
+tamanhos, latência) e o tempo por etapa (spans), gravada pelo escritor de logs
+no mesmo lote do JSONL.
+Relatórios, top-N e consultas por período são respondidos pelo índice, sem abrir os
+segmentos com os prompts e respostas completos.
+
+O mesmo banco guarda os componentes dos prompts (trechos endereçados pelo hash do
+conteúdo, comprimidos), referenciados pelos registros dos segmentos. As referências
+de cada interação ficam registradas para que a limpeza de logs apague os componentes
+que nenhuma interação restante usa.
+"""
+
+import os
+import re
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+INDEX_FILENAME = "log_index.sqlite"
+
+_PHASE_PATTERN = re.compile(r'^P(\d+)')
+_TASK_PATTERN = re.compile(r'Task_(\d+)')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    prompt_key TEXT,
+    phase INTEGER,
+    task INTEGER,
+    context_size_chars INTEGER DEFAULT 0,
+    prompt_size_chars INTEGER DEFAULT 0,
+    token_estimate INTEGER DEFAULT 0,
+    response_size_chars INTEGER DEFAULT 0,
+    latency_ms INTEGER,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_prompt_key ON interactions(prompt_key);
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS interaction_spans (
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    ms REAL NOT NULL,
+    PRIMARY KEY (id, name)
+);
+CREATE TABLE IF NOT EXISTS prompt_components (hash TEXT PRIMARY KEY, content BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS interaction_components (
+    id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (id, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_interaction_components_hash ON interaction_components(hash);
+"""
+
+_COLUMNS = ('id', 'timestamp', 'prompt_key', 'phase', 'task', 'context_size_chars', 'prompt_size_chars',
+            'token_estimate', 'response_size_chars', 'latency_ms', 'source')
+# Colunas aceitas em ordenações (top-N)
+METRIC_COLUMNS = ('context_size_chars', 'prompt_size_chars', 'token_estimate', 'response_size_chars', 'latency_ms')
+
+TimeBound = Union[str, datetime, None]
+
+
+def _timestamp(value: TimeBound) -> Optional[str]:
+    """Mesmo formato dos registros (YYYYMMDD_HHMMSS), que ordena cronologicamente."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y%m%d_%H%M%S")
+    return value
+
+
+def index_row(record: Dict, source: str = "") -> tuple:
+    """Métricas de um registro de interação (sem prompt e resposta)."""
+    prompt_key = record.get('prompt_key') or ""
+    phase = _PHASE_PATTERN.match(prompt_key)
+    task = _TASK_PATTERN.search(prompt_key)
+    return (
+        record.get('id'),
+        record.get('timestamp') or "",
+        prompt_key,
+        int(phase.group(1)) if phase else None,
+        int(task.group(1)) if task else None,
+        record.get('context_size_chars', 0),
+        record.get('prompt_size_chars', len(record.get('prompt_text') or "")),
+        record.get('token_estimate', 0),
+        record.get('response_size_chars', len(record.get('response_text') or "")),
+        record.get('latency_ms'),
+        source
+    )
+
+
+def _component_references(records: Iterable[Dict]) -> List[tuple]:
+    """Pares (id da interação, hash do componente) dos registros deduplicados."""
+    return [(record['id'], digest) for record in records if record.get('id')
+            for digest in record.get('prompt_components') or ()]
+
+
+class LogIndex:
+    """Tabela de interações com consultas agregadas"""
+
+    def __init__(self, logs_dir: str):
+        self.db_path = os.path.join(logs_dir, INDEX_FILENAME)
+        os.makedirs(logs_dir, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Conexões curtas: o escritor (thread de fundo) e os relatórios usam conexões próprias
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, records: Iterable[Dict], source: str = ""):
+        """Indexa um lote de registros numa única transação."""
+        records = [record for record in records if record.get('id')]
+        rows = [index_row(record, source) for record in records]
+        span_rows = [
+            (record['id'], name, timing.get('count', 0), timing.get('ms', 0.0))
+            for record in records for name, timing in (record.get('spans') or {}).items()
+        ]
+        component_rows = _component_references(records)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO interactions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows
+            )
+            conn.executemany("INSERT OR REPLACE INTO interaction_spans (id, name, count, ms) VALUES (?, ?, ?, ?)",
+                             span_rows)
+            conn.executemany("INSERT OR IGNORE INTO interaction_components (id, hash) VALUES (?, ?)",
+                             component_rows)
+            if source:
+                conn.execute("INSERT OR IGNORE INTO sources (path) VALUES (?)", (source,))
+
+    def indexed_sources(self) -> set:
+        with closing(self._connect()) as conn:
+            return {row['path'] for row in conn.execute("SELECT path FROM sources")}
+
+    def _where(self, since: TimeBound, until: TimeBound, prompt_key: Optional[str] = None):
+        clauses, params = [], []
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(_timestamp(since))
+        if until:
+            clauses.append("timestamp <= ?")
+            params.append(_timestamp(until))
+        if prompt_key:
+            clauses.append("prompt_key = ?")
+            params.append(prompt_key)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def summary(self, since: TimeBound = None, until: TimeBound = None) -> Dict:
+        """Totais e distribuição por prompt no período."""
+        where, params = self._where(since, until)
+        with closing(self._connect()) as conn:
+            totals = conn.execute(
+                "SELECT COUNT(*) AS interactions, COALESCE(SUM(token_estimate), 0) AS tokens, "
+                "COALESCE(SUM(context_size_chars), 0) AS context_chars, "
+                "COALESCE(SUM(response_size_chars), 0) AS response_chars, "
+                "AVG(latency_ms) AS avg_latency_ms "
+                f"FROM interactions{where}", params
+            ).fetchone()
+            by_prompt = conn.execute(
+                f"SELECT prompt_key, COUNT(*) AS count FROM interactions{where} GROUP BY prompt_key ORDER BY prompt_key",
+                params
+            ).fetchall()
+        summary = dict(totals)
+        summary['by_prompt'] = {row['prompt_key']: row['count'] for row in by_prompt}
+        return summary
+
+    def top(self, n: int = 10, by: str = 'token_estimate', since: TimeBound = None,
+            until: TimeBound = None) -> List[Dict]:
+        """As `n` interações com o maior valor da métrica `by`."""
+        if by not in METRIC_COLUMNS:
+            raise ValueError(f"Métrica inválida para top-N: {by}")
+        where, params = self._where(since, until)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM interactions{where} ORDER BY {by} DESC LIMIT ?", params + [n]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def phase_breakdown(self, since: TimeBound = None, until: TimeBound = None) -> Dict[Optional[int], Dict]:
+        """Latência média e tempo total por etapa (span), agrupados por fase."""
+        where, params = self._where(since, until)
+        with closing(self._connect()) as conn:
+            phases = conn.execute(
+                f"SELECT phase, COUNT(*) AS interactions, AVG(latency_ms) AS avg_latency_ms "
+                f"FROM interactions{where} GROUP BY phase ORDER BY phase", params
+            ).fetchall()
+            spans = conn.execute(
+                "SELECT i.phase AS phase, s.name AS name, SUM(s.count) AS count, SUM(s.ms) AS ms "
+                f"FROM interaction_spans s JOIN interactions i ON i.id = s.id{where.replace('timestamp', 'i.timestamp')} "
+                "GROUP BY i.phase, s.name ORDER BY i.phase, ms DESC", params
+            ).fetchall()
+        breakdown = {row['phase']: dict(row, spans=[]) for row in phases}
+        for row in spans:
+            breakdown[row['phase']]['spans'].append(dict(row))
+        return breakdown
+
+    def query(self, since: TimeBound = None, until: TimeBound = None, prompt_key: Optional[str] = None,
+              limit: Optional[int] = None, newest_first: bool = False) -> List[Dict]:
+        """Interações (só métricas) por período e/ou prompt."""
+        where, params = self._where(since, until, prompt_key)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT * FROM interactions{where} ORDER BY timestamp {order}, id {order}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def source_of(self, record_id: str) -> Optional[str]:
+        """Arquivo (nome dentro do diretório de logs) onde a interação está gravada."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT source FROM interactions WHERE id = ?", (record_id,)).fetchone()
+        return row['source'] if row and row['source'] else None
+
+    def store_components(self, components: Dict[str, str], records: Iterable[Dict] = ()):
+        """Grava os componentes ainda desconhecidos (cada conteúdo uma única vez).
+
+        As referências de `records` entram na mesma transação, para que uma limpeza
+        concorrente não apague um componente antes de o registro ser indexado.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO prompt_components (hash, content) VALUES (?, ?)",
+                [(digest, zlib.compress(content.encode('utf-8'))) for digest, content in components.items()]
+            )
+            conn.executemany("INSERT OR IGNORE INTO interaction_components (id, hash) VALUES (?, ?)",
+                             _component_references(records))
+
+    def load_components(self, hashes: Iterable[str]) -> Dict[str, str]:
+        hashes = list(set(hashes))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT hash, content FROM prompt_components WHERE hash IN ({', '.join('?' * len(hashes))})", hashes
+            ).fetchall() if hashes else []
+        return {row['hash']: zlib.decompress(row['content']).decode('utf-8') for row in rows}
+
+    def remove_sources(self, paths: Iterable[str]):
+        """Esquece interações de arquivos removidos (limpeza de logs).
+
+        Componentes de prompt usados pelas interações removidas e por nenhuma outra
+        também são apagados.
+        """
+        params = [(path,) for path in paths]
+        if not params:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TEMP TABLE removed_components (hash TEXT PRIMARY KEY)")
+            conn.executemany(
+                "INSERT OR IGNORE INTO removed_components (hash) SELECT hash FROM interaction_components "
+                "WHERE id IN (SELECT id FROM interactions WHERE source = ?)", params
+            )
+            for table in ('interaction_spans', 'interaction_components'):
+                conn.executemany(f"DELETE FROM {table} WHERE id IN (SELECT id FROM interactions WHERE source = ?)",
+                                 params)
+            conn.executemany("DELETE FROM interactions WHERE source = ?", params)
+            conn.executemany("DELETE FROM sources WHERE path = ?", params)
+            conn.execute(
+                "DELETE FROM prompt_components WHERE hash IN (SELECT hash FROM removed_components) "
+                "AND hash NOT IN (SELECT hash FROM interaction_components)"
+            )
+            conn.execute("DROP TABLE removed_components")
@@ -0,0 +1,135 @@
+"""
+Resumos (digests) dos documentos das fases
+
+Quando uma fase grava seu documento, um resumo compacto (títulos de seção, primeiros
+tópicos e a frase inicial de cada seção, com tamanho limitado) é calculado uma única vez
+e salvo ao lado dele como `<documento>.digest.json`. As fases seguintes montam o contexto
+lendo apenas esses resumos, em vez de reler e refiltrar todos os documentos anteriores.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from helper.prompt_filter import get_prompt_filter
+
+# Tamanho máximo de um digest salvo
+DIGEST_MAX_CHARS = 1500
+# Tópicos mantidos por seção
+DIGEST_BULLETS_PER_SECTION = 3
+# Orçamento mínimo por documento ao dividir o contexto entre muitas fases
+DIGEST_MIN_SHARE = 150
+
+_BULLET_PATTERN = re.compile(r'^(?:[-*+]|\d+[.)])\s+')
+_SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s')
+
+
+def summarize_document(content: str, max_chars: int = DIGEST_MAX_CHARS,
+                       bullets_per_section: int = DIGEST_BULLETS_PER_SECTION) -> str:
+    """Gera o resumo de um documento de fase (sem prompts, limitado a `max_chars`)."""
+    filtered = get_prompt_filter().filter_text(content)
+    summary_lines = []
+    bullets = 0
+    has_text = False
+
+    for raw_line in filtered.split('\n'):
+        line = raw_line.strip()
+        if not line or line.startswith('```'):
+            continue
+        if line.startswith('#'):
+            if line.startswith('####'):
+                continue
+            summary_lines.append(line)
+            bullets = 0
+            has_text = False
+        elif _BULLET_PATTERN.match(line):
+            if bullets < bullets_per_section:
+                summary_lines.append(line[:160])
+                bullets += 1
+        elif not has_text and bullets == 0:
+            # Primeira frase do parágrafo de abertura da seção
+            summary_lines.append(_SENTENCE_END_PATTERN.split(line, 1)[0][:200])
+            has_text = True
+
+    return trim_to_lines('\n'.join(summary_lines), max_chars)
+
+
+def trim_to_lines(text: str, limit: int) -> str:
+    """Corta o texto em fronteira de linha para caber em `limit` caracteres."""
+    if len(text) <= limit:
+        return text
+    kept = []
+    size = 0
+    for line in text.split('\n'):
+        if size + len(line) + 1 > limit:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    return '\n'.join(kept) if kept else text[:limit]
+
+
+class PhaseDigestStore:
+    """Gera, salva e lê os digests dos documentos das fases"""
+
+    def __init__(self, max_chars: int = DIGEST_MAX_CHARS):
+        self.max_chars = max_chars
+
+    @staticmethod
+    def digest_path(doc_path: str) -> Path:
+        path = Path(doc_path)
+        return path.with_name(f"{path.stem}.digest.json")
+
+    def update(self, doc_path: str, content: Optional[str] = None) -> str:
+        """Calcula e salva o digest de um documento recém-gravado."""
+        if content is None:
+            with open(doc_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        stat = os.stat(doc_path)
+        digest = summarize_document(content, self.max_chars)
+        data = {
+            'source': os.path.basename(doc_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'digest': digest
+        }
+        digest_file = self.digest_path(doc_path)
+        tmp_file = digest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, digest_file)
+        return digest
+
+    def get(self, doc_path: str) -> str:
+        """Lê o digest; recalcula se ainda não existir ou se o documento mudou."""
+        if not os.path.exists(doc_path):
+            return ""
+        stat = os.stat(doc_path)
+        digest_file = self.digest_path(doc_path)
+        try:
+            with open(digest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('mtime_ns') == stat.st_mtime_ns and data.get('size') == stat.st_size:
+                return data.get('digest', "")
+        except (OSError, json.JSONDecodeError):
+            pass
+        return self.update(doc_path)
+
+    def build_context(self, doc_paths: List[str], total_budget: int) -> str:
+        """Junta os digests dos documentos, dividindo o orçamento igualmente entre eles."""
+        existing = [path for path in doc_paths if os.path.exists(path)]
+        if not existing:
+            return ""
+        share = max(DIGEST_MIN_SHARE, total_budget // len(existing))
+
+        parts = []
+        for doc_path in existing:
+            try:
+                digest = self.get(doc_path)
+            except Exception as e:
+                print(f"Erro ao carregar resumo de {doc_path}: {e}")
+                continue
+            if digest.strip():
+                parts.append(f"## {os.path.basename(doc_path)}\n{trim_to_lines(digest, share)}")
+        return '\n\n'.join(parts)
@@ -0,0 +1,97 @@
+"""
+Checkpoints do pipeline de migração
+
+Cada etapa concluída (prompt de fase, atualização da base de conhecimento, etapa de
+task, tentativa de refinamento) é registrada em `pipeline_state.json` com o hash dos
+artefatos que gerou. Com `--resume`, as etapas já concluídas são puladas e as
+respostas salvas são reaproveitadas, desde que os artefatos ainda existam inalterados.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+
+def file_sha1(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class PipelineState:
+    """Estado persistente das etapas concluídas do pipeline"""
+
+    def __init__(self, output_dir: str, resume: bool = False):
+        self.state_file = os.path.join(output_dir, "pipeline_state.json")
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state.get('steps'), dict):
+                return state
+        except (OSError, json.JSONDecodeError):
+            pass
+        return {'steps': {}, 'values': {}}
+
+    def _save(self):
+        # Escrita atômica e sincronizada: uma queda nunca deixa o arquivo pela metade
+        tmp_file = self.state_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.state_file)
+
+    def reset(self):
+        """Começa um pipeline novo (descarta os checkpoints anteriores)."""
+        with self._lock:
+            self._state = {'steps': {}, 'values': {}}
+            self._save()
+
+    def record(self, step: str, artifacts: Iterable[str] = (), **data):
+        """Registra uma etapa concluída com o hash de cada artefato gerado."""
+        with self._lock:
+            self._state['steps'][step] = {
+                'completed_at': datetime.now().isoformat(),
+                'artifacts': {path: file_sha1(path) for path in artifacts},
+                'data': data
+            }
+            self._save()
+
+    def completed(self, step: str) -> Optional[Dict]:
+        """Em modo resume, retorna o registro da etapa se ela foi concluída e
+        seus artefatos continuam intactos; caso contrário, None."""
+        if not self.resume:
+            return None
+        entry = self._state['steps'].get(step)
+        if entry is None:
+            return None
+        for path, digest in entry.get('artifacts', {}).items():
+            if digest is None or file_sha1(path) != digest:
+                return None
+        return entry
+
+    def resumed_artifact(self, step: str) -> Optional[str]:
+        """Conteúdo do primeiro artefato de uma etapa concluída (a resposta salva do LLM)."""
+        entry = self.completed(step)
+        if not entry or not entry['artifacts']:
+            return None
+        with open(next(iter(entry['artifacts'])), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def get_value(self, key: str, default=None):
+        return self._state['values'].get(key, default)
+
+    def set_value(self, key: str, value):
+        with self._lock:
+            self._state['values'][key] = value
+            self._save()
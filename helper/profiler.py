@@ -0,0 +1,197 @@
+"""
+Perfil de execução do pipeline (`main.py --profile`)
+
+Um amostrador em segundo plano captura, a intervalos fixos, a pilha de todas as
+threads de trabalho (thread principal e workers da Fase 4 em lote) e atribui cada
+amostra à fase ativa (`fase1`..`fase4`, `analyze_project_code`...). É um perfil de
+tempo de parede: esperas (sleep, leitura do WebSocket) também aparecem.
+
+Ao final são gravados em `logs/`:
+- `profile_<ts>.collapsed`: pilhas no formato "collapsed" (uma linha `fase;f1;f2 N`),
+  aceito por flamegraph.pl, speedscope e similares;
+- `profile_<ts>_summary.md`: tempo de parede por fase e as funções com mais tempo
+  próprio e inclusivo em cada fase.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Optional
+
+DEFAULT_INTERVAL = 0.005
+SUMMARY_TOP_FUNCTIONS = 15
+# Threads de apoio que passam quase todo o tempo ociosas
+IGNORED_THREADS = ("llm-log-writer",)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # ';' separa frames e ' ' separa a contagem no formato collapsed
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':').replace(' ', '_')
+
+
+class PipelineProfiler:
+    """Amostrador de pilhas com atribuição por fase; desligado, não tem custo."""
+
+    def __init__(self, logs_dir: str, interval: float = DEFAULT_INTERVAL):
+        self.logs_dir = logs_dir
+        self.interval = interval
+        self.enabled = False
+        self._phases: List[str] = []
+        self._samples: Dict[str, Counter] = defaultdict(Counter)
+        self._wall_time: Dict[str, float] = defaultdict(float)
+        self._ticks: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pipeline-profiler", daemon=True)
+        self._thread.start()
+        print(f"🔬 Perfil de execução ativo (amostragem a cada {self.interval * 1000:.0f} ms)")
+
+    def stop(self):
+        if not self.enabled:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.enabled = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """Atribui as amostras coletadas durante o bloco à fase `name`."""
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            self._phases.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._wall_time[name] += time.perf_counter() - started
+                self._phases.remove(name)
+
+    def profiled(self, name: str):
+        """Decorador: a função inteira conta como a fase `name`."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        labels_by_code = {}
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                current_phase = self._phases[-1] if self._phases else None
+            if current_phase is None:
+                continue
+            ignored = {thread.ident for thread in threading.enumerate() if thread.name in IGNORED_THREADS}
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_ident or thread_id in ignored:
+                    continue
+                labels = []
+                in_project = False
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels_by_code.get(code)
+                    if label is None:
+                        label = labels_by_code[code] = _frame_label(code)
+                    labels.append(label)
+                    in_project = in_project or code.co_filename.startswith(_PROJECT_ROOT)
+                    frame = frame.f_back
+                if in_project:  # workers ociosos do pool não executam código do projeto
+                    stacks.append(";".join([current_phase] + labels[::-1]))
+            with self._lock:
+                self._samples[current_phase].update(stacks)
+                self._ticks[current_phase] += 1
+
+    def _function_times(self, samples: Counter):
+        """Amostras com a função no topo (tempo próprio) e em qualquer ponto da pilha (inclusivo)."""
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in samples.items():
+            frames = stack.split(';')[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        return own, inclusive
+
+    def write_reports(self) -> Optional[Dict[str, str]]:
+        """Grava o arquivo collapsed e o resumo; retorna os caminhos (None se nada foi coletado)."""
+        self.stop()
+        with self._lock:
+            samples = {phase: Counter(counter) for phase, counter in self._samples.items()}
+            wall_time = dict(self._wall_time)
+            ticks = dict(self._ticks)
+        if not samples and not wall_time:
+            return None
+
+        os.makedirs(self.logs_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        collapsed_file = os.path.join(self.logs_dir, f"profile_{timestamp}.collapsed")
+        with open(collapsed_file, 'w', encoding='utf-8') as f:
+            for phase in sorted(samples):
+                for stack, count in sorted(samples[phase].items()):
+                    f.write(f"{stack} {count}\n")
+
+        interval_ms = self.interval * 1000
+        lines = [
+            "# Perfil de Execução do Pipeline",
+            "",
+            f"**Gerado em:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"**Amostragem:** a cada {interval_ms:.0f} ms (tempo de parede, todas as threads de trabalho)",
+            f"**Pilhas (flamegraph):** `{os.path.basename(collapsed_file)}`",
+            "",
+            "## ⏱️ Tempo por Fase",
+            "",
+            "| Fase | Tempo de Parede | Amostras |",
+            "|------|-----------------|----------|",
+        ]
+        for phase in sorted(set(wall_time) | set(samples), key=lambda name: -wall_time.get(name, 0)):
+            lines.append(f"| {phase} | {wall_time.get(phase, 0):.2f}s | {sum(samples.get(phase, {}).values()):,} |")
+
+        for phase in sorted(samples, key=lambda name: -wall_time.get(name, 0)):
+            own, inclusive = self._function_times(samples[phase])
+            total = max(sum(samples[phase].values()), 1)
+            # O intervalo real entre amostras varia (GIL); o tempo de parede da fase calibra a estimativa
+            tick_ms = wall_time.get(phase, 0) * 1000 / max(ticks.get(phase, 0), 1) or interval_ms
+            lines += ["", f"## 🔥 {phase}", "", "### Tempo próprio", "",
+                      "| Função | Tempo Estimado | % |", "|--------|----------------|---|"]
+            lines += [f"| `{label}` | {count * tick_ms:,.0f} ms | {count * 100 / total:.1f}% |"
+                      for label, count in own.most_common(SUMMARY_TOP_FUNCTIONS)]
+            lines += ["", "### Tempo inclusivo", "",
+                      "| Função | Tempo Estimado | % |", "|--------|----------------|---|"]
+            lines += [f"| `{label}` | {count * tick_ms:,.0f} ms | {count * 100 / total:.1f}% |"
+                      for label, count in inclusive.most_common(SUMMARY_TOP_FUNCTIONS)]
+
+        summary_file = os.path.join(self.logs_dir, f"profile_{timestamp}_summary.md")
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+        print(f"🔬 Perfil salvo: {summary_file}")
+        print(f"🔥 Flamegraph: {collapsed_file}")
+        return {'collapsed': collapsed_file, 'summary': summary_file}
@@ -0,0 +1,98 @@
+"""
+Filtro de prompts em documentos das fases
+
+Remove dos documentos gerados as seções de prompt e as linhas de instrução que o LLM
+costuma repetir na resposta. Todos os indicadores são compilados numa única regex de
+alternância e o texto é processado numa só passada (com uma linha de lookahead).
+O resultado por documento fica em cache nos digests das fases (`helper.phase_digest`).
+"""
+
+import re
+from typing import Iterable, Iterator, Optional, Tuple
+
+# Indicadores de início de seção de prompt
+PROMPT_INDICATORS = (
+    'prompt ', '**prompt', 'instruções para', 'desenvolva',
+    'importante:** detalhe', 'organize por sprints',
+    'considere as tecnologias', 'baseado na análise'
+)
+
+# Linhas que claramente são instruções (removidas individualmente)
+INSTRUCTION_PHRASES = (
+    'detalhe a execução', 'organize por sprints', 'deliverables claros',
+    'importante:**', 'instruções:', 'desenvolva planos'
+)
+
+_BLANK_LINES_PATTERN = re.compile(r'\n\s*\n\s*\n')
+
+
+def _compile_alternation(phrases: Iterable[str]):
+    # Frases mais longas primeiro para que prefixos comuns não encurtem o match
+    ordered = sorted(set(phrases), key=len, reverse=True)
+    return re.compile("|".join(re.escape(phrase) for phrase in ordered))
+
+
+class PromptFilter:
+    """Motor de remoção de prompts compartilhado pelo carregamento de contexto e pela limpeza"""
+
+    def __init__(self, prompt_indicators: Iterable[str] = PROMPT_INDICATORS,
+                 instruction_phrases: Iterable[str] = INSTRUCTION_PHRASES):
+        self.prompt_pattern = _compile_alternation(prompt_indicators)
+        self.instruction_pattern = _compile_alternation(instruction_phrases)
+        # Pré-filtro: uma única busca decide se a linha contém algum indicador
+        self.any_pattern = _compile_alternation(tuple(prompt_indicators) + tuple(instruction_phrases))
+
+    def _classify(self, line_lower: str) -> Tuple[bool, bool]:
+        """Retorna (é indicador de prompt, é linha de instrução)."""
+        if not self.any_pattern.search(line_lower):
+            return False, False
+        return bool(self.prompt_pattern.search(line_lower)), bool(self.instruction_pattern.search(line_lower))
+
+    def filter_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Filtra as linhas numa passada, olhando no máximo uma linha à frente."""
+        iterator = iter(lines)
+        current = next(iterator, None)
+        if current is None:
+            return
+        current_flags = self._classify(current.lower().strip())
+        skip_section = False
+
+        while current is not None:
+            following = next(iterator, None)
+            following_flags = self._classify(following.lower().strip()) if following is not None else None
+            is_prompt, is_instruction = current_flags
+
+            if is_prompt:
+                skip_section = True
+            else:
+                emit = True
+                if skip_section:
+                    # Nova seção principal (# título) encerra a seção de prompt
+                    if current.startswith('#') and not current.startswith('###'):
+                        skip_section = False
+                    # Linha em branco seguida de texto que não é prompt também encerra
+                    elif current.strip() == '' and following is not None:
+                        if following.strip() and not following_flags[0]:
+                            skip_section = False
+                    else:
+                        emit = False
+                if emit and not is_instruction and not skip_section:
+                    yield current
+
+            current, current_flags = following, following_flags
+
+    def filter_text(self, content: str) -> str:
+        """Remove prompts de um texto e colapsa linhas vazias consecutivas."""
+        filtered_content = '\n'.join(self.filter_lines(content.split('\n')))
+        return _BLANK_LINES_PATTERN.sub('\n\n', filtered_content)
+
+
+_default_filter: Optional[PromptFilter] = None
+
+
+def get_prompt_filter() -> PromptFilter:
+    """Instância compartilhada do filtro de prompts (regexes compiladas uma vez)"""
+    global _default_filter
+    if _default_filter is None:
+        _default_filter = PromptFilter()
+    return _default_filter
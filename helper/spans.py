@@ -0,0 +1,56 @@
+"""
+Medição de tempo por etapa (spans)
+
+Trechos instrumentados com `span("nome")` (ou funções com `@traced("nome")`) somam
+sua duração num acumulador da thread atual. O log de interações consome esse
+acumulador (`take_spans`) a cada chamada ao LLM, de modo que cada registro leva o
+tempo gasto em cada etapa desde a interação anterior: construção de contexto,
+comandos CDP por método, digitação, espera pela resposta e captura.
+
+Spans aninhados são somados separadamente (o pai inclui o tempo dos filhos).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict
+
+_local = threading.local()
+
+
+def _totals() -> Dict[str, list]:
+    totals = getattr(_local, 'totals', None)
+    if totals is None:
+        totals = _local.totals = {}
+    return totals
+
+
+@contextmanager
+def span(name: str):
+    """Mede o bloco e acumula em `name` (contagem e milissegundos)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = _totals().setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += (time.perf_counter() - started) * 1000
+
+
+def traced(name: str):
+    """Decorador equivalente a envolver a função inteira em `span(name)`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def take_spans() -> Dict[str, Dict]:
+    """Tempos acumulados nesta thread desde a última leitura (`{nome: {'count', 'ms'}}`); zera o acumulador."""
+    totals = _totals()
+    _local.totals = {}
+    return {name: {'count': count, 'ms': round(ms, 1)} for name, (count, ms) in totals.items()}
@@ -0,0 +1,158 @@
+"""
+Execução paralela das tasks da Fase 4
+
+As tasks do backlog (já com sprint e dependências, ver `helper.backlog`) formam um
+grafo de dependências (DAG):
+- as tasks de um sprint dependem das tasks do sprint anterior;
+- linhas `Dependências: Task 3, Modelo de dados` ligam a task às tasks citadas.
+Títulos que só agrupam tasks (`## Sprint 2`, títulos sem descrição) ficam fora do grafo.
+
+Tasks independentes rodam em paralelo, cada uma numa sessão de LLM do pool.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from helper.backlog import is_heading_only
+
+# Status finais de uma task no executor
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+STATUS_BLOCKED = 'blocked'
+
+
+@dataclass
+class TaskNode:
+    """Task do backlog com suas dependências no grafo"""
+    index: int
+    task: Dict
+    sprint: int = 0
+    dependencies: Set[int] = field(default_factory=set)
+
+
+def build_task_graph(tasks: List[Dict]) -> Dict[int, TaskNode]:
+    """Monta o grafo de dependências a partir das tasks de `TaskManager.load_tasks`.
+
+    Os nós mantêm o índice da task na lista completa; agrupadores não viram nós.
+    """
+    indexes = {task['id']: index for index, task in enumerate(tasks)
+               if task.get('id') and not is_heading_only(task)}
+
+    graph: Dict[int, TaskNode] = {}
+    sprint_members: Dict[int, List[int]] = {}
+    for index, task in enumerate(tasks):
+        if is_heading_only(task):
+            continue
+        sprint = task.get('sprint', 0)
+        node = TaskNode(index=index, task=task, sprint=sprint)
+        previous_sprints = [s for s in sprint_members if s < sprint]
+        if previous_sprints:
+            node.dependencies.update(sprint_members[max(previous_sprints)])
+        node.dependencies.update(
+            indexes[dependency] for dependency in task.get('dependencies', ())
+            if indexes.get(dependency, index) < index
+        )
+        sprint_members.setdefault(sprint, []).append(index)
+        graph[index] = node
+    return graph
+
+
+class ParallelTaskExecutor:
+    """Executa o grafo de tasks com um pool de sessões de LLM.
+
+    `run_task(client, index, task)` executa uma task completa (implementação,
+    validação e integração) usando a sessão recebida e retorna True em caso de sucesso.
+    Tasks cujas dependências falharam não são executadas (status `blocked`).
+    """
+
+    def __init__(self, run_task: Callable[[object, int, Dict], bool], clients: List[object]):
+        if not clients:
+            raise ValueError("É necessário pelo menos uma sessão de LLM")
+        self.run_task = run_task
+        self.clients = clients
+        self._lock = threading.Lock()
+
+    def _run_with_client(self, sessions: "queue.Queue", node: TaskNode) -> bool:
+        client = sessions.get()
+        try:
+            return bool(self.run_task(client, node.index, node.task))
+        finally:
+            sessions.put(client)
+
+    def run(self, graph: Dict[int, TaskNode], done: Optional[Set[int]] = None,
+            on_status: Optional[Callable[[int, str], None]] = None) -> Dict[int, str]:
+        """Executa as tasks pendentes do grafo respeitando as dependências.
+
+        Args:
+            graph: grafo de `build_task_graph`.
+            done: índices já concluídos em execuções anteriores (não são reexecutados).
+            on_status: chamado com (índice, status) quando cada task termina.
+
+        Returns:
+            Status final de cada task executada ou bloqueada.
+        """
+        done = set(done or ())
+        results: Dict[int, str] = {}
+        remaining = {
+            index: {dep for dep in node.dependencies if dep not in done}
+            for index, node in graph.items() if index not in done
+        }
+        dependents: Dict[int, List[int]] = {}
+        for index, dependencies in remaining.items():
+            for dependency in dependencies:
+                dependents.setdefault(dependency, []).append(index)
+
+        sessions: "queue.Queue" = queue.Queue()
+        for client in self.clients:
+            sessions.put(client)
+
+        def finish(index: int, status: str):
+            with self._lock:
+                results[index] = status
+            if on_status:
+                on_status(index, status)
+
+        def block_dependents(index: int):
+            pending = list(dependents.get(index, []))
+            while pending:
+                dependent = pending.pop()
+                if dependent in results or dependent not in remaining:
+                    continue
+                remaining.pop(dependent)
+                finish(dependent, STATUS_BLOCKED)
+                pending.extend(dependents.get(dependent, []))
+
+        with ThreadPoolExecutor(max_workers=len(self.clients)) as pool:
+            running = {}
+
+            def submit_ready():
+                ready = [index for index, deps in remaining.items() if not deps]
+                for index in sorted(ready):
+                    remaining.pop(index)
+                    running[pool.submit(self._run_with_client, sessions, graph[index])] = index
+
+            submit_ready()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        print(f"❌ Erro na task {index}: {e}")
+                        success = False
+
+                    if success:
+                        finish(index, STATUS_COMPLETED)
+                        for dependent in dependents.get(index, []):
+                            if dependent in remaining:
+                                remaining[dependent].discard(index)
+                    else:
+                        finish(index, STATUS_FAILED)
+                        block_dependents(index)
+                submit_ready()
+
+        return results
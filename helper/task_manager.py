@@ -1,67 +1,108 @@
 import os
 import json
+import threading
 from helper.context_manager import load_context, save_md
 from helper.code_parser import extract_code_blocks, save_code_to_file
+from helper.backlog import parse_backlog
+
+# Formato do tasks_status.json com status indexado pelo ID estável da task
+STATUS_FORMAT_VERSION = 2
 
 class TaskManager:
     def __init__(self, output_dir):
         self.output_dir = output_dir
         self.backlog_file = os.path.join(output_dir, "migration-backlog.md")
         self.tasks_file = os.path.join(output_dir, "tasks_status.json")
-        
+        # Protege o tasks_status.json quando várias tasks terminam ao mesmo tempo
+        self._status_lock = threading.Lock()
+        # Backlog interpretado, válido enquanto (mtime, tamanho) do arquivo não mudar
+        self._backlog_signature = None
+        self._backlog = []
+        self._status = None
+
+    def load_backlog(self):
+        """Retorna as tasks do backlog (`BacklogTask`), relendo o arquivo só se ele mudou."""
+        try:
+            stat = os.stat(self.backlog_file)
+        except OSError:
+            self._backlog_signature = None
+            self._backlog = []
+            return self._backlog
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._backlog_signature:
+            with open(self.backlog_file, 'r', encoding='utf-8') as f:
+                self._backlog = parse_backlog(f.read())
+            self._backlog_signature = signature
+        return self._backlog
+
     def load_tasks(self):
         """Carrega tasks do backlog."""
-        if not os.path.exists(self.backlog_file):
-            return []
-        
-        with open(self.backlog_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse simples das tasks - você pode melhorar isso
-        tasks = []
-        lines = content.split('\n')
-        current_task = None
-        
-        for line in lines:
-            if line.startswith('## ') or line.startswith('### '):
-                if current_task:
-                    tasks.append(current_task)
-                current_task = {
-                    'title': line.strip('# '),
-                    'description': '',
-                    'status': 'pending'
-                }
-            elif current_task and line.strip():
-                current_task['description'] += line + '\n'
-        
-        if current_task:
-            tasks.append(current_task)
-            
-        return tasks
-    
-    def get_next_task(self):
-        """Retorna a próxima task pendente."""
-        tasks = self.load_tasks()
-        status = self._load_status()
-        
-        for i, task in enumerate(tasks):
-            if status.get(str(i), 'pending') == 'pending':
-                return i, task
-        
+        status = self._get_status()
+        return [task.as_dict(status.get(task.id, 'pending')) for task in self.load_backlog()]
+
+    def get_next_task(self, exclude=()):
+        """Retorna a próxima task pendente (ignorando os IDs em `exclude`)."""
+        status = self._get_status()
+        for task in self.load_backlog():
+            if task.id not in exclude and status.get(task.id, 'pending') == 'pending':
+                return task.index, task.as_dict()
+
         return None, None
-    
-    def mark_task_completed(self, task_index):
+
+    def mark_task_completed(self, task_ref):
         """Marca uma task como completa."""
-        status = self._load_status()
-        status[str(task_index)] = 'completed'
-        self._save_status(status)
-    
+        self.mark_task_status(task_ref, 'completed')
+
+    def mark_task_status(self, task_ref, value):
+        """Atualiza o status de uma task (por índice ou ID; seguro para chamadas concorrentes)."""
+        task_id = self._resolve_id(task_ref)
+        with self._status_lock:
+            status = self._get_status()
+            status[task_id] = value
+            self._save_status(status)
+
+    def is_task_completed(self, task_ref):
+        return self._get_status().get(self._resolve_id(task_ref)) == 'completed'
+
+    def completed_task_indexes(self):
+        """Índices (no backlog atual) das tasks já concluídas."""
+        status = self._get_status()
+        return {task.index for task in self.load_backlog() if status.get(task.id) == 'completed'}
+
+    def _resolve_id(self, task_ref):
+        if isinstance(task_ref, int):
+            return self.load_backlog()[task_ref].id
+        return str(task_ref)
+
+    def _get_status(self):
+        """Status em memória (o arquivo só é lido na primeira consulta)."""
+        if self._status is None:
+            self._status = self._load_status()
+        return self._status
+
     def _load_status(self):
-        if os.path.exists(self.tasks_file):
-            with open(self.tasks_file, 'r') as f:
-                return json.load(f)
-        return {}
-    
+        if not os.path.exists(self.tasks_file):
+            return {}
+        with open(self.tasks_file, 'r') as f:
+            data = json.load(f)
+        if data.get('version') == STATUS_FORMAT_VERSION:
+            return data.get('tasks', {})
+
+        # Formato antigo: chaves são posições na lista; converte para IDs do backlog atual
+        backlog = self.load_backlog()
+        migrated = {
+            backlog[int(index)].id: value
+            for index, value in data.items()
+            if index.isdigit() and int(index) < len(backlog)
+        }
+        if migrated:
+            print(f"🔄 Status de {len(migrated)} tasks convertido para IDs estáveis")
+        return migrated
+
     def _save_status(self, status):
-        with open(self.tasks_file, 'w') as f:
-            json.dump(status, f, indent=2)
+        # Escrita atômica: um leitor nunca vê o arquivo pela metade
+        tmp_file = self.tasks_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump({'version': STATUS_FORMAT_VERSION, 'tasks': status}, f, indent=2)
+        os.replace(tmp_file, self.tasks_file)
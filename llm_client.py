@@ -1,4 +1,5 @@
 import json
+import threading
 from urllib.request import urlopen
 import time
 
@@ -7,21 +8,41 @@ from devtools.dom import get_box_model, enable_dom, find_last_element, find_elem
 from devtools.page import enable_page
 from devtools.input import enable_input, click, insert_text
 from devtools.chat import stream_chat_response
+from helper.spans import span, traced
+
+# Endpoint HTTP do Chrome com --remote-debugging-port (lista as abas)
+DEFAULT_DEBUG_ENDPOINT = 'http://localhost:9222/json'
+
+# Latência da última chamada de cada thread (lida pelo log das interações)
+_last_call = threading.local()
+
+def last_call_latency_ms():
+    """Latência (ms) do último send_prompt desta thread; consome o valor."""
+    latency = getattr(_last_call, 'latency_ms', None)
+    _last_call.latency_ms = None
+    return latency
 
 class LLMClient:
-    def __init__(self, target_url='https://vscode.dev'):
+    # send_prompt aceita on_chunk para receber a resposta em trechos
+    supports_streaming = True
+    
+    def __init__(self, target_url='https://vscode.dev', tab_index=0, debug_endpoint=DEFAULT_DEBUG_ENDPOINT):
         self.target_url = target_url
+        self.debug_endpoint = debug_endpoint
+        # Qual aba correspondente usar (cada aba é uma sessão de chat independente)
+        self.tab_index = tab_index
         self.client = None
         self.send_button_selector = '#workbench\\.panel\\.chat > div > div > div.monaco-scrollable-element > div.split-view-container > div > div > div.pane-body > div.interactive-session > div.interactive-input-part > div.interactive-input-and-side-toolbar > div > div.chat-input-toolbars > div.monaco-toolbar.chat-execute-toolbar > div > ul > li.action-item.monaco-dropdown-with-primary > div.action-container.menu-entry > a'
         self.chat_response_selector = 'div[data-last-element]'
         
     def get_debug_url(self):
         try:
-            with urlopen('http://localhost:9222/json') as response:
+            with urlopen(self.debug_endpoint) as response:
                 tabs = json.load(response)
-                for tab in tabs:
-                    if tab.get('type') == 'page' and tab.get('url', '').startswith(self.target_url):
-                        return tab['webSocketDebuggerUrl']
+                matching = [tab for tab in tabs
+                            if tab.get('type') == 'page' and tab.get('url', '').startswith(self.target_url)]
+                if len(matching) > self.tab_index:
+                    return matching[self.tab_index]['webSocketDebuggerUrl']
         except Exception as e:
             print(f'Erro ao obter URL de depuração: {e}')
         return None
@@ -36,78 +57,90 @@ class LLMClient:
         enable_dom(self.client)
         enable_input(self.client)
         
-    def send_prompt(self, prompt_text):
+    @traced("llm.send_prompt")
+    def send_prompt(self, prompt_text, on_chunk=None):
+        """Envia o prompt e retorna a resposta completa.
+
+        Se `on_chunk` for informado, recebe cada trecho novo da resposta durante a captura.
+        """
         if not self.client:
             raise Exception('Cliente não conectado. Chame connect() primeiro.')
+        started = time.monotonic()
         
-        # Encontrar textarea
-        node_id, frame_id = find_last_element(self.client, 'textarea')
-        if not node_id:
-            raise Exception('Textarea não encontrado.')
+        with span("llm.focus_input"):
+            # Encontrar textarea
+            node_id, frame_id = find_last_element(self.client, 'textarea')
+            if not node_id:
+                raise Exception('Textarea não encontrado.')
         
-        # Clicar e inserir texto
-        box = get_box_model(self.client, node_id)
-        quad = box['content']
-        center_x = int(quad[0] + (quad[2] - quad[0]) / 2)
-        center_y = int(quad[1] + (quad[5] - quad[1]) / 2)
-        click(self.client, center_x, center_y)
-        time.sleep(0.5)
-        insert_text(self.client, prompt_text)
+            # Clicar e inserir texto
+            box = get_box_model(self.client, node_id)
+            quad = box['content']
+            center_x = int(quad[0] + (quad[2] - quad[0]) / 2)
+            center_y = int(quad[1] + (quad[5] - quad[1]) / 2)
+            click(self.client, center_x, center_y)
+            time.sleep(0.5)
 
+        with span("llm.insert_text"):
+            insert_text(self.client, prompt_text)
         
-        # Capturar estado atual do chat
-        expression_count = f"document.querySelectorAll('{self.chat_response_selector}').length"
-        resp = self.client.send('Runtime.evaluate', {
-            'expression': expression_count,
-            'returnByValue': True
-        })
-        prev_count = resp.get('result', {}).get('result', {}).get('value', 0)
-        
-        # Encontrar e clicar no botão de enviar
-        send_button_node_id, _ = find_element_by_selector(self.client, self.send_button_selector)
-        if not send_button_node_id:
-            raise Exception("Botão de enviar não encontrado.")
-        
-        send_button_box = get_box_model(self.client, send_button_node_id)
-        quad = send_button_box['content']
-        center_x = int(quad[0] + (quad[2] - quad[0]) / 2)
-        center_y = int(quad[1] + (quad[5] - quad[1]) / 2)
-        click(self.client, center_x, center_y)
-        
-        # Aguardar nova resposta com timeout
-        max_wait_time = 25  # 5 minutos máximo
-        wait_interval = 5    # Verifica a cada 5 segundos
-        total_waited = 0
-        
-        print("⏳ Aguardando resposta do LLM...")
-        while total_waited < max_wait_time:
-            time.sleep(wait_interval)
-            total_waited += wait_interval
-            
+        with span("llm.click_send"):
+            # Capturar estado atual do chat
+            expression_count = f"document.querySelectorAll('{self.chat_response_selector}').length"
             resp = self.client.send('Runtime.evaluate', {
                 'expression': expression_count,
                 'returnByValue': True
             })
+            prev_count = resp.get('result', {}).get('result', {}).get('value', 0)
+        
+            # Encontrar e clicar no botão de enviar
+            send_button_node_id, _ = find_element_by_selector(self.client, self.send_button_selector)
+            if not send_button_node_id:
+                raise Exception("Botão de enviar não encontrado.")
+        
+            send_button_box = get_box_model(self.client, send_button_node_id)
+            quad = send_button_box['content']
+            center_x = int(quad[0] + (quad[2] - quad[0]) / 2)
+            center_y = int(quad[1] + (quad[5] - quad[1]) / 2)
+            click(self.client, center_x, center_y)
+
+        with span("llm.wait_response"):
+            # Aguardar nova resposta com timeout
+            max_wait_time = 25  # 5 minutos máximo
+            wait_interval = 5    # Verifica a cada 5 segundos
+            total_waited = 0
+        
+            print("⏳ Aguardando resposta do LLM...")
+            while total_waited < max_wait_time:
+                time.sleep(wait_interval)
+                total_waited += wait_interval
             
-            # Corrige o acesso ao valor
-            curr_count = resp.get('result', {}).get('result', {}).get('value', 0)
+                resp = self.client.send('Runtime.evaluate', {
+                    'expression': expression_count,
+                    'returnByValue': True
+                })
             
-            print(f"📊 Aguardando... {total_waited}s (elementos: {curr_count})")
+                # Corrige o acesso ao valor
+                curr_count = resp.get('result', {}).get('result', {}).get('value', 0)
             
-            if curr_count != prev_count:
-                print("✅ Nova resposta detectada!")
-                time.sleep(5)
-                break
-        else:
-            # Timeout atingido
-            print(f"⏰ Timeout de {max_wait_time}s atingido. Tentando capturar resposta atual...")
-            # Continua para tentar capturar o que estiver disponível
+                print(f"📊 Aguardando... {total_waited}s (elementos: {curr_count})")
             
-        
+                if curr_count != prev_count:
+                    print("✅ Nova resposta detectada!")
+                    time.sleep(5)
+                    break
+            else:
+                # Timeout atingido
+                print(f"⏰ Timeout de {max_wait_time}s atingido. Tentando capturar resposta atual...")
+                # Continua para tentar capturar o que estiver disponível
+
         # Capturar resposta
-        return self._capture_response()
+        response = self._capture_response(on_chunk)
+        _last_call.latency_ms = int((time.monotonic() - started) * 1000)
+        return response
     
-    def _capture_response(self):
+    @traced("llm.capture_response")
+    def _capture_response(self, on_chunk=None):
         """Captura a resposta do chat com timeout e melhor tratamento de erros"""
         response_parts = []
         prev_text = ""
@@ -169,8 +202,15 @@ class LLMClient:
                 if current and current != prev_text:
                     diff = current[len(prev_text):]
                     response_parts.append(diff)
+                    # Marca o trecho como consumido antes do callback: uma falha nele não
+                    # pode fazer a próxima leitura acrescentar o mesmo trecho de novo
                     prev_text = current
                     has_update = True
+                    if on_chunk:
+                        try:
+                            on_chunk(diff)
+                        except Exception as e:
+                            print(f"⚠️ Erro ao processar trecho da resposta: {e}")
                     print(f"📝 Resposta parcial capturada ({len(current)} chars)")
                 elif has_update and current:
                     # Se já temos atualizações e o texto não mudou, provavelmente terminou
@@ -4,94 +4,129 @@
 
 import os
 import sys
-import json
-from datetime import datetime
+import atexit
+import argparse
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
 from migration_prompts import PROMPTS
-from helper.context_manager import save_md, load_context, append_to_context
-from llm_client import LLMClient
-from helper.code_parser import extract_code_blocks, save_code_to_file, extract_structured_code_blocks, save_structured_code_block
+from helper.context_manager import save_md, load_context
+from helper.code_parser import extract_code_blocks, save_code_to_file, save_structured_code_block, StructuredCodeBlockParser
+from helper.prompt_filter import get_prompt_filter
+from helper.phase_digest import PhaseDigestStore
 from helper.task_manager import TaskManager
-from code_analyzer import CodeAnalyzer
-from project_structure_manager import ProjectStructureManager
-from migration_config_manager import MigrationConfigManager
-from smart_context_manager import SmartContextManager
+from helper.task_executor import ParallelTaskExecutor, build_task_graph
+from helper.feedback_store import FeedbackStore, FeedbackEntry
+from helper.spans import span, take_spans, traced
+from helper.profiler import PipelineProfiler
+from helper.lazy import LazyObject
 
 OUTPUT_DIR = "migration_docs"
 CODE_DIR = os.path.join(OUTPUT_DIR, "generated_code")
 LOGS_DIR = os.path.join(OUTPUT_DIR, "logs")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(CODE_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
 
 # Variável global para diretório do sistema legado
 LEGACY_DIRECTORY = None
 
-# Inicializa os gerenciadores
-project_manager = ProjectStructureManager(OUTPUT_DIR)
-config_manager = MigrationConfigManager(OUTPUT_DIR)
-smart_context = SmartContextManager(OUTPUT_DIR, max_context_size=8000)
+# Log das interações com o LLM: segmentos JSONL comprimidos, gravados em lote
+LLM_LOG_COMPRESSION = 'gzip'
+
+def ensure_output_dirs():
+    """Cria os diretórios de saída (no primeiro uso, não na importação do módulo)"""
+    for directory in (OUTPUT_DIR, CODE_DIR, LOGS_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+def _create_project_manager():
+    ensure_output_dirs()
+    from project_structure_manager import ProjectStructureManager
+    return ProjectStructureManager(OUTPUT_DIR)
+
+def _create_config_manager():
+    ensure_output_dirs()
+    from migration_config_manager import MigrationConfigManager
+    return MigrationConfigManager(OUTPUT_DIR)
+
+def _create_smart_context():
+    ensure_output_dirs()
+    from smart_context_manager import SmartContextManager
+    return SmartContextManager(OUTPUT_DIR, max_context_size=8000)
+
+def _create_pipeline_state():
+    ensure_output_dirs()
+    from helper.pipeline_state import PipelineState
+    return PipelineState(OUTPUT_DIR)
+
+def _create_llm_log():
+    ensure_output_dirs()
+    from helper.llm_log import LLMLogWriter
+    return LLMLogWriter(LOGS_DIR, compression=LLM_LOG_COMPRESSION)
+
+# Inicializa os gerenciadores. Os que leem ou gravam em disco só são criados no
+# primeiro uso: importar o main (testes, benchmarks, --help) não toca em migration_docs/
+project_manager = LazyObject(_create_project_manager)
+config_manager = LazyObject(_create_config_manager)
+smart_context = LazyObject(_create_smart_context)
+phase_digests = PhaseDigestStore()
+# Checkpoints das etapas concluídas (usados por --resume)
+pipeline_state = LazyObject(_create_pipeline_state)
+llm_log = LazyObject(_create_llm_log)
+
+def close_llm_log():
+    """Descarrega o log do LLM na saída, se ele chegou a ser aberto"""
+    if llm_log.lazy_loaded:
+        llm_log.close()
+
+atexit.register(close_llm_log)
+
+# Perfil de execução por fase (ativado com --profile)
+profiler = PipelineProfiler(LOGS_DIR)
+
+# Orçamento (chars) do resumo das fases anteriores no contexto de cada prompt
+PREVIOUS_RESULTS_BUDGET = 1200
+
+# Sessões de LLM usadas pela Fase 4 em lote
+FASE4_DEFAULT_WORKERS = 3
+
+# Limites do prompt de refinamento (achados da validação e linhas da estrutura)
+REFINEMENT_MAX_FINDINGS = 12
+REFINEMENT_STRUCTURE_LINES = 25
+
+# Orçamento (chars) do feedback de tasks anteriores no prompt de implementação
+FEEDBACK_PROMPT_CHARS = 1500
+
+_feedback_stores = {}
+_feedback_stores_lock = threading.Lock()
 
 def log_llm_interaction(prompt_key, prompt_text, response_text, context_size=0, token_estimate=0):
-    """Registra interações com o LLM para análise e debug"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Cria log estruturado
-    log_entry = {
-        "timestamp": timestamp,
+    """Registra interações com o LLM para análise e debug (gravação em segundo plano)"""
+    from llm_client import last_call_latency_ms
+    log_id = llm_log.write({
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
         "prompt_key": prompt_key,
         "context_size_chars": context_size,
         "token_estimate": token_estimate,
         "prompt_text": prompt_text,
         "response_text": response_text,
-        "response_size_chars": len(response_text)
-    }
-    
-    # Salva log JSON para análise programática
-    json_log_file = os.path.join(LOGS_DIR, f"llm_log_{timestamp}.json")
-    with open(json_log_file, 'w', encoding='utf-8') as f:
-        json.dump(log_entry, f, ensure_ascii=False, indent=2)
+        "response_size_chars": len(response_text),
+        "prompt_size_chars": len(prompt_text),
+        "latency_ms": last_call_latency_ms(),
+        # Tempo por etapa desde a interação anterior desta thread
+        "spans": take_spans()
+    })
     
-    # Salva log markdown para leitura humana
-    md_log_file = os.path.join(LOGS_DIR, f"llm_log_{timestamp}.md")
-    log_content = f"""# Log LLM Interaction - {timestamp}
-
-## 📋 Metadados
-- **Prompt Key:** {prompt_key}
-- **Timestamp:** {timestamp}
-- **Context Size:** {context_size:,} caracteres
-- **Token Estimate:** {token_estimate:,} tokens
-- **Response Size:** {len(response_text):,} caracteres
-
-## 📤 PROMPT ENVIADO
-```
-{prompt_text}
-```
-
-## 📥 RESPOSTA RECEBIDA
-{response_text}
-
----
-*Log gerado automaticamente pelo sistema de migração*
-"""
-    
-    save_md(md_log_file, log_content)
-    
-    # Adiciona entrada ao log consolidado
-    consolidated_log = os.path.join(LOGS_DIR, "consolidated_log.md")
-    summary_entry = f"""
-## {timestamp} - {prompt_key}
-- **Context:** {context_size:,} chars
-- **Response:** {len(response_text):,} chars
-- **Files:** `llm_log_{timestamp}.json`, `llm_log_{timestamp}.md`
-
-"""
-    append_to_context(consolidated_log, summary_entry)
-    
-    print(f"📝 Log salvo: llm_log_{timestamp}.json/.md")
-    return json_log_file, md_log_file
+    print(f"📝 Log registrado: {log_id}")
+    return log_id
 
 def run_prompt_with_llm(llm_client, prompt_key, doc_filename, context_files=None, legacy_directory=None):
     print(f"\n=== {prompt_key} ===")
+    
+    step = f"phase:{prompt_key}"
+    saved_response = pipeline_state.resumed_artifact(step)
+    if saved_response is not None:
+        print(f"⏭️ {prompt_key} já concluído; usando {doc_filename} do checkpoint")
+        return saved_response
+    
+    ensure_output_dirs()
     print("Enviando prompt para o LLM...")
     
     # Constrói contexto completo
@@ -116,8 +151,10 @@ def run_prompt_with_llm(llm_client, prompt_key, doc_filename, context_files=None
     # Registra interação no log
     log_llm_interaction(prompt_key, full_prompt, response, context_size, token_estimate)
     
-    # Salva resposta
-    save_md(os.path.join(OUTPUT_DIR, doc_filename), response)
+    # Salva resposta e calcula uma única vez o resumo usado pelas fases seguintes
+    doc_path = os.path.join(OUTPUT_DIR, doc_filename)
+    save_md(doc_path, response)
+    phase_digests.update(doc_path)
     print(f"Resposta salva em: {doc_filename}")
     
     # Extrai código se houver
@@ -130,8 +167,10 @@ def run_prompt_with_llm(llm_client, prompt_key, doc_filename, context_files=None
             save_code_to_file(block['code'], code_path)
             print(f"Código salvo em: {code_filename}")
     
+    pipeline_state.record(step, [doc_path])
     return response
 
+@traced("context.comprehensive")
 def build_comprehensive_context(context_files=None, legacy_directory=None):
     """Constrói contexto completo incluindo Fase 0, workspace legado e contexto anterior"""
     context_parts = []
@@ -154,17 +193,17 @@ def build_comprehensive_context(context_files=None, legacy_directory=None):
         if legacy_context:
             context_parts.append(f"# SISTEMA LEGADO ANALISADO\n{legacy_context}")
     
-    # 3. CONTEXTO ANTERIOR DAS FASES (apenas resultados principais, muito limitado)
+    # 3. CONTEXTO ANTERIOR DAS FASES (digests pré-calculados, orçamento dividido entre as fases)
     if context_files:
-        previous_results = load_previous_results_only([os.path.join(OUTPUT_DIR, f) for f in context_files])
+        previous_results = phase_digests.build_context(
+            [os.path.join(OUTPUT_DIR, f) for f in context_files], PREVIOUS_RESULTS_BUDGET
+        )
         if previous_results:
-            # Limita drasticamente o contexto anterior já que temos RAG
-            if len(previous_results) > 800:  # Reduz de 1500 para 800 chars
-                previous_results = previous_results[:800] + "\n[...análises anteriores truncadas - use RAG para detalhes]"
-            context_parts.append(f"# ANÁLISES ANTERIORES (RESUMO MÍNIMO)\n{previous_results}")
+            context_parts.append(f"# ANÁLISES ANTERIORES (RESUMO MÍNIMO)\n{previous_results}\n[...use RAG para detalhes]")
     
     return "\n\n".join(context_parts) if context_parts else ""
 
+@traced("context.smart")
 def build_smart_context_for_task(task_description: str, task_type: str = "implementation") -> str:
     """Constrói contexto otimizado tipo RAG para tasks específicas"""
     print(f"🧠 Construindo contexto inteligente para task ({task_type})...")
@@ -180,6 +219,7 @@ def build_smart_context_for_task(task_description: str, task_type: str = "implem
     
     return smart_context_result
 
+@traced("context.legacy_summary")
 def get_compact_legacy_summary(legacy_directory: str) -> str:
     """Obtém resumo super compacto do sistema legado (máximo 1000 chars)"""
     try:
@@ -232,116 +272,23 @@ def get_compact_legacy_summary(legacy_directory: str) -> str:
     except Exception as e:
         return f"Erro ao analisar sistema legado: {str(e)[:100]}"
 
+@traced("context.knowledge_base")
 def update_knowledge_base_after_phase(context_files):
     """Atualiza a base de conhecimento após cada fase"""
+    step = f"kb:{context_files[-1]}" if context_files else "kb"
+    if pipeline_state.completed(step):
+        print("⏭️ Base de conhecimento já atualizada para esta fase")
+        return
+    
     print("📚 Atualizando base de conhecimento...")
     smart_context.update_from_files(context_files)
+    pipeline_state.record(step)
     
     # Mostra estatísticas
     stats = smart_context.get_context_stats()
     print(f"📊 KB Stats: {stats['total_documents']} docs, {stats['total_size']:,} chars")
 
-def load_previous_results_only(file_paths):
-    """Carrega apenas os resultados das fases anteriores, filtrando prompts de forma mais agressiva"""
-    results = []
-    
-    for file_path in file_paths:
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Estratégia mais agressiva para remover prompts
-                lines = content.split('\n')
-                filtered_lines = []
-                skip_section = False
-                
-                for i, line in enumerate(lines):
-                    line_lower = line.lower().strip()
-                    
-                    # Detecta início de seções de prompt (mais abrangente)
-                    prompt_indicators = [
-                        'prompt ', '**prompt', 'instruções para', 'desenvolva',
-                        'importante:** detalhe', 'organize por sprints',
-                        'considere as tecnologias', 'baseado na análise'
-                    ]
-                    
-                    if any(indicator in line_lower for indicator in prompt_indicators):
-                        skip_section = True
-                        continue
-                    
-                    # Detecta fim de seção de prompt
-                    if skip_section:
-                        # Se encontra nova seção principal (# título), para de pular
-                        if line.startswith('#') and not line.startswith('###'):
-                            skip_section = False
-                        # Se linha em branco seguida de texto sem indentação, pode ser fim de prompt
-                        elif line.strip() == '' and i + 1 < len(lines):
-                            next_line = lines[i + 1].strip()
-                            if next_line and not next_line.startswith(' ') and not any(indicator in next_line.lower() for indicator in prompt_indicators):
-                                skip_section = False
-                        else:
-                            continue
-                    
-                    # Remove linhas que claramente são instruções
-                    if any(phrase in line_lower for phrase in [
-                        'detalhe a execução', 'organize por sprints', 'deliverables claros',
-                        'importante:**', 'instruções:', 'desenvolva planos'
-                    ]):
-                        continue
-                    
-                    # Inclui linha se não estiver em seção de prompt
-                    if not skip_section:
-                        filtered_lines.append(line)
-                
-                # Remove linhas vazias consecutivas e limita tamanho
-                filtered_content = '\n'.join(filtered_lines)
-                
-                # Remove múltiplas linhas vazias consecutivas
-                import re
-                filtered_content = re.sub(r'\n\s*\n\s*\n', '\n\n', filtered_content)
-                
-                # Limita drasticamente o tamanho do contexto anterior
-                if len(filtered_content) > 1000:  # Reduz de 2000 para 1000 caracteres
-                    filtered_content = filtered_content[:1000] + "\n[...resumo truncado para otimização]"
-                
-                if filtered_content.strip():
-                    filename = os.path.basename(file_path)
-                    
-                    # Extrai apenas as primeiras seções importantes
-                    important_sections = []
-                    current_section = []
-                    section_title = None
-                    
-                    for line in filtered_content.split('\n'):
-                        if line.startswith('##') and not line.startswith('###'):
-                            # Salva seção anterior se tiver conteúdo relevante
-                            if section_title and current_section:
-                                section_content = '\n'.join(current_section)
-                                if len(section_content.strip()) > 50:  # Só inclui seções com conteúdo substancial
-                                    important_sections.append(f"{section_title}\n{section_content}")
-                            
-                            section_title = line
-                            current_section = []
-                        else:
-                            current_section.append(line)
-                    
-                    # Salva última seção
-                    if section_title and current_section:
-                        section_content = '\n'.join(current_section)
-                        if len(section_content.strip()) > 50:
-                            important_sections.append(f"{section_title}\n{section_content}")
-                    
-                    # Usa apenas as 2 primeiras seções importantes
-                    if important_sections:
-                        final_content = '\n\n'.join(important_sections[:2])
-                        results.append(f"## {filename}\n{final_content}")
-                    
-            except Exception as e:
-                print(f"Erro ao carregar {file_path}: {e}")
-    
-    return '\n\n'.join(results)
-
+@traced("context.legacy_workspace")
 def build_legacy_workspace_context(legacy_directory):
     """Constrói contexto compacto do workspace do sistema legado"""
     context_parts = []
@@ -578,19 +525,30 @@ def get_file_extension(file_path):
     }
     return extension_map.get(ext, 'text')
 
-def fase0(llm_client=None):
-    """Fase 0: Configuração de Migração - Coleta requisitos do usuário"""
+@profiler.profiled("fase0")
+def fase0(llm_client=None, config_file=None):
+    """Fase 0: Configuração de Migração - Coleta requisitos do usuário
+    
+    Com `config_file` (YAML/JSON), a configuração é carregada sem perguntas.
+    """
     print("\n🚀 FASE 0: Configuração de Migração")
     print("Esta fase coleta suas preferências para personalizar todo o processo.")
     
-    choice = input("\nComo deseja fornecer os requisitos?\n[1] Interativo [2] Arquivo YAML/JSON [3] Pular (usar padrão): ").strip()
+    if pipeline_state.completed("fase0"):
+        print("⏭️ Configuração já concluída; mantendo a configuração salva")
+        return config_manager.load_requirements()
+    
+    if config_file:
+        choice = '2'
+    else:
+        choice = input("\nComo deseja fornecer os requisitos?\n[1] Interativo [2] Arquivo YAML/JSON [3] Pular (usar padrão): ").strip()
     
     if choice == '1':
         # Coleta interativa
         requirements = config_manager.collect_user_requirements_interactive()
     elif choice == '2':
         # Carrega de arquivo
-        file_path = input("Caminho do arquivo de configuração: ").strip()
+        file_path = config_file or input("Caminho do arquivo de configuração: ").strip()
         if os.path.exists(file_path):
             requirements = config_manager.load_requirements_from_file(file_path)
         else:
@@ -599,6 +557,7 @@ def fase0(llm_client=None):
     else:
         # Pula configuração
         print("⏭️ Pulando configuração personalizada. Usando padrão.")
+        pipeline_state.record("fase0")
         return None
     
     # Gera contexto inicial e salva
@@ -618,6 +577,7 @@ Este arquivo contém o feedback acumulado de todas as validações e integraçõ
 
 """
     save_md(global_context_file, initial_content)
+    get_feedback_store().reset()
     
     # Atualiza estrutura do projeto baseada nos requisitos
     config_manager.update_project_structure_config(project_manager)
@@ -631,13 +591,19 @@ Este arquivo contém o feedback acumulado de todas as validações e integraçõ
     print(f"📄 Configuração salva em: {summary_file}")
     print(f"🔧 Contexto global inicializado com suas preferências")
     
+    pipeline_state.record("fase0", [summary_file])
     return requirements
 
-def fase1(llm_client):
+@profiler.profiled("fase1")
+def fase1(llm_client, legacy_directory=None):
     print("\n🏗️  FASE 1: Análise do Sistema Legado")
     
     # Solicita diretório do sistema legado se não foi definido
     global LEGACY_DIRECTORY
+    if legacy_directory:
+        LEGACY_DIRECTORY = legacy_directory
+    if not LEGACY_DIRECTORY and pipeline_state.resume:
+        LEGACY_DIRECTORY = pipeline_state.get_value('legacy_directory')
     if not LEGACY_DIRECTORY or not os.path.exists(LEGACY_DIRECTORY):
         LEGACY_DIRECTORY = input("\n📁 Caminho do diretório do sistema legado: ").strip()
         
@@ -645,6 +611,7 @@ def fase1(llm_client):
             print(f"❌ Diretório não encontrado: {LEGACY_DIRECTORY}")
             print("💡 Dica: Use um caminho absoluto para o diretório do código legado")
             return []
+    pipeline_state.set_value('legacy_directory', LEGACY_DIRECTORY)
     
     print(f"✅ Analisando sistema legado em: {LEGACY_DIRECTORY}")
     
@@ -664,6 +631,7 @@ def fase1(llm_client):
     
     return context_files
 
+@profiler.profiled("fase2")
 def fase2(llm_client, context_files):
     print("\n🗺️  FASE 2: Construção do Roadmap")
     
@@ -681,6 +649,7 @@ def fase2(llm_client, context_files):
     
     return context_files
 
+@profiler.profiled("fase3")
 def fase3(llm_client, context_files):
     print("\n📋 FASE 3: Criação de Tasks")
     
@@ -709,6 +678,7 @@ def fase3(llm_client, context_files):
     
     return context_files
 
+@profiler.profiled("fase4")
 def fase4(llm_client, context_files):
     print("\n⚡ FASE 4: Iteração e Implementação")
     
@@ -716,9 +686,10 @@ def fase4(llm_client, context_files):
     initialize_global_context()
     
     task_manager = TaskManager(OUTPUT_DIR)
+    skipped = set()
     
     while True:
-        task_index, task = task_manager.get_next_task()
+        task_index, task = task_manager.get_next_task(exclude=skipped)
         if not task:
             print("✅ Todas as tasks foram concluídas!")
             break
@@ -730,23 +701,205 @@ def fase4(llm_client, context_files):
         
         if choice == '1':
             # Carrega contexto melhorado (incluindo feedback global)
-            enhanced_context = load_enhanced_context(context_files)
+            enhanced_context = load_enhanced_context(context_files, task_index, task)
             implement_task(llm_client, task, enhanced_context, task_index, task_manager)
         elif choice == '2':
-            continue
+            skipped.add(task['id'])
         elif choice == '3':
             break
         else:
             print("Opção inválida")
 
+def connect_llm_sessions(llm_client, workers):
+    """Abre sessões extras (uma aba do chat cada) além da sessão principal.
+    
+    Se alguma aba não estiver disponível, segue com as sessões já conectadas.
+    """
+    from llm_client import LLMClient
+    clients = [llm_client]
+    for tab_index in range(1, workers):
+        extra_client = LLMClient(llm_client.target_url, tab_index, llm_client.debug_endpoint)
+        try:
+            extra_client.connect()
+        except Exception as e:
+            print(f"⚠️ Sessão {tab_index + 1} indisponível ({e}); usando {len(clients)} sessão(ões)")
+            break
+        clients.append(extra_client)
+    return clients
+
+@profiler.profiled("fase4_batch")
+def fase4_batch(llm_client, context_files, workers=FASE4_DEFAULT_WORKERS):
+    """Fase 4 não interativa: executa as tasks independentes em paralelo.
+    
+    O backlog é lido uma única vez e vira um grafo de dependências (sprints e
+    linhas `Dependências:`); cada sessão de LLM executa implementação, validação
+    e integração de uma task por vez.
+    """
+    print("\n⚡ FASE 4 (em lote): Implementação paralela")
+    
+    initialize_global_context()
+    task_manager = TaskManager(OUTPUT_DIR)
+    tasks = task_manager.load_tasks()
+    if not tasks:
+        print("⚠️ Nenhuma task encontrada no backlog.")
+        return {}
+    
+    graph = build_task_graph(tasks)
+    done = task_manager.completed_task_indexes()
+    pending = len(graph) - len(done & set(graph))
+    if not pending:
+        print("✅ Todas as tasks foram concluídas!")
+        return {}
+    
+    # Contexto das fases carregado uma vez; cada task soma só a sua fatia do feedback
+    base_context = load_base_context(context_files)
+    clients = connect_llm_sessions(llm_client, min(workers, pending))
+    print(f"📋 {pending} tasks pendentes | 🔀 {len(clients)} sessão(ões) de LLM")
+    
+    def run_task(client, task_index, task):
+        print(f"\n📝 [{task_index}] {task['title']}")
+        enhanced_context = base_context + feedback_context_section(task_index, task)
+        implement_task(client, task, enhanced_context, task_index, task_manager)
+        return task_manager.is_task_completed(task['id'])
+    
+    def report(task_index, status):
+        icons = {'completed': '✅', 'failed': '❌', 'blocked': '⏸️'}
+        print(f"{icons.get(status, '•')} Task {task_index} ({tasks[task_index]['title']}): {status}")
+    
+    try:
+        results = ParallelTaskExecutor(run_task, clients).run(graph, done=done, on_status=report)
+    finally:
+        for client in clients[1:]:
+            client.close()
+    
+    completed = sum(1 for status in results.values() if status == 'completed')
+    print(f"\n📊 Fase 4 em lote: {completed}/{len(results)} tasks concluídas")
+    return results
+
+def send_prompt_with_code_stream(llm_client, prompt, on_block):
+    """Envia o prompt e repassa cada bloco `ARQUIVO:` ao `on_block` assim que ele é concluído.
+    
+    Retorna a resposta completa e o parser, que também guarda os blocos de código simples.
+    """
+    parser = StructuredCodeBlockParser(on_block=on_block)
+    if getattr(llm_client, 'supports_streaming', False):
+        response = llm_client.send_prompt(prompt, on_chunk=parser.feed)
+    else:
+        response = llm_client.send_prompt(prompt)
+    parser.sync(response)
+    return response, parser
+
+@traced("validation.static")
+def static_validation_report(blocks, saved_files):
+    """Pré-validação local (sintaxe, imports, nome de classe x arquivo).
+    
+    Retorna o texto de rejeição quando há erros mecânicos (a validação pelo LLM
+    pode ser dispensada) ou None quando o código deve seguir para o P4_2.
+    """
+    from helper.code_validator import validate_blocks, validate_files, format_static_report
+    # Sem os blocos (ex.: retomada de checkpoint), valida os arquivos já salvos
+    issues = validate_blocks(blocks) if blocks else validate_files(saved_files)
+    if not issues:
+        return None
+    print(f"🧪 Validação estática encontrou {len(issues)} problema(s); validação pelo LLM dispensada")
+    for issue in issues[:10]:
+        print(f"   • {issue}")
+    return format_static_report(issues)
+
+def task_file_key(file_path):
+    """Nome de um arquivo gerado nos prompts de refinamento (caminho relativo a new_system)."""
+    try:
+        return Path(file_path).relative_to(project_manager.new_system_dir).as_posix()
+    except ValueError:
+        return os.path.basename(file_path)
+
+def build_code_listing(task_files):
+    """Conteúdo atual dos arquivos da task no FORMATO ESTRUTURADO (ARQUIVO: + bloco de código)."""
+    from helper.code_validator import detect_language
+    parts = []
+    for key, file_path in task_files.items():
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                code = f.read()
+        except OSError:
+            continue
+        metadata = project_manager.files_metadata.get(file_path)
+        language = metadata.technology if metadata else detect_language(file_path)
+        parts.append(f"ARQUIVO: {key}\n```{language}\n{code.rstrip()}\n```")
+    return "\n\n".join(parts)
+
+def select_failing_files(task_files, validation):
+    """Arquivos citados na validação; se nenhum for citado, todos os arquivos da task."""
+    failing = {}
+    for key, file_path in task_files.items():
+        name = os.path.basename(key)
+        stem = os.path.splitext(name)[0]
+        if name in validation or (len(stem) > 3 and stem in validation):
+            failing[key] = file_path
+    return failing or dict(task_files)
+
+def relevant_validation_findings(validation, file_keys, max_lines=REFINEMENT_MAX_FINDINGS):
+    """Linhas da validação que apontam problemas ou citam os arquivos com falha."""
+    names = {os.path.splitext(os.path.basename(key))[0] for key in file_keys}
+    findings = []
+    in_problem_section = False
+    for line in validation.split('\n'):
+        line = line.strip()
+        if line.startswith('#'):
+            # Tudo o que está sob um título como "Problemas" / "Erros encontrados" é relevante
+            in_problem_section = any(keyword in line.lower() for keyword in FAILURE_KEYWORDS)
+            continue
+        if not line or line in findings:
+            continue
+        lower = line.lower()
+        if (in_problem_section or any(keyword in lower for keyword in FAILURE_KEYWORDS)
+                or any(name in line for name in names)):
+            findings.append(line)
+        if len(findings) >= max_lines:
+            break
+    return '\n'.join(findings) or extract_failure_reason(validation)
+
+@traced("context.refinement")
+def build_refinement_prompt(attempt, task, task_files, validation):
+    """Prompt de refinamento compacto: só arquivos com falha, achados relevantes e a parte
+    relevante da estrutura. As correções voltam como substituições por arquivo."""
+    failing = select_failing_files(task_files, validation)
+    structure = project_manager.get_structure_overview(
+        focus=f"{task['description']} {' '.join(failing)}", max_lines=REFINEMENT_STRUCTURE_LINES
+    )
+    return f"""REFINAMENTO DE CÓDIGO - Tentativa {attempt}
+
+PROBLEMAS APONTADOS NA VALIDAÇÃO:
+{relevant_validation_findings(validation, failing)}
+
+ARQUIVOS COM FALHA (versão atual):
+{build_code_listing(failing)}
+
+ESTRUTURA RELEVANTE DO PROJETO:
+{structure}
+
+INSTRUÇÕES PARA REFINAMENTO:
+1. Corrija apenas os problemas apontados, mantendo a funcionalidade original
+2. Responda somente com os arquivos que mudaram, cada um no FORMATO ESTRUTURADO com o conteúdo completo do arquivo
+3. Use em ARQUIVO: exatamente o mesmo nome mostrado acima para que a versão anterior seja substituída
+4. Não repita arquivos que não mudaram
+5. Explique brevemente as correções feitas
+"""
+
 def implement_task(llm_client, task, context, task_index, task_manager):
     # P4.1: Implementação com contexto inteligente
-    project_structure = project_manager.get_structure_overview()
+    with span("context.structure_overview"):
+        project_structure = project_manager.get_structure_overview(focus=task['description'])
     
     # *** NOVA IMPLEMENTAÇÃO: Usa contexto inteligente em vez do contexto tradicional ***
     print("🧠 Construindo contexto otimizado para implementação...")
     smart_context_result = build_smart_context_for_task(task['description'], "implementation")
     
+    # Só a fatia relevante do feedback acumulado (mesmo componente e histórico da task)
+    feedback = get_feedback_store().context_for(task_index, task.get('section', ''), max_chars=FEEDBACK_PROMPT_CHARS)
+    if feedback:
+        smart_context_result += f"\n\n# FEEDBACK DE TASKS ANTERIORES\n{feedback}"
+    
     implementation_prompt = PROMPTS["P4_1"].format(
         task_description=task['description'],
         project_structure=project_structure
@@ -769,47 +922,61 @@ def implement_task(llm_client, task, context, task_index, task_manager):
         reduction_pct = ((original_context_size - context_size) / original_context_size) * 100
         print(f"💡 Redução de contexto: {reduction_pct:.1f}% ({original_context_size:,} → {context_size:,} chars)")
     
-    code_response = llm_client.send_prompt(full_prompt)
-    
-    # Registra interação da implementação
-    log_llm_interaction(f"P4_1_Task_{task_index}", full_prompt, code_response, context_size, token_estimate)
-    
-    # Salva código
-    impl_file = f"task_{task_index}_implementation.md"
-    save_md(os.path.join(OUTPUT_DIR, impl_file), code_response)
-    
-    # Tenta extrair blocos estruturados primeiro
-    structured_blocks = extract_structured_code_blocks(code_response)
+    # Salva cada arquivo assim que seu bloco é concluído, enquanto o LLM gera os próximos
     saved_files = []
+    generated_blocks = []
+    step_prefix = f"task:{task.get('id', task_index)}"
+    impl_file = f"task_{task_index}_implementation.md"
     
-    if structured_blocks:
-        print(f"📁 Encontrados {len(structured_blocks)} blocos de código estruturados")
-        for i, block in enumerate(structured_blocks):
-            try:
-                file_path = project_manager.save_generated_file(
-                    code_content=block.code,
-                    code_language=block.language,
-                    task_index=task_index,
-                    task_description=block.description,
-                    component_hint=block.component
-                )
-                saved_files.append(file_path)
-                print(f"📄 {block.filename} → {file_path}")
-            except Exception as e:
-                print(f"❌ Erro ao salvar {block.filename}: {e}")
-    else:
-        # Fallback para extração tradicional
-        print("⚠️ Formato estruturado não encontrado, usando extração tradicional...")
-        code_blocks = extract_code_blocks(code_response)
-        for i, block in enumerate(code_blocks):
+    def save_block(block):
+        try:
             file_path = project_manager.save_generated_file(
-                code_content=block['code'],
-                code_language=block['language'],
+                code_content=block.code,
+                code_language=block.language,
                 task_index=task_index,
-                task_description=task['description'],
-                component_hint=""
+                task_description=block.description,
+                component_hint=block.component
             )
             saved_files.append(file_path)
+            generated_blocks.append(block)
+            print(f"📄 {block.filename} → {file_path}")
+        except Exception as e:
+            print(f"❌ Erro ao salvar {block.filename}: {e}")
+    
+    checkpoint = pipeline_state.completed(f"{step_prefix}:implementation")
+    if checkpoint:
+        print("⏭️ Implementação já concluída; usando a resposta do checkpoint")
+        code_response = pipeline_state.resumed_artifact(f"{step_prefix}:implementation")
+        saved_files = checkpoint['data'].get('files', [])
+    else:
+        # Metadados dos arquivos são persistidos uma única vez ao final do lote
+        with project_manager.batch_save():
+            code_response, code_parser = send_prompt_with_code_stream(llm_client, full_prompt, save_block)
+        
+        # Registra interação da implementação
+        log_llm_interaction(f"P4_1_Task_{task_index}", full_prompt, code_response, context_size, token_estimate)
+        
+        # Salva código
+        save_md(os.path.join(OUTPUT_DIR, impl_file), code_response)
+        
+        if code_parser.blocks:
+            print(f"📁 Encontrados {len(code_parser.blocks)} blocos de código estruturados")
+        else:
+            # Fallback para extração tradicional (blocos coletados na mesma passada)
+            print("⚠️ Formato estruturado não encontrado, usando extração tradicional...")
+            saved_files.extend(project_manager.save_generated_files([
+                {
+                    'code_content': block['code'],
+                    'code_language': block['language'],
+                    'task_index': task_index,
+                    'task_description': task['description'],
+                    'component_hint': ""
+                }
+                for block in code_parser.code_blocks
+            ]))
+        
+        pipeline_state.record(f"{step_prefix}:implementation", [os.path.join(OUTPUT_DIR, impl_file)],
+                              files=saved_files)
     
     if saved_files:
         print(f"✅ Arquivos gerados e organizados: {len(saved_files)}")
@@ -821,29 +988,40 @@ def implement_task(llm_client, task, context, task_index, task_manager):
         summary_file = os.path.join(OUTPUT_DIR, "project_summary.md")
         save_md(summary_file, summary)
         
-        # P4.2: Validação (otimizada)
-        print("🔍 Validando com contexto otimizado...")
-        
-        # Constrói contexto específico para validação (mais compacto)
-        validation_context = build_smart_context_for_task(task['description'], "validation")
-        
-        # Combina o prompt de validação com contexto otimizado
-        base_validation_prompt = PROMPTS["P4_2"].format(code_to_validate=code_response)
-        validation_prompt_with_context = f"CONTEXTO PARA VALIDAÇÃO:\n{validation_context[:2000]}\n\n{base_validation_prompt}"
-        
-        validation = llm_client.send_prompt(validation_prompt_with_context)
-        
-        # Registra interação da validação
-        log_llm_interaction(f"P4_2_Task_{task_index}", validation_prompt_with_context, validation, 
-                          len(validation_context[:2000]), len(validation_prompt_with_context) // 4)
-        
-        validation_file = f"task_{task_index}_validation.md"
-        save_md(os.path.join(OUTPUT_DIR, validation_file), validation)
+        validation = pipeline_state.resumed_artifact(f"{step_prefix}:validation")
+        if validation is not None:
+            print("⏭️ Validação já concluída; usando o resultado do checkpoint")
+        else:
+            # Erros mecânicos vão direto para o refinamento, sem ida ao LLM
+            validation = static_validation_report(generated_blocks, saved_files)
+            
+            if validation is None:
+                # P4.2: Validação (otimizada)
+                print("🔍 Validando com contexto otimizado...")
+                
+                # Constrói contexto específico para validação (mais compacto)
+                validation_context = build_smart_context_for_task(task['description'], "validation")
+                
+                # Combina o prompt de validação com contexto otimizado
+                base_validation_prompt = PROMPTS["P4_2"].format(code_to_validate=code_response)
+                validation_prompt_with_context = f"CONTEXTO PARA VALIDAÇÃO:\n{validation_context[:2000]}\n\n{base_validation_prompt}"
+                
+                validation = llm_client.send_prompt(validation_prompt_with_context)
+                
+                # Registra interação da validação
+                log_llm_interaction(f"P4_2_Task_{task_index}", validation_prompt_with_context, validation, 
+                                  len(validation_context[:2000]), len(validation_prompt_with_context) // 4)
+            
+            validation_file = f"task_{task_index}_validation.md"
+            save_md(os.path.join(OUTPUT_DIR, validation_file), validation)
+            
+            # P4_2 -.-> Context3: Atualiza contexto global com o resultado da validação
+            update_global_context_with_validation(task_index, task['title'], validation,
+                                                  is_approved="✅ APROVADO" in validation,
+                                                  component=task.get('section', ''))
+            pipeline_state.record(f"{step_prefix}:validation", [os.path.join(OUTPUT_DIR, validation_file)])
         
         if "✅ APROVADO" in validation:
-            # ✅ P4_2 -.-> Context3: Atualiza contexto global com validação bem-sucedida
-            update_global_context_with_validation(task_index, task['title'], validation, is_approved=True)
-            
             # P4.3: Integração (otimizada)
             print("🔗 Planejando integração com contexto otimizado...")
             
@@ -864,69 +1042,40 @@ def implement_task(llm_client, task, context, task_index, task_manager):
             save_md(os.path.join(OUTPUT_DIR, integration_file), integration)
             
             # ✅ P4_3 -.-> Context3: Atualiza contexto global com plano de integração
-            update_global_context_with_integration(task_index, task['title'], integration, success=True)
+            update_global_context_with_integration(task_index, task['title'], integration, success=True, component=task.get('section', ''))
             
-            task_manager.mark_task_completed(task_index)
+            task_manager.mark_task_completed(task.get('id', task_index))
             print("✅ Task concluída com sucesso!")
         else:
-            # ❌ P4_2 -.-> Context3: Atualiza contexto global com validação rejeitada
-            update_global_context_with_validation(task_index, task['title'], validation, is_approved=False)
-            
             print("❌ Código rejeitado na validação.")
             print("🔄 Iniciando ciclo de refinamento...")
             
-            # Ciclo de refinamento (mantém a lógica existente)
+            # Ciclo de refinamento: só os arquivos com falha vão ao LLM e as correções
+            # substituem os arquivos no lugar
             max_attempts = 3
             attempt = 1
+            task_files = {task_file_key(file_path): file_path for file_path in saved_files}
             
             while attempt <= max_attempts:
                 print(f"\n🔨 Tentativa de refinamento {attempt}/{max_attempts}")
                 
-                # Extrai motivo da falha da validação
-                failure_reason = extract_failure_reason(validation)
-                
-                # Prompt de refinamento
-                refinement_prompt = f"""
-REFINAMENTO DE CÓDIGO - Tentativa {attempt}
-
-CÓDIGO ORIGINAL QUE FALHOU:
-{code_response}
-
-MOTIVO DA FALHA NA VALIDAÇÃO:
-{failure_reason}
-
-VALIDAÇÃO COMPLETA:
-{validation}
-
-ESTRUTURA DO PROJETO:
-{project_structure}
-
-INSTRUÇÕES PARA REFINAMENTO:
-1. Analise cuidadosamente o motivo da falha
-2. Corrija os problemas identificados
-3. Mantenha a funcionalidade original intacta
-4. Melhore a qualidade do código conforme sugerido
-5. Use o FORMATO ESTRUTURADO para a resposta
-6. Forneça uma explicação das correções feitas
-
-Por favor, gere uma versão corrigida do código que atenda aos critérios de validação.
-"""
+                refinement_prompt = build_refinement_prompt(attempt, task, task_files, validation)
+                refinement_step = f"{step_prefix}:refinement:{attempt}"
+                changed_files = []
                 
-                print("🔨 Refinando código...")
-                refined_response = llm_client.send_prompt(refinement_prompt)
-                
-                # Registra interação do refinamento
-                log_llm_interaction(f"P4_1_Refinement_{attempt}_Task_{task_index}", refinement_prompt, refined_response, 0, len(refinement_prompt) // 4)
-                
-                # Salva a tentativa de refinamento
-                refinement_file = f"task_{task_index}_refinement_{attempt}.md"
-                save_md(os.path.join(OUTPUT_DIR, refinement_file), refined_response)
-                
-                # Processa código refinado
-                refined_structured_blocks = extract_structured_code_blocks(refined_response)
-                if refined_structured_blocks:
-                    for block in refined_structured_blocks:
-                        try:
+                def apply_refined_block(block):
+                    try:
+                        key = block.filename.strip()
+                        key = key[2:] if key.startswith('./') else key
+                        if key not in task_files:
+                            # Aceita só o nome do arquivo quando ele identifica um único arquivo da task
+                            matches = [k for k in task_files if os.path.basename(k) == os.path.basename(key)]
+                            key = matches[0] if len(matches) == 1 else key
+                        if key in task_files:
+                            file_path = project_manager.replace_generated_file(
+                                task_files[key], block.code, description=f"REFINEMENT_{attempt}_{block.description}"
+                            )
+                        else:
                             file_path = project_manager.save_generated_file(
                                 code_content=block.code,
                                 code_language=block.language,
@@ -934,35 +1083,75 @@ Por favor, gere uma versão corrigida do código que atenda aos critérios de va
                                 task_description=f"REFINEMENT_{attempt}_{block.description}",
                                 component_hint=block.component
                             )
-                            print(f"🔄 Refinado: {block.filename} → {file_path}")
-                        except Exception as e:
-                            print(f"❌ Erro ao salvar refinamento: {e}")
-                    
-                    # Valida código refinado (otimizado)
-                    print("🔍 Validando código refinado com contexto otimizado...")
-                    
-                    # Usa contexto otimizado para validação do refinamento
-                    refined_validation_context = build_smart_context_for_task(task['description'], "validation")
-                    base_refined_validation_prompt = PROMPTS["P4_2"].format(code_to_validate=refined_response)
-                    refined_validation_prompt = f"CONTEXTO PARA VALIDAÇÃO:\n{refined_validation_context[:1500]}\n\n{base_refined_validation_prompt}"
-                    
-                    refined_validation = llm_client.send_prompt(refined_validation_prompt)
+                            task_files[task_file_key(file_path)] = file_path
+                        changed_files.append(file_path)
+                        print(f"🔄 Refinado: {block.filename} → {file_path}")
+                    except Exception as e:
+                        print(f"❌ Erro ao salvar refinamento: {e}")
+                
+                checkpoint = pipeline_state.completed(refinement_step)
+                if checkpoint:
+                    print(f"⏭️ Refinamento {attempt} já concluído; usando a resposta do checkpoint")
+                    changed_files = checkpoint['data'].get('changed', [])
+                    task_files = checkpoint['data'].get('files', task_files)
+                else:
+                    print(f"🔨 Refinando código ({len(refinement_prompt):,} chars)...")
+                    with project_manager.batch_save():
+                        refined_response, _ = send_prompt_with_code_stream(llm_client, refinement_prompt, apply_refined_block)
                     
-                    # Registra interação da validação refinada
-                    log_llm_interaction(f"P4_2_Refinement_{attempt}_Task_{task_index}", refined_validation_prompt, 
-                                      refined_validation, len(refined_validation_context[:1500]), len(refined_validation_prompt) // 4)
+                    # Registra interação do refinamento
+                    log_llm_interaction(f"P4_1_Refinement_{attempt}_Task_{task_index}", refinement_prompt, refined_response, 0, len(refinement_prompt) // 4)
                     
-                    refined_validation_file = f"task_{task_index}_validation_refined_{attempt}.md"
-                    save_md(os.path.join(OUTPUT_DIR, refined_validation_file), refined_validation)
+                    # Salva a tentativa de refinamento
+                    refinement_file = f"task_{task_index}_refinement_{attempt}.md"
+                    save_md(os.path.join(OUTPUT_DIR, refinement_file), refined_response)
+                    pipeline_state.record(refinement_step, [os.path.join(OUTPUT_DIR, refinement_file)],
+                                          changed=changed_files, files=task_files)
+                
+                # Versão atual completa dos arquivos da task (após as substituições)
+                refined_response = build_code_listing(task_files)
+                
+                # Processa código refinado (arquivos já substituídos durante a captura)
+                if changed_files:
+                    refined_validation = pipeline_state.resumed_artifact(f"{refinement_step}:validation")
+                    if refined_validation is not None:
+                        print(f"⏭️ Validação do refinamento {attempt} já concluída; usando o checkpoint")
+                    else:
+                        refined_validation = static_validation_report(None, list(task_files.values()))
+                        
+                        if refined_validation is None:
+                            # Valida código refinado (otimizado)
+                            print("🔍 Validando código refinado com contexto otimizado...")
+                            
+                            # Usa contexto otimizado para validação do refinamento
+                            refined_validation_context = build_smart_context_for_task(task['description'], "validation")
+                            base_refined_validation_prompt = PROMPTS["P4_2"].format(code_to_validate=refined_response)
+                            refined_validation_prompt = f"CONTEXTO PARA VALIDAÇÃO:\n{refined_validation_context[:1500]}\n\n{base_refined_validation_prompt}"
+                            
+                            refined_validation = llm_client.send_prompt(refined_validation_prompt)
+                            
+                            # Registra interação da validação refinada
+                            log_llm_interaction(f"P4_2_Refinement_{attempt}_Task_{task_index}", refined_validation_prompt, 
+                                              refined_validation, len(refined_validation_context[:1500]), len(refined_validation_prompt) // 4)
+                        
+                        refined_validation_file = f"task_{task_index}_validation_refined_{attempt}.md"
+                        save_md(os.path.join(OUTPUT_DIR, refined_validation_file), refined_validation)
+                        
+                        if "✅ APROVADO" in refined_validation:
+                            # ✅ P4_2 -.-> Context3: Atualiza contexto com validação refinada bem-sucedida
+                            refinement_context = f"Código aprovado após {attempt} tentativa(s) de refinamento"
+                            update_global_context_with_validation(task_index, task['title'], f"{refinement_context}\n\n{refined_validation}", is_approved=True, component=task.get('section', ''))
+                        elif attempt == max_attempts:
+                            # ❌ P4_2 -.-> Context3: Atualiza contexto com validação refinada rejeitada
+                            failed_refinement_context = f"Código rejeitado após {max_attempts} tentativas de refinamento"
+                            update_global_context_with_validation(task_index, task['title'], f"{failed_refinement_context}\n\n{refined_validation}", is_approved=False, component=task.get('section', ''))
+                        pipeline_state.record(f"{refinement_step}:validation",
+                                              [os.path.join(OUTPUT_DIR, refined_validation_file)])
                     
                     if "✅ APROVADO" in refined_validation:
                         # Código aprovado após refinamento
                         print(f"✅ Código aprovado na tentativa {attempt}!")
                         
-                        # ✅ P4_2 -.-> Context3: Atualiza contexto com validação refinada bem-sucedida
-                        refinement_context = f"Código aprovado após {attempt} tentativa(s) de refinamento"
-                        update_global_context_with_validation(task_index, task['title'], f"{refinement_context}\n\n{refined_validation}", is_approved=True)
-                        
                         # P4.3: Integração (otimizada pós-refinamento)
                         print("🔗 Planejando integração pós-refinamento com contexto otimizado...")
                         
@@ -982,20 +1171,15 @@ Por favor, gere uma versão corrigida do código que atenda aos critérios de va
                         
                         # ✅ P4_3 -.-> Context3: Atualiza contexto global com integração pós-refinamento
                         refinement_integration_context = f"Integração planejada após {attempt} refinamento(s)"
-                        update_global_context_with_integration(task_index, task['title'], f"{refinement_integration_context}\n\n{integration}", success=True)
+                        update_global_context_with_integration(task_index, task['title'], f"{refinement_integration_context}\n\n{integration}", success=True, component=task.get('section', ''))
                         
-                        task_manager.mark_task_completed(task_index)
+                        task_manager.mark_task_completed(task.get('id', task_index))
                         print("✅ Task concluída com sucesso após refinamento!")
                         return
                     else:
                         print(f"❌ Código ainda rejeitado na tentativa {attempt}")
-                        # ❌ P4_2 -.-> Context3: Atualiza contexto com validação refinada rejeitada
-                        if attempt == max_attempts:
-                            failed_refinement_context = f"Código rejeitado após {max_attempts} tentativas de refinamento"
-                            update_global_context_with_validation(task_index, task['title'], f"{failed_refinement_context}\n\n{refined_validation}", is_approved=False)
                         
                         validation = refined_validation  # Usa a nova validação para a próxima iteração
-                        code_response = refined_response  # Usa o código refinado para a próxima iteração
                         attempt += 1
                 else:
                     print(f"⚠️ Nenhum código estruturado gerado na tentativa {attempt}")
@@ -1005,8 +1189,10 @@ Por favor, gere uma versão corrigida do código que atenda aos critérios de va
             print("📝 Verifique os arquivos de validação para entender os problemas.")
             
             # ❌ P4_2 -.-> Context3: Atualiza contexto global com falha completa
-            failure_context = f"Task falhou após {max_attempts} tentativas de refinamento. Necessária análise manual."
-            update_global_context_with_validation(task_index, task['title'], failure_context, is_approved=False)
+            if not pipeline_state.completed(f"{step_prefix}:failed"):
+                failure_context = f"Task falhou após {max_attempts} tentativas de refinamento. Necessária análise manual."
+                update_global_context_with_validation(task_index, task['title'], failure_context, is_approved=False, component=task.get('section', ''))
+                pipeline_state.record(f"{step_prefix}:failed")
     else:
         print("⚠️ Nenhum código foi gerado.")
 
@@ -1030,7 +1216,14 @@ Este arquivo contém o feedback acumulado de todas as validações e integraçõ
         save_md(global_context_file, initial_content)
         print(f"🔧 Contexto global inicializado em: global_context.md")
 
-def update_global_context_with_validation(task_index, task_title, validation_result, is_approved):
+def get_feedback_store():
+    """Armazenamento de feedback do diretório de saída atual"""
+    with _feedback_stores_lock:
+        if OUTPUT_DIR not in _feedback_stores:
+            _feedback_stores[OUTPUT_DIR] = FeedbackStore(OUTPUT_DIR)
+        return _feedback_stores[OUTPUT_DIR]
+
+def update_global_context_with_validation(task_index, task_title, validation_result, is_approved, component=""):
     """Atualiza o contexto global com resultados de validação (P4_2 -.-> Context3)"""
     timestamp = __import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
@@ -1060,12 +1253,14 @@ def update_global_context_with_validation(task_index, task_title, validation_res
     
     context_update += "\n---\n"
     
-    # Salva no arquivo de contexto global
-    global_context_file = os.path.join(OUTPUT_DIR, "global_context.md")
-    append_to_context(global_context_file, context_update)
+    # Salva no armazenamento limitado (reescreve o global_context.md)
+    get_feedback_store().record(FeedbackEntry(
+        'validation', task_index, task_title, component, is_approved, context_update,
+        reasons=[] if is_approved else failure_reasons(validation_result)
+    ))
     print(f"📝 Contexto global atualizado com feedback de validação")
 
-def update_global_context_with_integration(task_index, task_title, integration_plan, success=True):
+def update_global_context_with_integration(task_index, task_title, integration_plan, success=True, component=""):
     """Atualiza o contexto global com resultados de integração (P4_3 -.-> Context3)"""
     timestamp = __import__('datetime').datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
@@ -1096,13 +1291,13 @@ def update_global_context_with_integration(task_index, task_title, integration_p
     
     context_update += "\n---\n"
     
-    # Salva no arquivo de contexto global
-    global_context_file = os.path.join(OUTPUT_DIR, "global_context.md")
-    append_to_context(global_context_file, context_update)
+    # Salva no armazenamento limitado (reescreve o global_context.md)
+    get_feedback_store().record(FeedbackEntry('integration', task_index, task_title, component, success, context_update))
     print(f"📝 Contexto global atualizado com feedback de integração")
 
-def load_enhanced_context(context_files):
-    """Carrega contexto incluindo feedback global acumulado e configuração do usuário"""
+@traced("context.base")
+def load_base_context(context_files):
+    """Carrega o contexto das fases e a configuração do usuário"""
     # Carrega contexto original das fases
     base_context = load_context([os.path.join(OUTPUT_DIR, f) for f in context_files])
     
@@ -1112,38 +1307,56 @@ def load_enhanced_context(context_files):
         migration_context = config_manager.generate_migration_context()
         base_context = f"{migration_context}\n\n{base_context}"
     
-    # Adiciona contexto global se existir
-    global_context_file = os.path.join(OUTPUT_DIR, "global_context.md")
-    if os.path.exists(global_context_file):
-        global_context = load_context([global_context_file])
-        return f"{base_context}\n\n## CONTEXTO GLOBAL ACUMULADO\n{global_context}"
-    
     return base_context
 
-def extract_failure_reason(validation_text):
-    """Extrai o motivo principal da falha da validação."""
-    lines = validation_text.split('\n')
+@traced("context.feedback")
+def feedback_context_section(task_index=None, task=None):
+    """Fatia limitada do feedback acumulado (da task, se informada)"""
+    component = task.get('section', '') if task else ''
+    feedback = get_feedback_store().context_for(task_index, component)
+    return f"\n\n## CONTEXTO GLOBAL ACUMULADO\n{feedback}" if feedback else ""
+
+def load_enhanced_context(context_files, task_index=None, task=None):
+    """Carrega contexto incluindo configuração do usuário e o feedback relevante à task"""
+    return load_base_context(context_files) + feedback_context_section(task_index, task)
+
+# Palavras que indicam um problema apontado na validação
+FAILURE_KEYWORDS = ('erro', 'problema', 'falha', 'incorreto', 'inválido', 'rejeitado')
+
+def failure_reasons(validation_text, limit=5):
+    """Linhas da validação que apontam problemas (no máximo `limit`)."""
     reasons = []
-    
-    for line in lines:
+    for line in validation_text.split('\n'):
         line = line.strip()
-        if any(keyword in line.lower() for keyword in ['erro', 'problema', 'falha', 'incorreto', 'inválido', 'rejeitado']):
+        if any(keyword in line.lower() for keyword in FAILURE_KEYWORDS):
             reasons.append(line)
+    return reasons[:limit]
+
+def extract_failure_reason(validation_text):
+    """Extrai o motivo principal da falha da validação."""
+    reasons = failure_reasons(validation_text)
     
     if reasons:
-        return '\n'.join(reasons[:5])  # Retorna no máximo 5 motivos principais
+        return '\n'.join(reasons)  # Retorna no máximo 5 motivos principais
     else:
         return "Motivo da falha não claramente identificado na validação."
 
-def analyze_project_code(llm_client):
+@profiler.profiled("analyze_project_code")
+def analyze_project_code(llm_client, project_dir=None, use_batches=None):
+    """Analisa o código de um projeto existente arquivo a arquivo (ou em lotes).
+    
+    Sem `project_dir`/`use_batches`, pergunta ao usuário. Retorna True se a análise terminou.
+    """
     print("\n🔍 ANÁLISE DE CÓDIGO DO PROJETO")
     
-    project_dir = input("Digite o caminho do projeto para analisar: ").strip()
+    if project_dir is None:
+        project_dir = input("Digite o caminho do projeto para analisar: ").strip()
     if not os.path.exists(project_dir):
         print("❌ Diretório não encontrado.")
-        return
+        return False
     
     try:
+        from code_analyzer import CodeAnalyzer
         analyzer = CodeAnalyzer(project_dir, OUTPUT_DIR)
         
         # Descobre arquivos
@@ -1152,19 +1365,28 @@ def analyze_project_code(llm_client):
         
         if not files:
             print("⚠️ Nenhum arquivo de código encontrado no projeto.")
-            return
+            return False
         
         # Analisa dependências
         analyzer.analyze_dependencies(files)
         print(f"📊 Ordem de análise determinada: {len(analyzer.analysis_order)} arquivos")
         
-        # Analisa cada arquivo na ordem correta
-        for i, file_path in enumerate(analyzer.analysis_order, 1):
-            print(f"\n[{i}/{len(analyzer.analysis_order)}] Analisando...")
+        # Agrupa arquivos pequenos (DTOs, enums, interfaces) em lotes por pacote
+        if use_batches is None:
+            use_batches = input("Agrupar arquivos pequenos em lotes? [S/n]: ").strip().lower() not in ['n', 'nao', 'não', 'no']
+        if use_batches:
+            batches = analyzer.plan_analysis_batches()
+            print(f"📦 {len(analyzer.analysis_order)} arquivos agrupados em {len(batches)} requisições")
+        else:
+            batches = [[file_path] for file_path in analyzer.analysis_order]
+        
+        # Analisa cada lote na ordem correta
+        for i, batch in enumerate(batches, 1):
+            print(f"\n[{i}/{len(batches)}] Analisando {len(batch)} arquivo(s)...")
             try:
-                analyzer.analyze_file_with_llm(llm_client, file_path)
+                analyzer.analyze_batch_with_llm(llm_client, batch)
             except Exception as e:
-                print(f"❌ Erro ao analisar {file_path}: {e}")
+                print(f"❌ Erro ao analisar {', '.join(str(p) for p in batch)}: {e}")
                 continue
         
         # Salva knowledge base
@@ -1173,6 +1395,7 @@ def analyze_project_code(llm_client):
         
         print("\n✅ Análise de código concluída!")
         print(f"📄 Verifique os arquivos em {OUTPUT_DIR}/")
+        return True
         
     except ImportError as e:
         print(f"❌ Erro ao importar analisadores: {e}")
@@ -1182,53 +1405,36 @@ def analyze_project_code(llm_client):
         print("- analyzers/python_analyzer.py")
     except Exception as e:
         print(f"❌ Erro durante análise: {e}")
+    return False
 
-def generate_logs_report():
-    """Gera relatório de análise dos logs de interação com LLM"""
+@profiler.profiled("generate_logs_report")
+def generate_logs_report(since=None, until=None):
+    """Gera relatório de análise dos logs de interação com LLM (a partir do índice)
+    
+    `since`/`until` (datetime ou YYYYMMDD_HHMMSS) limitam o período analisado.
+    """
     print("\n📊 ANÁLISE DOS LOGS LLM")
+    llm_log.flush()
+    llm_log.sync_index()
+    log_index = llm_log.index
     
-    if not os.path.exists(LOGS_DIR):
+    stats = log_index.summary(since, until)
+    total_interactions = stats['interactions']
+    if not total_interactions:
         print("❌ Nenhum log encontrado.")
         return
     
-    # Lista arquivos de log JSON
-    log_files = [f for f in os.listdir(LOGS_DIR) if f.startswith('llm_log_') and f.endswith('.json')]
-    
-    if not log_files:
-        print("❌ Nenhum log JSON encontrado.")
-        return
-    
-    print(f"📂 Analisando {len(log_files)} logs...")
-    
-    # Coleta estatísticas
-    total_interactions = 0
-    total_tokens = 0
-    total_context_chars = 0
-    total_response_chars = 0
-    prompt_types = {}
-    
-    logs_data = []
+    total_tokens = stats['tokens']
+    total_context_chars = stats['context_chars']
+    total_response_chars = stats['response_chars']
+    prompt_types = stats['by_prompt']
+    # Últimas 20 interações para a timeline
+    logs_data = list(reversed(log_index.query(since, until, limit=20, newest_first=True)))
     
-    for log_file in sorted(log_files):
-        log_path = os.path.join(LOGS_DIR, log_file)
-        try:
-            with open(log_path, 'r', encoding='utf-8') as f:
-                log_data = json.load(f)
-                logs_data.append(log_data)
-                
-                total_interactions += 1
-                total_tokens += log_data.get('token_estimate', 0)
-                total_context_chars += log_data.get('context_size_chars', 0)
-                total_response_chars += log_data.get('response_size_chars', 0)
-                
-                prompt_key = log_data.get('prompt_key', 'unknown')
-                prompt_types[prompt_key] = prompt_types.get(prompt_key, 0) + 1
-                
-        except Exception as e:
-            print(f"⚠️ Erro ao ler {log_file}: {e}")
+    print(f"📂 {total_interactions} interações analisadas")
     
     # Gera relatório
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     report_content = f"""# Relatório de Análise dos Logs LLM
 
 **Gerado em:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
@@ -1258,15 +1464,46 @@ def generate_logs_report():
 |-----------|------------|---------|--------|----------|
 """
     
-    for log_data in logs_data[-20:]:  # Últimas 20 interações
-        timestamp = log_data.get('timestamp', 'N/A')
-        prompt_key = log_data.get('prompt_key', 'N/A')
-        context_size = log_data.get('context_size_chars', 0)
-        tokens = log_data.get('token_estimate', 0)
-        response_size = log_data.get('response_size_chars', 0)
+    for log_data in logs_data:
+        timestamp = log_data['timestamp'] or 'N/A'
+        prompt_key = log_data['prompt_key'] or 'N/A'
+        context_size = log_data['context_size_chars'] or 0
+        tokens = log_data['token_estimate'] or 0
+        response_size = log_data['response_size_chars'] or 0
         
         report_content += f"| {timestamp} | {prompt_key} | {context_size:,} | {tokens:,} | {response_size:,} |\n"
     
+    report_content += """
+
+## 💰 Interações Mais Caras (tokens)
+
+| ID | Prompt Type | Tokens | Latência |
+|----|------------|--------|----------|
+"""
+    for log_data in log_index.top(5, 'token_estimate', since, until):
+        latency = f"{log_data['latency_ms'] / 1000:.1f}s" if log_data['latency_ms'] is not None else "N/A"
+        report_content += f"| {log_data['id']} | {log_data['prompt_key']} | {log_data['token_estimate'] or 0:,} | {latency} |\n"
+    
+    report_content += """
+
+## ⏱️ Latência por Fase
+"""
+    for phase, data in log_index.phase_breakdown(since, until).items():
+        phase_name = f"Fase {phase}" if phase is not None else "Outros"
+        avg_latency = f"{data['avg_latency_ms'] / 1000:.1f}s" if data['avg_latency_ms'] is not None else "N/A"
+        report_content += f"""
+### {phase_name} ({data['interactions']} interações, latência média {avg_latency})
+"""
+        if not data['spans']:
+            continue
+        report_content += """
+| Etapa | Chamadas | Total | Média por Interação |
+|-------|----------|-------|---------------------|
+"""
+        for timing in data['spans']:
+            report_content += (f"| {timing['name']} | {timing['count']:,} | {timing['ms']:,.0f} ms | "
+                               f"{timing['ms'] / data['interactions']:,.0f} ms |\n")
+    
     report_content += f"""
 
 ## 🔍 Análise de Eficiência
@@ -1274,6 +1511,7 @@ def generate_logs_report():
 ### Contexto vs Resposta
 - **Ratio Contexto/Resposta:** {(total_context_chars / max(total_response_chars, 1)):.2f}
 - **Eficiência de Token:** {(total_response_chars / max(total_tokens, 1)):.2f} chars/token
+- **Latência Média:** {f"{stats['avg_latency_ms'] / 1000:.1f}s" if stats['avg_latency_ms'] is not None else "N/A"}
 
 ### Recomendações
 """
@@ -1289,7 +1527,7 @@ def generate_logs_report():
         report_content += "- ✅ Uso de tokens eficiente\n"
     
     # Salva relatório
-    report_file = os.path.join(LOGS_DIR, f"logs_analysis_report_{timestamp}.md")
+    report_file = os.path.join(LOGS_DIR, f"logs_analysis_report_{report_timestamp}.md")
     save_md(report_file, report_content)
     
     print("✅ Relatório de análise gerado!")
@@ -1300,42 +1538,31 @@ def generate_logs_report():
     return report_file
 
 def cleanup_old_logs(keep_days=30):
-    """Remove logs mais antigos que X dias para economizar espaço"""
+    """Remove segmentos de log mais antigos que X dias para economizar espaço"""
     if not os.path.exists(LOGS_DIR):
         return
     
-    from datetime import datetime, timedelta
-    cutoff_date = datetime.now() - timedelta(days=keep_days)
-    
-    removed_count = 0
-    total_count = 0
+    from helper.llm_log import LEGACY_PREFIX, list_segments
+    llm_log.flush()
+    cutoff = (datetime.now() - timedelta(days=keep_days)).timestamp()
+    legacy_files = [os.path.join(LOGS_DIR, f) for f in os.listdir(LOGS_DIR) if f.startswith(LEGACY_PREFIX)]
+    log_files = list_segments(LOGS_DIR) + legacy_files
     
-    for filename in os.listdir(LOGS_DIR):
-        if filename.startswith('llm_log_') and ('.' in filename):
-            total_count += 1
-            try:
-                # Extrai timestamp do nome do arquivo
-                timestamp_str = filename.split('_')[2].split('.')[0]  # YYYYMMDD_HHMMSS
-                file_date = datetime.strptime(timestamp_str, '%H%M%S')
-                
-                # Para comparação, usa apenas a data atual como base
-                file_date = file_date.replace(year=datetime.now().year, 
-                                             month=datetime.now().month, 
-                                             day=datetime.now().day)
-                
-                if file_date < cutoff_date:
-                    file_path = os.path.join(LOGS_DIR, filename)
-                    os.remove(file_path)
-                    removed_count += 1
-                    
-            except (ValueError, IndexError):
-                # Ignora arquivos com formato de nome inválido
-                continue
+    removed = []
+    for file_path in log_files:
+        try:
+            if os.path.getmtime(file_path) < cutoff and file_path != llm_log.current_segment:
+                os.remove(file_path)
+                removed.append(os.path.basename(file_path))
+        except OSError:
+            continue
+    llm_log.index.remove_sources(removed)
+    removed_count = len(removed)
     
     if removed_count > 0:
-        print(f"🧹 Limpeza de logs: {removed_count}/{total_count} arquivos removidos")
+        print(f"🧹 Limpeza de logs: {removed_count}/{len(log_files)} arquivos removidos")
     else:
-        print(f"✅ Logs atualizados: {total_count} arquivos mantidos")
+        print(f"✅ Logs atualizados: {len(log_files)} arquivos mantidos")
 
 def show_logs_menu():
     """Menu específico para gerenciamento de logs"""
@@ -1345,6 +1572,7 @@ def show_logs_menu():
         print("[2] Listar logs disponíveis")
         print("[3] Limpar logs antigos (>30 dias)")
         print("[4] Ver log consolidado")
+        print("[5] Exportar interação em Markdown")
         print("[0] Voltar ao menu principal")
         
         choice = input("Opção: ").strip()
@@ -1357,6 +1585,8 @@ def show_logs_menu():
             cleanup_old_logs()
         elif choice == '4':
             show_consolidated_log()
+        elif choice == '5':
+            export_log_markdown(input("ID da interação: ").strip())
         elif choice == '0':
             break
         else:
@@ -1364,51 +1594,55 @@ def show_logs_menu():
 
 def list_available_logs():
     """Lista todos os logs disponíveis com informações básicas"""
-    if not os.path.exists(LOGS_DIR):
-        print("❌ Nenhum log encontrado.")
-        return
+    llm_log.flush()
+    llm_log.sync_index()
+    rows = llm_log.index.query(newest_first=True)  # Mais recentes primeiro
     
-    log_files = [f for f in os.listdir(LOGS_DIR) if f.startswith('llm_log_') and f.endswith('.json')]
-    
-    if not log_files:
-        print("❌ Nenhum log JSON encontrado.")
+    if not rows:
+        print("❌ Nenhum log encontrado.")
         return
     
-    print(f"\n📂 {len(log_files)} logs disponíveis:")
-    print("=" * 80)
-    print(f"{'Timestamp':<20} {'Prompt Key':<25} {'Tokens':<10} {'Context':<10}")
-    print("=" * 80)
+    print(f"\n📂 {len(rows)} logs disponíveis:")
+    print("=" * 90)
+    print(f"{'ID':<30} {'Prompt Key':<25} {'Tokens':<10} {'Context':<10}")
+    print("=" * 90)
     
-    for log_file in sorted(log_files, reverse=True):  # Mais recentes primeiro
-        log_path = os.path.join(LOGS_DIR, log_file)
-        try:
-            with open(log_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                timestamp = data.get('timestamp', 'N/A')
-                prompt_key = data.get('prompt_key', 'N/A')[:24]  # Trunca se muito longo
-                tokens = data.get('token_estimate', 0)
-                context = data.get('context_size_chars', 0)
-                
-                print(f"{timestamp:<20} {prompt_key:<25} {tokens:<10} {context:<10}")
-                
-        except Exception as e:
-            print(f"⚠️ Erro ao ler {log_file}: {e}")
+    for data in rows:
+        prompt_key = (data['prompt_key'] or 'N/A')[:24]  # Trunca se muito longo
+        print(f"{data['id']:<30} {prompt_key:<25} {data['token_estimate'] or 0:<10} {data['context_size_chars'] or 0:<10}")
 
 def show_consolidated_log():
-    """Mostra o log consolidado"""
-    consolidated_file = os.path.join(LOGS_DIR, "consolidated_log.md")
-    if os.path.exists(consolidated_file):
+    """Mostra o resumo das últimas interações"""
+    from helper.llm_log import render_summary
+    llm_log.flush()
+    llm_log.sync_index()
+    recent = llm_log.index.query(limit=5, newest_first=True)
+    if recent:
         print("\n📋 LOG CONSOLIDADO:")
         print("=" * 60)
-        with open(consolidated_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Mostra apenas as últimas 20 linhas para não sobrecarregar
-            lines = content.split('\n')
-            for line in lines[-20:]:
-                print(line)
+        print(render_summary(list(reversed(recent))))
     else:
-        print("❌ Log consolidado não encontrado.")
+        print("❌ Nenhum log encontrado.")
 
+def export_log_markdown(log_id):
+    """Gera a visão em Markdown de uma interação (sob demanda)"""
+    from helper.llm_log import find_record, render_markdown
+    llm_log.flush()
+    try:
+        record = find_record(LOGS_DIR, log_id, llm_log.index)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return None
+    if record is None:
+        print(f"❌ Interação não encontrada: {log_id}")
+        return None
+    
+    md_log_file = os.path.join(LOGS_DIR, f"{log_id}.md")
+    save_md(md_log_file, render_markdown(record))
+    print(f"📄 Arquivo: {md_log_file}")
+    return md_log_file
+
+@profiler.profiled("clean_existing_files_from_prompts")
 def clean_existing_files_from_prompts():
     """Remove prompts dos arquivos já existentes para limpeza retroativa"""
     print("\n🧹 LIMPEZA DE PROMPTS EM ARQUIVOS EXISTENTES")
@@ -1433,50 +1667,8 @@ def clean_existing_files_from_prompts():
             
             original_size = len(content)
             
-            # Aplica a mesma lógica de limpeza da função load_previous_results_only
-            lines = content.split('\n')
-            filtered_lines = []
-            skip_section = False
-            
-            for i, line in enumerate(lines):
-                line_lower = line.lower().strip()
-                
-                # Detecta seções de prompt
-                prompt_indicators = [
-                    'prompt ', '**prompt', 'instruções para', 'desenvolva',
-                    'importante:** detalhe', 'organize por sprints',
-                    'considere as tecnologias', 'baseado na análise'
-                ]
-                
-                if any(indicator in line_lower for indicator in prompt_indicators):
-                    skip_section = True
-                    continue
-                
-                # Detecta fim de seção de prompt
-                if skip_section:
-                    if line.startswith('#') and not line.startswith('###'):
-                        skip_section = False
-                    elif line.strip() == '' and i + 1 < len(lines):
-                        next_line = lines[i + 1].strip()
-                        if next_line and not next_line.startswith(' ') and not any(indicator in next_line.lower() for indicator in prompt_indicators):
-                            skip_section = False
-                    else:
-                        continue
-                
-                # Remove linhas que são claramente instruções
-                if any(phrase in line_lower for phrase in [
-                    'detalhe a execução', 'organize por sprints', 'deliverables claros',
-                    'importante:**', 'instruções:', 'desenvolva planos'
-                ]):
-                    continue
-                
-                if not skip_section:
-                    filtered_lines.append(line)
-            
-            # Remove múltiplas linhas vazias
-            import re
-            filtered_content = '\n'.join(filtered_lines)
-            filtered_content = re.sub(r'\n\s*\n\s*\n', '\n\n', filtered_content)
+            # Aplica o mesmo motor de limpeza usado pelos digests das fases
+            filtered_content = get_prompt_filter().filter_text(content)
             
             new_size = len(filtered_content)
             
@@ -1506,20 +1698,233 @@ def clean_existing_files_from_prompts():
     else:
         print("\n✅ Nenhum arquivo precisou de limpeza")
 
-def main():
+def run_full_pipeline(llm_client):
+    """Executa as fases 0 a 4 em sequência"""
+    fase0()  # Sempre começa com Fase 0
+    context_files = fase1(llm_client)
+    context_files = fase2(llm_client, context_files)
+    context_files = fase3(llm_client, context_files)
+    fase4(llm_client, context_files)
+
+def existing_context_files():
+    """Documentos .md já gerados em OUTPUT_DIR (contexto das fases seguintes)"""
+    return [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.md')]
+
+def run_steps(llm_client, steps, config_file=None, legacy_directory=None, workers=FASE4_DEFAULT_WORKERS):
+    """Executa etapas do pipeline sem interação (subcomandos e jobs), na ordem dada.
+    
+    Etapas seguidas reaproveitam os documentos umas das outras; uma etapa isolada usa
+    os documentos já gerados em OUTPUT_DIR. Retorna o código de saída (0 = sucesso).
+    """
+    context_files = None
+    for step in steps:
+        if step == 'fase0':
+            if fase0(config_file=config_file) is None and config_file:
+                return 1
+        elif step == 'fase1':
+            # Sem terminal: o diretório vem do argumento ou do checkpoint, nunca de input()
+            if not legacy_directory and pipeline_state.resume:
+                legacy_directory = pipeline_state.get_value('legacy_directory')
+            if not legacy_directory or not os.path.isdir(legacy_directory):
+                print(f"❌ Diretório do sistema legado não encontrado: {legacy_directory or '(não informado)'}")
+                print("💡 Dica: informe --legacy-dir (ou legacy_directory no job)")
+                return 1
+            context_files = fase1(llm_client, legacy_directory)
+            if not context_files:
+                return 1
+        elif step in ('fase2', 'fase3'):
+            phase = fase2 if step == 'fase2' else fase3
+            context_files = phase(llm_client, context_files if context_files is not None else existing_context_files())
+        elif step == 'implement':
+            results = fase4_batch(llm_client, context_files if context_files is not None else existing_context_files(), workers)
+            if any(status != 'completed' for status in results.values()):
+                return 1
+        elif step == 'analyze':
+            if not analyze_project_code(llm_client, legacy_directory or LEGACY_DIRECTORY, use_batches=True):
+                return 1
+    return 0
+
+def run_command(llm_client, args, spec=None):
+    """Executa um subcomando que usa o LLM; retorna o código de saída"""
+    if args.command == 'job':
+        print(f"📋 Job {spec.name}: {', '.join(spec.steps)}")
+        return run_steps(llm_client, spec.steps, spec.config_file, spec.legacy_directory, spec.workers)
+    if args.command == 'phase':
+        return run_steps(llm_client, [f"fase{args.number}"], args.config, args.legacy_dir)
+    if args.command == 'implement':
+        if not args.all:
+            fase4(llm_client, existing_context_files())
+            return 0
+        return run_steps(llm_client, ['implement'], workers=args.workers)
+    if args.command == 'analyze':
+        return 0 if analyze_project_code(llm_client, args.project_dir, use_batches=not args.no_batches) else 1
+    print(f"❌ Comando desconhecido: {args.command}")
+    return 2
+
+def run_logs_command(args):
+    """Subcomando `logs` (não precisa de conexão com o LLM)"""
+    if args.action == 'report':
+        generate_logs_report(args.since, args.until)
+    elif args.action == 'list':
+        list_available_logs()
+    elif args.action == 'cleanup':
+        cleanup_old_logs(args.days)
+    elif args.action == 'show':
+        show_consolidated_log()
+    elif args.action == 'export':
+        return 0 if export_log_markdown(args.log_id) else 1
+    return 0
+
+def run_jobs(specs, parallel, extra_args=()):
+    """Executa vários jobs, cada um em um processo próprio, até `parallel` ao mesmo tempo.
+    
+    A saída de cada job vai para `<output_dir>/job.log`. Retorna 1 se algum job falhou.
+    """
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def run(spec):
+        os.makedirs(spec.output_dir, exist_ok=True)
+        log_file = os.path.join(spec.output_dir, "job.log")
+        print(f"▶️ {spec.name}: saída em {log_file}")
+        command = [sys.executable, os.path.abspath(__file__), *extra_args, 'job', spec.path]
+        with open(log_file, 'w', encoding='utf-8') as log:
+            # Sem terminal: um input() esquecido encerra o job em vez de travá-lo
+            process = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+        print(f"{'✅' if process.returncode == 0 else '❌'} {spec.name} (código {process.returncode})")
+        return process.returncode
+    
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        exit_codes = list(executor.map(run, specs))
+    print(f"\n📊 Jobs: {exit_codes.count(0)}/{len(exit_codes)} concluídos")
+    return 0 if all(code == 0 for code in exit_codes) else 1
+
+def set_output_dir(output_dir):
+    """Troca o diretório dos artefatos; deve ser chamado antes do primeiro uso dos gerenciadores.
+    
+    Cada migração simultânea na mesma máquina usa o seu próprio diretório.
+    """
+    global OUTPUT_DIR, CODE_DIR, LOGS_DIR
+    OUTPUT_DIR = output_dir
+    CODE_DIR = os.path.join(OUTPUT_DIR, "generated_code")
+    LOGS_DIR = os.path.join(OUTPUT_DIR, "logs")
+    profiler.logs_dir = LOGS_DIR
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migrador de sistemas legados",
+                                     epilog="Sem subcomando, abre o menu interativo.")
+    parser.add_argument('--resume', action='store_true',
+                        help="retoma o pipeline completo, pulando as etapas já concluídas")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"gera perfil de execução por fase (flamegraph e resumo em {LOGS_DIR}/)")
+    parser.add_argument('--output-dir', help=f"diretório dos artefatos (padrão: {OUTPUT_DIR})")
+    parser.add_argument('--debug-endpoint', help="endpoint /json do Chrome com o chat (padrão: http://localhost:9222/json)")
+    subparsers = parser.add_subparsers(dest='command', metavar='comando')
+    
+    phase = subparsers.add_parser('phase', help="executa uma fase (0 a 3) sem interação")
+    phase.add_argument('number', type=int, choices=range(4), help="número da fase")
+    phase.add_argument('--config', help="arquivo YAML/JSON da migração (obrigatório na fase 0)")
+    phase.add_argument('--legacy-dir', help="diretório do sistema legado (obrigatório na fase 1, exceto com --resume de uma execução que já o registrou)")
+    
+    implement = subparsers.add_parser('implement', help="Fase 4: implementa as tasks do backlog")
+    implement.add_argument('--all', action='store_true',
+                           help="implementa todas as tasks pendentes, em paralelo e sem perguntas")
+    implement.add_argument('--workers', type=int, default=FASE4_DEFAULT_WORKERS,
+                           help=f"sessões de chat usadas com --all (padrão: {FASE4_DEFAULT_WORKERS})")
+    
+    analyze = subparsers.add_parser('analyze', help="analisa o código de um projeto existente")
+    analyze.add_argument('project_dir', help="diretório do projeto")
+    analyze.add_argument('--no-batches', action='store_true', help="uma requisição por arquivo (sem lotes)")
+    
+    logs = subparsers.add_parser('logs', help="relatórios e manutenção dos logs do LLM")
+    logs_actions = logs.add_subparsers(dest='action', required=True, metavar='ação')
+    report = logs_actions.add_parser('report', help="gera o relatório de análise dos logs")
+    report.add_argument('--since', help="início do período (YYYYMMDD_HHMMSS)")
+    report.add_argument('--until', help="fim do período (YYYYMMDD_HHMMSS)")
+    logs_actions.add_parser('list', help="lista as interações registradas")
+    cleanup = logs_actions.add_parser('cleanup', help="remove segmentos de log antigos")
+    cleanup.add_argument('--days', type=int, default=30, help="idade mínima dos segmentos removidos")
+    logs_actions.add_parser('show', help="mostra as últimas interações")
+    export = logs_actions.add_parser('export', help="exporta uma interação em Markdown")
+    export.add_argument('log_id', help="ID da interação")
+    
+    job = subparsers.add_parser('job', help="executa jobs descritos em YAML (ver job_spec_example.yaml)")
+    job.add_argument('specs', nargs='+', help="arquivos de job")
+    job.add_argument('--parallel', type=int, default=1,
+                     help="jobs executados ao mesmo tempo, cada um em um processo (padrão: 1)")
+    
+    args = parser.parse_args(argv)
+    if args.command == 'phase' and args.number == 0 and not args.config:
+        parser.error("a fase 0 sem interação precisa de --config")
+    if args.command == 'phase' and args.number == 1 and not (args.legacy_dir or args.resume):
+        parser.error("a fase 1 sem interação precisa de --legacy-dir")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    spec = None
+    if args.command == 'job':
+        from helper.job_spec import find_conflicts, load_job_spec
+        try:
+            specs = [load_job_spec(path) for path in args.specs]
+        except (OSError, ValueError) as e:
+            print(f"❌ Job inválido: {e}")
+            return 1
+        conflicts = find_conflicts(specs, args.parallel)
+        if conflicts:
+            for conflict in conflicts:
+                print(f"❌ {conflict}")
+            return 1
+        if len(specs) > 1:
+            extra_args = [flag for flag, enabled in (('--resume', args.resume), ('--profile', args.profile)) if enabled]
+            return run_jobs(specs, args.parallel, extra_args)
+        spec = specs[0]
+    
+    output_dir = spec.output_dir if spec else args.output_dir
+    if output_dir:
+        set_output_dir(output_dir)
+    if args.command == 'logs':
+        return run_logs_command(args)
+    
     print("🚀 MIGRADOR DE SISTEMAS LEGADOS")
     print("Certifique-se de que o VS Code Web está aberto com o Copilot Chat ativo.")
     
+    ensure_output_dirs()
+    
     # Conecta com LLM
+    debug_endpoint = (spec.debug_endpoint if spec else None) or args.debug_endpoint
     try:
-        llm_client = LLMClient()
+        from llm_client import LLMClient
+        llm_client = LLMClient(debug_endpoint=debug_endpoint) if debug_endpoint else LLMClient()
         llm_client.connect()
         print("✅ Conectado ao LLM")
     except Exception as e:
         print(f"❌ Erro ao conectar: {e}")
-        return
+        return 1
+    
+    if args.profile:
+        profiler.start()
     
     try:
+        if args.command:
+            if args.resume or (spec and spec.resume):
+                pipeline_state.resume = True
+            elif spec and 'fase0' in spec.steps:
+                # Job desde a Fase 0 é uma execução nova, como a opção [1] do menu
+                pipeline_state.reset()
+            exit_code = run_command(llm_client, args, spec)
+            status = "✅ Processo concluído" if exit_code == 0 else "❌ Processo concluído com falhas"
+            print(f"\n{status}! Verifique os arquivos em {OUTPUT_DIR}/")
+            return exit_code
+        
+        if args.resume:
+            print("♻️ Retomando o pipeline a partir do último checkpoint...")
+            pipeline_state.resume = True
+            run_full_pipeline(llm_client)
+            print(f"\n✅ Processo concluído! Verifique os arquivos em {OUTPUT_DIR}/")
+            return
+        
         print("\nEscolha a operação:")
         print("[0] Fase 0: Configuração da Migração (Coletamento de Requisitos)")
         print("[1] Executar todas as fases de migração")
@@ -1530,27 +1935,27 @@ def main():
         print("[6] Analisar código de projeto existente")
         print("[7] Gerenciar logs LLM (relatórios, limpeza, análise)")
         print("[8] 🧹 Limpar prompts de arquivos existentes")
+        print("[9] 📦 Exportar estrutura completa do novo sistema (diretórios + READMEs)")
+        print("[10] Fase 4 em lote: Implementação paralela (sem interação)")
         
         choice = input("Opção: ").strip()
         
         if choice == '0':
             fase0()
         elif choice == '1':
-            fase0()  # Sempre começa com Fase 0
-            context_files = fase1(llm_client)
-            context_files = fase2(llm_client, context_files)
-            context_files = fase3(llm_client, context_files)
-            fase4(llm_client, context_files)
+            # Execução nova: descarta checkpoints de execuções anteriores
+            pipeline_state.reset()
+            run_full_pipeline(llm_client)
         elif choice == '2':
             fase1(llm_client)
         elif choice == '3':
-            context_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.md')]
+            context_files = existing_context_files()
             fase2(llm_client, context_files)
         elif choice == '4':
-            context_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.md')]
+            context_files = existing_context_files()
             fase3(llm_client, context_files)
         elif choice == '5':
-            context_files = [f for f in os.listdir(OUTPUT_DIR) if f.endswith('.md')]
+            context_files = existing_context_files()
             fase4(llm_client, context_files)
         elif choice == '6':
             analyze_project_code(llm_client)
@@ -1558,13 +1963,25 @@ def main():
             show_logs_menu()
         elif choice == '8':
             clean_existing_files_from_prompts()
+        elif choice == '9':
+            readmes = project_manager.export_structure(include_readmes=True)
+            print(f"📦 Estrutura exportada em {project_manager.new_system_dir} ({readmes} READMEs criados)")
+        elif choice == '10':
+            workers = input(f"Número de sessões paralelas [{FASE4_DEFAULT_WORKERS}]: ").strip()
+            context_files = existing_context_files()
+            fase4_batch(llm_client, context_files, int(workers) if workers.isdigit() else FASE4_DEFAULT_WORKERS)
         else:
             print("Opção inválida")
             
         print(f"\n✅ Processo concluído! Verifique os arquivos em {OUTPUT_DIR}/")
         
     finally:
+        # Só opções que geraram arquivos chegam a criar o gerenciador da estrutura
+        if project_manager.lazy_loaded:
+            project_manager.flush_files_metadata()
         llm_client.close()
+        if args.profile:
+            profiler.write_reports()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
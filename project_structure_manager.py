@@ -5,11 +5,21 @@ Organiza o código gerado em uma estrutura de diretórios apropriada
 
 import os
 import json
+import threading
 import yaml
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 
+# O journal é compactado no snapshot quando tiver pelo menos este número de entradas
+# e também ao menos tantas entradas quanto o snapshot (custo amortizado O(1) por arquivo)
+JOURNAL_COMPACT_MIN_ENTRIES = 50
+
+# Limites da visão geral da estrutura enviada nos prompts
+OVERVIEW_MAX_LINES = 60
+OVERVIEW_MAX_FILES_PER_DIR = 5
+
 @dataclass
 class FileMetadata:
     """Metadados de um arquivo gerado"""
@@ -29,10 +39,22 @@ class ProjectStructureManager:
         self.output_base_dir = Path(output_base_dir)
         self.new_system_dir = self.output_base_dir / "new_system"
         self.structure_config_file = self.output_base_dir / "project_structure.json"
+        self.files_metadata_file = self.output_base_dir / "files_metadata.json"
+        self.files_journal_file = self.output_base_dir / "files_metadata.jsonl"
         self.files_metadata = {}
+        self._journal_entries = 0
+        # Lote aberto por `batch_save` em cada thread (workers paralelos têm lotes independentes)
+        self._thread_batch = threading.local()
+        # Serializa escritas de metadados e da árvore quando tasks rodam em paralelo
+        self._lock = threading.RLock()
+        # Árvore em memória de new_system (carregada do disco na primeira visão geral)
+        self._tree: Optional[Dict] = None
+        self._tree_version = 0
+        self._overview_cache: Dict[tuple, str] = {}
         
         self._ensure_directories()
         self._load_or_create_structure_config()
+        self._load_files_metadata()
     
     def _ensure_directories(self):
         """Cria diretórios base se não existirem"""
@@ -143,7 +165,8 @@ class ProjectStructureManager:
             self.structure_config["technology_stack"]["backend"] = "python_fastapi"
         
         self._save_structure_config()
-        self._create_directory_structure()
+        # Diretórios ficam apenas na configuração; são criados na primeira escrita ou no export
+        self.refresh_structure_tree()
     
     def _add_microservices_structure(self):
         """Adiciona estrutura específica para microserviços"""
@@ -167,22 +190,45 @@ class ProjectStructureManager:
                 }
             }
     
-    def _create_directory_structure(self):
-        """Cria toda a estrutura de diretórios baseada na configuração"""
+    def _configured_directories(self) -> List[tuple]:
+        """Diretórios previstos na configuração, como (caminho relativo, subdiretório, descrição).
+        
+        `subdir` é None para o diretório raiz de cada componente.
+        """
+        directories = []
         for component, config in self.structure_config["directory_structure"].items():
-            component_path = self.new_system_dir / config["path"]
-            component_path.mkdir(parents=True, exist_ok=True)
+            component_path = Path(config["path"])
+            directories.append((component_path, None, config.get("description", "")))
+            for subdir, description in config.get("subdirs", {}).items():
+                directories.append((component_path / subdir, subdir, description))
+        return directories
+    
+    def export_structure(self, include_readmes: bool = True) -> int:
+        """Materializa em disco todos os diretórios da configuração.
+        
+        Durante a migração os diretórios existem só virtualmente e são criados na primeira
+        escrita de arquivo; o export gera a estrutura completa (e os READMEs) para entrega.
+        Retorna quantos READMEs foram criados.
+        """
+        readmes_created = 0
+        for relative_path, subdir, description in self._configured_directories():
+            directory = self.new_system_dir / relative_path
+            directory.mkdir(parents=True, exist_ok=True)
+            self._track_path(directory)
             
-            if "subdirs" in config:
-                for subdir, description in config["subdirs"].items():
-                    subdir_path = component_path / subdir
-                    subdir_path.mkdir(parents=True, exist_ok=True)
-                    
-                    # Cria arquivo README em cada diretório
-                    readme_path = subdir_path / "README.md"
-                    if not readme_path.exists():
-                        readme_content = f"# {subdir}\n\n{description}\n"
-                        readme_path.write_text(readme_content, encoding='utf-8')
+            # Cria arquivo README em cada subdiretório configurado
+            if include_readmes and subdir:
+                readme_path = directory / "README.md"
+                if not readme_path.exists():
+                    readme_content = f"# {subdir}\n\n{description}\n"
+                    readme_path.write_text(readme_content, encoding='utf-8')
+                    readmes_created += 1
+                self._track_path(readme_path, is_file=True)
+        return readmes_created
+    
+    def _create_directory_structure(self):
+        """Cria toda a estrutura de diretórios baseada na configuração"""
+        self.export_structure(include_readmes=True)
     
     def determine_file_location(self, code_content: str, code_language: str, 
                               component_hint: str = "", task_description: str = "") -> tuple:
@@ -268,40 +314,97 @@ class ProjectStructureManager:
                           task_description: str, component_hint: str = "") -> str:
         """Salva arquivo gerado na localização apropriada"""
         
-        # Determina localização
-        relative_path, file_type = self.determine_file_location(
-            code_content, code_language, component_hint, task_description
-        )
+        with self._lock:
+            # Determina localização
+            relative_path, file_type = self.determine_file_location(
+                code_content, code_language, component_hint, task_description
+            )
         
-        # Gera nome do arquivo
-        file_name = self._generate_file_name(code_content, code_language, file_type, task_index)
+            # Gera nome do arquivo
+            file_name = self._generate_file_name(code_content, code_language, file_type, task_index)
         
-        # Caminho completo
-        full_dir_path = self.new_system_dir / relative_path
-        full_dir_path.mkdir(parents=True, exist_ok=True)
+            # Caminho completo
+            full_dir_path = self.new_system_dir / relative_path
+            full_dir_path.mkdir(parents=True, exist_ok=True)
         
-        full_file_path = full_dir_path / file_name
+            full_file_path = full_dir_path / file_name
         
-        # Salva arquivo
-        full_file_path.write_text(code_content, encoding='utf-8')
+            # Salva arquivo
+            full_file_path.write_text(code_content, encoding='utf-8')
+            self._track_path(full_file_path, is_file=True)
         
-        # Registra metadados
-        metadata = FileMetadata(
-            file_path=str(full_file_path.relative_to(self.new_system_dir)),
-            component=component_hint or "unknown",
-            layer=file_type,
-            technology=code_language,
-            dependencies=[],  # pode ser melhorado para extrair dependências
-            description=task_description[:100] + "..." if len(task_description) > 100 else task_description,
-            task_index=task_index,
-            generated_at=__import__('datetime').datetime.now().isoformat()
-        )
+            # Registra metadados
+            metadata = FileMetadata(
+                file_path=str(full_file_path.relative_to(self.new_system_dir)),
+                component=component_hint or "unknown",
+                layer=file_type,
+                technology=code_language,
+                dependencies=[],  # pode ser melhorado para extrair dependências
+                description=task_description[:100] + "..." if len(task_description) > 100 else task_description,
+                task_index=task_index,
+                generated_at=__import__('datetime').datetime.now().isoformat()
+            )
         
-        self.files_metadata[str(full_file_path)] = metadata
-        self._save_files_metadata()
+            self.files_metadata[str(full_file_path)] = metadata
+            self._record_file_metadata(str(full_file_path))
         
-        return str(full_file_path)
+            return str(full_file_path)
     
+    @contextmanager
+    def batch_save(self):
+        """Agrupa vários `save_generated_file` e persiste os metadados uma única vez no final.
+        
+        O lote pertence à thread que o abriu: cada worker grava suas entradas ao sair do
+        próprio lote, sem esperar os lotes das outras threads. Lotes aninhados na mesma
+        thread são gravados pelo mais externo.
+        
+        Uso:
+            with manager.batch_save():
+                for block in blocks:
+                    manager.save_generated_file(...)
+        """
+        outermost = self._current_batch() is None
+        if outermost:
+            self._thread_batch.pending = []
+        try:
+            yield self
+        finally:
+            if outermost:
+                pending = self._thread_batch.pending
+                self._thread_batch.pending = None
+                self._append_to_journal(pending)
+    
+    def _current_batch(self) -> Optional[List[str]]:
+        return getattr(self._thread_batch, 'pending', None)
+    
+    def save_generated_files(self, files: List[Dict]) -> List[str]:
+        """Salva vários arquivos gerados numa única transação de metadados.
+        
+        Cada item aceita as mesmas chaves de `save_generated_file`
+        (code_content, code_language, task_index, task_description, component_hint).
+        """
+        with self.batch_save():
+            return [self.save_generated_file(**file_args) for file_args in files]
+
+    def replace_generated_file(self, file_path: str, code_content: str, description: str = "") -> str:
+        """Substitui o conteúdo de um arquivo já gerado (ex.: correção no refinamento).
+
+        O arquivo continua no mesmo caminho, em vez de uma nova cópia ser criada a cada tentativa.
+        """
+        with self._lock:
+            full_file_path = Path(file_path)
+            full_file_path.parent.mkdir(parents=True, exist_ok=True)
+            full_file_path.write_text(code_content, encoding='utf-8')
+            self._track_path(full_file_path, is_file=True)
+
+            metadata = self.files_metadata.get(str(full_file_path))
+            if metadata is not None:
+                metadata.generated_at = __import__('datetime').datetime.now().isoformat()
+                if description:
+                    metadata.description = description[:100] + "..." if len(description) > 100 else description
+                self._record_file_metadata(str(full_file_path))
+            return str(full_file_path)
+
     def _generate_file_name(self, code_content: str, code_language: str, file_type: str, task_index: int) -> str:
         """Gera nome apropriado para o arquivo"""
         
@@ -338,7 +441,9 @@ class ProjectStructureManager:
         import re
         
         if code_language.lower() == "java":
-            match = re.search(r'class\s+(\w+)', code_content)
+            # Prefere o tipo público (o que define o nome do arquivo); interfaces, enums e records também contam
+            match = (re.search(r'\bpublic\s+(?:(?:abstract|final|sealed|non-sealed|static|strictfp)\s+)*(?:class|interface|enum|record)\s+(\w+)', code_content)
+                     or re.search(r'\b(?:class|interface|enum|record)\s+(\w+)', code_content))
             if match:
                 return match.group(1)
         elif code_language.lower() in ["javascript", "typescript", "jsx", "tsx"]:
@@ -349,13 +454,65 @@ class ProjectStructureManager:
         
         return None
     
+    def _load_files_metadata(self):
+        """Carrega o snapshot de metadados e reaplica as entradas do journal"""
+        if self.files_metadata_file.exists():
+            try:
+                with open(self.files_metadata_file, 'r', encoding='utf-8') as f:
+                    for path, data in json.load(f).items():
+                        self.files_metadata[path] = FileMetadata(**data)
+            except (json.JSONDecodeError, TypeError) as e:
+                print(f"⚠️ Erro ao carregar metadados dos arquivos: {e}")
+        
+        if self.files_journal_file.exists():
+            with open(self.files_journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.files_metadata[entry['path']] = FileMetadata(**entry['metadata'])
+                        self._journal_entries += 1
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue  # linha incompleta de uma escrita interrompida
+    
+    def _record_file_metadata(self, file_key: str):
+        """Registra os metadados de um arquivo no journal (ou adia até o fim do lote)"""
+        entry = json.dumps({'path': file_key, 'metadata': asdict(self.files_metadata[file_key])}, ensure_ascii=False)
+        pending = self._current_batch()
+        if pending is not None:
+            pending.append(entry)
+        else:
+            self._append_to_journal([entry])
+    
+    def _append_to_journal(self, entries: List[str]):
+        """Anexa as entradas ao journal numa única escrita, compactando quando necessário"""
+        with self._lock:
+            if not entries:
+                return
+            
+            with open(self.files_journal_file, 'a', encoding='utf-8') as f:
+                f.write("\n".join(entries) + "\n")
+            self._journal_entries += len(entries)
+            
+            if self._journal_entries >= max(JOURNAL_COMPACT_MIN_ENTRIES, len(self.files_metadata)):
+                self._save_files_metadata()
+    
     def _save_files_metadata(self):
-        """Salva metadados dos arquivos"""
-        metadata_file = self.output_base_dir / "files_metadata.json"
+        """Grava o snapshot completo de metadados de forma atômica e zera o journal"""
         metadata_dict = {k: asdict(v) for k, v in self.files_metadata.items()}
         
-        with open(metadata_file, 'w', encoding='utf-8') as f:
+        tmp_file = self.files_metadata_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(metadata_dict, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_file, self.files_metadata_file)
+        
+        self.files_journal_file.unlink(missing_ok=True)
+        self._journal_entries = 0
+    
+    def flush_files_metadata(self):
+        """Consolida journal e snapshot em `files_metadata.json` (ex.: ao final da execução)"""
+        with self._lock:
+            if self._journal_entries:
+                self._save_files_metadata()
     
     def generate_project_summary(self) -> str:
         """Gera resumo do projeto gerado"""
@@ -383,20 +540,160 @@ class ProjectStructureManager:
         
         return summary
     
-    def get_structure_overview(self) -> str:
-        """Retorna visão geral da estrutura criada"""
-        overview = "📁 Estrutura do Novo Sistema:\n\n"
+    def _new_tree_node(self) -> Dict:
+        # 'rendered': linhas já renderizadas da subárvore, por (nível, profundidade, recolhido)
+        return {'dirs': {}, 'files': set(), 'count': 0, 'rendered': {}}
+    
+    def _load_tree(self) -> Dict:
+        """Monta a árvore em memória com um único `os.walk` de new_system"""
+        if self._tree is None:
+            self._tree = self._new_tree_node()
+            for root, dirs, files in os.walk(self.new_system_dir):
+                dirs.sort()
+                relative = Path(root).relative_to(self.new_system_dir)
+                for file in files:
+                    self._insert_path(relative.parts + (file,), is_file=True)
+                for directory in dirs:
+                    self._insert_path(relative.parts + (directory,), is_file=False)
+            # Diretórios ainda virtuais (só na configuração) também aparecem na visão geral
+            for relative_path, _, _ in self._configured_directories():
+                self._insert_path(relative_path.parts, is_file=False)
+        return self._tree
+    
+    def _insert_path(self, parts: tuple, is_file: bool) -> bool:
+        """Insere um caminho relativo na árvore; retorna True se algo mudou. Custo O(profundidade).
         
-        for root, dirs, files in os.walk(self.new_system_dir):
-            level = root.replace(str(self.new_system_dir), '').count(os.sep)
-            indent = ' ' * 2 * level
-            folder_name = os.path.basename(root)
-            if folder_name:
-                overview += f"{indent}📂 {folder_name}/\n"
-            
-            subindent = ' ' * 2 * (level + 1)
-            for file in files:
-                if not file.startswith('.'):
-                    overview += f"{subindent}📄 {file}\n"
+        Só os nós do caminho alterado perdem as subárvores renderizadas; os demais as mantêm.
+        """
+        node = self._tree
+        chain = [node]
+        dir_parts = parts[:-1] if is_file else parts
+        changed = False
+        for part in dir_parts:
+            if part not in node['dirs']:
+                node['dirs'][part] = self._new_tree_node()
+                changed = True
+            node = node['dirs'][part]
+            chain.append(node)
+        if is_file and parts[-1] not in node['files']:
+            node['files'].add(parts[-1])
+            for ancestor in chain:
+                ancestor['count'] += 1
+            changed = True
+        if changed:
+            for ancestor in chain:
+                ancestor['rendered'].clear()
+        return changed
+    
+    def _track_path(self, path: Path, is_file: bool = False):
+        """Atualiza a árvore em memória após uma escrita (se ela já foi carregada)"""
+        if self._tree is None:
+            return
+        try:
+            parts = Path(path).relative_to(self.new_system_dir).parts
+        except ValueError:
+            return
+        if parts and self._insert_path(parts, is_file):
+            self._tree_version += 1
+            self._overview_cache.clear()
+    
+    def refresh_structure_tree(self):
+        """Descarta a árvore em memória (ex.: após alterações externas em new_system)"""
+        with self._lock:
+            self._tree = None
+            self._tree_version += 1
+            self._overview_cache.clear()
+    
+    def _relevant_components(self, focus: str) -> Optional[set]:
+        """Componentes de primeiro nível relacionados ao foco (componente/descrição da task)"""
+        if not focus:
+            return None
+        focus_lower = focus.lower()
+        relevant = set()
+        for name in self._tree['dirs']:
+            if name.lower() in focus_lower:
+                relevant.add(name)
+        for metadata in self.files_metadata.values():
+            if metadata.component and metadata.component != "unknown" and metadata.component.lower() in focus_lower:
+                relevant.add(Path(metadata.file_path).parts[0])
+        return relevant or None
+    
+    def _render_tree(self, node: Dict, name: str, level: int, lines: List[str], relevant: Optional[set],
+                     max_depth: int) -> int:
+        """Renderiza a árvore em `lines`; retorna a profundidade máxima encontrada.
+        
+        Subárvores abaixo da raiz são reaproveitadas do cache do nó: o foco só decide se um
+        componente de primeiro nível aparece recolhido, e isso faz parte da chave.
+        """
+        collapsed = relevant is not None and level == 1 and name not in relevant
+        if level == 0:
+            return self._render_node(node, name, level, lines, relevant, max_depth, collapsed)
+        key = (level, max_depth, collapsed)
+        cached = node['rendered'].get(key)
+        if cached is None:
+            rendered = []
+            depth = self._render_node(node, name, level, rendered, relevant, max_depth, collapsed)
+            cached = node['rendered'][key] = (rendered, depth)
+        lines.extend(cached[0])
+        return cached[1]
+    
+    def _render_node(self, node: Dict, name: str, level: int, lines: List[str], relevant: Optional[set],
+                     max_depth: int, collapsed: bool) -> int:
+        indent = ' ' * 2 * level
+        # Cadeias de diretórios sem arquivos e com um único filho viram uma linha só
+        label = name
+        while not node['files'] and len(node['dirs']) == 1:
+            child_name, child = next(iter(node['dirs'].items()))
+            label = f"{label}/{child_name}"
+            node = child
+        
+        if collapsed or (level >= max_depth and (node['dirs'] or node['files'])):
+            lines.append(f"{indent}📂 {label}/ ({node['count']} arquivos)")
+            return level
+        lines.append(f"{indent}📂 {label}/")
+        
+        subindent = ' ' * 2 * (level + 1)
+        visible_files = sorted(f for f in node['files'] if not f.startswith('.'))
+        for file in visible_files[:OVERVIEW_MAX_FILES_PER_DIR]:
+            lines.append(f"{subindent}📄 {file}")
+        if len(visible_files) > OVERVIEW_MAX_FILES_PER_DIR:
+            lines.append(f"{subindent}… (+{len(visible_files) - OVERVIEW_MAX_FILES_PER_DIR} arquivos)")
+        
+        depth = level
+        for child_name in sorted(node['dirs']):
+            depth = max(depth, self._render_tree(node['dirs'][child_name], child_name, level + 1, lines,
+                                                 relevant, max_depth))
+        return depth
+    
+    def get_structure_overview(self, focus: str = "", max_lines: int = OVERVIEW_MAX_LINES) -> str:
+        """Retorna visão geral (limitada) da estrutura criada, a partir da árvore em memória.
+        
+        Args:
+            focus: componente ou descrição da task; componentes não relacionados são
+                mostrados recolhidos, só com a contagem de arquivos.
+            max_lines: número máximo de linhas da árvore.
+        """
+        with self._lock:
+            return self._build_structure_overview(focus, max_lines)
+    
+    def _build_structure_overview(self, focus: str, max_lines: int) -> str:
+        tree = self._load_tree()
+        cache_key = (self._tree_version, focus, max_lines)
+        if cache_key in self._overview_cache:
+            return self._overview_cache[cache_key]
+        
+        relevant = self._relevant_components(focus)
+        lines = []
+        depth = self._render_tree(tree, self.new_system_dir.name, 0, lines, relevant, max_depth=1 << 30)
+        # Se não couber, recolhe os níveis mais profundos até caber (mantendo todos os componentes)
+        while len(lines) > max_lines and depth > 1:
+            depth -= 1
+            lines = []
+            self._render_tree(tree, self.new_system_dir.name, 0, lines, relevant, max_depth=depth)
+        if len(lines) > max_lines:
+            omitted = len(lines) - max_lines
+            lines = lines[:max_lines] + [f"… (+{omitted} linhas omitidas)"]
         
+        overview = "📁 Estrutura do Novo Sistema:\n\n" + "\n".join(lines) + "\n"
+        self._overview_cache[cache_key] = overview
         return overview
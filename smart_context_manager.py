@@ -1,49 +1,76 @@
 """
 Sistema de Contexto Inteligente tipo RAG para otimizar o contexto das tasks
 Reduz drasticamente o tamanho do contexto mantendo apenas informações relevantes
+
+A base de conhecimento só é aberta na primeira consulta: a busca usa apenas o índice
+de metadados e o conteúdo de cada documento é lido do disco quando necessário.
 """
 
 import os
 import re
-import json
+import threading
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
 from datetime import datetime
 
+from helper.kb_store import KnowledgeBaseStore
+
 class SmartContextManager:
     def __init__(self, output_dir: str, max_context_size: int = 8000):
         self.output_dir = output_dir
         self.max_context_size = max_context_size
-        self.knowledge_base = {}
         self.context_cache = {}
-        
-        # Carrega base de conhecimento existente
-        self.load_knowledge_base()
+        self.store = KnowledgeBaseStore(output_dir)
+        # Metadados carregados na primeira consulta; corpos lidos do disco sob demanda
+        self._knowledge_base: Optional[Dict[str, Dict]] = None
+        # Corpos indexados e ainda não salvos
+        self._pending_bodies: Dict[str, Dict] = {}
+        self._load_lock = threading.Lock()
+    
+    @property
+    def knowledge_base(self) -> Dict[str, Dict]:
+        """Metadados por documento (resumo, palavras-chave, tipo, tamanho), sem conteúdo e seções"""
+        if self._knowledge_base is None:
+            with self._load_lock:
+                if self._knowledge_base is None:
+                    self.load_knowledge_base()
+        return self._knowledge_base
     
     def load_knowledge_base(self):
-        """Carrega a base de conhecimento de um arquivo JSON"""
-        kb_file = os.path.join(self.output_dir, "knowledge_base.json")
-        if os.path.exists(kb_file):
-            try:
-                with open(kb_file, 'r', encoding='utf-8') as f:
-                    self.knowledge_base = json.load(f)
-                print(f"📚 Base de conhecimento carregada: {len(self.knowledge_base)} entradas")
-            except Exception as e:
-                print(f"⚠️ Erro ao carregar base de conhecimento: {e}")
-                self.knowledge_base = {}
-        else:
-            self.knowledge_base = {}
+        """Carrega o índice da base de conhecimento (os corpos ficam no disco)"""
+        try:
+            self._knowledge_base = self.store.load_index()
+            if self._knowledge_base:
+                print(f"📚 Base de conhecimento carregada: {len(self._knowledge_base)} entradas")
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar base de conhecimento: {e}")
+            self._knowledge_base = {}
     
     def save_knowledge_base(self):
-        """Salva a base de conhecimento em um arquivo JSON"""
-        kb_file = os.path.join(self.output_dir, "knowledge_base.json")
+        """Grava os corpos novos e o índice da base de conhecimento"""
+        if self._knowledge_base is None:
+            return
         try:
-            with open(kb_file, 'w', encoding='utf-8') as f:
-                json.dump(self.knowledge_base, f, ensure_ascii=False, indent=2)
-            print(f"💾 Base de conhecimento salva: {len(self.knowledge_base)} entradas")
+            self.store.save(self._knowledge_base, self._pending_bodies)
+            self._pending_bodies = {}
+            print(f"💾 Base de conhecimento salva: {len(self._knowledge_base)} entradas")
         except Exception as e:
             print(f"❌ Erro ao salvar base de conhecimento: {e}")
     
+    def get_document(self, doc_id: str) -> Dict:
+        """Metadados e corpo (`content`, `sections`) de um documento; vazio se não existir"""
+        entry = self.knowledge_base.get(doc_id)
+        if entry is None:
+            return {}
+        body = self._pending_bodies.get(doc_id)
+        if body is None:
+            try:
+                body = self.store.read_body(entry)
+            except Exception as e:
+                print(f"⚠️ Erro ao ler documento {doc_id}: {e}")
+                body = {}
+        return {**entry, **body}
+    
     def extract_keywords(self, text: str) -> List[str]:
         """Extrai palavras-chave relevantes do texto"""
         # Remove caracteres especiais e converte para minúsculas
@@ -88,14 +115,13 @@ class SmartContextManager:
         sections = self.extract_sections(content)
         
         self.knowledge_base[doc_id] = {
-            'content': content,
             'summary': summary,
             'keywords': keywords,
             'doc_type': doc_type,
-            'sections': sections,
             'indexed_at': datetime.now().isoformat(),
             'size': len(content)
         }
+        self._pending_bodies[doc_id] = {'content': content, 'sections': sections}
         
         print(f"📚 Documento indexado: {doc_id} ({len(content)} chars, {len(keywords)} keywords)")
     
@@ -180,7 +206,7 @@ class SmartContextManager:
                 if current_size + len(summary) > self.max_context_size * 0.8:
                     break
                 
-                doc_data = self.knowledge_base.get(doc_id, {})
+                doc_data = self.get_document(doc_id)
                 
                 # Usa resumo ou seção específica baseada no tipo de task
                 if task_type == "implementation":
@@ -273,15 +299,17 @@ class SmartContextManager:
         essentials = []
         
         # Busca informações sobre tecnologias detectadas
-        for doc_id, doc_data in self.knowledge_base.items():
+        for doc_id in self.knowledge_base:
             if 'dependencies' in doc_id or 'architecture' in doc_id:
-                sections = doc_data.get('sections', {})
+                sections = self.get_document(doc_id).get('sections', {})
                 for section_name, content in sections.items():
                     if any(keyword in section_name.lower() for keyword in ['tecnologia', 'framework', 'dependência']):
                         essentials.append(f"**{section_name}**: {content[:200]}...")
                         break
+                if len(essentials) == 3:  # Máximo 3 essenciais
+                    break
         
-        return '\n'.join(essentials[:3])  # Máximo 3 essenciais
+        return '\n'.join(essentials)
     
     def update_from_files(self, context_files: List[str]):
         """Atualiza a base de conhecimento com arquivos do contexto"""
@@ -10,7 +10,22 @@ from datetime import datetime
 # Adiciona o diretório atual ao path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from main import load_previous_results_only, OUTPUT_DIR
+from helper.phase_digest import PhaseDigestStore
+from main import OUTPUT_DIR, PREVIOUS_RESULTS_BUDGET
+
+
+def load_previous_results(file_paths):
+    """Contexto das fases anteriores como o pipeline monta (digests sem prompts)"""
+    return PhaseDigestStore().build_context(file_paths, PREVIOUS_RESULTS_BUDGET)
+
+
+def remove_test_file(file_path):
+    """Remove o arquivo de teste e o digest gravado ao lado dele"""
+    for path in (file_path, str(PhaseDigestStore.digest_path(file_path))):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 def create_test_file_with_prompts():
     """Cria um arquivo de teste com prompts misturados"""
@@ -91,7 +106,7 @@ def test_prompt_filtering():
     print("\n🔄 Aplicando filtro de prompts...")
     
     try:
-        filtered_content = load_previous_results_only([test_file])
+        filtered_content = load_previous_results([test_file])
         filtered_size = len(filtered_content)
         
         print(f"📏 Tamanho filtrado: {filtered_size:,} caracteres")
@@ -143,11 +158,8 @@ def test_prompt_filtering():
         return False
     
     # Limpa arquivo de teste
-    try:
-        os.remove(test_file)
-        print(f"\n🗑️  Arquivo de teste removido")
-    except:
-        pass
+    remove_test_file(test_file)
+    print(f"\n🗑️  Arquivo de teste removido")
     
     return True
 
@@ -203,7 +215,7 @@ Informações técnicas relevantes.
         
         # Testa filtragem
         try:
-            filtered = load_previous_results_only([temp_file])
+            filtered = load_previous_results([temp_file])
             filtered_size = len(filtered)
             
             if filtered_size < original_size:
@@ -216,10 +228,7 @@ Informações técnicas relevantes.
             print(f"   ❌ Erro: {e}")
         
         # Remove arquivo temporário
-        try:
-            os.remove(temp_file)
-        except:
-            pass
+        remove_test_file(temp_file)
 
 if __name__ == "__main__":
     print(f"🕒 Teste iniciado em: {datetime.now().strftime('%H:%M:%S')}")
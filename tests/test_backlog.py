@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Teste do modelo estruturado do backlog
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import helper.task_manager as task_manager_module
+from helper.backlog import parse_backlog
+from helper.task_manager import TaskManager
+
+BACKLOG = """# Backlog
+
+## Sprint 1
+### Task 1: Modelo de dados
+Prioridade: Alta
+Criar entidades.
+### Task 2: Repositórios [P3]
+Dependências: Task 1
+"""
+
+
+def write_backlog(directory, content):
+    with open(os.path.join(directory, "migration-backlog.md"), 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_tasks_have_stable_ids_priority_and_dependencies():
+    """IDs não dependem da posição; prioridade e dependências são extraídas"""
+    tasks = parse_backlog(BACKLOG)
+    sprint, model, repositories = tasks
+
+    assert (sprint.sprint, model.sprint) == (1, 1)
+    assert model.priority == 1 and repositories.priority == 3
+    assert repositories.dependencies == [model.id]
+
+    edited = parse_backlog(BACKLOG.replace("## Sprint 1\n", "## Sprint 1\n### Task 0: Setup\n"))
+    assert [task.id for task in edited if task.title != "Task 0: Setup"] == [task.id for task in tasks]
+    print("✅ IDs estáveis funcionando")
+
+
+def test_status_survives_backlog_edits_and_legacy_format_is_migrated():
+    """Status por ID continua correto após inserir tasks; formato antigo (por índice) é convertido"""
+    directory = tempfile.mkdtemp()
+    write_backlog(directory, BACKLOG)
+    # Formato antigo: Sprint 1 e Task 1 concluídas
+    with open(os.path.join(directory, "tasks_status.json"), 'w') as f:
+        json.dump({"0": "completed", "1": "completed"}, f)
+
+    manager = TaskManager(directory)
+    index, task = manager.get_next_task()
+    assert task['title'] == "Task 2: Repositórios [P3]"
+    manager.mark_task_completed(index)
+
+    write_backlog(directory, BACKLOG + "### Task 3: Serviços\nCriar serviços.\n")
+    os.utime(os.path.join(directory, "migration-backlog.md"), ns=(1, 1))
+    reopened = TaskManager(directory)
+    _, task = reopened.get_next_task()
+    assert task['title'] == "Task 3: Serviços", task
+    assert reopened.completed_task_indexes() == {0, 1, 2}
+    print("✅ Status por ID funcionando")
+
+
+def test_backlog_is_parsed_once_while_unchanged():
+    """Consultas seguidas não reinterpretam o backlog nem relêem o status"""
+    directory = tempfile.mkdtemp()
+    write_backlog(directory, BACKLOG)
+    manager = TaskManager(directory)
+
+    calls = []
+    original_parse = task_manager_module.parse_backlog
+    task_manager_module.parse_backlog = lambda content: (calls.append(1), original_parse(content))[1]
+    try:
+        for _ in range(20):
+            manager.get_next_task()
+            manager.load_tasks()
+    finally:
+        task_manager_module.parse_backlog = original_parse
+    assert len(calls) == 1, f"Esperava uma única interpretação, obteve {len(calls)}"
+    print("✅ Cache do backlog funcionando")
+
+
+if __name__ == "__main__":
+    test_tasks_have_stable_ids_priority_and_dependencies()
+    test_status_survives_backlog_edits_and_legacy_format_is_migrated()
+    test_backlog_is_parsed_once_while_unchanged()
+    print("\n🎉 Todos os testes do backlog passaram!")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Teste da análise de código em lote (vários arquivos pequenos por prompt)
+e da pré-extração estática de elementos
+"""
+
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from code_analyzer import CodeAnalyzer, BATCH_FILE_MARKER
+from analyzers.java_analyzer import JavaAnalyzer
+
+
+class FakeLLMClient:
+    """Cliente LLM falso que responde com uma seção por arquivo do lote"""
+
+    def __init__(self, skip_files=None):
+        self.prompts = []
+        self.skip_files = skip_files or []
+
+    def send_prompt(self, prompt_text):
+        self.prompts.append(prompt_text)
+        sections = []
+        for line in prompt_text.split('\n'):
+            if line.startswith(BATCH_FILE_MARKER) and line.endswith('.java ==='):
+                file_path = line[len(BATCH_FILE_MARKER):-3].strip()
+                name = Path(file_path).stem
+                if name in self.skip_files:
+                    continue
+                sections.append(
+                    f"{BATCH_FILE_MARKER} {file_path} ===\n"
+                    f"CLASSE: {name}\n"
+                    f"Descrição: Classe {name} do lote.\n"
+                )
+        if sections:
+            return "\n".join(sections)
+        # Prompt de descrições de elementos já extraídos
+        refs = re.findall(r'^\[(\d+)\] [^(\n]*?(\w+)\(', prompt_text, re.MULTILINE)
+        if refs:
+            return "\n".join(f"[{ref}] Descreve {name} pelo LLM." for ref, name in refs)
+        # Prompt de arquivo único
+        return "CLASSE: Single\nDescrição: Análise individual.\n"
+
+
+def create_java_project(base_dir, count=6):
+    """Cria um projeto Java com DTOs pequenos em dois pacotes"""
+    files = []
+    for i in range(count):
+        package = "com.acme.dto" if i % 2 == 0 else "com.acme.model"
+        package_dir = Path(base_dir) / "src" / package.replace('.', '/')
+        package_dir.mkdir(parents=True, exist_ok=True)
+        file_path = package_dir / f"Item{i}.java"
+        file_path.write_text(f"package {package};\n\npublic class Item{i} {{\n    private String name;\n}}\n", encoding='utf-8')
+        files.append(file_path)
+    return files
+
+
+def test_batch_planning_groups_small_files_by_package():
+    """Arquivos pequenos do mesmo pacote devem compartilhar o mesmo lote"""
+    project_dir = tempfile.mkdtemp()
+    output_dir = tempfile.mkdtemp()
+    create_java_project(project_dir)
+
+    analyzer = CodeAnalyzer(project_dir, output_dir)
+    files = analyzer.discover_files()
+    analyzer.analyze_dependencies(files)
+
+    batches = analyzer.plan_analysis_batches()
+    print(f"📦 {len(files)} arquivos → {len(batches)} lotes")
+
+    assert len(batches) == 2, f"Esperava 2 lotes (um por pacote), obteve {len(batches)}"
+    assert sum(len(batch) for batch in batches) == len(files)
+
+    # Orçamento pequeno força mais lotes, sem perder arquivos
+    small_batches = analyzer.plan_analysis_batches(token_budget=30)
+    assert len(small_batches) > len(batches)
+    assert sum(len(batch) for batch in small_batches) == len(files)
+    print("✅ Planejamento de lotes funcionando")
+
+
+def test_batches_keep_dependencies_before_dependents():
+    """Um arquivo grande que importa um DTO pequeno só é analisado depois do lote do DTO"""
+    project_dir = tempfile.mkdtemp()
+    create_java_project(project_dir)
+    service_dir = Path(project_dir) / "src" / "com" / "acme" / "service"
+    service_dir.mkdir(parents=True)
+    methods = "\n".join(f"    public String metodo{i}() {{ return item.toString(); }}" for i in range(150))
+    (service_dir / "PedidoService.java").write_text(
+        "package com.acme.service;\n\nimport com.acme.dto.Item0;\n\n"
+        f"public class PedidoService {{\n    private Item0 item;\n{methods}\n}}\n", encoding='utf-8')
+
+    analyzer = CodeAnalyzer(project_dir, tempfile.mkdtemp())
+    analyzer.analyze_dependencies(analyzer.discover_files())
+    batches = [[path.name for path in batch] for batch in analyzer.plan_analysis_batches()]
+    print(f"📦 Lotes: {batches}")
+
+    position = {name: index for index, batch in enumerate(batches) for name in batch}
+    assert position["Item0.java"] < position["PedidoService.java"], "Dependência deve ser analisada antes"
+    assert sum(len(batch) for batch in batches) == 7
+    print("✅ Lotes respeitam a ordem das dependências")
+
+
+def test_batch_response_is_split_per_file():
+    """A resposta do lote deve gerar elementos para cada arquivo"""
+    project_dir = tempfile.mkdtemp()
+    output_dir = tempfile.mkdtemp()
+    create_java_project(project_dir, count=4)
+
+    analyzer = CodeAnalyzer(project_dir, output_dir, use_static_extraction=False)
+    analyzer.analyze_dependencies(analyzer.discover_files())
+
+    llm = FakeLLMClient(skip_files=["Item2"])
+    for batch in analyzer.plan_analysis_batches():
+        analyzer.analyze_batch_with_llm(llm, batch)
+
+    names = sorted(element.name for element in analyzer.knowledge_base.values())
+    print(f"📚 Elementos extraídos: {names}")
+    print(f"📨 Prompts enviados: {len(llm.prompts)}")
+
+    assert "Item0" in names and "Item1" in names and "Item3" in names
+    # Item2 foi omitido pelo LLM no lote e reanalisado individualmente
+    assert "Single" in names
+    assert len(llm.prompts) == 3, f"Esperava 2 lotes + 1 fallback, obteve {len(llm.prompts)}"
+    assert (Path(output_dir) / "analysis_Item0.md").exists()
+    print("✅ Divisão da resposta em lote funcionando")
+
+
+def test_static_extraction_skips_llm_for_trivial_files():
+    """DTOs triviais são descritos localmente, sem nenhum prompt"""
+    project_dir = tempfile.mkdtemp()
+    output_dir = tempfile.mkdtemp()
+    create_java_project(project_dir, count=4)
+
+    analyzer = CodeAnalyzer(project_dir, output_dir)
+    analyzer.analyze_dependencies(analyzer.discover_files())
+
+    llm = FakeLLMClient()
+    for batch in analyzer.plan_analysis_batches():
+        analyzer.analyze_batch_with_llm(llm, batch)
+
+    names = sorted(element.name for element in analyzer.knowledge_base.values())
+    print(f"📚 Elementos extraídos: {names}")
+
+    assert len(llm.prompts) == 0, f"Não esperava prompts, obteve {len(llm.prompts)}"
+    assert "Item0" in names and "name" in names
+    assert all(element.description for element in analyzer.knowledge_base.values())
+    assert (Path(output_dir) / "analysis_Item0.md").exists()
+    print("✅ Extração estática sem LLM funcionando")
+
+
+def test_static_extraction_asks_only_descriptions():
+    """Métodos não triviais vão ao LLM só para receber a descrição"""
+    project_dir = tempfile.mkdtemp()
+    output_dir = tempfile.mkdtemp()
+    source_dir = Path(project_dir) / "src" / "com" / "acme"
+    source_dir.mkdir(parents=True)
+    (source_dir / "Pricing.java").write_text(
+        "package com.acme;\n\n"
+        "/** Regras de preço. */\n"
+        "public class Pricing {\n"
+        "    private double rate;\n"
+        "    public double getRate() { return rate; }\n"
+        "    public double total(double value, int quantity) {\n"
+        "        double sum = value * quantity;\n"
+        "        if (quantity > 10) { sum = sum * (1 - rate); }\n"
+        "        return Math.max(sum, 0);\n"
+        "    }\n"
+        "}\n", encoding='utf-8')
+
+    analyzer = CodeAnalyzer(project_dir, output_dir)
+    files = analyzer.discover_files()
+    analyzer.analyze_dependencies(files)
+
+    llm = FakeLLMClient()
+    for file_path in files:
+        analyzer.analyze_file_with_llm(llm, file_path)
+
+    by_name = {element.name: element for element in analyzer.knowledge_base.values()}
+    print(f"📨 Prompts enviados: {len(llm.prompts)}")
+
+    assert len(llm.prompts) == 1
+    assert by_name["Pricing"].description == "Regras de preço."
+    assert by_name["total"].description == "Descreve total pelo LLM."
+    listing = llm.prompts[0].split("ELEMENTOS A DESCREVER")[1]
+    assert "getRate" not in listing and by_name["getRate"].description
+    print("✅ Prompt de descrições funcionando")
+
+
+def test_python_static_extraction():
+    """Docstrings e assinaturas Python são extraídas com ast"""
+    project_dir = tempfile.mkdtemp()
+    output_dir = tempfile.mkdtemp()
+    (Path(project_dir) / "tools.py").write_text(
+        "import os\n\n"
+        "LIMIT = 3\n\n"
+        "def helper(path):\n"
+        "    \"\"\"Lista arquivos do diretório.\"\"\"\n"
+        "    return os.listdir(path)\n\n"
+        "def _scan(path, depth=1):\n"
+        "    return [p for p in os.listdir(path) if depth]\n", encoding='utf-8')
+
+    analyzer = CodeAnalyzer(project_dir, output_dir)
+    files = analyzer.discover_files()
+    analyzer.analyze_dependencies(files)
+
+    llm = FakeLLMClient()
+    for file_path in files:
+        analyzer.analyze_file_with_llm(llm, file_path)
+
+    by_name = {element.name: element for element in analyzer.knowledge_base.values()}
+    assert by_name["helper"].description == "Lista arquivos do diretório."
+    assert by_name["_scan"].description == "Descreve _scan pelo LLM."
+    assert by_name["_scan"].access_modifier == "private"
+    assert by_name["LIMIT"].element_type == "variable"
+    assert len(llm.prompts) == 1
+    print("✅ Extração estática Python funcionando")
+
+
+def test_response_parser_handles_missing_descriptions():
+    """O parser linear aceita elementos sem descrição e texto livre sem travar"""
+    analyzer = JavaAnalyzer(Path(tempfile.mkdtemp()))
+    notes = "".join(f"Observação {i} sobre o serviço.\n" for i in range(200))
+    response = (
+        "```\n"
+        "CLASSE: UserService extends BaseService\n"
+        "Modificadores: public\n"
+        "Descrição: Gerencia usuários.\n"
+        "Métodos principais: salvar\n\n"
+        "MÉTODO: public void salvar(User user)\n"
+        "Descrição: Persiste o usuário.\n"
+        "Annotations: @Override, @Transactional\n\n"
+        "CAMPO: private int total\n"
+        "```\n" + notes
+    )
+
+    elements = {element.name: element for element in analyzer.parse_analysis_response("UserService.java", response).values()}
+    print(f"📚 Elementos: {sorted(elements)}")
+
+    assert elements["UserService"].access_modifier == "public"
+    assert elements["UserService"].description.startswith("Gerencia usuários.")
+    assert elements["salvar"].annotations == ["@Override", "@Transactional"]
+    assert elements["total"].description == ""
+    print("✅ Parser de respostas funcionando")
+
+
+if __name__ == "__main__":
+    test_batch_planning_groups_small_files_by_package()
+    test_batches_keep_dependencies_before_dependents()
+    test_batch_response_is_split_per_file()
+    test_static_extraction_skips_llm_for_trivial_files()
+    test_static_extraction_asks_only_descriptions()
+    test_python_static_extraction()
+    test_response_parser_handles_missing_descriptions()
+    print("\n🎉 Todos os testes de análise em lote passaram!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Teste da validação estática local do código gerado
+"""
+
+import os
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.code_parser import StructuredCodeBlock
+from helper.code_validator import format_static_report, validate_blocks, validate_files, validate_source
+from project_structure_manager import ProjectStructureManager
+
+VALID_JAVA = '''package com.empresa.clientes;
+
+import java.util.List;
+
+public class ClienteService {
+    private static final String SEPARADOR = "}";
+
+    public List<String> listar() {
+        return List.of("a", String.valueOf('{'));
+    }
+}
+'''
+
+
+def block(filename, language, code):
+    return StructuredCodeBlock(filename=filename, location="", component="", description="",
+                               language=language, code=code, dependencies=[])
+
+
+def test_valid_code_passes():
+    """Código correto (inclusive delimitadores dentro de strings) não gera problemas"""
+    blocks = [
+        block("ClienteService.java", "java", VALID_JAVA),
+        block("app.py", "python", "import os\n\ndef caminho(nome):\n    return os.path.join('dados', nome)\n"),
+        block("application.yml", "yaml", "server:\n  port: 8080\n"),
+        block("V1__clientes.sql", "sql", "CREATE TABLE clientes (nome VARCHAR(80)); -- it's ok\n"),
+        block("Tela.jsx", "jsx", "const Tela = () => <p>Don't {</p>;\n"),
+    ]
+    assert validate_blocks(blocks) == []
+    print("✅ Código válido aceito")
+
+
+def test_mechanical_errors_are_reported_with_location():
+    """Erros de sintaxe, imports faltando e classe/arquivo divergentes geram mensagens exatas"""
+    cases = {
+        ("Pedido.java", "java"): "public class Pedido {\n    void salvar() {\n}\n",
+        ("PedidoService.java", "java"): "public class PedidoServiceImpl {\n    Optional<String> buscar() { return null; }\n}\n",
+        ("pedidos.py", "python"): "def total(itens):\n    return sum(i.valor for i in itens) + taxa\n",
+        ("quebrado.py", "python"): "def total(:\n    pass\n",
+        ("config.json", "json"): '{"porta": 8080,}',
+        ("docker-compose.yml", "yaml"): "services:\n  app: x\n    image: y\n",
+    }
+    messages = {}
+    for (filename, language), code in cases.items():
+        issues = validate_source(filename, language, code)
+        print(filename, [str(issue) for issue in issues])
+        assert issues, f"{filename} deveria ter problemas"
+        messages[filename] = " | ".join(str(issue) for issue in issues)
+
+    assert "'{' aberto e nunca fechado" in messages["Pedido.java"] and "(linha 1)" in messages["Pedido.java"]
+    assert "PedidoServiceImpl" in messages["PedidoService.java"]
+    assert "import java.util.Optional" in messages["PedidoService.java"]
+    assert "'taxa'" in messages["pedidos.py"]
+    assert "erro de sintaxe" in messages["quebrado.py"]
+
+    report = format_static_report(validate_source("pedidos.py", "python", cases[("pedidos.py", "python")]))
+    assert report.startswith("❌ REJEITADO") and "✅ APROVADO" not in report
+    print("✅ Erros mecânicos detectados")
+
+
+def test_project_generated_names_skip_type_name_check():
+    """Arquivos salvos como TaskN_* (nome dado pelo projeto) não são rejeitados pelo nome do tipo"""
+    interface = "package com.empresa;\n\npublic interface UserRepository {\n    void salvar();\n}\n"
+    assert validate_source("new_system/backend/Task3_Main.java", "java", interface) == []
+    assert validate_source("UserRepository.java", "java", interface) == []
+    assert validate_source("Repositorio.java", "java", interface), "Nome dado pelo LLM continua verificado"
+
+    manager = ProjectStructureManager(tempfile.mkdtemp())
+    path = manager.save_generated_file(code_content=interface, code_language="java", task_index=3,
+                                       task_description="Repositório")
+    assert os.path.basename(path) == "UserRepository.java"
+    assert validate_files([path]) == []
+    print("✅ Interfaces, enums e records mantêm o nome do tipo")
+
+
+def test_qualified_names_and_task_types_are_not_missing_imports():
+    """Nomes qualificados e tipos do próprio projeto não viram falso 'usado sem import'"""
+    qualified = ("package com.empresa;\n\n@javax.persistence.Entity\npublic class Pedido {\n"
+                 "    @javax.persistence.Id private Long id;\n    private java.util.List<String> itens;\n}\n")
+    assert validate_source("Pedido.java", "java", qualified) == []
+
+    # 'Service' é um tipo do mesmo pacote declarado em outro arquivo da task
+    service = "package com.empresa;\n\npublic interface Service {\n    void executar();\n}\n"
+    user = "package com.empresa;\n\npublic class Agenda {\n    private Service service;\n}\n"
+    assert validate_source("Agenda.java", "java", user), "Isolado, o nome continua suspeito"
+    assert validate_blocks([block("Service.java", "java", service), block("Agenda.java", "java", user)]) == []
+    print("✅ Imports verificados de forma conservadora")
+
+
+if __name__ == "__main__":
+    test_valid_code_passes()
+    test_mechanical_errors_are_reported_with_location()
+    test_project_generated_names_skip_type_name_check()
+    test_qualified_names_and_task_types_are_not_missing_imports()
+    print("\n🎉 Todos os testes de validação estática passaram!")
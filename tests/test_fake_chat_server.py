@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Teste do backend falso do chat (benchmarks offline) e do gerador de sistemas sintéticos
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.request import urlopen
+
+import websocket
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import importlib
+
+import llm_client
+from benchmarks.bench_pipeline import SLEEP_MODULES, _ScaledTime
+from benchmarks.fake_chat_server import SEND_BUTTON_NODE_ID, FakeChatServer, SyntheticResponder
+from benchmarks.synthetic_codebase import generate_codebase, plan_codebase
+
+
+def cdp(ws, message_id, method, params=None):
+    ws.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+    response = json.loads(ws.recv())
+    assert response['id'] == message_id
+    return response['result']
+
+
+def test_chat_round_trip_streams_response():
+    """Digitar + clicar em enviar gera uma resposta que cresce até o texto completo"""
+    server = FakeChatServer(tabs=2, latency=0.05, stream_time=0.1,
+                            responder=lambda prompt: f"Resposta para: {prompt}").start()
+    try:
+        with urlopen(server.json_url) as response:
+            tabs = json.load(response)
+        assert len(tabs) == 2 and tabs[0]['url'].startswith('https://vscode.dev')
+
+        ws = websocket.create_connection(tabs[1]['webSocketDebuggerUrl'])
+        count = "document.querySelectorAll('div[data-last-element]').length"
+        text = "const lastElem = elems[elems.length - 2];"
+        assert cdp(ws, 1, 'Runtime.evaluate', {'expression': count})['result']['value'] == 1
+
+        cdp(ws, 2, 'Input.insertText', {'text': "olá " * 20})
+        quad = cdp(ws, 3, 'DOM.getBoxModel', {'nodeId': SEND_BUTTON_NODE_ID})['model']['content']
+        cdp(ws, 4, 'Input.dispatchMouseEvent', {'type': 'mouseReleased', 'x': quad[0] + 1, 'y': quad[1] + 1})
+        assert cdp(ws, 5, 'Runtime.evaluate', {'expression': count})['result']['value'] == 1, "Ainda na latência"
+
+        expected = "Resposta para: " + "olá " * 20
+        seen = []
+        deadline = time.monotonic() + 5
+        while (not seen or seen[-1] != expected) and time.monotonic() < deadline:
+            current = cdp(ws, 6 + len(seen), 'Runtime.evaluate', {'expression': text})['result']['value']
+            if current and (not seen or current != seen[-1]):
+                seen.append(current)
+            time.sleep(0.01)
+        assert seen[-1] == expected
+        assert len(seen) > 1 and all(expected.startswith(part) for part in seen), "Resposta deveria chegar em trechos"
+        assert cdp(ws, 100, 'Runtime.evaluate', {'expression': count})['result']['value'] == 2
+        ws.close()
+
+        assert server.stats()['prompts'] == 1
+        print("✅ Chat falso via CDP funcionando")
+    finally:
+        server.stop()
+
+
+def test_failing_chunk_callback_does_not_duplicate_response():
+    """Erro no on_chunk é registrado; a resposta final não repete o trecho que falhou"""
+    expected = "Resposta em vários trechos. " * 40
+    server = FakeChatServer(latency=0.05, stream_time=2.0, responder=lambda prompt: expected).start()
+    # Esperas fixas do cliente encurtadas como no benchmark
+    modules = [importlib.import_module(name) for name in SLEEP_MODULES]
+    original_times = [module.time for module in modules]
+    for module in modules:
+        module.time = _ScaledTime(0.1)
+    try:
+        client = llm_client.LLMClient(debug_endpoint=server.json_url)
+        client.connect()
+        chunks = []
+
+        def on_chunk(chunk):
+            chunks.append(chunk)
+            if len(chunks) == 1:
+                raise ValueError("falha no parser")
+
+        response = client.send_prompt("olá", on_chunk=on_chunk)
+        client.close()
+    finally:
+        for module, original_time in zip(modules, original_times):
+            module.time = original_time
+        server.stop()
+    assert len(chunks) > 1, "A resposta deveria chegar em mais de um trecho"
+    # A captura pode encerrar antes do fim do streaming; o que importa é não repetir texto
+    assert response == "".join(chunks) and expected.startswith(response), response
+    print("✅ Falha no callback de trechos não duplica a resposta")
+
+
+def test_synthetic_codebase_and_responses():
+    """Grafo de imports acíclico e respostas no formato de cada etapa"""
+    planned = plan_codebase(40, fan_out=3, graph='random')
+    assert all(all(dependency < item.index for dependency in item.imports) for item in planned)
+    assert all(len(item.imports) == 3 for item in planned[3:])
+    assert [item.imports for item in plan_codebase(5, graph='chain')] == [[], [0], [1], [2], [3]]
+
+    created = generate_codebase(tempfile.mkdtemp(), 'java', files=8)
+    assert len(created) == 8
+    assert "import com.acme.legacy.mod0.Servico0;" in created[1].read_text(encoding='utf-8')
+
+    responder = SyntheticResponder(response_size=500, tasks=3)
+    assert responder("contexto\n\nPrompt 3.2: Planos de Execução\n...").count("### Task") == 3
+    assert responder("Prompt 4.2: Validação e Integração\n").startswith("✅ APROVADO")
+    assert "ARQUIVO: service_1.py" in responder("Prompt 4.1: Implementação por Componente\n")
+    assert responder("**ELEMENTOS A DESCREVER:**\n[1] class A\n[2] method b").count("\n") == 1
+    print("✅ Sistema sintético e respostas por etapa funcionando")
+
+
+if __name__ == "__main__":
+    test_chat_round_trip_streams_response()
+    test_failing_chunk_callback_does_not_duplicate_response()
+    test_synthetic_codebase_and_responses()
+    print("\n🎉 Todos os testes do chat falso passaram!")
@@ -29,7 +29,7 @@ def test_feedback_loops():
     try:
         # Sobrescreve OUTPUT_DIR temporariamente
         import main
-        main.OUTPUT_DIR = test_dir
+        main.set_output_dir(test_dir)
         
         print("🧪 Testando Feedback Loops...")
         
@@ -102,7 +102,7 @@ def test_feedback_loops():
         
     finally:
         # Restaura OUTPUT_DIR original
-        main.OUTPUT_DIR = original_output_dir
+        main.set_output_dir(original_output_dir)
         
         # Limpa diretório temporário (opcional - descomente para limpar)
         # shutil.rmtree(test_dir)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Teste do armazenamento limitado de feedback (global_context.md com janela recente + lições)
+"""
+
+import os
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.feedback_store import RECENT_ENTRIES, FeedbackEntry, FeedbackStore
+
+
+def rejection(index, component, reason):
+    text = f"## 🔍 Feedback de Validação - Task {index}\n**Status:** ❌ REJEITADO\n\n{reason}\n" + "detalhe " * 200
+    return FeedbackEntry('validation', index, f"Task {index}", component, False, text,
+                         reasons=["❌ REJEITADO", f"- {reason}"])
+
+
+def test_old_entries_become_component_lessons():
+    """Entradas antigas viram lições por componente e o markdown para de crescer"""
+    output_dir = tempfile.mkdtemp()
+    with open(os.path.join(output_dir, "global_context.md"), 'w', encoding='utf-8') as f:
+        f.write("# Contexto Global da Migração\n\n## 📊 Histórico de Feedback\n")
+    store = FeedbackStore(output_dir)
+
+    sizes = []
+    for index in range(1, 3 * RECENT_ENTRIES + 1):
+        component = "Backend" if index % 2 else "Frontend"
+        store.record(rejection(index, component, f"Erro de import no serviço {component}"))
+        sizes.append(os.path.getsize(store.context_file))
+
+    with open(store.context_file, encoding='utf-8') as f:
+        content = f.read()
+    assert content.startswith("# Contexto Global da Migração")
+    assert content.count("## 🔍 Feedback de Validação") == RECENT_ENTRIES
+    assert "(20x) Erro de import no serviço Backend" in content
+    assert "❌ REJEITADO\n" not in content.split("## 🔍")[0], "Status sozinho não é lição"
+    assert sizes[-1] <= max(sizes[RECENT_ENTRIES:2 * RECENT_ENTRIES]) + 200, "Markdown deveria ter tamanho limitado"
+
+    # Estado persiste entre execuções
+    assert len(FeedbackStore(output_dir)._state['recent']) == RECENT_ENTRIES
+    print("✅ Compressão em lições por componente funcionando")
+
+
+def test_task_slice_only_carries_relevant_feedback():
+    """A fatia da task traz seu histórico e o mesmo componente, dentro do limite"""
+    store = FeedbackStore(tempfile.mkdtemp())
+    store.record(rejection(1, "Backend", "Falta tratamento de erro no repositório"))
+    store.record(rejection(2, "Frontend", "Componente de tela inválido"))
+
+    backend = store.context_for(1, "Backend", max_chars=2500)
+    print(backend[:400])
+    assert "Histórico desta task:** 1 validação(ões), 1 rejeição(ões)" in backend
+    assert "Falta tratamento de erro" in backend
+    assert "Componente de tela inválido" not in backend
+    assert len(backend) <= 2500
+
+    overview = store.context_for(max_chars=5000)
+    assert "Task 1" in overview and "Task 2" in overview
+    print("✅ Fatia relevante por task funcionando")
+
+
+if __name__ == "__main__":
+    test_old_entries_become_component_lessons()
+    test_task_slice_only_carries_relevant_feedback()
+    print("\n🎉 Todos os testes do armazenamento de feedback passaram!")
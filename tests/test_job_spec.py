@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Teste da especificação de jobs e dos subcomandos da linha de comando (execução sem interação)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.job_spec import DEFAULT_STEPS, find_conflicts, load_job_spec
+from main import parse_args
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_spec(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def test_job_spec_with_inline_migration_config():
+    """Caminhos relativos ao arquivo do job; a seção migration_config torna o próprio job a configuração"""
+    directory = tempfile.mkdtemp()
+    os.makedirs(os.path.join(directory, "legacy"))
+    path = write_spec(directory, "erp.yaml", """
+job:
+  legacy_directory: legacy
+  output_dir: runs/erp
+  steps: [implement, fase1, fase0]
+migration_config:
+  project_name: "ERP"
+""")
+    spec = load_job_spec(path)
+    assert spec.name == "erp"
+    assert spec.legacy_directory == os.path.join(directory, "legacy")
+    assert spec.output_dir == os.path.join(directory, "runs", "erp")
+    assert spec.config_file == path
+    assert spec.steps == ['fase0', 'fase1', 'implement'], "Etapas devem seguir a ordem do pipeline"
+
+    minimal = load_job_spec(write_spec(directory, "minimal.yaml", "job:\n  steps: [fase2, fase3]\n"))
+    assert minimal.output_dir == "migration_docs" and minimal.workers == 3
+    assert list(DEFAULT_STEPS)[0] == 'fase0'
+    print("✅ Job com configuração embutida funcionando")
+
+
+def test_invalid_jobs_and_conflicts():
+    """Erros de conteúdo viram ValueError; jobs paralelos não podem dividir diretório nem Chrome"""
+    directory = tempfile.mkdtemp()
+    invalid = {
+        "sem_job.yaml": "migration_config:\n  project_name: X\n",
+        "etapa.yaml": "job:\n  steps: [fase9]\n",
+        "sem_config.yaml": "job:\n  steps: [fase0]\n",
+        "sem_legado.yaml": "job:\n  steps: [fase1]\n  legacy_directory: nao_existe\n",
+    }
+    for name, content in invalid.items():
+        try:
+            load_job_spec(write_spec(directory, name, content))
+        except ValueError as e:
+            assert name in str(e)
+        else:
+            raise AssertionError(f"{name} deveria ser rejeitado")
+
+    first = load_job_spec(write_spec(directory, "a.yaml", "job:\n  steps: [fase2]\n  output_dir: a\n"))
+    second = load_job_spec(write_spec(directory, "b.yaml", "job:\n  steps: [fase2]\n  output_dir: b\n"))
+    assert find_conflicts([first, second], parallel=1) == []
+    assert len(find_conflicts([first, second], parallel=2)) == 1, "Mesmo Chrome em jobs paralelos"
+    second.output_dir = first.output_dir
+    assert len(find_conflicts([first, second], parallel=1)) == 1
+    print("✅ Validação de jobs funcionando")
+
+
+def test_cli_subcommands():
+    """Subcomandos sem interação e compatibilidade com o menu (sem subcomando)"""
+    assert parse_args([]).command is None
+    args = parse_args(['--output-dir', 'runs/a', 'implement', '--all', '--workers', '2'])
+    assert (args.command, args.all, args.workers, args.output_dir) == ('implement', True, 2, 'runs/a')
+    args = parse_args(['phase', '1', '--legacy-dir', '/tmp/legado'])
+    assert (args.number, args.legacy_dir) == (1, '/tmp/legado')
+    args = parse_args(['logs', 'report', '--since', '20250101_000000'])
+    assert (args.action, args.since) == ('report', '20250101_000000')
+    assert parse_args(['job', 'a.yaml', 'b.yaml', '--parallel', '2']).specs == ['a.yaml', 'b.yaml']
+    try:
+        parse_args(['phase', '0'])
+    except SystemExit as e:
+        assert e.code == 2
+    else:
+        raise AssertionError("Fase 0 sem --config deveria ser rejeitada")
+    print("✅ Subcomandos da linha de comando funcionando")
+
+
+def test_run_steps_fails_instead_of_prompting():
+    """Configuração inexistente e fase 1 retomada sem diretório legado terminam com código 1"""
+    output_dir = tempfile.mkdtemp()
+    script = (
+        "import main\n"
+        f"main.set_output_dir({output_dir!r})\n"
+        "main.pipeline_state.resume = True\n"
+        "print('codes', main.run_steps(None, ['fase0'], config_file='nao_existe.yaml'),"
+        " main.run_steps(None, ['fase1']))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True, timeout=60)
+    assert "codes 1 1" in result.stdout, result.stdout + result.stderr
+    assert "Diretório do sistema legado não encontrado" in result.stdout
+    print("✅ Etapas sem interação falham com código de saída")
+
+
+if __name__ == "__main__":
+    test_job_spec_with_inline_migration_config()
+    test_invalid_jobs_and_conflicts()
+    test_cli_subcommands()
+    test_run_steps_fails_instead_of_prompting()
+    print("\n🎉 Todos os testes de jobs passaram!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Teste da base de conhecimento indexada (índice carregado sob demanda e corpos por posição)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import helper.kb_store as kb_store
+from smart_context_manager import SmartContextManager
+
+
+def test_index_is_lazy_and_bodies_are_read_on_demand():
+    """Construção não lê nada; o índice não carrega corpos; reindexações são compactadas"""
+    output_dir = tempfile.mkdtemp()
+    manager = SmartContextManager(output_dir)
+    for index in range(20):
+        manager.index_document(f"architecture-{index}.md",
+                               f"# Visão\nSistema java spring {index}\n## Tecnologias\nSpring Boot {index}\n")
+    manager.save_knowledge_base()
+
+    reopened = SmartContextManager(output_dir)
+    assert reopened._knowledge_base is None, "Índice só deveria ser lido na primeira consulta"
+    assert 'content' not in reopened.knowledge_base["architecture-3.md"]
+    document = reopened.get_document("architecture-3.md")
+    assert document['sections']['Tecnologias'].strip() == "Spring Boot 3"
+    assert "Spring Boot" in reopened.build_smart_context_for_task("sistema java spring")
+
+    # Reindexar várias vezes deixa corpos obsoletos; a compactação mantém só os vigentes
+    original_limit = kb_store.COMPACT_MIN_BYTES
+    kb_store.COMPACT_MIN_BYTES = 0
+    try:
+        for round_number in range(3):
+            padding = "" if round_number == 2 else "detalhe " * 500
+            reopened.index_document("architecture-3.md", f"# Visão\nRevisão {round_number}\n{padding}")
+            reopened.save_knowledge_base()
+    finally:
+        kb_store.COMPACT_MIN_BYTES = original_limit
+    final = SmartContextManager(output_dir)
+    assert final.get_document("architecture-3.md")['content'] == "# Visão\nRevisão 2\n"
+    assert final.get_document("architecture-19.md")['sections']['Tecnologias'].strip() == "Spring Boot 19"
+    with open(final.store.bodies_file, 'rb') as f:
+        assert len(f.readlines()) == 20
+    print("✅ Base indexada sob demanda funcionando")
+
+
+def test_interrupted_compaction_keeps_index_consistent():
+    """Queda entre a compactação e a gravação do índice não invalida as posições"""
+    output_dir = tempfile.mkdtemp()
+    manager = SmartContextManager(output_dir)
+    for round_number in range(3):
+        manager.index_document("domain.md", f"# Domínio\nRevisão {round_number}\n" + "pedido " * 300)
+        manager.index_document("rules.md", f"# Regras\nRegra {round_number}\n")
+        manager.save_knowledge_base()
+
+    original_limit = kb_store.COMPACT_MIN_BYTES
+    kb_store.COMPACT_MIN_BYTES = 0
+    try:
+        def crash(documents):
+            raise OSError("queda simulada")
+        manager.store._write_index = crash
+        manager.save_knowledge_base()  # o erro é registrado e o arquivo da nova geração fica órfão
+        recovered = SmartContextManager(output_dir)
+        assert recovered.get_document("rules.md")['content'] == "# Regras\nRegra 2\n"
+        assert recovered.store.bodies_file.endswith(kb_store.BODIES_FILENAME)
+
+        # A próxima compactação bem-sucedida troca de geração e remove os arquivos antigos
+        recovered.index_document("rules.md", "# Regras\nRegra 3\n")
+        recovered.save_knowledge_base()
+    finally:
+        kb_store.COMPACT_MIN_BYTES = original_limit
+    final = SmartContextManager(output_dir)
+    assert final.get_document("rules.md")['content'] == "# Regras\nRegra 3\n"
+    assert final.get_document("domain.md")['content'].startswith("# Domínio\nRevisão 2")
+    bodies = [name for name in os.listdir(output_dir) if name.startswith("knowledge_base.docs")]
+    assert bodies == [os.path.basename(final.store.bodies_file)] and final.store.generation >= 1, bodies
+    print("✅ Compactação interrompida mantém a base consistente")
+
+
+def test_legacy_knowledge_base_is_converted():
+    """knowledge_base.json antigo vira índice + corpos; entradas da análise de código são ignoradas"""
+    output_dir = tempfile.mkdtemp()
+    with open(os.path.join(output_dir, "knowledge_base.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            "business-flows.md": {'content': "# Fluxos\nPedido e fatura", 'summary': "Fluxos", 'keywords': ["pedido"],
+                                  'doc_type': 'business', 'sections': {'Fluxos': "Pedido e fatura"}, 'size': 24},
+            "Servico.java::Servico": {'name': "Servico", 'element_type': "class", 'file_path': "Servico.java"},
+        }, f)
+
+    manager = SmartContextManager(output_dir)
+    assert list(manager.knowledge_base) == ["business-flows.md"]
+    assert manager.get_document("business-flows.md")['content'] == "# Fluxos\nPedido e fatura"
+    assert os.path.exists(manager.store.index_file)
+    print("✅ Conversão da base antiga funcionando")
+
+
+if __name__ == "__main__":
+    test_index_is_lazy_and_bodies_are_read_on_demand()
+    test_interrupted_compaction_keeps_index_consistent()
+    test_legacy_knowledge_base_is_converted()
+    print("\n🎉 Todos os testes da base indexada passaram!")
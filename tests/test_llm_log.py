@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Teste do log de interações em segmentos JSONL com gravação em lote
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.spans import span, take_spans, traced
+from helper.llm_log import LLMLogWriter, find_record, iter_records, list_segments, render_markdown, split_prompt_components
+
+
+def test_records_are_batched_rotated_and_unique():
+    """Chamadas paralelas no mesmo segundo geram registros distintos em poucos arquivos"""
+    logs_dir = tempfile.mkdtemp()
+    writer = LLMLogWriter(logs_dir, compression='gzip', max_segment_bytes=20_000, flush_interval=0.05)
+
+    def worker(n):
+        for i in range(25):
+            writer.write({'timestamp': "20250101_120000", 'prompt_key': f"P{n}", 'prompt_text': "prompt",
+                          'response_text': f"resposta {n}-{i} " + "y" * 500})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    records = list(iter_records(logs_dir))
+    assert len(records) == 100
+    assert len({record['id'] for record in records}) == 100, "IDs deveriam ser únicos"
+    segments = list_segments(logs_dir)
+    assert 1 < len(segments) < 20 and all(path.endswith('.jsonl.gz') for path in segments)
+    print(f"✅ {len(records)} registros em {len(segments)} segmentos")
+
+
+def test_truncated_batch_keeps_previous_records_and_markdown_on_demand():
+    """Um lote cortado no fim do segmento não apaga os anteriores; Markdown sai sob demanda"""
+    logs_dir = tempfile.mkdtemp()
+    writer = LLMLogWriter(logs_dir)
+    first_id = writer.write({'prompt_key': "P1", 'prompt_text': "prompt", 'response_text': "resposta ok"})
+    writer.flush()
+    writer.write({'prompt_key': "P2", 'prompt_text': "prompt", 'response_text': "perdida"})
+    writer.close()
+
+    segment = list_segments(logs_dir)[0]
+    with open(segment, 'rb') as f:
+        data = f.read()
+    with open(segment, 'wb') as f:
+        f.write(data[:-10])  # simula queda durante a gravação do segundo lote
+
+    records = list(iter_records(logs_dir))
+    assert [record['prompt_key'] for record in records] == ["P1"]
+    markdown = render_markdown(find_record(logs_dir, first_id, writer.index))
+    assert "## 📥 RESPOSTA RECEBIDA\nresposta ok" in markdown
+    assert not any(name.endswith('.md') for name in os.listdir(logs_dir))
+    print("✅ Recuperação de lote truncado e visão Markdown funcionando")
+
+
+def test_index_answers_reports_without_reading_segments():
+    """Totais, top-N e período vêm do índice; logs JSON antigos são indexados uma vez"""
+    logs_dir = tempfile.mkdtemp()
+    with open(os.path.join(logs_dir, "llm_log_20240101_100000.json"), 'w', encoding='utf-8') as f:
+        json.dump({'timestamp': "20240101_100000", 'prompt_key': "P1_1", 'token_estimate': 900,
+                   'context_size_chars': 3000, 'response_size_chars': 800, 'prompt_text': "p", 'response_text': "r"}, f)
+
+    writer = LLMLogWriter(logs_dir, flush_interval=0.05)
+    for task in range(1, 4):
+        writer.write({'timestamp': f"20250301_10000{task}", 'prompt_key': f"P4_2_Task_{task}", 'token_estimate': task * 100,
+                      'context_size_chars': 400, 'response_size_chars': 50, 'latency_ms': 2000,
+                      'prompt_text': "prompt", 'response_text': "r" * 50})
+    writer.close()
+    writer.sync_index()
+    writer.sync_index()  # idempotente
+
+    for path in list_segments(logs_dir):
+        os.remove(path)  # o índice não depende dos segmentos para os relatórios
+
+    stats = writer.index.summary()
+    assert stats['interactions'] == 4 and stats['tokens'] == 1500 and stats['avg_latency_ms'] == 2000
+    assert stats['by_prompt']["P1_1"] == 1
+    assert [row['prompt_key'] for row in writer.index.top(2)] == ["P1_1", "P4_2_Task_3"]
+    recent = writer.index.query(since="20250101_000000")
+    assert [(row['phase'], row['task']) for row in recent] == [(4, 1), (4, 2), (4, 3)]
+    print("✅ Índice de logs funcionando")
+
+
+def test_prompt_components_are_stored_once_and_rebuilt_exactly():
+    """Material repetido dos prompts é gravado uma vez; o prompt volta idêntico"""
+    logs_dir = tempfile.mkdtemp()
+    shared = "# CONFIGURAÇÃO DA MIGRAÇÃO\n" + "Java 8 -> Java 17, Spring Boot, PostgreSQL.\n" * 60 + "\n\n"
+    legacy = "# SISTEMA LEGADO (RESUMO)\n" + "Módulos: clientes, pedidos, faturamento.\n" * 60 + "\n\n\n"
+    prompts = [f"CONTEXTO OTIMIZADO:\n{shared}{legacy}Implemente a task {i}:\n\n- detalhe {i}\n" for i in range(40)]
+    assert "".join(split_prompt_components(prompts[0])) == prompts[0]
+
+    writer = LLMLogWriter(logs_dir, compression=None)
+    ids = [writer.write({'prompt_key': f"P4_1_Task_{i}", 'prompt_text': prompt, 'response_text': "ok"})
+           for i, prompt in enumerate(prompts)]
+    writer.close()
+
+    segment_bytes = sum(os.path.getsize(path) for path in list_segments(logs_dir))
+    raw_bytes = sum(len(prompt.encode('utf-8')) for prompt in prompts)
+    print(f"📉 Segmentos: {segment_bytes:,} bytes (prompts completos: {raw_bytes:,} bytes)")
+    assert segment_bytes * 10 < raw_bytes
+    assert len(writer.index.load_components(
+        [h for record in iter_records(logs_dir) for h in record['prompt_components']])) < 3 * len(prompts)
+
+    for record_id, prompt in zip(ids[::13], prompts[::13]):
+        assert find_record(logs_dir, record_id, writer.index)['prompt_text'] == prompt
+    print("✅ Componentes de prompt deduplicados e reconstruídos")
+
+
+def test_steady_traffic_is_flushed_and_errors_do_not_block():
+    """Tráfego contínuo não adia a gravação; erro inesperado no lote não trava flush()"""
+    logs_dir = tempfile.mkdtemp()
+    writer = LLMLogWriter(logs_dir, compression=None, flush_interval=0.1, batch_size=1000)
+    for i in range(12):
+        writer.write({'prompt_key': f"P4_1_Task_{i}", 'response_text': "ok"})
+        time.sleep(0.05)
+    assert len(list(iter_records(logs_dir))) >= 6, "Registros antigos deveriam estar em disco"
+
+    def broken_batch(records):
+        raise RuntimeError("falha inesperada")
+    writer._write_batch = broken_batch
+    writer.write({'prompt_key': "P4_1_Task_99", 'response_text': "ok"})
+    finished = threading.Event()
+    threading.Thread(target=lambda: (writer.flush(), finished.set()), daemon=True).start()
+    assert finished.wait(5), "flush() não deveria bloquear após erro na gravação"
+    writer.close()
+    print("✅ Gravação por idade do lote e tolerância a erros funcionando")
+
+
+def test_removed_sources_drop_unreferenced_components():
+    """A limpeza de logs apaga os componentes usados só pelas interações removidas"""
+    logs_dir = tempfile.mkdtemp()
+    shared = "# CONFIGURAÇÃO DA MIGRAÇÃO\n" + "Java 8 -> Java 17.\n" * 40 + "\n\n"
+    writer = LLMLogWriter(logs_dir, compression=None, max_segment_bytes=1)
+    old_id = writer.write({'prompt_key': "P4_1_Task_1", 'prompt_text': shared + "Task antiga exclusiva\n"})
+    writer.flush()
+    new_id = writer.write({'prompt_key': "P4_1_Task_2", 'prompt_text': shared + "Task nova\n"})
+    writer.close()
+
+    old_segment, new_segment = list_segments(logs_dir)
+    records = {record['id']: record for record in iter_records(logs_dir)}
+    old_only = set(records[old_id]['prompt_components']) - set(records[new_id]['prompt_components'])
+    assert old_only, "A task antiga deveria ter um componente exclusivo"
+
+    os.remove(old_segment)
+    writer.index.remove_sources([os.path.basename(old_segment)])
+    assert writer.index.load_components(old_only) == {}
+    assert find_record(logs_dir, new_id, writer.index)['prompt_text'] == shared + "Task nova\n"
+    assert writer.index.source_of(new_id) == os.path.basename(new_segment)
+    print("✅ Limpeza remove componentes sem referência")
+
+
+def test_spans_feed_phase_latency_breakdown():
+    """Spans da thread vão para o registro e o índice agrega o tempo por fase e etapa"""
+    @traced("context.smart")
+    def build_context():
+        with span("context.structure_overview"):
+            return "contexto"
+
+    build_context()
+    build_context()
+    with span("cdp.Runtime.evaluate"):
+        pass
+    spans = take_spans()
+    assert spans["context.smart"]["count"] == 2 and spans["context.structure_overview"]["count"] == 2
+    assert take_spans() == {}, "O acumulador deveria ser zerado após a leitura"
+
+    logs_dir = tempfile.mkdtemp()
+    writer = LLMLogWriter(logs_dir)
+    for task in (1, 2):
+        writer.write({'prompt_key': f"P4_1_Task_{task}", 'latency_ms': 3000, 'response_text': "ok",
+                      'spans': {"llm.wait_response": {'count': 1, 'ms': 2500.0}, "cdp.Runtime.evaluate": {'count': 7, 'ms': 400.0}}})
+    writer.write({'prompt_key': "P1_1", 'latency_ms': 1000, 'response_text': "ok", 'spans': spans})
+    writer.close()
+
+    breakdown = writer.index.phase_breakdown()
+    assert breakdown[4]['interactions'] == 2 and breakdown[4]['avg_latency_ms'] == 3000
+    assert breakdown[4]['spans'][0] == {'phase': 4, 'name': "llm.wait_response", 'count': 2, 'ms': 5000.0}
+    assert {row['name'] for row in breakdown[1]['spans']} == set(spans)
+    print("✅ Spans e latência por fase funcionando")
+
+
+if __name__ == "__main__":
+    test_records_are_batched_rotated_and_unique()
+    test_truncated_batch_keeps_previous_records_and_markdown_on_demand()
+    test_index_answers_reports_without_reading_segments()
+    test_prompt_components_are_stored_once_and_rebuilt_exactly()
+    test_steady_traffic_is_flushed_and_errors_do_not_block()
+    test_removed_sources_drop_unreferenced_components()
+    test_spans_feed_phase_latency_breakdown()
+    print("\n🎉 Todos os testes do log de interações passaram!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Teste dos digests dos documentos das fases
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.phase_digest import PhaseDigestStore
+
+
+def write_phase_doc(directory, name, sections=6):
+    """Cria um documento de fase grande, com prompt repetido no início"""
+    parts = ["**Prompt 1.1:** Desenvolva a análise da arquitetura\n"]
+    for i in range(sections):
+        parts.append(f"## Seção {i} de {name}\n")
+        parts.append(f"Resumo da seção {i}. Detalhes longos que não entram no digest.\n")
+        parts.extend(f"- Ponto {j} da seção {i}\n" for j in range(6))
+        parts.append("Texto adicional " * 40 + "\n")
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(parts))
+    return path
+
+
+def test_digest_is_compact_and_prompt_free():
+    """O digest guarda títulos, primeiros tópicos e frase inicial, sem o prompt"""
+    directory = tempfile.mkdtemp()
+    path = write_phase_doc(directory, "architecture-analysis.md")
+    store = PhaseDigestStore(max_chars=600)
+
+    digest = store.update(path)
+    print(digest)
+
+    assert len(digest) <= 600
+    assert "## Seção 0 de architecture-analysis.md" in digest
+    assert "- Ponto 2 da seção 0" in digest and "- Ponto 3 da seção 0" not in digest
+    assert "Resumo da seção 0." in digest and "Detalhes longos" not in digest
+    assert "Prompt 1.1" not in digest
+    assert store.digest_path(path).exists()
+    print("✅ Digest compacto funcionando")
+
+
+def test_context_reads_digests_and_refreshes_stale_ones():
+    """O contexto divide o orçamento entre as fases e recalcula digests desatualizados"""
+    directory = tempfile.mkdtemp()
+    store = PhaseDigestStore()
+    paths = [write_phase_doc(directory, f"phase-{i}.md") for i in range(4)]
+    for path in paths:
+        store.update(path)
+
+    context = store.build_context(paths, total_budget=800)
+    print(context)
+    assert all(f"## phase-{i}.md" in context for i in range(4)), "Todas as fases devem aparecer no contexto"
+    assert len(context) < 800 + 4 * 40
+
+    time.sleep(0.01)
+    with open(paths[0], 'w', encoding='utf-8') as f:
+        f.write("## Nova Seção\nConteúdo revisado.\n")
+    assert "Nova Seção" in store.get(paths[0]), "Digest desatualizado deveria ser recalculado"
+    print("✅ Contexto por digests funcionando")
+
+
+if __name__ == "__main__":
+    test_digest_is_compact_and_prompt_free()
+    test_context_reads_digests_and_refreshes_stale_ones()
+    print("\n🎉 Todos os testes de digests passaram!")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Teste dos checkpoints do pipeline (--resume)
+"""
+
+import os
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.pipeline_state import PipelineState
+
+
+def test_completed_steps_are_resumed_from_their_artifacts():
+    """Etapas registradas são retomadas com o conteúdo salvo, após reabrir o estado"""
+    directory = tempfile.mkdtemp()
+    doc_path = os.path.join(directory, "architecture-analysis.md")
+    with open(doc_path, 'w', encoding='utf-8') as f:
+        f.write("# Arquitetura\nMonolito em camadas.\n")
+
+    state = PipelineState(directory)
+    state.record("phase:P1_1", [doc_path])
+    state.record("task:abc:refinement:1", [doc_path], has_blocks=True)
+    state.set_value('legacy_directory', '/tmp/legado')
+    # Sem --resume nada é pulado
+    assert state.completed("phase:P1_1") is None
+
+    resumed = PipelineState(directory, resume=True)
+    assert resumed.resumed_artifact("phase:P1_1").startswith("# Arquitetura")
+    assert resumed.completed("task:abc:refinement:1")['data'] == {'has_blocks': True}
+    assert resumed.get_value('legacy_directory') == '/tmp/legado'
+    assert resumed.completed("phase:P1_2") is None
+    print("✅ Retomada de etapas funcionando")
+
+
+def test_changed_or_missing_artifacts_invalidate_the_step():
+    """Artefato alterado ou apagado faz a etapa ser executada de novo"""
+    directory = tempfile.mkdtemp()
+    doc_path = os.path.join(directory, "business-flows.md")
+    with open(doc_path, 'w', encoding='utf-8') as f:
+        f.write("Fluxos\n")
+    state = PipelineState(directory, resume=True)
+    state.record("phase:P1_2", [doc_path])
+    assert state.completed("phase:P1_2") is not None
+
+    with open(doc_path, 'a', encoding='utf-8') as f:
+        f.write("resposta truncada")
+    assert state.completed("phase:P1_2") is None
+
+    os.unlink(doc_path)
+    assert state.resumed_artifact("phase:P1_2") is None
+
+    state.reset()
+    assert PipelineState(directory, resume=True).get_value('legacy_directory') is None
+    print("✅ Invalidação de checkpoints funcionando")
+
+
+if __name__ == "__main__":
+    test_completed_steps_are_resumed_from_their_artifacts()
+    test_changed_or_missing_artifacts_invalidate_the_step()
+    print("\n🎉 Todos os testes de checkpoints passaram!")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Teste do perfil de execução por fase (--profile)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.profiler import PipelineProfiler
+
+
+def busy_walk(seconds):
+    """Trabalho local simulado (varredura de arquivos, filtros...)"""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_samples_are_grouped_by_phase_into_collapsed_stacks():
+    """Amostras da thread principal e de workers caem na fase ativa"""
+    profiler = PipelineProfiler(tempfile.mkdtemp(), interval=0.002)
+
+    @profiler.profiled("fase1")
+    def fase1():
+        busy_walk(0.15)
+
+    @profiler.profiled("fase4_batch")
+    def fase4_batch():
+        workers = [threading.Thread(target=busy_walk, args=(0.15,)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    fase1()  # desligado: nada é coletado
+    assert profiler.write_reports() is None
+
+    profiler.start()
+    fase1()
+    fase4_batch()
+    reports = profiler.write_reports()
+
+    with open(reports['collapsed'], encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("fase1;") and "busy_walk" in line for line in lines)
+    # Worker: a pilha começa no bootstrap da thread, não na função fase4_batch
+    assert any(line.startswith("fase4_batch;") and "_bootstrap" in line and "busy_walk" in line for line in lines)
+
+    with open(reports['summary'], encoding='utf-8') as f:
+        summary = f.read()
+    print(summary[:800])
+    assert "| fase1 |" in summary and "## 🔥 fase4_batch" in summary
+    assert "`busy_walk_(tests/test_profiler.py" in summary
+    print("✅ Perfil por fase funcionando")
+
+
+if __name__ == "__main__":
+    test_samples_are_grouped_by_phase_into_collapsed_stacks()
+    print("\n🎉 Todos os testes de perfil passaram!")
@@ -7,12 +7,13 @@ import os
 import sys
 import tempfile
 import shutil
+import threading
 
 # Adiciona o diretório atual ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from project_structure_manager import ProjectStructureManager
-from helper.code_parser import extract_structured_code_blocks, StructuredCodeBlock
+from helper.code_parser import extract_structured_code_blocks, StructuredCodeBlock, StructuredCodeBlockParser
 
 def test_project_structure_system():
     """Testa o sistema completo de estrutura de projeto"""
@@ -199,5 +200,194 @@ def test_project_structure_system():
         # shutil.rmtree(test_dir)
         print(f"\n🗂️ Arquivos de teste mantidos em: {test_dir}")
 
+def test_streaming_parser_emits_blocks_incrementally():
+    """O parser incremental emite cada arquivo ao fechar a cerca, antes do fim da resposta"""
+    response = (
+        "ARQUIVO: README.md\n"
+        "COMPONENTE: docs\n"
+        "```markdown\n"
+        "# Projeto\n"
+        "```bash\n"
+        "make run\n"
+        "```\n"
+        "```\n"
+        "DEPENDÊNCIAS: Makefile, Docker\n\n"
+        "ARQUIVO: App.java\n"
+        "```java\n"
+        "public class App {}\n"
+        "```\n"
+    )
+
+    emitted = []
+    parser = StructuredCodeBlockParser(on_block=lambda block: emitted.append((block.filename, len(parser.text))))
+    for i in range(0, len(response), 5):
+        parser.feed(response[i:i + 5])
+    parser.close()
+
+    print(f"📄 Blocos emitidos (arquivo, chars recebidos): {emitted}")
+    assert [name for name, _ in emitted] == ["README.md", "App.java"]
+    assert emitted[0][1] < len(response), "README.md deveria ser emitido antes do fim da resposta"
+    assert "```bash" in parser.blocks[0].code, "Cerca aninhada deveria fazer parte do código"
+    assert parser.blocks[0].dependencies == ["Makefile", "Docker"]
+    assert len(parser.code_blocks) == 2
+    assert [b.filename for b in extract_structured_code_blocks(response)] == ["README.md", "App.java"]
+    print("✅ Parser incremental de blocos funcionando")
+
+def test_batch_save_persists_metadata_once():
+    """Um lote de arquivos grava os metadados uma vez e sobrevive a um novo carregamento"""
+    test_dir = tempfile.mkdtemp()
+    try:
+        manager = ProjectStructureManager(test_dir)
+        writes = []
+        original_append = manager._append_to_journal
+        manager._append_to_journal = lambda entries: (writes.append(len(entries)), original_append(entries))
+
+        files = [
+            {'code_content': f"public class Service{i} {{}}", 'code_language': "java",
+             'task_index': 1, 'task_description': f"Serviço {i}", 'component_hint': "service"}
+            for i in range(30)
+        ]
+        saved = manager.save_generated_files(files)
+
+        print(f"💾 {len(saved)} arquivos salvos com {len([w for w in writes if w])} escrita(s) de metadados")
+        assert len(saved) == 30
+        assert [w for w in writes if w] == [30], f"Esperava uma única escrita de 30 entradas, obteve {writes}"
+
+        reloaded = ProjectStructureManager(test_dir)
+        assert len(reloaded.files_metadata) == 30, "Metadados deveriam ser recarregados do journal"
+
+        reloaded.flush_files_metadata()
+        assert not reloaded.files_journal_file.exists(), "Journal deveria ser compactado no snapshot"
+        assert len(ProjectStructureManager(test_dir).files_metadata) == 30
+        print("✅ Persistência em lote de metadados funcionando")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_overlapping_batches_on_threads_flush_independently():
+    """O lote de um worker vai para o journal ao terminar, mesmo com o lote de outro ainda aberto"""
+    test_dir = tempfile.mkdtemp()
+    try:
+        manager = ProjectStructureManager(test_dir)
+        second_open = threading.Event()
+        first_done = threading.Event()
+
+        def first_worker():
+            second_open.wait(5)
+            with manager.batch_save():
+                manager.save_generated_file("public class Pedido {}", "java", 1, "Entidade", "entity")
+            first_done.set()
+
+        def second_worker():
+            with manager.batch_save():
+                manager.save_generated_file("public class Fatura {}", "java", 2, "Entidade", "entity")
+                second_open.set()
+                first_done.wait(5)
+                # O lote da task 1 já terminou: seus metadados devem estar no journal
+                journal = manager.files_journal_file.read_text(encoding='utf-8') if manager.files_journal_file.exists() else ""
+                assert "Pedido.java" in journal, "Lote encerrado deveria estar no journal"
+                assert "Fatura.java" not in journal, "Lote ainda aberto não deveria ser gravado"
+
+        errors = []
+        def run(target):
+            try:
+                target()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run, args=(worker,)) for worker in (first_worker, second_worker)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        assert first_done.is_set()
+        assert len(ProjectStructureManager(test_dir).files_metadata) == 2
+        print("✅ Lotes de metadados independentes por thread")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_structure_overview_is_cached_and_bounded():
+    """A visão geral vem da árvore em memória, é limitada e foca no componente da task"""
+    test_dir = tempfile.mkdtemp()
+    try:
+        manager = ProjectStructureManager(test_dir)
+        manager._create_directory_structure()
+        manager.get_structure_overview()
+
+        walks = []
+        original_walk = os.walk
+        os.walk = lambda *args, **kwargs: (walks.append(args), original_walk(*args, **kwargs))[1]
+        try:
+            for i in range(40):
+                manager.save_generated_file(f"public class Service{i} {{}}", "java", 1, f"Serviço {i}", "service")
+            overview = manager.get_structure_overview(max_lines=30)
+            focused = manager.get_structure_overview(focus="Criar serviços no backend")
+        finally:
+            os.walk = original_walk
+
+        print(overview)
+        assert not walks, "A visão geral não deveria percorrer o disco após a primeira carga"
+        assert len(overview.strip().split('\n')) <= 30 + 3
+        assert "📂 frontend/" in overview and "📂 infrastructure/" in overview
+        assert "📂 frontend/ (" in focused, "Componentes fora do foco deveriam aparecer recolhidos"
+        assert "… (+" in focused, "Diretórios com muitos arquivos deveriam ser resumidos"
+        print("✅ Visão geral em cache funcionando")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_overview_rerenders_only_dirty_subtrees():
+    """Uma escrita invalida só as subárvores do caminho alterado; o resultado é igual ao de uma árvore nova"""
+    test_dir = tempfile.mkdtemp()
+    try:
+        manager = ProjectStructureManager(test_dir)
+        manager._create_directory_structure()
+        for i in range(8):
+            manager.save_generated_file(f"public class Service{i} {{}}", "java", 1, f"Serviço {i}", "service")
+        manager.get_structure_overview(max_lines=30)
+        tree = manager._tree
+        frontend_cache = dict(tree['dirs']['frontend']['rendered'])
+        assert frontend_cache, "Subárvores deveriam ficar em cache após a primeira visão geral"
+
+        manager.save_generated_file("public class Pedido {}", "java", 2, "Entidade", "entity")
+        assert tree['dirs']['frontend']['rendered'] == frontend_cache, "Subárvore intocada não deveria ser refeita"
+        assert not tree['dirs']['backend']['rendered'], "Subárvore alterada deveria ser invalidada"
+
+        for focus, max_lines in (("", 30), ("Criar serviços no backend", 60), ("", 12)):
+            cached = manager.get_structure_overview(focus=focus, max_lines=max_lines)
+            fresh = ProjectStructureManager(test_dir).get_structure_overview(focus=focus, max_lines=max_lines)
+            assert cached == fresh, f"Visão geral em cache difere da renderização completa ({focus!r}, {max_lines})"
+        print("✅ Visão geral refaz só as subárvores alteradas")
+    finally:
+        shutil.rmtree(test_dir)
+
+def test_structure_is_materialized_lazily():
+    """A arquitetura alvo não cria diretórios nem READMEs até a primeira escrita ou o export"""
+    test_dir = tempfile.mkdtemp()
+    try:
+        manager = ProjectStructureManager(test_dir)
+        manager.update_structure_from_target_architecture("Arquitetura de microservices com Spring Boot")
+
+        assert not list(manager.new_system_dir.iterdir()), "Nenhum diretório deveria ser criado antecipadamente"
+        overview = manager.get_structure_overview()
+        assert "user-service" in overview, "Diretórios virtuais devem aparecer na visão geral"
+        assert "README.md" not in overview
+
+        file_path = manager.save_generated_file("public class UserController {}", "java", 1, "Controller", "controller")
+        assert os.path.exists(file_path), "Diretório deve ser criado na primeira escrita"
+        assert not list(manager.new_system_dir.rglob("README.md"))
+
+        readmes = manager.export_structure(include_readmes=True)
+        assert readmes > 0 and (manager.new_system_dir / "services" / "user-service" / "src" / "main" / "resources" / "README.md").exists()
+        assert not (manager.new_system_dir / "services" / "user-service" / "README.md").exists()
+        print(f"✅ Materialização sob demanda funcionando ({readmes} READMEs no export)")
+    finally:
+        shutil.rmtree(test_dir)
+
 if __name__ == "__main__":
     test_project_structure_system()
+    test_streaming_parser_emits_blocks_incrementally()
+    test_batch_save_persists_metadata_once()
+    test_overlapping_batches_on_threads_flush_independently()
+    test_structure_overview_is_cached_and_bounded()
+    test_overview_rerenders_only_dirty_subtrees()
+    test_structure_is_materialized_lazily()
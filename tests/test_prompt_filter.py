@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Teste do motor compartilhado de remoção de prompts
+"""
+
+import os
+import sys
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.prompt_filter import PromptFilter
+
+SAMPLE = """# Análise do Sistema
+
+## Componentes
+O sistema possui módulo de autenticação.
+
+**Prompt 3.2:** Desenvolva planos de execução
+Considere as tecnologias atuais
+- item do prompt
+
+## Resultados
+Deliverables claros por sprint
+Arquitetura em camadas.
+"""
+
+
+def test_prompt_sections_and_instructions_are_removed():
+    """Seções de prompt e linhas de instrução saem; o conteúdo analisado fica"""
+    filtered = PromptFilter().filter_text(SAMPLE)
+    print(filtered)
+
+    assert "módulo de autenticação" in filtered
+    assert "Arquitetura em camadas." in filtered
+    assert "## Resultados" in filtered
+    assert "Prompt 3.2" not in filtered and "item do prompt" not in filtered
+    assert "Deliverables claros" not in filtered
+    print("✅ Remoção de prompts funcionando")
+
+
+if __name__ == "__main__":
+    test_prompt_sections_and_instructions_are_removed()
+    print("\n🎉 Todos os testes do filtro de prompts passaram!")
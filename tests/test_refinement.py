@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Teste do refinamento por arquivo (só arquivos com falha no prompt, correção no lugar)
+"""
+
+import os
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from project_structure_manager import ProjectStructureManager
+
+CLIENTE = "public class ClienteService {\n    void salvar() {}\n}\n"
+PEDIDO = "public class PedidoService {\n    void fechar() { int total = ; }\n}\n"
+
+VALIDATION = """❌ REJEITADO
+
+## Análise geral
+A implementação segue a arquitetura proposta e tem boa organização.
+
+## Problemas
+- Erro de sintaxe em PedidoService.java na linha 2
+- Falta tratamento de exceção no fechamento do pedido
+"""
+
+
+def test_refinement_prompt_only_carries_failing_files():
+    """O prompt leva só o arquivo citado na validação e os achados relevantes"""
+    original_manager = main.project_manager
+    main.project_manager = ProjectStructureManager(tempfile.mkdtemp())
+    try:
+        saved = [
+            main.project_manager.save_generated_file(code, "java", 1, "Serviço de clientes e pedidos", "backend")
+            for code in (CLIENTE, PEDIDO)
+        ]
+        task_files = {main.task_file_key(path): path for path in saved}
+        task = {'title': "Task 1", 'description': "Serviço de clientes e pedidos"}
+
+        prompt = main.build_refinement_prompt(1, task, task_files, VALIDATION)
+        print(prompt)
+
+        assert "PedidoService" in prompt and "int total = ;" in prompt
+        assert "void salvar()" not in prompt, "Arquivo sem falha não deveria ir para o refinamento"
+        assert "Erro de sintaxe em PedidoService.java" in prompt
+        assert "Falta tratamento de exceção" in prompt
+        assert "boa organização" not in prompt, "Trechos da validação sem problemas não deveriam ir"
+        assert len(prompt) < len(CLIENTE + PEDIDO + VALIDATION) + 1200
+        print("✅ Prompt de refinamento compacto funcionando")
+    finally:
+        main.project_manager = original_manager
+
+
+def test_refined_file_replaces_previous_version():
+    """A correção substitui o arquivo no mesmo caminho, sem criar cópias"""
+    manager = ProjectStructureManager(tempfile.mkdtemp())
+    path = manager.save_generated_file(PEDIDO, "java", 1, "Serviço de pedidos", "backend")
+    files_before = len(manager.files_metadata)
+
+    fixed = PEDIDO.replace("int total = ;", "int total = 0;")
+    assert manager.replace_generated_file(path, fixed, "REFINEMENT_1_correção") == path
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == fixed
+    assert len(manager.files_metadata) == files_before
+    assert manager.files_metadata[path].description == "REFINEMENT_1_correção"
+    print("✅ Substituição no lugar funcionando")
+
+
+if __name__ == "__main__":
+    test_refinement_prompt_only_carries_failing_files()
+    test_refined_file_replaces_previous_version()
+    print("\n🎉 Todos os testes de refinamento passaram!")
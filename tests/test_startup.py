@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Teste da inicialização sem efeitos colaterais (gerenciadores criados no primeiro uso)
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.fake_chat_server import FakeChatServer
+from helper.lazy import LazyObject
+
+
+def test_import_main_has_no_side_effects():
+    """Importar o main não cria migration_docs/ nem carrega websocket, YAML ou SQLite"""
+    workdir = tempfile.mkdtemp()
+    script = (f"import sys; sys.path.insert(0, {ROOT_DIR!r}); import main; "
+              "print(','.join(m for m in ('websocket', 'yaml', 'sqlite3', 'code_analyzer') if m in sys.modules)); "
+              "print(main.pipeline_state.lazy_loaded, main.llm_log.lazy_loaded)")
+    result = subprocess.run([sys.executable, '-c', script], cwd=workdir, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    loaded, lazy_state = result.stdout.splitlines()
+    assert loaded == "", f"Módulos carregados na importação: {loaded}"
+    assert lazy_state == "False False"
+    assert os.listdir(workdir) == [], f"Arquivos criados na importação: {os.listdir(workdir)}"
+    print("✅ Importação do main sem efeitos colaterais")
+
+
+def test_menu_option_without_code_generation_creates_no_structure():
+    """Opções que não implementam código (ex.: [8] limpeza) não criam new_system/"""
+    output_dir = os.path.join(tempfile.mkdtemp(), "out")
+    server = FakeChatServer(latency=0, stream_time=0, responder=lambda prompt: "ok").start()
+    try:
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT_DIR, "main.py"), '--output-dir', output_dir,
+             '--debug-endpoint', server.json_url],
+            cwd=ROOT_DIR, input="8\n", capture_output=True, text=True, timeout=60
+        )
+    finally:
+        server.stop()
+    assert "Processo concluído" in result.stdout, result.stdout + result.stderr
+    assert not os.path.exists(os.path.join(output_dir, "new_system")), os.listdir(output_dir)
+    assert not os.path.exists(os.path.join(output_dir, "project_structure.json"))
+    print("✅ Opção sem geração de código não cria a estrutura do projeto")
+
+
+def test_lazy_object_creates_instance_once():
+    """O proxy cria a instância no primeiro acesso e repassa leitura e escrita de atributos"""
+    created = []
+
+    class State:
+        resume = False
+
+    def factory():
+        created.append(State())
+        return created[-1]
+
+    state = LazyObject(factory)
+    assert not state.lazy_loaded and created == []
+    state.resume = True
+    assert state.resume is True and created[0].resume is True
+    assert state.lazy_loaded and len(created) == 1
+    print("✅ LazyObject funcionando")
+
+
+if __name__ == "__main__":
+    test_import_main_has_no_side_effects()
+    test_menu_option_without_code_generation_creates_no_structure()
+    test_lazy_object_creates_instance_once()
+    print("\n🎉 Todos os testes de inicialização passaram!")
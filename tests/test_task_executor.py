@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Teste do executor paralelo da Fase 4
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.task_executor import ParallelTaskExecutor, build_task_graph
+from helper.task_manager import TaskManager
+
+BACKLOG = """# Backlog da Migração
+
+## Sprint 1
+### Task 1: Modelo de dados
+Criar entidades.
+### Task 2: Configuração do projeto
+Criar pom.xml.
+### Task 3: Repositórios
+Dependências: Task 1
+## Sprint 2
+### Task 4: Serviço de clientes
+Depende de: Repositórios
+### Task 5: Serviço de pedidos
+Dependências: nenhuma
+"""
+
+
+def load_backlog_tasks():
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, "migration-backlog.md"), 'w', encoding='utf-8') as f:
+        f.write(BACKLOG)
+    manager = TaskManager(directory)
+    return manager, manager.load_tasks()
+
+
+def test_graph_uses_sprints_and_dependency_lines():
+    """Dependências vêm das linhas `Dependências:` e da ordem dos sprints"""
+    _, tasks = load_backlog_tasks()
+    titles = [task['title'] for task in tasks]
+    graph = build_task_graph(tasks)
+    index = {title.split(':')[0]: i for i, title in enumerate(titles)}
+
+    assert graph[index['Task 1']].dependencies == set()
+    assert graph[index['Task 2']].dependencies == set()
+    assert graph[index['Task 3']].dependencies == {index['Task 1']}
+    # Sprint 2 depende de todo o Sprint 1; os títulos dos sprints não são tasks
+    sprint1 = {index['Task 1'], index['Task 2'], index['Task 3']}
+    assert graph[index['Task 4']].dependencies == sprint1
+    assert graph[index['Task 5']].dependencies == sprint1
+    assert index['Sprint 1'] not in graph and index['Sprint 2'] not in graph
+    print("✅ Grafo de dependências funcionando")
+
+
+def test_independent_tasks_run_concurrently_and_failures_block_dependents():
+    """Tasks independentes rodam ao mesmo tempo; dependentes de falhas ficam bloqueadas"""
+    manager, tasks = load_backlog_tasks()
+    graph = build_task_graph(tasks)
+    failing = next(i for i, task in enumerate(tasks) if task['title'].startswith('Task 1'))
+    dependent = next(i for i, task in enumerate(tasks) if task['title'].startswith('Task 3'))
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+    used_clients = set()
+
+    def run_task(client, task_index, task):
+        with lock:
+            active.append(task_index)
+            peak.append(len(active))
+            used_clients.add(client)
+        time.sleep(0.05)
+        with lock:
+            active.remove(task_index)
+        if task_index == failing:
+            return False
+        manager.mark_task_completed(task_index)
+        return True
+
+    start = time.time()
+    results = ParallelTaskExecutor(run_task, ["sessão-a", "sessão-b", "sessão-c"]).run(graph)
+    elapsed = time.time() - start
+    print(results, f"{elapsed:.2f}s")
+
+    assert max(peak) >= 2, "Tasks independentes deveriam rodar em paralelo"
+    assert used_clients <= {"sessão-a", "sessão-b", "sessão-c"}
+    assert results[failing] == 'failed'
+    assert results[dependent] == 'blocked'
+    # Todo o Sprint 2 depende do Sprint 1, que falhou
+    assert all(status == 'blocked' for i, status in results.items() if graph[i].sprint == 2)
+    assert manager.completed_task_indexes() == {i for i, status in results.items() if status == 'completed'}
+    print("✅ Execução paralela funcionando")
+
+
+def test_completed_tasks_are_not_run_again():
+    """Tasks concluídas em execuções anteriores são puladas e contam como dependência satisfeita"""
+    _, tasks = load_backlog_tasks()
+    graph = build_task_graph(tasks)
+    done = {i for i, node in graph.items() if node.sprint == 1}
+    executed = []
+
+    results = ParallelTaskExecutor(lambda client, i, task: executed.append(i) or True, [object()]).run(graph, done=done)
+
+    assert set(executed) == set(graph) - done
+    assert all(status == 'completed' for status in results.values())
+    print("✅ Retomada da execução funcionando")
+
+
+def test_sprint_headings_are_not_executed():
+    """Títulos de sprint e entradas sem descrição não passam por implementação"""
+    _, tasks = load_backlog_tasks()
+    graph = build_task_graph(tasks)
+    executed = []
+
+    results = ParallelTaskExecutor(lambda client, i, task: executed.append(task['title']) or True,
+                                   [object()]).run(graph)
+
+    assert sorted(title.split(':')[0] for title in executed) == [f"Task {n}" for n in range(1, 6)]
+    assert all(tasks[i]['description'].strip() for i in results)
+    print("✅ Títulos de sprint fora da execução")
+
+
+if __name__ == "__main__":
+    test_graph_uses_sprints_and_dependency_lines()
+    test_independent_tasks_run_concurrently_and_failures_block_dependents()
+    test_completed_tasks_are_not_run_again()
+    test_sprint_headings_are_not_executed()
+    print("\n🎉 Todos os testes do executor paralelo passaram!")